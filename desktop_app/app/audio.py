@@ -1,111 +1,520 @@
 """Audio recording and playback with 16-bit PCM WAV support."""
+import io
 import struct
 import wave
 import os
+import queue
 import tempfile
 import threading
-from typing import Optional, Callable
+import time
+from typing import Optional, Callable, Union
 from datetime import datetime
 
-# Optional imports for audio capture
-try:
-    import sounddevice as sd
-    import numpy as np
-    SOUNDDEVICE_AVAILABLE = True
-except ImportError:
-    SOUNDDEVICE_AVAILABLE = False
+from .lazy import LazyModule, module_available
 
-try:
-    import pyaudio
-    PYAUDIO_AVAILABLE = True
-except ImportError:
-    PYAUDIO_AVAILABLE = False
+# Optional imports, deferred until audio is actually used
+np = LazyModule("numpy")
+NUMPY_AVAILABLE = module_available("numpy")
+
+from .audio_devices import get_device_manager, sd, pyaudio, SOUNDDEVICE_AVAILABLE, PYAUDIO_AVAILABLE
+from .audio_backends import AudioBackend, StreamStats, default_backend
+
+# Storage codecs and WAV helpers live in audio_codec, which storage and
+# export use without importing the audio backends
+from .audio_codec import (
+    soundfile_available, wav_header, validate_wav_16bit, WAV_HEADER_SIZE,
+    CODEC_WAV, CODEC_FLAC, CODEC_DELTA, CODECS, available_codecs,
+    encode_audio, decode_audio, decoded_wav_size, stored_audio_format
+)
+
+
+def __getattr__(name):
+    # SOUNDFILE_AVAILABLE is computed on first access
+    if name == "SOUNDFILE_AVAILABLE":
+        return soundfile_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class CaptureBuffer:
+    """
+    Growable int16 sample buffer with room for a WAV header in front.
+    
+    The audio callback copies each block into preallocated storage instead
+    of appending a new array per block. Capacity doubles when full, so
+    growth is rare and amortized. At stop the header is written into the
+    reserved space and the WAV is one contiguous slice.
+    """
+    
+    _HEADER_SAMPLES = WAV_HEADER_SIZE // 2
+    
+    def __init__(self, sample_rate: int, channels: int = 1, initial_seconds: float = 30.0):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        capacity = max(1024, int(sample_rate * channels * initial_seconds))
+        self._data = np.empty(self._HEADER_SAMPLES + capacity, dtype='<i2')
+        self._length = 0
+    
+    def __len__(self) -> int:
+        """Number of samples written."""
+        return self._length
+    
+    @property
+    def capacity(self) -> int:
+        """Number of samples that fit without growing."""
+        return len(self._data) - self._HEADER_SAMPLES
+    
+    def _grow(self, needed: int) -> None:
+        new_capacity = self.capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+        grown = np.empty(self._HEADER_SAMPLES + new_capacity, dtype='<i2')
+        end = self._HEADER_SAMPLES + self._length
+        grown[:end] = self._data[:end]
+        self._data = grown
+    
+    def write(self, block) -> None:
+        """
+        Append a block of samples.
+        
+        Args:
+            block: int16 numpy array (any shape) or raw little-endian bytes
+        """
+        if isinstance(block, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(block, dtype='<i2')
+        else:
+            samples = block.reshape(-1)
+        
+        count = len(samples)
+        if self._length + count > self.capacity:
+            self._grow(self._length + count)
+        
+        start = self._HEADER_SAMPLES + self._length
+        self._data[start:start + count] = samples
+        self._length += count
+    
+    def samples(self):
+        """View of the recorded samples (no copy)."""
+        return self._data[self._HEADER_SAMPLES:self._HEADER_SAMPLES + self._length]
+    
+    def to_wav(self) -> bytes:
+        """Write the header in place and return the complete WAV."""
+        data_size = self._length * 2
+        header = np.frombuffer(
+            wav_header(data_size, self.sample_rate, self.channels), dtype='<i2'
+        )
+        self._data[:self._HEADER_SAMPLES] = header
+        return self._data[:self._HEADER_SAMPLES + self._length].tobytes()
+
+
+class PrerollRing:
+    """
+    Fixed-size int16 ring buffer holding the most recent audio.
+    
+    Fed continuously by the warm input stream so a recording can start with
+    the audio captured just before the record button was pressed.
+    """
+    
+    def __init__(self, size: int):
+        self.size = max(0, size)
+        self._data = np.zeros(max(1, self.size), dtype='<i2')
+        self._pos = 0
+        self._filled = 0
+    
+    def write(self, block) -> None:
+        """Append a block (int16 array or raw bytes), overwriting the oldest samples."""
+        if self.size == 0:
+            return
+        if isinstance(block, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(block, dtype='<i2')
+        else:
+            samples = block.reshape(-1)
+        
+        if len(samples) >= self.size:
+            self._data[:] = samples[-self.size:]
+            self._pos = 0
+            self._filled = self.size
+            return
+        
+        end = self._pos + len(samples)
+        if end <= self.size:
+            self._data[self._pos:end] = samples
+        else:
+            first = self.size - self._pos
+            self._data[self._pos:] = samples[:first]
+            self._data[:end - self.size] = samples[first:]
+        self._pos = end % self.size
+        self._filled = min(self.size, self._filled + len(samples))
+    
+    def snapshot(self):
+        """Return the buffered samples, oldest first, as a new array."""
+        if self._filled < self.size:
+            return self._data[:self._filled].copy()
+        return np.concatenate((self._data[self._pos:], self._data[:self._pos]))
+
+
+PARTIAL_SUFFIX = ".partial.wav"
+
+
+def _patch_wav_sizes(f, data_size: int) -> None:
+    """Rewrite the RIFF and data chunk sizes of an open WAV file."""
+    position = f.tell()
+    f.seek(4)
+    f.write(struct.pack("<I", 36 + data_size))
+    f.seek(40)
+    f.write(struct.pack("<I", data_size))
+    f.seek(position)
+
+
+def recover_partial_wav(path: str) -> Optional[str]:
+    """
+    Repair a recording left behind by a crash during disk capture.
+    
+    Patches the header sizes from the file length (dropping a trailing
+    half sample) and renames <name>.partial.wav to <name>.wav.
+    
+    Args:
+        path: Path to a .partial.wav file
+        
+    Returns:
+        Path of the repaired WAV, or None if the file is unusable
+    """
+    try:
+        size = os.path.getsize(path)
+        if size <= WAV_HEADER_SIZE:
+            return None
+        data_size = (size - WAV_HEADER_SIZE) // 2 * 2
+        with open(path, 'r+b') as f:
+            f.truncate(WAV_HEADER_SIZE + data_size)
+            _patch_wav_sizes(f, data_size)
+    except OSError:
+        return None
+    
+    recovered = path[:-len(PARTIAL_SUFFIX)] + ".wav" if path.endswith(PARTIAL_SUFFIX) else path
+    os.replace(path, recovered)
+    return recovered
+
+
+def find_partial_recordings(directory: str) -> list:
+    """List .partial.wav files left in a spill directory."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith(PARTIAL_SUFFIX)
+    )
+
+
+class DiskCaptureWriter:
+    """
+    Streams captured blocks to a WAV file on disk from a writer thread.
+    
+    The audio callback only copies the block and puts it on a SimpleQueue,
+    which never blocks. The writer thread appends blocks to
+    <name>.partial.wav and patches the header sizes every flush_interval
+    seconds, so a crash leaves a file recover_partial_wav can repair. On a
+    clean close the file is renamed to <name>.wav. Memory use does not
+    grow with recording length.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, directory: str, sample_rate: int, channels: int = 1,
+                 flush_interval: float = 1.0):
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.path = os.path.join(directory, f"recording_{stamp}{PARTIAL_SUFFIX}")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.flush_interval = flush_interval
+        self.data_size = 0
+        self.max_queue_depth = 0
+        self._queued_bytes = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._file = open(self.path, 'wb')
+        self._file.write(wav_header(0, sample_rate, channels))
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def __len__(self) -> int:
+        """Number of samples written or queued so far."""
+        return self._queued_bytes // 2
+    
+    def write(self, block) -> None:
+        """Queue a block of samples (int16 array or raw bytes) for writing."""
+        if isinstance(block, (bytes, bytearray)):
+            data = bytes(block)
+        else:
+            # PortAudio reuses its buffer after the callback returns
+            data = block.tobytes()
+        self._queued_bytes += len(data)
+        self._queue.put(data)
+    
+    @property
+    def queue_depth(self) -> int:
+        """Blocks waiting for the writer thread."""
+        return self._queue.qsize()
+    
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            
+            if item is self._STOP:
+                break
+            if item is not None:
+                self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize() + 1)
+                self._file.write(item)
+                self.data_size += len(item)
+            
+            now = time.monotonic()
+            if now - last_flush >= self.flush_interval:
+                _patch_wav_sizes(self._file, self.data_size)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                last_flush = now
+    
+    def close(self) -> Optional[str]:
+        """
+        Drain the queue, finalize the header and return the WAV path.
+        
+        Returns:
+            Path to the finished .wav, or None if nothing was recorded
+        """
+        self._queue.put(self._STOP)
+        self._thread.join()
+        _patch_wav_sizes(self._file, self.data_size)
+        self._file.close()
+        
+        if self.data_size == 0:
+            os.remove(self.path)
+            return None
+        
+        final_path = self.path[:-len(PARTIAL_SUFFIX)] + ".wav"
+        os.replace(self.path, final_path)
+        return final_path
 
 
 class AudioRecorder:
     """Records and plays back 16-bit PCM WAV audio."""
     
     # Audio settings
-    SAMPLE_RATE = 44100
+    SAMPLE_RATE = 44100  # Default capture rate
+    SUPPORTED_SAMPLE_RATES = (16000, 22050, 32000, 44100, 48000)
     CHANNELS = 1
     SAMPLE_WIDTH = 2  # 16-bit = 2 bytes
     BITS_PER_SAMPLE = 16
     
-    def __init__(self):
+    def __init__(
+        self,
+        spill_to_disk: bool = False,
+        spill_dir: Optional[str] = None,
+        sample_rate: int = SAMPLE_RATE,
+        backend: Optional[AudioBackend] = None
+    ):
+        """
+        Initialize the recorder.
+        
+        Args:
+            spill_to_disk: Stream recordings to a WAV on disk instead of RAM
+                (for consent statements, texts and other long recordings)
+            spill_dir: Directory for disk recordings. Defaults to a
+                'recordings' folder under the system temp directory.
+            sample_rate: Capture rate, one of SUPPORTED_SAMPLE_RATES
+            backend: Audio backend; defaults to default_backend()
+        """
+        if sample_rate not in self.SUPPORTED_SAMPLE_RATES:
+            raise ValueError(f"Unsupported sample rate: {sample_rate}")
+        self.sample_rate = sample_rate
+        self.backend = backend if backend is not None else default_backend()
+        self.capture_stats = StreamStats()
         self.is_recording = False
-        self._recorded_data = []
+        self.spill_to_disk = spill_to_disk
+        self.spill_dir = spill_dir or os.path.join(tempfile.gettempdir(), "wordlist_recordings")
+        self._recorded_data: Optional[Union[CaptureBuffer, DiskCaptureWriter]] = None
+        
+        # Warm input stream with pre-roll (see start_monitoring)
+        self._monitor_thread: Optional[threading.Thread] = None
+        self._monitor_stop = threading.Event()
+        self._preroll: Optional[PrerollRing] = None
+        self._sink = None
+        self._sink_lock = threading.Lock()
+        self.preroll_ms = 0
+        
+        # Record start latency of the last recording
+        self._start_requested_at: Optional[float] = None
+        self.last_start_latency_ms: Optional[float] = None
         self._recording_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
         self._playback_thread: Optional[threading.Thread] = None
         self._current_stream = None
     
-    @staticmethod
-    def check_audio_support() -> dict:
+    def check_audio_support(self) -> dict:
         """
         Check audio recording/playback support.
         
+        Real backends use the cached device list of the shared device manager.
+        
         Returns:
             Dict with 'supported' bool and 'message' string
         """
-        if SOUNDDEVICE_AVAILABLE:
-            try:
-                devices = sd.query_devices()
-                input_devices = [d for d in devices if d['max_input_channels'] > 0]
-                if input_devices:
-                    return {"supported": True, "message": "Audio supported via sounddevice"}
-                return {"supported": False, "message": "No input devices found"}
-            except Exception as e:
-                return {"supported": False, "message": f"sounddevice error: {e}"}
-        
-        if PYAUDIO_AVAILABLE:
-            try:
-                p = pyaudio.PyAudio()
-                device_count = p.get_device_count()
-                p.terminate()
-                if device_count > 0:
-                    return {"supported": True, "message": "Audio supported via PyAudio"}
-                return {"supported": False, "message": "No audio devices found"}
-            except Exception as e:
-                return {"supported": False, "message": f"PyAudio error: {e}"}
-        
-        return {
-            "supported": False,
-            "message": "No audio library available. Install sounddevice or pyaudio."
-        }
+        if self.backend is None:
+            return get_device_manager().check_support()
+        return self.backend.check_support()
     
-    def start_recording(self) -> bool:
+    def start_recording(self, spill_to_disk: Optional[bool] = None) -> bool:
         """
         Start audio recording.
         
+        Args:
+            spill_to_disk: Override the recorder's spill_to_disk setting
+                for this recording
+        
         Returns:
             True if recording started successfully
         """
         if self.is_recording:
             return False
         
-        self._recorded_data = []
-        self._stop_event.clear()
+        if not NUMPY_AVAILABLE:
+            return False
         
-        if SOUNDDEVICE_AVAILABLE:
-            self._recording_thread = threading.Thread(target=self._record_sounddevice)
-        elif PYAUDIO_AVAILABLE:
-            self._recording_thread = threading.Thread(target=self._record_pyaudio)
-        else:
+        self._start_requested_at = time.perf_counter()
+        self.last_start_latency_ms = None
+        
+        if self.is_monitoring:
+            with self._sink_lock:
+                self._recorded_data = self._new_capture(spill_to_disk)
+                self._recorded_data.write(self._preroll.snapshot())
+                self._sink = self._recorded_data
+            # Audio is already flowing, so the only delay is the snapshot
+            self.last_start_latency_ms = (time.perf_counter() - self._start_requested_at) * 1000
+            self.is_recording = True
+            return True
+        
+        if self.backend is None:
             return False
         
+        self._recording_thread = threading.Thread(target=self._record)
+        self._recorded_data = self._new_capture(spill_to_disk)
+        self._stop_event.clear()
+        
         self._recording_thread.start()
         self.is_recording = True
         return True
     
-    def stop_recording(self) -> Optional[bytes]:
+    def _new_capture(self, spill_to_disk: Optional[bool]):
+        """Create the capture target for a new recording."""
+        if spill_to_disk is None:
+            spill_to_disk = self.spill_to_disk
+        if spill_to_disk:
+            return DiskCaptureWriter(self.spill_dir, self.sample_rate, self.CHANNELS)
+        return CaptureBuffer(self.sample_rate, self.CHANNELS)
+    
+    def _note_first_block(self) -> None:
+        """Record start latency when the first block of a cold start arrives."""
+        if self.last_start_latency_ms is None and self._start_requested_at is not None:
+            self.last_start_latency_ms = (time.perf_counter() - self._start_requested_at) * 1000
+    
+    # Warm input stream
+    def set_sample_rate(self, sample_rate: int) -> bool:
         """
-        Stop recording and return WAV data.
+        Change the capture rate for following recordings.
+        
+        A running warm input stream is reopened at the new rate.
         
         Returns:
-            16-bit PCM WAV data as bytes, or None if not recording
+            False if a recording is in progress or the rate is unsupported
         """
-        if not self.is_recording:
-            return None
+        if self.is_recording or sample_rate not in self.SUPPORTED_SAMPLE_RATES:
+            return False
+        if sample_rate == self.sample_rate:
+            return True
+        
+        monitoring = self.is_monitoring
+        if monitoring:
+            self.stop_monitoring()
+        self.sample_rate = sample_rate
+        if monitoring:
+            self.start_monitoring(self.preroll_ms)
+        return True
+    
+    @property
+    def is_monitoring(self) -> bool:
+        """True while the warm input stream is running."""
+        return self._monitor_thread is not None
+    
+    def start_monitoring(self, preroll_ms: int = 500) -> bool:
+        """
+        Open a persistent input stream that keeps a pre-roll ring buffer.
+        
+        While monitoring, start_recording does not open a stream; it copies
+        the last preroll_ms of audio into the new recording and keeps
+        appending, so the start of the word is never cut off.
+        
+        Args:
+            preroll_ms: Milliseconds of audio kept before record start
+            
+        Returns:
+            True if monitoring is running
+        """
+        if self.is_monitoring:
+            return True
+        if not NUMPY_AVAILABLE or self.backend is None:
+            return False
+        
+        self.preroll_ms = preroll_ms
+        self._preroll = PrerollRing(int(self.sample_rate * self.CHANNELS * preroll_ms / 1000))
+        self._monitor_stop.clear()
+        self._monitor_thread = threading.Thread(
+            target=self._run_input, args=(self._feed_monitor, self._monitor_stop), daemon=True
+        )
+        self._monitor_thread.start()
+        return True
+    
+    def stop_monitoring(self) -> None:
+        """Close the warm input stream."""
+        if not self.is_monitoring:
+            return
+        self._monitor_stop.set()
+        self._monitor_thread.join(timeout=2.0)
+        self._monitor_thread = None
+        self._preroll = None
+    
+    def _feed_monitor(self, block) -> None:
+        """Called with every block from the warm stream."""
+        with self._sink_lock:
+            self._preroll.write(block)
+            if self._sink is not None:
+                self._sink.write(block)
+    
+    def get_start_latency(self) -> dict:
+        """
+        Report how quickly the last recording started capturing.
+        
+        Returns:
+            Dict with 'latency_ms' (None before the first block arrived),
+            'warm' (pre-roll stream in use) and 'preroll_ms'
+        """
+        return {
+            "latency_ms": self.last_start_latency_ms,
+            "warm": self.is_monitoring,
+            "preroll_ms": self.preroll_ms if self.is_monitoring else 0
+        }
+    
+    @property
+    def recording_to_disk(self) -> bool:
+        """True if the current recording is being streamed to disk."""
+        return isinstance(self._recorded_data, DiskCaptureWriter)
+    
+    def _stop_capture(self) -> None:
+        if self._sink is not None:
+            with self._sink_lock:
+                self._sink = None
+            self.is_recording = False
+            return
         
         self._stop_event.set()
         
@@ -114,84 +523,100 @@ class AudioRecorder:
             self._recording_thread = None
         
         self.is_recording = False
+    
+    def stop_recording(self) -> Optional[bytes]:
+        """
+        Stop recording and return WAV data.
+        
+        Disk recordings are read back into memory; use
+        stop_recording_to_file to avoid that.
+        
+        Returns:
+            16-bit PCM WAV data as bytes, or None if not recording
+        """
+        if not self.is_recording:
+            return None
+        
+        if self.recording_to_disk:
+            path = self.stop_recording_to_file()
+            if not path:
+                return None
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.remove(path)
+            return data
+        
+        self._stop_capture()
         
         if not self._recorded_data:
             return None
         
         return self._create_wav(self._recorded_data)
     
-    def _record_sounddevice(self):
-        """Record audio using sounddevice."""
-        chunk_size = 1024
+    def stop_recording_to_file(self) -> Optional[str]:
+        """
+        Stop recording and return the path of a finished WAV file.
         
-        def callback(indata, frames, time_info, status):
-            if not self._stop_event.is_set():
-                self._recorded_data.append(indata.copy())
+        Disk recordings are finalized in place; in-memory recordings are
+        written to the spill directory. The caller owns the returned file.
         
-        try:
-            with sd.InputStream(
-                samplerate=self.SAMPLE_RATE,
-                channels=self.CHANNELS,
-                dtype='int16',
-                blocksize=chunk_size,
-                callback=callback
-            ):
-                while not self._stop_event.is_set():
-                    self._stop_event.wait(0.1)
-        except Exception as e:
-            print(f"Recording error: {e}")
+        Returns:
+            Path to a 16-bit PCM WAV, or None if not recording
+        """
+        if not self.is_recording:
+            return None
+        
+        self._stop_capture()
+        
+        if self.recording_to_disk:
+            return self._recorded_data.close()
+        
+        if not self._recorded_data:
+            return None
+        
+        os.makedirs(self.spill_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=".wav", dir=self.spill_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self._create_wav(self._recorded_data))
+        return path
     
-    def _record_pyaudio(self):
-        """Record audio using PyAudio."""
-        p = pyaudio.PyAudio()
-        chunk_size = 1024
+    def _record(self):
+        """Capture a cold-started recording until stop is requested."""
+        buffer = self._recorded_data
+        to_disk = isinstance(buffer, DiskCaptureWriter)
         
-        try:
-            stream = p.open(
-                format=pyaudio.paInt16,
-                channels=self.CHANNELS,
-                rate=self.SAMPLE_RATE,
-                input=True,
-                frames_per_buffer=chunk_size
-            )
-            
-            while not self._stop_event.is_set():
-                data = stream.read(chunk_size, exception_on_overflow=False)
-                self._recorded_data.append(data)
-            
-            stream.stop_stream()
-            stream.close()
-        except Exception as e:
-            print(f"Recording error: {e}")
-        finally:
-            p.terminate()
+        def on_block(block):
+            self._note_first_block()
+            buffer.write(block)
+            if to_disk:
+                self.capture_stats.record_queue_depth(buffer.queue_depth)
+        
+        self._run_input(on_block, self._stop_event)
     
-    def _create_wav(self, audio_data) -> bytes:
+    def _run_input(self, on_block: Callable, stop_event: threading.Event):
+        """Feed blocks from the backend's input stream to on_block until stop_event is set."""
+        self.backend.run_input(self.sample_rate, self.CHANNELS, on_block, stop_event, self.capture_stats)
+    
+    def get_capture_stats(self) -> dict:
+        """
+        Real-time capture counters.
+        
+        Returns:
+            Dict with the backend name plus block, overflow, queue depth and
+            callback duration statistics since the recorder was created
+        """
+        stats = self.capture_stats.snapshot()
+        stats["backend"] = self.backend.name if self.backend else None
+        return stats
+    
+    def _create_wav(self, audio_data: CaptureBuffer) -> bytes:
         """
         Create WAV file from recorded audio data.
         
         Returns:
             Complete WAV file as bytes
         """
-        # Combine all audio chunks
-        if SOUNDDEVICE_AVAILABLE and len(audio_data) > 0 and hasattr(audio_data[0], 'tobytes'):
-            # numpy arrays from sounddevice
-            raw_data = b''.join(chunk.tobytes() for chunk in audio_data)
-        else:
-            # bytes from pyaudio
-            raw_data = b''.join(audio_data)
-        
-        # Create WAV in memory
-        import io
-        buffer = io.BytesIO()
-        
-        with wave.open(buffer, 'wb') as wf:
-            wf.setnchannels(self.CHANNELS)
-            wf.setsampwidth(self.SAMPLE_WIDTH)
-            wf.setframerate(self.SAMPLE_RATE)
-            wf.writeframes(raw_data)
-        
-        return buffer.getvalue()
+        return audio_data.to_wav()
     
     def play_audio(self, wav_data: bytes, on_complete: Optional[Callable] = None) -> bool:
         """
@@ -224,7 +649,6 @@ class AudioRecorder:
     
     def _play_sounddevice(self, wav_data: bytes, on_complete: Optional[Callable]):
         """Play audio using sounddevice."""
-        import io
         try:
             buffer = io.BytesIO(wav_data)
             with wave.open(buffer, 'rb') as wf:
@@ -236,8 +660,10 @@ class AudioRecorder:
             if channels > 1:
                 audio_array = audio_array.reshape(-1, channels)
             
-            sd.play(audio_array, samplerate)
-            sd.wait()
+            manager = get_device_manager()
+            with manager.stream_session():
+                sd.play(audio_array, samplerate, device=manager.default_output())
+                sd.wait()
             
             if on_complete:
                 on_complete()
@@ -246,58 +672,40 @@ class AudioRecorder:
     
     def _play_pyaudio(self, wav_data: bytes, on_complete: Optional[Callable]):
         """Play audio using PyAudio."""
-        import io
-        p = pyaudio.PyAudio()
+        manager = get_device_manager()
         
         try:
             buffer = io.BytesIO(wav_data)
             wf = wave.open(buffer, 'rb')
+            p = manager.get_pyaudio()
             
-            stream = p.open(
-                format=p.get_format_from_width(wf.getsampwidth()),
-                channels=wf.getnchannels(),
-                rate=wf.getframerate(),
-                output=True
-            )
-            
-            chunk_size = 1024
-            data = wf.readframes(chunk_size)
-            
-            while data:
-                stream.write(data)
+            with manager.stream_session():
+                stream = p.open(
+                    format=p.get_format_from_width(wf.getsampwidth()),
+                    channels=wf.getnchannels(),
+                    rate=wf.getframerate(),
+                    output=True,
+                    output_device_index=manager.default_output()
+                )
+                
+                chunk_size = 1024
                 data = wf.readframes(chunk_size)
-            
-            stream.stop_stream()
-            stream.close()
+                
+                while data:
+                    stream.write(data)
+                    data = wf.readframes(chunk_size)
+                
+                stream.stop_stream()
+                stream.close()
             wf.close()
             
             if on_complete:
                 on_complete()
         except Exception as e:
             print(f"Playback error: {e}")
-        finally:
-            p.terminate()
     
     def cleanup(self):
         """Clean up resources."""
         if self.is_recording:
             self.stop_recording()
-
-
-def validate_wav_16bit(wav_data: bytes) -> bool:
-    """
-    Validate that WAV data is 16-bit PCM.
-    
-    Args:
-        wav_data: WAV file data as bytes
-        
-    Returns:
-        True if valid 16-bit PCM WAV
-    """
-    import io
-    try:
-        buffer = io.BytesIO(wav_data)
-        with wave.open(buffer, 'rb') as wf:
-            return wf.getsampwidth() == 2  # 16-bit = 2 bytes
-    except Exception:
-        return False
+        self.stop_monitoring()
@@ -0,0 +1,446 @@
+"""
+Audio backends for capture and playback, with real-time instrumentation.
+
+AudioRecorder and PlaybackEngine talk to the sound card only through a
+backend: sounddevice, PyAudio, or an in-process fake device that produces
+a deterministic synthetic signal (for tests and benchmarks without a
+sound card). Every backend reports block counts, overflows/underflows,
+callback durations and queue depths into a StreamStats.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional, Callable, Dict, Any
+
+from .lazy import LazyModule, module_available
+from .audio_devices import get_device_manager, sd, pyaudio, SOUNDDEVICE_AVAILABLE, PYAUDIO_AVAILABLE
+
+np = LazyModule("numpy")
+NUMPY_AVAILABLE = module_available("numpy")
+
+
+# Environment variable selecting a backend by name (e.g. "fake" in CI)
+BACKEND_ENV = "WORDLIST_AUDIO_BACKEND"
+
+BLOCK_SIZE = 1024
+
+
+class StreamStats:
+    """
+    Counters for one direction of audio (capture or playback).
+
+    Callback durations are kept for the most recent window blocks, which
+    is enough for stable percentiles without unbounded growth.
+    """
+
+    def __init__(self, window: int = 2048):
+        self._lock = threading.Lock()
+        self._durations = deque(maxlen=window)
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.blocks = 0
+            self.frames = 0
+            self.overflows = 0
+            self.underflows = 0
+            self.queue_depth = 0
+            self.max_queue_depth = 0
+            self.max_callback_ms = 0.0
+            self._durations.clear()
+
+    def record_block(self, frames: int, seconds: float) -> None:
+        ms = seconds * 1000
+        with self._lock:
+            self.blocks += 1
+            self.frames += frames
+            self._durations.append(ms)
+            if ms > self.max_callback_ms:
+                self.max_callback_ms = ms
+
+    def record_overflow(self) -> None:
+        with self._lock:
+            self.overflows += 1
+
+    def record_underflow(self) -> None:
+        with self._lock:
+            self.underflows += 1
+
+    def record_queue_depth(self, depth: int) -> None:
+        with self._lock:
+            self.queue_depth = depth
+            if depth > self.max_queue_depth:
+                self.max_queue_depth = depth
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters and callback duration percentiles in ms."""
+        with self._lock:
+            durations = sorted(self._durations)
+            result = {
+                "blocks": self.blocks,
+                "frames": self.frames,
+                "overflows": self.overflows,
+                "underflows": self.underflows,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "callback_ms_max": round(self.max_callback_ms, 3)
+            }
+        for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            value = durations[min(len(durations) - 1, int(q * len(durations)))] if durations else None
+            result[f"callback_ms_{name}"] = round(value, 3) if value is not None else None
+        return result
+
+
+def _deliver(on_block: Callable, block, stats: StreamStats) -> None:
+    """Pass one block to the consumer and time it."""
+    start = time.perf_counter()
+    on_block(block)
+    stats.record_block(len(block), time.perf_counter() - start)
+
+
+class _HeldOutputStream:
+    """
+    A PortAudio output stream that holds a device manager stream session.
+
+    The session lasts until close(), so a device rescan never reinitializes
+    PortAudio underneath a persistent output stream.
+    """
+
+    def __init__(self, manager, open_stream: Callable, is_active: Callable, close: Callable):
+        """
+        Args:
+            manager: AudioDeviceManager to hold the session on
+            open_stream: Callable returning the started stream
+            is_active: Callable (stream) -> bool
+            close: Callable (stream) closing it
+        """
+        self._manager = manager
+        self._is_active = is_active
+        self._close = close
+        self._closed = False
+        manager.acquire_stream()
+        try:
+            self.stream = open_stream()
+        except Exception:
+            manager.release_stream()
+            raise
+
+    @property
+    def active(self) -> bool:
+        """False once closed, or when PortAudio stopped the stream."""
+        if self._closed:
+            return False
+        try:
+            return bool(self._is_active(self.stream))
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._close(self.stream)
+        finally:
+            self._manager.release_stream()
+
+
+class AudioBackend:
+    """
+    Interface of an audio backend.
+
+    run_input blocks until stop_event is set, calling on_block with each
+    captured int16 block. open_output returns a started output stream
+    (with a close() method) that calls fill(outdata) for every block;
+    fill writes int16 samples into outdata in place.
+    """
+
+    name = "none"
+
+    def run_input(self, sample_rate: int, channels: int, on_block: Callable,
+                  stop_event: threading.Event, stats: StreamStats) -> None:
+        raise NotImplementedError
+
+    def open_output(self, sample_rate: int, channels: int, fill: Callable, stats: StreamStats):
+        raise NotImplementedError
+
+    def register_idle_release(self, release: Callable[[], bool]) -> None:
+        """Let device rescans close an idle output stream through its owner."""
+        get_device_manager().register_idle_release(release)
+
+    def check_support(self) -> Dict[str, Any]:
+        return get_device_manager().check_support()
+
+
+class SoundDeviceBackend(AudioBackend):
+    """PortAudio through sounddevice callback streams."""
+
+    name = "sounddevice"
+
+    def run_input(self, sample_rate, channels, on_block, stop_event, stats):
+        def callback(indata, frames, time_info, status):
+            if status.input_overflow:
+                stats.record_overflow()
+            if not stop_event.is_set():
+                _deliver(on_block, indata, stats)
+
+        manager = get_device_manager()
+
+        def open_stream():
+            return sd.InputStream(
+                samplerate=sample_rate,
+                channels=channels,
+                dtype='int16',
+                blocksize=BLOCK_SIZE,
+                device=manager.default_input(),
+                callback=callback
+            )
+
+        try:
+            try:
+                stream = open_stream()
+            except Exception:
+                # The cached device may have been unplugged; rescan once
+                manager.refresh()
+                stream = open_stream()
+
+            with manager.stream_session(), stream:
+                while not stop_event.is_set():
+                    stop_event.wait(0.1)
+        except Exception as e:
+            print(f"Recording error: {e}")
+
+    def open_output(self, sample_rate, channels, fill, stats):
+        def callback(outdata, frames, time_info, status):
+            if status.output_underflow:
+                stats.record_underflow()
+            _deliver(fill, outdata, stats)
+
+        manager = get_device_manager()
+        device = manager.default_output()
+
+        def open_stream():
+            stream = sd.OutputStream(
+                samplerate=sample_rate,
+                channels=channels,
+                dtype='int16',
+                blocksize=512,
+                latency='low',
+                device=device,
+                callback=callback
+            )
+            stream.start()
+            return stream
+
+        return _HeldOutputStream(manager, open_stream, lambda s: s.active, lambda s: s.close())
+
+
+class PyAudioBackend(AudioBackend):
+    """
+    PortAudio through PyAudio: blocking reads for capture, callback for playback.
+
+    Blocking reads do not report input overflows without discarding the
+    block, so capture only reports queue depth (frames waiting to be read).
+    """
+
+    name = "pyaudio"
+
+    def run_input(self, sample_rate, channels, on_block, stop_event, stats):
+        manager = get_device_manager()
+
+        def open_stream():
+            return manager.get_pyaudio().open(
+                format=pyaudio.paInt16,
+                channels=channels,
+                rate=sample_rate,
+                input=True,
+                input_device_index=manager.default_input(),
+                frames_per_buffer=BLOCK_SIZE
+            )
+
+        try:
+            try:
+                stream = open_stream()
+            except Exception:
+                # The cached device may have been unplugged; rescan once
+                manager.refresh()
+                stream = open_stream()
+
+            with manager.stream_session():
+                try:
+                    while not stop_event.is_set():
+                        # Frames waiting in PortAudio's buffer; grows when we fall behind
+                        stats.record_queue_depth(stream.get_read_available())
+                        data = stream.read(BLOCK_SIZE, exception_on_overflow=False)
+                        _deliver(on_block, np.frombuffer(data, dtype='<i2').reshape(-1, channels), stats)
+                finally:
+                    # Closed on errors too, before the session ends
+                    try:
+                        stream.stop_stream()
+                    finally:
+                        stream.close()
+        except Exception as e:
+            print(f"Recording error: {e}")
+
+    def open_output(self, sample_rate, channels, fill, stats):
+        manager = get_device_manager()
+        out = np.zeros((512, channels), dtype='<i2')
+
+        def callback(in_data, frame_count, time_info, status):
+            if status & pyaudio.paOutputUnderflow:
+                stats.record_underflow()
+            block = out[:frame_count]
+            _deliver(fill, block, stats)
+            return block.tobytes(), pyaudio.paContinue
+
+        device = manager.default_output()
+
+        def open_stream():
+            stream = manager.get_pyaudio().open(
+                format=pyaudio.paInt16,
+                channels=channels,
+                rate=sample_rate,
+                output=True,
+                output_device_index=device,
+                frames_per_buffer=512,
+                stream_callback=callback
+            )
+            stream.start_stream()
+            return stream
+
+        def close(stream):
+            stream.stop_stream()
+            stream.close()
+
+        return _HeldOutputStream(manager, open_stream, lambda s: s.is_active(), close)
+
+
+def sine_signal(frequency: float = 220.0, amplitude: int = 8000) -> Callable:
+    """
+    Deterministic test signal for FakeBackend.
+
+    The value of each sample depends only on its absolute frame index, so
+    recordings can be checked for dropped or repeated blocks.
+    """
+    def generate(start_frame: int, frames: int, sample_rate: int, channels: int):
+        t = (start_frame + np.arange(frames)) / sample_rate
+        block = np.rint(np.sin(2 * np.pi * frequency * t) * amplitude).astype('<i2')
+        return np.repeat(block[:, None], channels, axis=1)
+    return generate
+
+
+class _FakeOutputStream:
+    """Output stream of FakeBackend: pulls blocks on a paced thread."""
+
+    def __init__(self, backend, sample_rate, channels, fill, stats):
+        self.played_frames = 0
+        self._played = deque(maxlen=backend.keep_output_blocks)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=backend._pace,
+            args=(sample_rate, self._stop, self._pull(channels, fill, stats), stats.record_underflow),
+            daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def active(self) -> bool:
+        return self._thread.is_alive() and not self._stop.is_set()
+
+    def _pull(self, channels, fill, stats):
+        def pull(frame, frames):
+            block = np.zeros((frames, channels), dtype='<i2')
+            _deliver(fill, block, stats)
+            self._played.append(block)
+            self.played_frames += frames
+        return pull
+
+    def played(self):
+        """Concatenation of the most recently played blocks."""
+        return np.concatenate(list(self._played)) if self._played else np.zeros((0, 1), dtype='<i2')
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+
+
+class FakeBackend(AudioBackend):
+    """
+    In-process fake sound card.
+
+    Capture produces signal(start_frame, frames, rate, channels) blocks;
+    playback pulls blocks and keeps the latest ones for inspection. Both
+    run at speed times real time (0 means as fast as possible). A block
+    delivered more than one block period late counts as an overflow
+    (capture) or underflow (playback), as a real device would drop data.
+    """
+
+    name = "fake"
+
+    def __init__(self, signal: Optional[Callable] = None, speed: float = 1.0,
+                 block_size: int = BLOCK_SIZE, keep_output_blocks: int = 512):
+        self.signal = signal or sine_signal()
+        self.speed = speed
+        self.block_size = block_size
+        self.keep_output_blocks = keep_output_blocks
+        self.outputs = []
+
+    def _pace(self, sample_rate, stop_event, step, on_late: Callable) -> None:
+        """
+        Call step(frame, frames) once per block at the configured pace.
+
+        on_late is called whenever the loop falls more than a block behind.
+        """
+        frame = 0
+        start = time.perf_counter()
+        block_seconds = self.block_size / (sample_rate * self.speed) if self.speed else 0.0
+
+        while not stop_event.is_set():
+            step(frame, self.block_size)
+            frame += self.block_size
+            if not self.speed:
+                continue
+            delay = start + frame / (sample_rate * self.speed) - time.perf_counter()
+            if delay > 0:
+                stop_event.wait(delay)
+            elif -delay > block_seconds:
+                # A real device would have dropped audio here
+                on_late()
+                start += -delay
+
+    def run_input(self, sample_rate, channels, on_block, stop_event, stats):
+        def step(frame, frames):
+            _deliver(on_block, self.signal(frame, frames, sample_rate, channels), stats)
+        self._pace(sample_rate, stop_event, step, stats.record_overflow)
+
+    def open_output(self, sample_rate, channels, fill, stats):
+        stream = _FakeOutputStream(self, sample_rate, channels, fill, stats)
+        self.outputs.append(stream)
+        return stream
+
+    def register_idle_release(self, release):
+        # The fake device is never reinitialized
+        pass
+
+    def check_support(self) -> Dict[str, Any]:
+        return {"supported": True, "message": "Audio supported via fake device"}
+
+
+def default_backend() -> Optional[AudioBackend]:
+    """
+    Backend selected by WORDLIST_AUDIO_BACKEND, else the first available one.
+
+    Returns:
+        An AudioBackend, or None if no audio library is installed
+    """
+    choice = os.environ.get(BACKEND_ENV, "").lower()
+    if choice == "fake" and NUMPY_AVAILABLE:
+        return FakeBackend()
+    if choice == "pyaudio" and PYAUDIO_AVAILABLE and NUMPY_AVAILABLE:
+        return PyAudioBackend()
+    if SOUNDDEVICE_AVAILABLE:
+        return SoundDeviceBackend()
+    if PYAUDIO_AVAILABLE and NUMPY_AVAILABLE:
+        return PyAudioBackend()
+    return None
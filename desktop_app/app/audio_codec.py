@@ -0,0 +1,245 @@
+"""Lossless storage codecs and 16-bit PCM WAV helpers."""
+import io
+import struct
+import wave
+import zlib
+
+from .lazy import LazyModule, module_available
+
+# Optional imports, deferred until a codec is actually used
+np = LazyModule("numpy")
+NUMPY_AVAILABLE = module_available("numpy")
+
+
+# Optional FLAC storage codec; loading libsndfile can fail with OSError,
+# so availability is only known after the first import attempt
+_soundfile = None
+_soundfile_checked = False
+
+
+def _load_soundfile():
+    global _soundfile, _soundfile_checked
+    if not _soundfile_checked:
+        try:
+            import soundfile
+            _soundfile = soundfile
+        except (ImportError, OSError):
+            _soundfile = None
+        _soundfile_checked = True
+    return _soundfile
+
+
+def soundfile_available() -> bool:
+    """True if the FLAC codec (soundfile) can be used."""
+    return _load_soundfile() is not None
+
+
+def __getattr__(name):
+    # SOUNDFILE_AVAILABLE is computed on first access
+    if name == "SOUNDFILE_AVAILABLE":
+        return soundfile_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+WAV_HEADER_SIZE = 44
+
+
+def wav_header(data_size: int, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """
+    Build a canonical 44-byte PCM WAV header.
+    
+    Args:
+        data_size: Size of the PCM data chunk in bytes
+        sample_rate: Frames per second
+        channels: Number of channels
+        sample_width: Bytes per sample
+        
+    Returns:
+        Header bytes (RIFF, fmt and data chunk headers)
+    """
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * block_align,
+        block_align, sample_width * 8,
+        b"data", data_size
+    )
+
+
+# Storage codecs. Recordings are always exported as 16-bit PCM WAV; a codec
+# only changes how they are kept in the database.
+CODEC_WAV = "wav"
+CODEC_FLAC = "flac"
+CODEC_DELTA = "delta-zlib"
+CODECS = (CODEC_WAV, CODEC_FLAC, CODEC_DELTA)
+
+FLAC_MAGIC = b"fLaC"
+DELTA_MAGIC = b"WLDZ"
+_DELTA_HEADER = struct.Struct("<4sBBHII")  # magic, version, channels, reserved, rate, frames
+
+
+def available_codecs() -> list:
+    """Storage codecs usable in this environment."""
+    codecs = [CODEC_WAV]
+    if soundfile_available():
+        codecs.append(CODEC_FLAC)
+    if NUMPY_AVAILABLE:
+        codecs.append(CODEC_DELTA)
+    return codecs
+
+
+def _read_pcm(wav_data: bytes):
+    """Parse a 16-bit PCM WAV into (frames x channels int16 array, rate, channels)."""
+    with wave.open(io.BytesIO(wav_data), 'rb') as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM WAV can be encoded")
+        sample_rate = wf.getframerate()
+        channels = wf.getnchannels()
+        frames = wf.readframes(wf.getnframes())
+    return np.frombuffer(frames, dtype='<i2').reshape(-1, channels), sample_rate, channels
+
+
+def _encode_delta(samples, sample_rate: int, channels: int) -> bytes:
+    """
+    Lossless delta + zlib encoding.
+    
+    Each channel is stored as wrapping int16 differences between
+    consecutive samples, with low and high bytes in separate planes so
+    zlib sees long runs of near-constant high bytes. Level 1 is used:
+    higher levels gain about 2% on speech at a quarter of the speed.
+    """
+    deltas = np.empty_like(samples)
+    deltas[:1] = samples[:1]
+    np.subtract(samples[1:], samples[:-1], out=deltas[1:])
+    planes = deltas.reshape(-1).view(np.uint8).reshape(-1, 2).T
+    header = _DELTA_HEADER.pack(DELTA_MAGIC, 1, channels, 0, sample_rate, len(samples))
+    return header + zlib.compress(planes.tobytes(), 1)
+
+
+def _decode_delta(data: bytes) -> bytes:
+    magic, version, channels, _, sample_rate, frames = _DELTA_HEADER.unpack_from(data)
+    if version != 1:
+        raise ValueError(f"Unsupported delta codec version: {version}")
+    planes = np.frombuffer(zlib.decompress(data[_DELTA_HEADER.size:]), dtype=np.uint8)
+    count = frames * channels
+    deltas = np.ascontiguousarray(planes.reshape(2, count).T).view('<i2').reshape(frames, channels)
+    samples = np.cumsum(deltas, axis=0, dtype='<i2')
+    return wav_header(samples.nbytes, sample_rate, channels) + samples.tobytes()
+
+
+def encode_audio(wav_data: bytes, codec: str) -> bytes:
+    """
+    Encode a 16-bit PCM WAV with a lossless storage codec.
+    
+    Args:
+        wav_data: WAV file data as bytes
+        codec: One of CODECS
+        
+    Returns:
+        Encoded bytes (wav_data itself for CODEC_WAV)
+        
+    Raises:
+        ValueError: For unknown or unavailable codecs and non-16-bit WAVs
+    """
+    if codec == CODEC_WAV:
+        return wav_data
+    if codec not in available_codecs():
+        raise ValueError(f"Audio codec not available: {codec}")
+    
+    samples, sample_rate, channels = _read_pcm(wav_data)
+    if codec == CODEC_DELTA:
+        return _encode_delta(samples, sample_rate, channels)
+    
+    buffer = io.BytesIO()
+    _load_soundfile().write(buffer, samples, sample_rate, format='FLAC', subtype='PCM_16')
+    return buffer.getvalue()
+
+
+def decode_audio(data: bytes) -> bytes:
+    """
+    Decode stored audio back to 16-bit PCM WAV.
+    
+    The format is detected from the leading magic bytes, so WAV and
+    encoded recordings can be mixed in one database.
+    
+    Raises:
+        ValueError: If the data is encoded with a codec that is not available
+    """
+    if not data or data[:4] == b"RIFF":
+        return data
+    if data[:4] == DELTA_MAGIC:
+        if not NUMPY_AVAILABLE:
+            raise ValueError("numpy is required to decode delta-zlib audio")
+        return _decode_delta(data)
+    if data[:4] == FLAC_MAGIC:
+        sf = _load_soundfile()
+        if sf is None:
+            raise ValueError("soundfile is required to decode FLAC audio")
+        samples, sample_rate = sf.read(io.BytesIO(data), dtype='int16', always_2d=True)
+        pcm = samples.astype('<i2').tobytes()
+        return wav_header(len(pcm), sample_rate, samples.shape[1]) + pcm
+    return data
+
+
+def decoded_wav_size(prefix: bytes, stored_size: int) -> int:
+    """
+    Size of the WAV that decode_audio would return, from the first 42 bytes.
+    
+    Lets export planning size recordings without decoding them.
+    """
+    if prefix[:4] == DELTA_MAGIC and len(prefix) >= _DELTA_HEADER.size:
+        _, _, channels, _, _, frames = _DELTA_HEADER.unpack_from(prefix)
+        return WAV_HEADER_SIZE + frames * channels * 2
+    if prefix[:4] == FLAC_MAGIC and len(prefix) >= 26:
+        # STREAMINFO: 20-bit rate, 3-bit channels-1, 5-bit bps-1, 36-bit total frames
+        info = int.from_bytes(prefix[18:26], "big")
+        channels = ((info >> 41) & 0x7) + 1
+        frames = info & 0xFFFFFFFFF
+        return WAV_HEADER_SIZE + frames * channels * 2
+    return stored_size
+
+
+def stored_audio_format(prefix: bytes) -> tuple:
+    """
+    (sample_rate, channels) of stored audio from its first 42 bytes.
+    
+    Returns:
+        The format, or (None, None) if the header is not recognized
+    """
+    if prefix[:4] == DELTA_MAGIC and len(prefix) >= _DELTA_HEADER.size:
+        _, _, channels, _, sample_rate, _ = _DELTA_HEADER.unpack_from(prefix)
+        return sample_rate, channels
+    if prefix[:4] == FLAC_MAGIC and len(prefix) >= 26:
+        info = int.from_bytes(prefix[18:26], "big")
+        return info >> 44, ((info >> 41) & 0x7) + 1
+    if prefix[:4] == b"RIFF" and prefix[12:16] == b"fmt " and len(prefix) >= 28:
+        channels, sample_rate = struct.unpack_from("<HI", prefix, 22)
+        return sample_rate, channels
+    return None, None
+
+
+def validate_wav_16bit(wav_data: bytes, sample_rate: int = None, channels: int = None) -> bool:
+    """
+    Validate that WAV data is 16-bit PCM.
+    
+    Args:
+        wav_data: WAV file data as bytes
+        sample_rate: If given, also require this sample rate
+        channels: If given, also require this channel count
+        
+    Returns:
+        True if valid 16-bit PCM WAV (with the given rate and channels)
+    """
+    try:
+        buffer = io.BytesIO(wav_data)
+        with wave.open(buffer, 'rb') as wf:
+            if wf.getsampwidth() != 2:  # 16-bit = 2 bytes
+                return False
+            if sample_rate is not None and wf.getframerate() != sample_rate:
+                return False
+            if channels is not None and wf.getnchannels() != channels:
+                return False
+            return True
+    except Exception:
+        return False
@@ -0,0 +1,241 @@
+"""Cached audio device discovery and shared backend handles."""
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Callable
+
+from .lazy import LazyModule, module_available
+
+# Optional imports for audio capture, deferred until a device is used:
+# importing sounddevice initializes PortAudio
+sd = LazyModule("sounddevice")
+pyaudio = LazyModule("pyaudio")
+SOUNDDEVICE_AVAILABLE = module_available("sounddevice")
+PYAUDIO_AVAILABLE = module_available("pyaudio")
+
+
+class AudioDeviceManager:
+    """
+    Initializes the audio backend once and caches device information.
+
+    PortAudio initialization and device enumeration are slow on some
+    systems, so both are done once and reused by every recording and
+    playback. The device list is rescanned on demand (refresh), when a
+    stream fails to open (a device was probably unplugged), or when it is
+    older than stale_after seconds.
+
+    Reinitializing closes every open stream, so a rescan first asks the
+    owners of idle streams (see register_idle_release) to close them and
+    is skipped while any stream remains open.
+    """
+
+    def __init__(self, stale_after: float = 30.0):
+        self.stale_after = stale_after
+        if SOUNDDEVICE_AVAILABLE:
+            self.backend = "sounddevice"
+        elif PYAUDIO_AVAILABLE:
+            self.backend = "pyaudio"
+        else:
+            self.backend = None
+
+        self.init_count = 0
+        self._lock = threading.RLock()
+        self._pa = None
+        self._devices: Optional[List[Dict[str, Any]]] = None
+        self._default_input: Optional[int] = None
+        self._default_output: Optional[int] = None
+        self._scanned_at = 0.0
+        self._active_streams = 0
+        self._idle_releasers: List[weakref.WeakMethod] = []
+
+    def get_pyaudio(self):
+        """Get the shared PyAudio instance, creating it on first use."""
+        with self._lock:
+            if self._pa is None:
+                self._pa = pyaudio.PyAudio()
+                self.init_count += 1
+            return self._pa
+
+    def _scan(self) -> None:
+        devices = []
+        default_input = default_output = None
+
+        if self.backend == "sounddevice":
+            if self.init_count == 0:
+                # sounddevice initializes PortAudio when it is first imported
+                self.init_count = 1
+            for index, d in enumerate(sd.query_devices()):
+                devices.append({
+                    "index": index,
+                    "name": d["name"],
+                    "max_input_channels": d["max_input_channels"],
+                    "max_output_channels": d["max_output_channels"],
+                    "default_samplerate": d["default_samplerate"]
+                })
+            default_input, default_output = sd.default.device
+        elif self.backend == "pyaudio":
+            pa = self.get_pyaudio()
+            for index in range(pa.get_device_count()):
+                d = pa.get_device_info_by_index(index)
+                devices.append({
+                    "index": index,
+                    "name": d["name"],
+                    "max_input_channels": d["maxInputChannels"],
+                    "max_output_channels": d["maxOutputChannels"],
+                    "default_samplerate": d["defaultSampleRate"]
+                })
+            try:
+                default_input = pa.get_default_input_device_info()["index"]
+            except (IOError, OSError):
+                default_input = None
+            try:
+                default_output = pa.get_default_output_device_info()["index"]
+            except (IOError, OSError):
+                default_output = None
+
+        # PortAudio reports "no default" as -1
+        self._default_input = default_input if default_input is not None and default_input >= 0 else None
+        self._default_output = default_output if default_output is not None and default_output >= 0 else None
+        self._devices = devices
+        self._scanned_at = time.monotonic()
+
+    def _ensure_scanned(self) -> None:
+        with self._lock:
+            stale = time.monotonic() - self._scanned_at > self.stale_after
+            if self._devices is None:
+                self._scan()
+            elif stale:
+                self.refresh()
+
+    def register_idle_release(self, release: Callable[[], bool]) -> None:
+        """
+        Register a bound method that closes its owner's stream if it is idle.
+
+        refresh() calls it before reinitializing. Only a weak reference is
+        kept, so registering does not keep the owner alive.
+        """
+        with self._lock:
+            self._idle_releasers.append(weakref.WeakMethod(release))
+
+    def _release_idle_streams(self) -> None:
+        alive = []
+        for ref in self._idle_releasers:
+            release = ref()
+            if release is None:
+                continue
+            alive.append(ref)
+            try:
+                release()
+            except Exception as e:
+                print(f"Could not close idle stream: {e}")
+        self._idle_releasers = alive
+
+    def refresh(self) -> bool:
+        """
+        Reinitialize the backend and rescan devices (e.g. after hot-plug).
+
+        Idle streams are closed by their owners first; the refresh is
+        skipped while a stream is still open, since reinitializing
+        PortAudio would close it underneath its user.
+
+        Returns:
+            True if the device list was refreshed
+        """
+        with self._lock:
+            if self._active_streams:
+                self._release_idle_streams()
+            if self._active_streams:
+                return False
+            if self.backend == "sounddevice" and hasattr(sd, "_terminate"):
+                sd._terminate()
+                sd._initialize()
+                self.init_count += 1
+            elif self.backend == "pyaudio" and self._pa is not None:
+                self._pa.terminate()
+                self._pa = None
+            if self.backend:
+                self._scan()
+            return True
+
+    def devices(self) -> List[Dict[str, Any]]:
+        """Get cached device capabilities."""
+        self._ensure_scanned()
+        return list(self._devices or [])
+
+    def default_input(self) -> Optional[int]:
+        """Index of the default input device, or None."""
+        self._ensure_scanned()
+        return self._default_input
+
+    def default_output(self) -> Optional[int]:
+        """Index of the default output device, or None."""
+        self._ensure_scanned()
+        return self._default_output
+
+    def acquire_stream(self) -> None:
+        """Mark a stream as open so the backend is not reinitialized under it."""
+        with self._lock:
+            self._active_streams += 1
+
+    def release_stream(self) -> None:
+        """Undo acquire_stream once the stream is closed."""
+        with self._lock:
+            self._active_streams -= 1
+
+    @contextmanager
+    def stream_session(self):
+        """Hold acquire_stream for the duration of a with block."""
+        self.acquire_stream()
+        try:
+            yield
+        finally:
+            self.release_stream()
+
+    def check_support(self) -> Dict[str, Any]:
+        """
+        Check audio recording/playback support from the cached device list.
+
+        Returns:
+            Dict with 'supported' bool and 'message' string
+        """
+        if self.backend is None:
+            return {
+                "supported": False,
+                "message": "No audio library available. Install sounddevice or pyaudio."
+            }
+
+        label = "sounddevice" if self.backend == "sounddevice" else "PyAudio"
+        try:
+            devices = self.devices()
+        except Exception as e:
+            return {"supported": False, "message": f"{label} error: {e}"}
+
+        if self.backend == "sounddevice":
+            if any(d["max_input_channels"] > 0 for d in devices):
+                return {"supported": True, "message": "Audio supported via sounddevice"}
+            return {"supported": False, "message": "No input devices found"}
+
+        if devices:
+            return {"supported": True, "message": "Audio supported via PyAudio"}
+        return {"supported": False, "message": "No audio devices found"}
+
+    def close(self) -> None:
+        """Release the backend handle."""
+        with self._lock:
+            if self._pa is not None:
+                self._pa.terminate()
+                self._pa = None
+
+
+_manager: Optional[AudioDeviceManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_device_manager() -> AudioDeviceManager:
+    """Get the process-wide device manager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = AudioDeviceManager()
+        return _manager
@@ -0,0 +1,272 @@
+"""Post-processing of recordings: silence trimming, peak normalization and resampling."""
+import io
+import math
+import wave
+from typing import Dict, Any, Tuple
+
+from .lazy import LazyModule, module_available
+
+np = LazyModule("numpy")
+NUMPY_AVAILABLE = module_available("numpy")
+
+from .audio_codec import wav_header, WAV_HEADER_SIZE
+
+
+FULL_SCALE = 32768.0
+
+# Defaults, overridable through the settings of the same name
+DEFAULT_THRESHOLD_DB = -45.0
+DEFAULT_PADDING_MS = 150
+DEFAULT_FRAME_MS = 10
+DEFAULT_PEAK_DB = -1.0
+MAX_GAIN_DB = 20.0
+
+
+def frame_rms_db(samples, frame_length: int):
+    """
+    RMS level of consecutive frames in dBFS.
+
+    Channels are averaged first. The last partial frame is zero-padded.
+
+    Args:
+        samples: int16 array of shape (frames,) or (frames, channels)
+        frame_length: Samples per analysis frame
+
+    Returns:
+        float32 array with one level per frame
+    """
+    x = samples.astype(np.float32)
+    if x.ndim > 1:
+        x = x.mean(axis=1)
+    count = -(-len(x) // frame_length)
+    padded = np.zeros(count * frame_length, dtype=np.float32)
+    padded[:len(x)] = x
+    frames = padded.reshape(count, frame_length)
+    rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_length)
+    return 20 * np.log10(np.maximum(rms, 1e-9) / FULL_SCALE)
+
+
+def find_speech_bounds(
+    samples,
+    sample_rate: int,
+    threshold_db: float = DEFAULT_THRESHOLD_DB,
+    padding_ms: int = DEFAULT_PADDING_MS,
+    frame_ms: int = DEFAULT_FRAME_MS
+) -> Tuple[int, int]:
+    """
+    Find the sample range to keep after trimming leading/trailing silence.
+
+    A frame counts as sound when its RMS is above threshold_db. The kept
+    range is widened by padding_ms on each side. A recording that is silent
+    throughout is kept whole.
+
+    Returns:
+        (start, end) sample indices
+    """
+    total = len(samples)
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    if total == 0:
+        return 0, 0
+
+    loud = np.flatnonzero(frame_rms_db(samples, frame_length) > threshold_db)
+    if loud.size == 0:
+        return 0, total
+
+    padding = sample_rate * padding_ms // 1000
+    start = max(0, int(loud[0]) * frame_length - padding)
+    end = min(total, (int(loud[-1]) + 1) * frame_length + padding)
+    return start, end
+
+
+def peak_normalize(samples, peak_db: float = DEFAULT_PEAK_DB, max_gain_db: float = MAX_GAIN_DB):
+    """
+    Scale samples so the loudest one reaches peak_db.
+
+    Gain is capped at max_gain_db so near-silent takes are not boosted
+    into noise.
+
+    Returns:
+        (normalized int16 samples, applied gain in dB)
+    """
+    peak = int(np.abs(samples.astype(np.int32)).max()) if len(samples) else 0
+    if peak == 0:
+        return samples, 0.0
+
+    gain_db = min(20 * np.log10(FULL_SCALE * 10 ** (peak_db / 20) / peak), max_gain_db)
+    gain = 10 ** (gain_db / 20)
+    scaled = np.clip(np.rint(samples * np.float32(gain)), -32768, 32767).astype('<i2')
+    return scaled, round(float(gain_db), 2)
+
+
+def process_recording(
+    wav_data: bytes,
+    trim: bool = True,
+    normalize: bool = False,
+    threshold_db: float = DEFAULT_THRESHOLD_DB,
+    padding_ms: int = DEFAULT_PADDING_MS,
+    peak_db: float = DEFAULT_PEAK_DB
+) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Trim silence from and optionally normalize a 16-bit PCM WAV recording.
+
+    Args:
+        wav_data: WAV file data as bytes
+        trim: Trim leading and trailing silence
+        normalize: Peak-normalize to peak_db
+        threshold_db: Silence threshold in dBFS
+        padding_ms: Silence kept before and after the sound
+        peak_db: Target peak level in dBFS
+
+    Returns:
+        (processed WAV bytes, info dict with original_duration, duration,
+        trimmed_start, trimmed_end and gain_db, all durations in seconds)
+
+    Raises:
+        ValueError: If the data is not 16-bit PCM WAV
+    """
+    try:
+        with wave.open(io.BytesIO(wav_data), 'rb') as wf:
+            if wf.getsampwidth() != 2:
+                raise ValueError("Only 16-bit PCM WAV is supported")
+            sample_rate = wf.getframerate()
+            channels = wf.getnchannels()
+            frames = wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"Invalid WAV data: {e}")
+
+    samples = np.frombuffer(frames, dtype='<i2').reshape(-1, channels)
+    total = len(samples)
+
+    start, end = (0, total)
+    if trim:
+        start, end = find_speech_bounds(samples, sample_rate, threshold_db, padding_ms)
+    samples = samples[start:end]
+
+    gain_db = 0.0
+    if normalize:
+        samples, gain_db = peak_normalize(samples, peak_db)
+
+    info = {
+        "original_duration": round(total / sample_rate, 3),
+        "duration": round(len(samples) / sample_rate, 3),
+        "trimmed_start": round(start / sample_rate, 3),
+        "trimmed_end": round((total - end) / sample_rate, 3),
+        "gain_db": gain_db
+    }
+
+    if start == 0 and end == total and gain_db == 0.0:
+        return wav_data, info
+
+    pcm = np.ascontiguousarray(samples).tobytes()
+    return wav_header(len(pcm), sample_rate, channels) + pcm, info
+
+
+# Resampler design: zero crossings of the sinc on each side, and Kaiser beta
+RESAMPLE_ZERO_CROSSINGS = 10
+RESAMPLE_KAISER_BETA = 5.0
+_RESAMPLE_BLOCK = 32768
+
+
+def _resample_ratio(src_rate: int, dst_rate: int) -> Tuple[int, int]:
+    g = math.gcd(src_rate, dst_rate)
+    return dst_rate // g, src_rate // g
+
+
+def resampled_frames(frames: int, src_rate: int, dst_rate: int) -> int:
+    """Number of frames resample_pcm returns for a given input length."""
+    up, down = _resample_ratio(src_rate, dst_rate)
+    return -(-frames * up // down)
+
+
+def resampled_wav_size(size: int, src_rate: int, channels: int, dst_rate: int) -> int:
+    """Byte size of a canonical WAV after convert_wav_rate."""
+    if not src_rate or not channels or src_rate == dst_rate:
+        return size
+    frames = max(0, size - WAV_HEADER_SIZE) // (2 * channels)
+    return WAV_HEADER_SIZE + resampled_frames(frames, src_rate, dst_rate) * 2 * channels
+
+
+def _lowpass_phases(up: int, down: int):
+    """
+    Windowed-sinc anti-aliasing filter split into its up polyphase branches.
+
+    Returns:
+        (phases array of shape (up, taps_per_phase), filter delay in
+        upsampled samples)
+    """
+    max_rate = max(up, down)
+    half_len = RESAMPLE_ZERO_CROSSINGS * max_rate
+    n = np.arange(-half_len, half_len + 1)
+    h = np.sinc(n / max_rate) / max_rate * np.kaiser(2 * half_len + 1, RESAMPLE_KAISER_BETA) * up
+    taps = -(-len(h) // up)
+    padded = np.zeros(taps * up)
+    padded[:len(h)] = h
+    return padded.reshape(taps, up).T.astype(np.float32), half_len
+
+
+def resample_pcm(samples, src_rate: int, dst_rate: int):
+    """
+    Resample int16 audio with a vectorized polyphase FIR filter.
+
+    Only the filter taps that line up with input samples are evaluated,
+    in blocks of output frames, so no upsampled intermediate is built.
+
+    Args:
+        samples: int16 array of shape (frames, channels)
+        src_rate: Sample rate of samples
+        dst_rate: Target sample rate
+
+    Returns:
+        int16 array of shape (resampled_frames(...), channels)
+    """
+    if src_rate == dst_rate:
+        return samples
+
+    up, down = _resample_ratio(src_rate, dst_rate)
+    phases, delay = _lowpass_phases(up, down)
+    taps = phases.shape[1]
+    frames, channels = samples.shape
+    out_frames = resampled_frames(frames, src_rate, dst_rate)
+
+    # Zero padding on both sides so every tap index is valid
+    padded = np.zeros((frames + 2 * taps + 1, channels), dtype=np.float32)
+    padded[taps:taps + frames] = samples
+    offsets = np.arange(taps)
+
+    out = np.empty((out_frames, channels), dtype='<i2')
+    for start in range(0, out_frames, _RESAMPLE_BLOCK):
+        n = np.arange(start, min(start + _RESAMPLE_BLOCK, out_frames))
+        pos = n * down + delay
+        base = pos // up + taps
+        window = padded[base[:, None] - offsets[None, :]]
+        block = np.einsum('nj,njc->nc', phases[pos % up], window)
+        out[n[0]:n[-1] + 1] = np.clip(np.rint(block), -32768, 32767)
+    return out
+
+
+def convert_wav_rate(wav_data: bytes, sample_rate: int) -> bytes:
+    """
+    Resample a 16-bit PCM WAV to another sample rate.
+
+    Returns wav_data unchanged when it is already at sample_rate or numpy
+    is not installed.
+
+    Raises:
+        ValueError: If the data is not 16-bit PCM WAV
+    """
+    try:
+        with wave.open(io.BytesIO(wav_data), 'rb') as wf:
+            if wf.getsampwidth() != 2:
+                raise ValueError("Only 16-bit PCM WAV is supported")
+            src_rate = wf.getframerate()
+            channels = wf.getnchannels()
+            frames = wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"Invalid WAV data: {e}")
+
+    if src_rate == sample_rate or not NUMPY_AVAILABLE:
+        return wav_data
+
+    samples = np.frombuffer(frames, dtype='<i2').reshape(-1, channels)
+    pcm = resample_pcm(samples, src_rate, sample_rate).tobytes()
+    return wav_header(len(pcm), sample_rate, channels) + pcm
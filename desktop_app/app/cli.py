@@ -0,0 +1,205 @@
+"""
+Headless command line for batch processing without the window.
+
+Each subcommand prints a JSON result and exits with 0 on success, 1 when
+the operation failed and 2 on usage errors. Neither pywebview nor the audio
+backends are imported, so it runs on servers without a display or sound
+card:
+
+    python -m app --db project.db import wordlist.xml
+    python -m app --project swahili export out.zip --compression fast --split-mb 650
+    python -m app --db project.db stats
+    python -m app projects
+    python -m app verify out.zip --quick
+    python -m app --db project.db benchmark --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, Any, List, Optional
+
+from .storage import StorageManager
+from .projects import ProjectManager
+from .query_trace import QueryTracer
+from .export_zip import COMPRESSION_POLICIES, DEFAULT_COMPRESSION
+from .integrity import verify_export_zip
+from .operations import (
+    load_sorted_entries, get_progress, import_wordlist_file, import_wordlist_url,
+    export_archive, export_sample_rate
+)
+
+
+def _is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+
+def cmd_import(storage: StorageManager, args) -> Dict[str, Any]:
+    if _is_url(args.source):
+        return import_wordlist_url(storage, args.source)
+    if not os.path.isfile(args.source):
+        return {"success": False, "error": f"File not found: {args.source}", "count": 0}
+    return import_wordlist_file(storage, args.source)
+
+
+def cmd_export(storage: StorageManager, args) -> Dict[str, Any]:
+    # Without --sample-rate the rate configured in the app applies; 0 keeps each recording's own
+    rate = export_sample_rate(storage) if args.sample_rate is None else args.sample_rate or None
+    max_volume_bytes = int(args.split_mb * 1024 * 1024) if args.split_mb else None
+    return export_archive(
+        storage, args.dest,
+        dedupe_audio=args.dedupe,
+        max_volume_bytes=max_volume_bytes,
+        compression=args.compression,
+        sample_rate=rate
+    )
+
+
+def cmd_stats(storage: StorageManager, args) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "database": storage.db_path,
+        "data_version": storage.get_data_version(),
+        "progress": get_progress(storage),
+        "audio": {
+            "codec": storage.audio_codec,
+            "recordings": len(storage.get_audio_sizes()),
+            "stored_bytes": storage.get_stored_audio_bytes(),
+            "export_sample_rate": export_sample_rate(storage)
+        },
+        "consent_records": len(storage.get_all_consent_records())
+    }
+
+
+def cmd_verify(storage: Optional[StorageManager], args) -> Dict[str, Any]:
+    return verify_export_zip(args.archive, quick=args.quick)
+
+
+def cmd_projects(storage: Optional[StorageManager], args) -> Dict[str, Any]:
+    return {"success": True, "projects": ProjectManager().list_projects()}
+
+
+def _median_ms(func, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(durations), 3)
+
+
+def cmd_benchmark(storage: StorageManager, args) -> Dict[str, Any]:
+    """Time reads and exports of the database; nothing in it is changed."""
+    storage.tracer.enabled = True
+    storage.tracer.reset()
+    result = {
+        "success": True,
+        "database": storage.db_path,
+        "entries": storage.get_total_count(),
+        "runs": args.runs,
+        "load_entries_ms": _median_ms(lambda: load_sorted_entries(storage), args.runs),
+        "progress_ms": _median_ms(lambda: get_progress(storage), args.runs),
+        "exports": []
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for compression in args.compression:
+            dest = os.path.join(tmpdir, f"export_{compression}.zip")
+            start = time.perf_counter()
+            summary = export_archive(storage, dest, compression=compression,
+                                     sample_rate=export_sample_rate(storage))
+            elapsed = time.perf_counter() - start
+            result["exports"].append({
+                "compression": compression,
+                "success": summary["success"],
+                "wall_ms": round(elapsed * 1000, 1),
+                "output_bytes": os.path.getsize(dest) if summary["success"] else None,
+                "error": summary.get("error")
+            })
+    result["success"] = all(e["success"] for e in result["exports"])
+    report = storage.tracer.report(top=args.top)
+    result["queries"] = {"connections": report["connections"], "statements": report["statements"]}
+    return result
+
+
+COMMANDS = {
+    "import": cmd_import,
+    "export": cmd_export,
+    "stats": cmd_stats,
+    "verify": cmd_verify,
+    "benchmark": cmd_benchmark,
+    "projects": cmd_projects,
+}
+
+# Commands that do not open a database
+NO_DATABASE = ("verify", "projects")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app",
+        description="Import, export and check wordlist databases without the window."
+    )
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--db", help="SQLite database file")
+    target.add_argument("--project", help="ID of a project of the app (default: the active project)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="Replace the wordlist from an XML file, URL or export ZIP")
+    p.add_argument("source", help="XML file, export ZIP or http(s) URL")
+
+    p = sub.add_parser("export", help="Export entries, recordings and consent log as ZIP")
+    p.add_argument("dest", help="Destination ZIP path")
+    p.add_argument("--compression", choices=sorted(COMPRESSION_POLICIES), default=DEFAULT_COMPRESSION)
+    p.add_argument("--dedupe", action="store_true", help="Store identical recordings once (not with --split-mb)")
+    p.add_argument("--split-mb", type=float, help="Split into volumes of at most this many MB")
+    p.add_argument("--sample-rate", type=int,
+                   help="Convert recordings to this rate (default: the app setting; 0 keeps them)")
+
+    sub.add_parser("stats", help="Print progress and storage statistics")
+
+    p = sub.add_parser("verify", help="Check an export ZIP against its checksums")
+    p.add_argument("archive", help="Export ZIP path")
+    p.add_argument("--quick", action="store_true", help="Only compare names and sizes")
+
+    p = sub.add_parser("benchmark", help="Time loading, progress counts and exports")
+    p.add_argument("--runs", type=int, default=5, help="Runs per read measurement (default: 5)")
+    p.add_argument("--compression", nargs="+", choices=sorted(COMPRESSION_POLICIES),
+                   default=[DEFAULT_COMPRESSION], help="Compression policies to export with")
+    p.add_argument("--top", type=int, default=5, help="SQL statements to list (default: 5)")
+
+    sub.add_parser("projects", help="List the app's projects with their cached statistics")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    storage = projects = None
+    if args.command not in NO_DATABASE:
+        try:
+            if args.db:
+                storage = StorageManager(args.db, tracer=QueryTracer())
+            else:
+                projects = ProjectManager(tracer=QueryTracer())
+                storage = projects.get_storage(args.project or projects.active_id)
+        except Exception as e:
+            print(json.dumps({"success": False, "error": f"Cannot open database: {e}"}, indent=2))
+            return 1
+
+    try:
+        result = COMMANDS[args.command](storage, args)
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+    if projects is not None:
+        # Keep the project picker's cached statistics current
+        projects.close()
+
+    print(json.dumps(result, indent=2, default=str))
+    return 0 if result.get("success") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,89 +2,375 @@
 import zipfile
 import json
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
-from io import BytesIO
 
 from .xml_io import generate_xml_utf16le
+from .jobs import JobCancelled
+from .integrity import (
+    ChecksumManifest, hash_audio_records, hash_ahead, find_duplicates, sha256_bytes, sha256_stream,
+    CHECKSUMS_FILENAME
+)
 
 
 APP_VERSION = "2.0.0"
 
+VOLUME_INDEX_FILENAME = "volume_index.json"
+
+# Compression policies: name -> (zipfile method, compresslevel)
+COMPRESSION_POLICIES = {
+    "stored": (zipfile.ZIP_STORED, None),
+    "fast": (zipfile.ZIP_DEFLATED, 1),
+    "default": (zipfile.ZIP_DEFLATED, 6),
+    "max": (zipfile.ZIP_DEFLATED, 9),
+}
+DEFAULT_COMPRESSION = "default"
+
+# Smallest volume limit accepted for split exports
+MIN_VOLUME_BYTES = 64 * 1024
+
+# Per-member allowance: local header, central directory record, ZIP64
+# extras, deflate framing and the member's line in checksums.json
+# (names are counted separately)
+_MEMBER_OVERHEAD = 256
+# End of central directory plus the checksums.json member itself
+_ARCHIVE_OVERHEAD = 1024
+
+
+def _default_dest_path(dest_path: Optional[str]) -> str:
+    """Generate a timestamped destination path and ensure .zip extension."""
+    if dest_path is None:
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        dest_path = f"wordlist_export_{timestamp}.zip"
+    
+    if not dest_path.endswith(".zip"):
+        dest_path += ".zip"
+    
+    return dest_path
+
 
 def create_export_zip(
     entries: List[Dict[str, Any]],
     audio_data: List[Dict[str, Any]],
     consent_records: List[Dict[str, Any]],
-    dest_path: Optional[str] = None
+    dest_path: Optional[str] = None,
+    dedupe_audio: bool = False,
+    hash_workers: Optional[int] = None,
+    compression: str = DEFAULT_COMPRESSION,
+    pictures: Optional[List[Dict[str, Any]]] = None,
+    load_audio: Optional[Callable[[str], Optional[bytes]]] = None
 ) -> Dict[str, Any]:
     """
     Create an export ZIP file containing wordlist data.
     
+    Every member is listed with its SHA-256 digest in checksums.json.
+    
     Args:
         entries: List of entry dictionaries
-        audio_data: List of dicts with 'filename' and 'data' keys
+        audio_data: List of dicts with 'filename' and 'data' keys ('filename'
+            only when load_audio is given)
         consent_records: List of consent record dictionaries
         dest_path: Optional destination path. If None, generates timestamped filename.
+        dedupe_audio: Store identical audio payloads once; duplicates are
+            listed under 'aliases' in checksums.json instead of in audio/
+        hash_workers: Thread count for parallel audio hashing; with
+            load_audio, also how many recordings are hashed ahead of the
+            writer (default: integrity.HASH_AHEAD)
+        compression: Name of a COMPRESSION_POLICIES entry
+        pictures: List of dicts with 'path' and 'arcname' keys (see
+            app.pictures.collect_pictures)
+        load_audio: Callable returning the audio bytes for a filename.
+            Recordings are then fetched in order on the calling thread while
+            writing and hashed a few ahead of the writer, so only those are
+            held in memory; with dedupe_audio the first of identical
+            recordings in audio_data order is kept.
         
     Returns:
         ExportSummary dict with path, counts, and status
     """
-    # Generate destination path if not provided
-    if dest_path is None:
-        now = datetime.now()
-        timestamp = now.strftime("%Y%m%d_%H%M%S")
-        dest_path = f"wordlist_export_{timestamp}.zip"
-    
-    # Ensure .zip extension
-    if not dest_path.endswith(".zip"):
-        dest_path += ".zip"
+    dest_path = _default_dest_path(dest_path)
+    pictures = pictures or []
     
-    # Create ZIP in memory first, then write to file
-    zip_buffer = BytesIO()
+    # Stream the archive to a partial file, then move it into place
+    partial_path = dest_path + ".partial"
+    manifest = ChecksumManifest()
     
     try:
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        if load_audio is None:
+            digests = hash_audio_records(audio_data, max_workers=hash_workers)
+            duplicates = find_duplicates(digests) if dedupe_audio else {}
+            payloads = ((a["filename"], a.get("data"), digests.get(a["filename"])) for a in audio_data)
+        else:
+            # Loaded in order; a few recordings are hashed ahead of the writer
+            duplicates = {}
+            payloads = hash_ahead([a["filename"] for a in audio_data], load_audio, hash_workers)
+        # Canonical filename by digest, for recordings hashed while writing
+        seen: Dict[str, str] = {}
+        audio_written = 0
+        
+        with _open_zip(partial_path, compression) as zf:
             # Add wordlist.xml with UTF-16LE BOM
             xml_data = generate_xml_utf16le(entries)
             zf.writestr("wordlist.xml", xml_data)
+            manifest.add_bytes("wordlist.xml", xml_data)
+            
+            # Add audio files, skipping payloads already stored under another name
+            for filename, data, digest in payloads:
+                if not data:
+                    continue
+                arcname = f"audio/{filename}"
+                canonical = duplicates.get(filename)
+                if dedupe_audio and load_audio is not None:
+                    canonical = seen.setdefault(digest, filename)
+                if canonical and canonical != filename:
+                    manifest.add_alias(arcname, f"audio/{canonical}")
+                    continue
+                zf.writestr(arcname, data)
+                manifest.add(arcname, digest, len(data))
+                audio_written += 1
+                del data
             
-            # Add audio files
-            for audio in audio_data:
-                if audio.get("data"):
-                    zf.writestr(f"audio/{audio['filename']}", audio["data"])
+            _write_pictures(zf, manifest, pictures)
             
             # Add consent log if records exist
             if consent_records:
                 consent_json = generate_consent_json(consent_records)
                 zf.writestr("consent_log.json", consent_json)
+                manifest.add_bytes("consent_log.json", consent_json)
             
             # Add metadata
             metadata_json = generate_metadata_json(entries)
             zf.writestr("metadata.json", metadata_json)
+            manifest.add_bytes("metadata.json", metadata_json)
+            
+            # Add checksum manifest last so it covers every other member
+            zf.writestr(CHECKSUMS_FILENAME, manifest.to_json())
         
-        # Write to file
-        zip_buffer.seek(0)
-        with open(dest_path, 'wb') as f:
-            f.write(zip_buffer.read())
-        
-        # Calculate stats
-        completed_count = sum(1 for e in entries if e.get("is_completed"))
-        audio_count = sum(1 for e in entries if e.get("audio_filename"))
-        transcription_count = sum(1 for e in entries if e.get("local_transcription"))
+        os.replace(partial_path, dest_path)
         
-        return {
-            "success": True,
-            "path": os.path.abspath(dest_path),
-            "total_entries": len(entries),
-            "completed_entries": completed_count,
-            "entries_with_audio": audio_count,
-            "entries_with_transcription": transcription_count,
-            "audio_files_included": len(audio_data),
+        summary = _export_summary(entries, dest_path)
+        summary.update({
+            "audio_files_included": audio_written,
+            "audio_duplicates_skipped": len(manifest.aliases),
+            "pictures_included": len(pictures),
             "consent_records_included": len(consent_records)
+        })
+        return summary
+    
+    except Exception as e:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        if isinstance(e, JobCancelled):
+            raise
+        return {
+            "success": False,
+            "error": str(e),
+            "path": None
         }
+
+
+def _open_zip(path: str, compression: str) -> zipfile.ZipFile:
+    """Open a ZIP for writing with a named compression policy."""
+    if compression not in COMPRESSION_POLICIES:
+        raise ValueError(f"Unknown compression policy: {compression}")
+    method, level = COMPRESSION_POLICIES[compression]
+    return zipfile.ZipFile(path, 'w', method, compresslevel=level)
+
+
+def _write_pictures(zf: zipfile.ZipFile, manifest: ChecksumManifest, pictures: List[Dict[str, Any]]) -> None:
+    """Copy picture files into the archive from disk."""
+    for picture in pictures:
+        with open(picture["path"], 'rb') as f:
+            digest = sha256_stream(f)
+        # JPEG and PNG are compressed already; deflating them again only costs time
+        zf.write(picture["path"], picture["arcname"], compress_type=zipfile.ZIP_STORED)
+        manifest.add(picture["arcname"], digest, os.path.getsize(picture["path"]))
+
+
+def _export_summary(entries: List[Dict[str, Any]], dest_path: str) -> Dict[str, Any]:
+    """Build the common part of an ExportSummary."""
+    return {
+        "success": True,
+        "path": os.path.abspath(dest_path),
+        "total_entries": len(entries),
+        "completed_entries": sum(1 for e in entries if e.get("is_completed")),
+        "entries_with_audio": sum(1 for e in entries if e.get("audio_filename")),
+        "entries_with_transcription": sum(1 for e in entries if e.get("local_transcription"))
+    }
+
+
+def volume_path(dest_path: str, number: int) -> str:
+    """
+    Get the path of one volume of a split export.
+    
+    Example: wordlist_export.zip -> wordlist_export.part01.zip
+    """
+    base = dest_path[:-4] if dest_path.endswith(".zip") else dest_path
+    return f"{base}.part{number:02d}.zip"
+
+
+def _member_cost(arcname: str, size: int) -> int:
+    """Upper bound on the bytes a member adds to a deflated archive."""
+    return size + size // 1000 + _MEMBER_OVERHEAD + 3 * len(arcname.encode("utf-8"))
+
+
+def plan_volumes(
+    audio_sizes: List[Dict[str, Any]],
+    max_volume_bytes: int,
+    first_volume_reserved: int = 0
+) -> Dict[str, int]:
+    """
+    Assign audio files to volumes without exceeding the byte limit.
+    
+    Files are packed in the given order; a new volume starts when the next
+    file would not fit. Sizes are upper bounds, so the plan holds even when
+    deflate cannot shrink the audio.
+    
+    Args:
+        audio_sizes: List of dicts with 'filename' and 'size' keys
+        max_volume_bytes: Maximum size of each volume file
+        first_volume_reserved: Bytes already used in volume 1 by
+            wordlist.xml, metadata.json and the other fixed members
+            
+    Returns:
+        Dict mapping audio filename to 1-based volume number
+        
+    Raises:
+        ValueError: If a single recording cannot fit in any volume
+    """
+    capacity = max_volume_bytes - _ARCHIVE_OVERHEAD
+    volume = 1
+    used = first_volume_reserved
+    plan = {}
+    
+    for audio in audio_sizes:
+        cost = _member_cost(f"audio/{audio['filename']}", audio["size"])
+        if cost > capacity:
+            raise ValueError(
+                f"{audio['filename']} ({audio['size']} bytes) is larger than the volume limit"
+            )
+        if used + cost > capacity:
+            volume += 1
+            used = 0
+        plan[audio["filename"]] = volume
+        used += cost
+    
+    return plan
+
+
+def generate_volume_index_json(plan: Dict[str, int], volume_count: int) -> str:
+    """Generate the volume index listing which volume holds each recording."""
+    return json.dumps({
+        "volumeCount": volume_count,
+        "audio": plan
+    }, indent=2)
+
+
+def create_split_export(
+    entries: List[Dict[str, Any]],
+    audio_sizes: List[Dict[str, Any]],
+    load_audio: Callable[[str], Optional[bytes]],
+    consent_records: List[Dict[str, Any]],
+    max_volume_bytes: int,
+    dest_path: Optional[str] = None,
+    compression: str = DEFAULT_COMPRESSION,
+    pictures: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """
+    Create a size-capped multi-volume export.
+    
+    Volume 1 holds wordlist.xml, metadata.json, consent_log.json,
+    volume_index.json and the pictures, followed by as much audio as fits. Each volume is a
+    complete ZIP with its own checksums.json and is written straight to
+    disk; recordings are fetched one at a time through load_audio so only
+    one is held in memory.
+    
+    Args:
+        entries: List of entry dictionaries
+        audio_sizes: List of dicts with 'filename' and 'size' keys
+        load_audio: Callable returning the audio bytes for a filename
+        consent_records: List of consent record dictionaries
+        max_volume_bytes: Maximum size of each volume file
+        dest_path: Optional base path; volumes are named <base>.partNN.zip
+        compression: Name of a COMPRESSION_POLICIES entry
+        pictures: List of dicts with 'path', 'arcname' and 'size' keys
+        
+    Returns:
+        ExportSummary dict with 'volumes' listing every volume path
+    """
+    dest_path = _default_dest_path(dest_path)
+    pictures = pictures or []
+    written = []
+    
+    try:
+        if max_volume_bytes < MIN_VOLUME_BYTES:
+            raise ValueError(f"Volume limit must be at least {MIN_VOLUME_BYTES} bytes")
+        
+        fixed_members = [
+            ("wordlist.xml", generate_xml_utf16le(entries)),
+            ("metadata.json", generate_metadata_json(entries))
+        ]
+        if consent_records:
+            fixed_members.append(("consent_log.json", generate_consent_json(consent_records)))
+        
+        # Reserve room for the index assuming the widest volume numbers
+        worst_index = generate_volume_index_json(
+            {a["filename"]: 99999 for a in audio_sizes}, 99999
+        )
+        reserved = sum(
+            _member_cost(name, len(data)) for name, data in fixed_members
+            + [(VOLUME_INDEX_FILENAME, worst_index)]
+        ) + sum(_member_cost(p["arcname"], p["size"]) for p in pictures)
+        if reserved > max_volume_bytes - _ARCHIVE_OVERHEAD:
+            raise ValueError("The wordlist and pictures are larger than the volume limit")
+        
+        plan = plan_volumes(audio_sizes, max_volume_bytes, first_volume_reserved=reserved)
+        volume_count = max(plan.values()) if plan else 1
+        fixed_members.append(
+            (VOLUME_INDEX_FILENAME, generate_volume_index_json(plan, volume_count))
+        )
+        
+        for number in range(1, volume_count + 1):
+            path = volume_path(dest_path, number)
+            manifest = ChecksumManifest()
+            written.append(path)
+            
+            with _open_zip(path, compression) as zf:
+                if number == 1:
+                    for name, data in fixed_members:
+                        zf.writestr(name, data)
+                        manifest.add_bytes(name, data)
+                    _write_pictures(zf, manifest, pictures)
+                
+                for audio in audio_sizes:
+                    if plan[audio["filename"]] != number:
+                        continue
+                    data = load_audio(audio["filename"])
+                    if not data:
+                        continue
+                    arcname = f"audio/{audio['filename']}"
+                    zf.writestr(arcname, data)
+                    manifest.add(arcname, sha256_bytes(data), len(data))
+                    del data
+                
+                zf.writestr(CHECKSUMS_FILENAME, manifest.to_json())
+        
+        summary = _export_summary(entries, written[0])
+        summary.update({
+            "volumes": [os.path.abspath(p) for p in written],
+            "audio_files_included": len(plan),
+            "pictures_included": len(pictures),
+            "consent_records_included": len(consent_records)
+        })
+        return summary
     
     except Exception as e:
+        for path in written:
+            if os.path.exists(path):
+                os.remove(path)
+        if isinstance(e, JobCancelled):
+            raise
         return {
             "success": False,
             "error": str(e),
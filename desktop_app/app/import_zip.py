@@ -0,0 +1,231 @@
+"""ZIP bundle import: restore archives produced by create_export_zip."""
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import Dict, Any, List, Iterator, Tuple
+
+from .xml_io import parse_wordlist_from_stream
+from .audio_codec import validate_wav_16bit
+from .integrity import load_manifest, sha256_bytes, HASH_ALGORITHM
+from .export_zip import VOLUME_INDEX_FILENAME, volume_path
+from .pictures import PICTURES_PREFIX, picture_dir
+
+
+AUDIO_PREFIX = "audio/"
+
+
+def read_consent_json(data: bytes) -> List[Dict[str, Any]]:
+    """
+    Convert consent_log.json content back into consent records.
+
+    Args:
+        data: Raw consent_log.json bytes
+
+    Returns:
+        List of consent record dictionaries in storage format
+    """
+    log = json.loads(data.decode("utf-8"))
+    return [
+        {
+            "timestamp": r.get("timestamp"),
+            "device_id": r.get("deviceId"),
+            "type": r.get("type"),
+            "response": r.get("response"),
+            "verbal_consent_filename": r.get("verbalConsentFilename")
+        }
+        for r in log.get("records", [])
+    ]
+
+
+def list_volumes(zip_path: str, zf: zipfile.ZipFile) -> List[str]:
+    """List every volume of a split export, or just zip_path for a single archive."""
+    try:
+        index = json.loads(zf.read(VOLUME_INDEX_FILENAME).decode("utf-8"))
+    except KeyError:
+        return [zip_path]
+
+    base = zip_path
+    suffix = ".part01.zip"
+    if base.endswith(suffix):
+        base = base[:-len(suffix)] + ".zip"
+
+    paths = [volume_path(base, n) for n in range(1, index.get("volumeCount", 1) + 1)]
+    missing = [p for p in paths if not os.path.exists(p)]
+    if missing:
+        raise FileNotFoundError(f"Missing export volume: {missing[0]}")
+    return paths
+
+
+class _AudioReader:
+    """Yields validated audio members one at a time from one or more volumes."""
+
+    def __init__(self, paths: List[str]):
+        self.paths = paths
+        self.rejected: List[Dict[str, str]] = []
+
+    def __iter__(self) -> Iterator[Tuple[str, bytes]]:
+        for path in self.paths:
+            with zipfile.ZipFile(path, 'r') as zf:
+                manifest = load_manifest(zf)
+                files = manifest.get("files", {}) if manifest else {}
+                aliases: Dict[str, List[str]] = {}
+                if manifest:
+                    for alias, target in manifest.get("aliases", {}).items():
+                        aliases.setdefault(target, []).append(alias)
+
+                for info in zf.infolist():
+                    name = info.filename
+                    if not name.startswith(AUDIO_PREFIX) or info.is_dir():
+                        continue
+
+                    data = zf.read(name)
+                    filename = name[len(AUDIO_PREFIX):]
+
+                    expected = files.get(name)
+                    if expected and sha256_bytes(data) != expected.get(HASH_ALGORITHM):
+                        self.rejected.append({"file": filename, "error": "checksum mismatch"})
+                        continue
+                    if not validate_wav_16bit(data):
+                        self.rejected.append({"file": filename, "error": "not 16-bit PCM WAV"})
+                        continue
+
+                    yield filename, data
+                    for alias in aliases.get(name, []):
+                        yield alias[len(AUDIO_PREFIX):], data
+
+
+def extract_pictures(zf: zipfile.ZipFile, dest_dir: str) -> Tuple[Dict[str, str], List[Dict[str, str]]]:
+    """
+    Extract the pictures/ members of an archive into dest_dir.
+
+    Args:
+        zf: Open export archive (volume 1 of a split export)
+        dest_dir: Existing directory the pictures are written to
+
+    Returns:
+        (dict mapping member name to file name in dest_dir, list of
+        rejected pictures with file and error)
+    """
+    manifest = load_manifest(zf)
+    files = manifest.get("files", {}) if manifest else {}
+    extracted: Dict[str, str] = {}
+    rejected: List[Dict[str, str]] = []
+
+    for info in zf.infolist():
+        name = info.filename
+        # Only the base name is used, so member names cannot escape dest_dir
+        filename = os.path.basename(name[len(PICTURES_PREFIX):])
+        if not name.startswith(PICTURES_PREFIX) or info.is_dir() or not filename:
+            continue
+        data = zf.read(name)
+        expected = files.get(name)
+        if expected and sha256_bytes(data) != expected.get(HASH_ALGORITHM):
+            rejected.append({"file": filename, "error": "checksum mismatch"})
+            continue
+        with open(os.path.join(dest_dir, filename), 'wb') as f:
+            f.write(data)
+        extracted[name] = filename
+    return extracted, rejected
+
+
+def _swap_in_dir(staging_dir: str, dest_dir: str) -> None:
+    """Replace dest_dir with staging_dir; directories cannot be os.replace'd over non-empty ones."""
+    old_dir = None
+    if os.path.isdir(dest_dir):
+        old_dir = tempfile.mkdtemp(prefix=os.path.basename(dest_dir) + ".old-", dir=os.path.dirname(dest_dir))
+        os.rmdir(old_dir)
+        os.replace(dest_dir, old_dir)
+    os.replace(staging_dir, dest_dir)
+    if old_dir:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def import_from_zip(zip_path: str, storage) -> Dict[str, Any]:
+    """
+    Restore an export archive into storage.
+
+    wordlist.xml is stream-parsed from the archive and audio members are
+    decompressed and inserted one at a time, so memory stays bounded by
+    the largest recording. Entries and audio are replaced in a single
+    transaction, so a failed import leaves the database as it was. Each recording is
+    checked against checksums.json (when present) and validate_wav_16bit.
+    Existing entries and audio are replaced; consent records not already
+    in storage are appended. Pictures are extracted to a staging directory
+    and replace the database's picture directory (see
+    app.pictures.picture_dir) only once the transaction has committed. Split exports are read from all volumes when
+    given the first one.
+
+    Args:
+        zip_path: Path to an export ZIP (or the .part01.zip of a split export)
+        storage: StorageManager to restore into
+
+    Returns:
+        ImportSummary with entry, audio and consent counts
+    """
+    staging_dir = None
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zf:
+            try:
+                with zf.open("wordlist.xml") as stream:
+                    entries = parse_wordlist_from_stream(stream)
+            except KeyError:
+                return {"success": False, "error": "Archive has no wordlist.xml", "count": 0}
+
+            try:
+                consent_records = read_consent_json(zf.read("consent_log.json"))
+            except KeyError:
+                consent_records = []
+
+            paths = list_volumes(zip_path, zf)
+
+            if not entries:
+                return {"success": False, "error": "No entries found in archive", "count": 0}
+
+            pictures_dir = picture_dir(storage.db_path)
+            staging_dir = tempfile.mkdtemp(
+                prefix=os.path.basename(pictures_dir) + ".import-", dir=os.path.dirname(pictures_dir)
+            )
+            pictures, pictures_rejected = extract_pictures(zf, staging_dir)
+
+        for entry in entries:
+            picture = entry.get("picture_filename")
+            if picture in pictures:
+                entry["picture_filename"] = os.path.join(pictures_dir, pictures[picture])
+
+        reader = _AudioReader(paths)
+        audio_count = storage.replace_all(entries, reader)
+
+        # The entries now point into pictures_dir
+        _swap_in_dir(staging_dir, pictures_dir)
+        staging_dir = None
+
+        existing = {
+            (r.get("timestamp"), r.get("device_id"), r.get("type"), r.get("response"))
+            for r in storage.get_all_consent_records()
+        }
+        consent_count = 0
+        for record in consent_records:
+            key = (record["timestamp"], record["device_id"], record["type"], record["response"])
+            if key not in existing:
+                storage.add_consent_record(record)
+                existing.add(key)
+                consent_count += 1
+
+        return {
+            "success": True,
+            "count": len(entries),
+            "audio_imported": audio_count,
+            "audio_rejected": reader.rejected,
+            "pictures_imported": len(pictures),
+            "pictures_rejected": pictures_rejected,
+            "consent_imported": consent_count,
+            "error": None
+        }
+
+    except Exception as e:
+        return {"success": False, "error": str(e), "count": 0}
+    finally:
+        if staging_dir:
+            shutil.rmtree(staging_dir, ignore_errors=True)
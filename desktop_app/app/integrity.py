@@ -0,0 +1,280 @@
+"""SHA-256 hashing, audio deduplication and checksum manifests for exports."""
+import hashlib
+import json
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Callable, Tuple
+
+
+CHECKSUMS_FILENAME = "checksums.json"
+HASH_ALGORITHM = "sha256"
+
+# Chunk size for streaming hashes; hashlib releases the GIL for large updates
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Recordings loaded and hashed ahead of the consumer by hash_ahead()
+HASH_AHEAD = 4
+
+
+def default_workers() -> int:
+    """Number of worker threads used for parallel hashing."""
+    return min(8, (os.cpu_count() or 1) + 2)
+
+
+def sha256_bytes(data: bytes) -> str:
+    """
+    Hash a bytes payload in fixed-size chunks.
+
+    Args:
+        data: Payload to hash
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    view = memoryview(data)
+    for offset in range(0, len(view), HASH_CHUNK_SIZE):
+        digest.update(view[offset:offset + HASH_CHUNK_SIZE])
+    return digest.hexdigest()
+
+
+def sha256_stream(stream) -> str:
+    """Hash a binary file-like object without reading it fully into memory."""
+    digest = hashlib.sha256()
+    while True:
+        chunk = stream.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_audio_records(
+    audio_data: List[Dict[str, Any]],
+    max_workers: Optional[int] = None
+) -> Dict[str, str]:
+    """
+    Hash audio payloads in parallel.
+
+    Args:
+        audio_data: List of dicts with 'filename' and 'data' keys
+        max_workers: Thread count (defaults to default_workers())
+
+    Returns:
+        Dict mapping audio filename to hex SHA-256 digest
+    """
+    records = [a for a in audio_data if a.get("data")]
+    if not records:
+        return {}
+
+    workers = max_workers or default_workers()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        digests = list(pool.map(lambda a: sha256_bytes(a["data"]), records))
+
+    return {a["filename"]: d for a, d in zip(records, digests)}
+
+
+def hash_ahead(
+    filenames: Iterable[str],
+    load: Callable[[str], Optional[bytes]],
+    ahead: Optional[int] = None
+) -> Iterator[Tuple[str, Optional[bytes], Optional[str]]]:
+    """
+    Load payloads in order and hash them on a pool while the caller works.
+
+    load() runs on the calling thread, one filename at a time; up to ahead
+    loaded payloads are hashed in parallel before the caller asks for them,
+    so at most ahead + 1 are held in memory.
+
+    Args:
+        filenames: Filenames in the order they are wanted
+        load: Callable returning the payload for a filename (None or
+            empty when missing)
+        ahead: Payloads hashed ahead of the caller (default: HASH_AHEAD)
+
+    Yields:
+        (filename, payload, hex SHA-256 digest); the digest is None for a
+        missing payload
+    """
+    ahead = max(1, ahead or HASH_AHEAD)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=ahead) as pool:
+        for filename in filenames:
+            data = load(filename)
+            pending.append((filename, data, pool.submit(sha256_bytes, data) if data else None))
+            if len(pending) > ahead:
+                filename, data, future = pending.popleft()
+                yield filename, data, future.result() if future else None
+        while pending:
+            filename, data, future = pending.popleft()
+            yield filename, data, future.result() if future else None
+
+
+def find_duplicates(digests: Dict[str, str]) -> Dict[str, str]:
+    """
+    Find audio files whose payload duplicates an earlier file.
+
+    The first filename (in sorted order) with a given digest is kept as the
+    canonical copy so results are stable between exports.
+
+    Args:
+        digests: Dict mapping filename to digest
+
+    Returns:
+        Dict mapping duplicate filename to canonical filename
+    """
+    canonical: Dict[str, str] = {}
+    aliases: Dict[str, str] = {}
+    for filename in sorted(digests):
+        digest = digests[filename]
+        if digest in canonical:
+            aliases[filename] = canonical[digest]
+        else:
+            canonical[digest] = filename
+    return aliases
+
+
+class ChecksumManifest:
+    """Collects per-member digests while an archive is written."""
+
+    def __init__(self):
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.aliases: Dict[str, str] = {}
+
+    def add(self, arcname: str, digest: str, size: int) -> None:
+        """Record a member written to the archive."""
+        self.files[arcname] = {HASH_ALGORITHM: digest, "size": size}
+
+    def add_bytes(self, arcname: str, data) -> None:
+        """Hash and record an in-memory member."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.add(arcname, sha256_bytes(data), len(data))
+
+    def add_alias(self, arcname: str, canonical_arcname: str) -> None:
+        """Record a deduplicated member that resolves to another member."""
+        self.aliases[arcname] = canonical_arcname
+
+    def to_json(self) -> str:
+        """Serialize the manifest as checksums.json content."""
+        return json.dumps({
+            "generatedAt": datetime.utcnow().isoformat() + "Z",
+            "algorithm": HASH_ALGORITHM,
+            "files": self.files,
+            "aliases": self.aliases
+        }, indent=2)
+
+
+def load_manifest(zf: zipfile.ZipFile) -> Optional[Dict[str, Any]]:
+    """
+    Read checksums.json from an open archive.
+
+    Returns:
+        Parsed manifest dict, or None if the archive has no manifest
+    """
+    try:
+        raw = zf.read(CHECKSUMS_FILENAME)
+    except KeyError:
+        return None
+    return json.loads(raw.decode("utf-8"))
+
+
+def resolve_member(manifest: Optional[Dict[str, Any]], arcname: str) -> str:
+    """Resolve a possibly deduplicated member name to the stored member."""
+    if manifest:
+        return manifest.get("aliases", {}).get(arcname, arcname)
+    return arcname
+
+
+def _verify_members(zip_path: str, items: Iterable) -> List[Dict[str, Any]]:
+    """Hash a batch of members using a private ZipFile handle."""
+    problems = []
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        for arcname, expected in items:
+            try:
+                with zf.open(arcname) as member:
+                    actual = sha256_stream(member)
+            except KeyError:
+                problems.append({"file": arcname, "error": "missing"})
+                continue
+            if actual != expected[HASH_ALGORITHM]:
+                problems.append({"file": arcname, "error": "checksum mismatch"})
+    return problems
+
+
+def verify_export_zip(
+    zip_path: str,
+    quick: bool = False,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Verify an export archive against its checksums.json manifest.
+
+    Quick mode only compares member names and sizes from the central
+    directory, so nothing is decompressed. Full mode streams every member
+    through SHA-256, spread across worker threads that each hold their
+    own ZipFile handle.
+
+    Args:
+        zip_path: Path to the export ZIP
+        quick: Only check presence and uncompressed sizes
+        max_workers: Thread count for full verification
+
+    Returns:
+        VerifySummary dict with 'success', 'checked' and 'problems'
+    """
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zf:
+            manifest = load_manifest(zf)
+            infos = {info.filename: info for info in zf.infolist()}
+    except (OSError, zipfile.BadZipFile) as e:
+        return {"success": False, "error": str(e), "checked": 0, "problems": []}
+
+    if manifest is None:
+        return {"success": False, "error": "No checksums.json in archive", "checked": 0, "problems": []}
+
+    files = manifest.get("files", {})
+    problems = []
+
+    for arcname, expected in files.items():
+        info = infos.get(arcname)
+        if info is None:
+            problems.append({"file": arcname, "error": "missing"})
+        elif info.file_size != expected.get("size"):
+            problems.append({"file": arcname, "error": "size mismatch"})
+
+    for alias, target in manifest.get("aliases", {}).items():
+        if target not in files:
+            problems.append({"file": alias, "error": "alias target missing"})
+
+    if not quick:
+        bad = {p["file"] for p in problems}
+        pending = [(n, e) for n, e in files.items() if n not in bad]
+        workers = max(1, min(max_workers or default_workers(), len(pending)))
+        batches = [pending[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for batch_problems in pool.map(lambda b: _verify_members(zip_path, b), batches):
+                problems.extend(batch_problems)
+
+    return {
+        "success": not problems,
+        "error": None if not problems else f"{len(problems)} problem(s) found",
+        "checked": len(files),
+        "problems": problems
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) != 1:
+        print("Usage: python -m app.integrity [--quick] <export.zip>")
+        sys.exit(2)
+
+    result = verify_export_zip(args[0], quick="--quick" in sys.argv)
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["success"] else 1)
@@ -0,0 +1,240 @@
+"""Background jobs for long-running API operations."""
+import itertools
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Callable, Dict, Any, List
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+_current = threading.local()
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job when it has been cancelled."""
+
+
+def current_job() -> Optional["Job"]:
+    """The job running on this thread, or None outside a job."""
+    return getattr(_current, "job", None)
+
+
+def check_cancelled() -> None:
+    """
+    Cancellation checkpoint for code that may run inside a job.
+
+    Raises:
+        JobCancelled: If the current job has been cancelled
+    """
+    job = current_job()
+    if job is not None and job.cancel_requested:
+        raise JobCancelled()
+
+
+def report_progress(done: int, total: int) -> None:
+    """Report progress of the current job; does nothing outside a job."""
+    job = current_job()
+    if job is not None:
+        job.set_progress(done, total)
+
+
+class Job:
+    """One submitted operation and its state."""
+
+    def __init__(self, job_id: str, name: str, func: Callable, uses_storage: bool):
+        self.id = job_id
+        self.name = name
+        self.func = func
+        self.uses_storage = uses_storage
+        self.status = JOB_QUEUED
+        self.progress: Optional[float] = None
+        self.result = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+        self._notify: Optional[Callable] = None
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def set_progress(self, done: int, total: int) -> None:
+        progress = round(done / total, 2) if total else None
+        if progress != self.progress:
+            self.progress = progress
+            if self._notify:
+                self._notify(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobScheduler:
+    """
+    Runs jobs on a small thread pool fed by a bounded queue.
+
+    Jobs that use storage hold a shared lock while they run, so imports,
+    exports and other bulk storage operations never interleave. Code
+    outside the scheduler that writes to storage takes storage_lock too,
+    waiting for the running job instead of failing on a locked database;
+    the lock is reentrant, so jobs can call code that takes it. Queued
+    jobs can be cancelled outright; running jobs stop at their next
+    check_cancelled() checkpoint.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queued: int = 16,
+        notify: Optional[Callable[[Dict[str, Any]], None]] = None,
+        keep_finished: int = 50
+    ):
+        """
+        Args:
+            workers: Worker threads
+            max_queued: Jobs that may wait before submit() refuses more
+            notify: Called with the job dict on every state or progress change
+            keep_finished: Finished jobs kept for get()
+        """
+        self.notify = notify
+        self.keep_finished = keep_finished
+        self.storage_lock = threading.RLock()
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True) for _ in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, name: str, func: Callable[[], Any], uses_storage: bool = True) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            name: Operation name shown to the UI
+            func: Called without arguments on a worker thread; its return
+                value becomes the job result
+            uses_storage: Serialize with other storage jobs
+
+        Returns:
+            The queued Job
+
+        Raises:
+            RuntimeError: If the queue is full
+        """
+        job = Job(f"job-{next(self._ids)}", name, func, uses_storage)
+        job._notify = self._changed
+        with self._lock:
+            self._jobs[job.id] = job
+        # Announce before a worker can pick the job up
+        self._changed(job)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise RuntimeError("Too many jobs queued; try again later")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request cancellation of a job.
+
+        Returns:
+            False if the job is unknown or already finished
+        """
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return False
+        job._cancel.set()
+        return True
+
+    def _changed(self, job: Job) -> None:
+        if self.notify:
+            try:
+                self.notify(job.to_dict())
+            except Exception as e:
+                print(f"Job notification failed: {e}")
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        with self._lock:
+            finished = [j for j in self._jobs.values() if j.status in FINISHED_STATES]
+            for old in finished[:max(0, len(finished) - self.keep_finished)]:
+                del self._jobs[old.id]
+        self._changed(job)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if job.cancel_requested:
+                self._finish(job, JOB_CANCELLED)
+                continue
+
+            lock = self.storage_lock if job.uses_storage else None
+            if lock:
+                lock.acquire()
+            _current.job = job
+            try:
+                # Cancelled while waiting for the storage lock
+                check_cancelled()
+                job.status = JOB_RUNNING
+                job.started_at = time.time()
+                self._changed(job)
+                job.result = job.func()
+                status = JOB_DONE
+            except JobCancelled:
+                status = JOB_CANCELLED
+            except Exception as e:
+                job.error = str(e)
+                status = JOB_FAILED
+            finally:
+                _current.job = None
+                if lock:
+                    lock.release()
+            self._finish(job, status)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancel queued jobs and stop the workers after their current job."""
+        for job in self.jobs():
+            if job.status == JOB_QUEUED:
+                job._cancel.set()
+        for _ in self._workers:
+            self._queue.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join(timeout=5.0)
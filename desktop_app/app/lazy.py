@@ -0,0 +1,48 @@
+"""Deferred imports of heavy optional dependencies."""
+import importlib
+import importlib.util
+import threading
+
+
+def module_available(name: str) -> bool:
+    """True if a module is installed, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    numpy and the audio libraries take a large share of startup time
+    (importing sounddevice also initializes PortAudio), so modules bind
+    them through a LazyModule and pay the cost only when audio is used.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        value = getattr(self._load(), attr)
+        # Later lookups find the attribute directly, without this hook
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
@@ -0,0 +1,323 @@
+"""
+Local HTTP server for recordings and pictures.
+
+Serves media to the webview so it can stream and cache it natively:
+
+    /<token>/audio/<filename>     recording from storage, as WAV
+    /<token>/picture/<entry_id>   the entry's picture file; ?size=thumb or
+                                  ?size=display serves a downscaled variant
+
+The server only listens on 127.0.0.1 and every path starts with a random
+token, so other local users and web pages cannot read the wordlist
+through it. Responses support single-range requests, ETags and
+If-None-Match/If-Modified-Since revalidation.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import secrets
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple, Callable
+from urllib.parse import quote, unquote, parse_qs
+
+from .pictures import VARIANTS, WEB_DIR, picture_roots, local_picture_path
+
+
+# Recordings can be replaced under the same name, so always revalidate
+AUDIO_CACHE_CONTROL = "private, no-cache"
+PICTURE_CACHE_CONTROL = "private, max-age=3600"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header.
+
+    Args:
+        header: Range header value, e.g. 'bytes=0-1023', 'bytes=100-' or 'bytes=-500'
+        size: Size of the resource in bytes
+
+    Returns:
+        Inclusive (start, end) byte positions, None to send the whole
+        resource (no header, or a form this server does not handle such
+        as multiple ranges)
+
+    Raises:
+        ValueError: If the range cannot be satisfied
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "WordlistMedia/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def _handle(self, send_body: bool) -> None:
+        media = self.server.media
+        path, _, query = self.path.partition("?")
+        parts = path.split("/")
+        # ['', token, kind, name]
+        if len(parts) != 4 or not secrets.compare_digest(parts[1], media.token):
+            self._send_status(404)
+            return
+
+        kind, name = parts[2], unquote(parts[3])
+        try:
+            if kind == "audio":
+                self._serve_audio(media, name, send_body)
+            elif kind == "picture":
+                size = parse_qs(query).get("size", [None])[0]
+                self._serve_picture(media, name, size, send_body)
+            else:
+                self._send_status(404)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_status(self, code: int, headers: Optional[dict] = None) -> None:
+        self.send_response(code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _not_modified(self, etag: str, last_modified: Optional[float]) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since and last_modified is not None:
+            try:
+                return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send_media(
+        self,
+        size: int,
+        read: Callable[[int, int], bytes],
+        content_type: str,
+        etag: str,
+        cache_control: str,
+        last_modified: Optional[float],
+        send_body: bool
+    ) -> None:
+        """Send a 200/206/304/416 response; read(start, length) returns body bytes."""
+        headers = {
+            "ETag": etag,
+            "Cache-Control": cache_control,
+            "Accept-Ranges": "bytes"
+        }
+        if last_modified is not None:
+            headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+        if self._not_modified(etag, last_modified):
+            self._send_status(304, headers)
+            return
+
+        byte_range = None
+        # A stale If-Range validator means the client must refetch everything
+        if self.headers.get("If-Range") in (None, etag):
+            try:
+                byte_range = parse_range(self.headers.get("Range"), size)
+            except ValueError:
+                headers["Content-Range"] = f"bytes */{size}"
+                self._send_status(416, headers)
+                return
+
+        if byte_range is None:
+            start, length = 0, size
+            self.send_response(200)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            self.send_response(206)
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        headers["Content-Type"] = content_type
+        headers["Content-Length"] = str(length)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        if send_body and length:
+            self.wfile.write(read(start, length))
+
+    def _serve_audio(self, media: "MediaServer", filename: str, send_body: bool) -> None:
+        # The ETag comes from the row's identity, so revalidation and range
+        # requests never read the whole recording
+        stat = media.storage.get_audio_stat(filename)
+        if stat is None:
+            self._send_status(404)
+            return
+        version = f"{media.storage.db_path}|{filename}|{stat['version']}"
+        etag = '"' + hashlib.blake2b(version.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+        if stat["encoded"]:
+            # Compressed recordings are decoded whole, once per version
+            data = media.decoded_audio(filename, etag)
+            size = len(data)
+
+            def read(start: int, length: int) -> bytes:
+                return data[start:start + length]
+        else:
+            size = stat["size"]
+
+            def read(start: int, length: int) -> bytes:
+                return media.storage.read_audio_range(filename, start, length)
+
+        self._send_media(size, read, "audio/wav", etag, AUDIO_CACHE_CONTROL, None, send_body)
+
+    def _serve_picture(self, media: "MediaServer", entry_id: str, size: Optional[str], send_body: bool) -> None:
+        path = media.picture_path(entry_id)
+        if path is None:
+            self._send_status(404)
+            return
+        if size in VARIANTS and media.pictures is not None:
+            # Falls back to the original when no variant can be made
+            path = media.pictures.get(path, size) or path
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._send_status(404)
+            return
+
+        def read(start: int, length: int) -> bytes:
+            with open(path, 'rb') as f:
+                f.seek(start)
+                return f.read(length)
+
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self._send_media(
+            stat.st_size, read, content_type, etag, PICTURE_CACHE_CONTROL, stat.st_mtime, send_body
+        )
+
+
+class MediaServer:
+    """Tokenized localhost HTTP server for recordings and entry pictures."""
+
+    def __init__(self, storage, picture_root: Optional[str] = None, port: int = 0, pictures=None):
+        """
+        Args:
+            storage: StorageManager to read recordings and entries from
+            picture_root: Directory relative picture paths are resolved
+                against after the database's picture directory (default:
+                the web directory)
+            port: Port to listen on; 0 picks a free one
+            pictures: PictureCache for ?size= variants (default: always
+                serve originals)
+        """
+        self.storage = storage
+        self.picture_root = picture_root or WEB_DIR
+        self.pictures = pictures
+        self.token = secrets.token_urlsafe(16)
+        self._port = port
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        # Last decoded compressed recording: (ETag, WAV bytes), so the range
+        # requests of one playback decode it once
+        self._decoded: Optional[Tuple[str, bytes]] = None
+        self._decoded_lock = threading.Lock()
+
+    def set_storage(self, storage) -> None:
+        """
+        Serve another database.
+
+        The token changes too, so responses the webview cached for the old
+        database (pictures are looked up by entry ID) are never reused.
+        """
+        self.storage = storage
+        self.token = secrets.token_urlsafe(16)
+        with self._decoded_lock:
+            self._decoded = None
+
+    def decoded_audio(self, filename: str, etag: str) -> bytes:
+        """WAV bytes of a compressed recording, decoded once per ETag."""
+        with self._decoded_lock:
+            if self._decoded is not None and self._decoded[0] == etag:
+                return self._decoded[1]
+        data = self.storage.get_audio(filename) or b""
+        with self._decoded_lock:
+            self._decoded = (etag, data)
+        return data
+
+    def start(self) -> str:
+        """
+        Start serving on a background thread.
+
+        Returns:
+            Base URL, e.g. 'http://127.0.0.1:53124/<token>'
+        """
+        if self._httpd is None:
+            self._httpd = ThreadingHTTPServer(("127.0.0.1", self._port), _MediaHandler)
+            self._httpd.daemon_threads = True
+            self._httpd.media = self
+            self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+            self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+            self._thread.join(timeout=2.0)
+
+    @property
+    def base_url(self) -> Optional[str]:
+        if self._httpd is None:
+            return None
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/{self.token}"
+
+    def audio_url(self, filename: str) -> Optional[str]:
+        if self.base_url is None:
+            return None
+        return f"{self.base_url}/audio/{quote(filename, safe='')}"
+
+    def picture_url(self, entry_id: int, size: Optional[str] = None) -> Optional[str]:
+        if self.base_url is None:
+            return None
+        url = f"{self.base_url}/picture/{entry_id}"
+        return f"{url}?size={size}" if size else url
+
+    def picture_path(self, entry_id: str) -> Optional[str]:
+        """Local file of an entry's picture, or None (unknown entry, no picture, remote URL, missing file)."""
+        try:
+            entry = self.storage.get_entry(int(entry_id))
+        except ValueError:
+            return None
+        picture = entry.get("picture_filename") if entry else None
+        return local_picture_path(picture, picture_roots(self.storage.db_path, self.picture_root))
@@ -0,0 +1,476 @@
+"""Merge export archives from several fieldworkers into one archive."""
+import hashlib
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .xml_io import parse_wordlist_from_stream, generate_xml_utf16le
+from .utils import normalize_reference, parse_reference_numeric
+from .integrity import (
+    ChecksumManifest, load_manifest, resolve_member, sha256_stream,
+    default_workers, HASH_ALGORITHM, HASH_CHUNK_SIZE, CHECKSUMS_FILENAME
+)
+from .export_zip import generate_consent_json, generate_metadata_json
+from .import_zip import read_consent_json, list_volumes, AUDIO_PREFIX
+from .pictures import PICTURES_PREFIX
+
+
+MERGE_REPORT_FILENAME = "merge_report.json"
+
+# Conflict policies for entries that share a reference
+POLICY_LATEST = "latest"
+POLICY_PREFER_AUDIO = "prefer_audio"
+POLICY_KEEP_ALL = "keep_all"
+POLICIES = (POLICY_LATEST, POLICY_PREFER_AUDIO, POLICY_KEEP_ALL)
+
+
+def load_archive_summary(zip_path: str) -> Dict[str, Any]:
+    """
+    Read everything needed to reconcile an archive, except audio payloads.
+
+    Runs in a worker process. Audio digests come from checksums.json when
+    present; otherwise each member is stream-hashed.
+
+    Args:
+        zip_path: Path to an export ZIP (or the first volume of a split export)
+
+    Returns:
+        Dict with 'path', 'entries', 'consent', 'audio' mapping audio
+        filename to its volume path, member name, digest and size, and
+        'pictures' mapping picture members (pictures/...) the same way
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        with zf.open("wordlist.xml") as stream:
+            entries = parse_wordlist_from_stream(stream)
+        try:
+            consent = read_consent_json(zf.read("consent_log.json"))
+        except KeyError:
+            consent = []
+        volumes = list_volumes(zip_path, zf)
+
+        # Pictures are always in the first volume
+        manifest = load_manifest(zf)
+        files = manifest.get("files", {}) if manifest else {}
+        pictures: Dict[str, Dict[str, Any]] = {}
+        for info in zf.infolist():
+            if not info.filename.startswith(PICTURES_PREFIX) or info.is_dir():
+                continue
+            expected = files.get(info.filename)
+            if expected:
+                digest = expected[HASH_ALGORITHM]
+            else:
+                with zf.open(info) as stream:
+                    digest = sha256_stream(stream)
+            pictures[info.filename] = {
+                "volume": zip_path,
+                "member": info.filename,
+                "digest": digest,
+                "size": info.file_size
+            }
+
+    audio: Dict[str, Dict[str, Any]] = {}
+    for path in volumes:
+        with zipfile.ZipFile(path, 'r') as zf:
+            manifest = load_manifest(zf)
+            files = manifest.get("files", {}) if manifest else {}
+            names = [n for n in zf.namelist() if n.startswith(AUDIO_PREFIX)]
+            if manifest:
+                names += list(manifest.get("aliases", {}))
+
+            for name in names:
+                member = resolve_member(manifest, name)
+                try:
+                    info = zf.getinfo(member)
+                except KeyError:
+                    continue
+                expected = files.get(member)
+                if expected:
+                    digest = expected[HASH_ALGORITHM]
+                else:
+                    with zf.open(member) as stream:
+                        digest = sha256_stream(stream)
+                audio[name[len(AUDIO_PREFIX):]] = {
+                    "volume": path,
+                    "member": member,
+                    "digest": digest,
+                    "size": info.file_size
+                }
+
+    return {
+        "path": zip_path,
+        "entries": entries,
+        "consent": consent,
+        "audio": audio,
+        "pictures": pictures
+    }
+
+
+def _take_key(take: Dict[str, Any], policy: str):
+    """Sort key for choosing the winning take; larger wins."""
+    entry = take["entry"]
+    has_audio = take["audio"] is not None
+    recorded_at = entry.get("recorded_at") or ""
+    if policy == POLICY_PREFER_AUDIO:
+        return (has_audio, recorded_at, take["source"])
+    return (recorded_at, has_audio, take["source"])
+
+
+def _take_filename(filename: str, number: int) -> str:
+    """Name for an additional take, e.g. 0001_body.wav -> 0001_body.take2.wav."""
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.take{number}{ext}"
+
+
+def _place_picture(
+    member: str,
+    location: Dict[str, Any],
+    pictures: Dict[str, Dict[str, Any]],
+    by_digest: Dict[str, str]
+) -> str:
+    """Member name of a picture in the merged archive; identical files share one."""
+    arcname = by_digest.get(location["digest"])
+    if arcname is None:
+        stem, ext = os.path.splitext(member)
+        arcname, n = member, 2
+        while arcname in pictures:
+            arcname, n = f"{stem}_{n}{ext}", n + 1
+        pictures[arcname] = location
+        by_digest[location["digest"]] = arcname
+    return arcname
+
+
+def _place_unreferenced_audio(
+    summaries: List[Dict[str, Any]],
+    audio: Dict[str, Dict[str, Any]]
+) -> Dict[int, Dict[str, str]]:
+    """
+    Add recordings no entry refers to, such as verbal consent statements.
+
+    Each keeps its name unless a different recording already has it, in
+    which case it is renamed like a picture (name_2.wav). A recording
+    already placed under its name with the same digest is not repeated.
+
+    Returns:
+        Renamed recordings per source index (old filename to new filename)
+    """
+    renamed: Dict[int, Dict[str, str]] = {}
+    for source, summary in enumerate(summaries):
+        referenced = {e.get("audio_filename") for e in summary["entries"]}
+        for filename in sorted(summary["audio"]):
+            if filename in referenced:
+                continue
+            location = summary["audio"][filename]
+            stem, ext = os.path.splitext(filename)
+            name, n = filename, 2
+            while name in audio and audio[name]["digest"] != location["digest"]:
+                name, n = f"{stem}_{n}{ext}", n + 1
+            audio.setdefault(name, location)
+            if name != filename:
+                renamed.setdefault(source, {})[filename] = name
+    return renamed
+
+
+def reconcile_entries(
+    summaries: List[Dict[str, Any]],
+    policy: str = POLICY_LATEST
+) -> Dict[str, Any]:
+    """
+    Reconcile entries from several archives by normalized reference.
+
+    The winning take for each reference is chosen by the policy:
+    'latest' prefers the newest recorded_at, 'prefer_audio' prefers takes
+    with audio, and 'keep_all' behaves like 'latest' but never drops a
+    recording: every other distinct take is kept as <name>.takeN.wav.
+    An empty transcription on the winner is filled from the newest take
+    that has one, and likewise a missing picture. Pictures packed in the
+    archives are carried over, renamed when different files share a name,
+    and so are recordings no entry refers to (see _place_unreferenced_audio).
+
+    Args:
+        summaries: Results of load_archive_summary, in source order
+        policy: One of POLICIES
+
+    Returns:
+        Dict with merged 'entries', 'audio' (output filename to source
+        location), 'pictures' (output member to source location),
+        'conflicts', 'extra_takes', 'unreferenced_audio' (count) and
+        'renamed_audio' (source index to old and new filenames)
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown merge policy: {policy}")
+
+    takes: Dict[str, List[Dict[str, Any]]] = {}
+    for source, summary in enumerate(summaries):
+        for entry in summary["entries"]:
+            ref = normalize_reference(entry.get("reference", ""))
+            filename = entry.get("audio_filename")
+            location = summary["audio"].get(filename) if filename else None
+            takes.setdefault(ref, []).append({
+                "entry": entry,
+                "audio": location,
+                "source": source
+            })
+
+    entries = []
+    audio: Dict[str, Dict[str, Any]] = {}
+    pictures: Dict[str, Dict[str, Any]] = {}
+    pictures_by_digest: Dict[str, str] = {}
+    conflicts = []
+    extra_takes: Dict[str, List[str]] = {}
+
+    for ref in sorted(takes, key=parse_reference_numeric):
+        candidates = sorted(takes[ref], key=lambda t: _take_key(t, policy), reverse=True)
+        winner = candidates[0]
+        entry = dict(winner["entry"])
+        entry["reference"] = ref
+
+        if not entry.get("local_transcription"):
+            for take in candidates[1:]:
+                if take["entry"].get("local_transcription"):
+                    entry["local_transcription"] = take["entry"]["local_transcription"]
+                    break
+
+        for take in candidates:
+            picture = take["entry"].get("picture_filename")
+            if not picture:
+                continue
+            location = summaries[take["source"]].get("pictures", {}).get(picture)
+            if location is not None:
+                picture = _place_picture(picture, location, pictures, pictures_by_digest)
+            entry["picture_filename"] = picture
+            break
+
+        primary_audio = winner["audio"]
+        if primary_audio is None and policy == POLICY_KEEP_ALL:
+            # Never drop a recording: fall back to the newest take with audio
+            for take in candidates[1:]:
+                if take["audio"] is not None:
+                    primary_audio = take["audio"]
+                    entry["audio_filename"] = take["entry"]["audio_filename"]
+                    break
+
+        if primary_audio is None:
+            entry["audio_filename"] = None
+        else:
+            audio[entry["audio_filename"]] = primary_audio
+
+        entry["is_completed"] = bool(entry.get("local_transcription") or entry.get("audio_filename"))
+        entries.append(entry)
+
+        digests = {t["audio"]["digest"] for t in candidates if t["audio"]}
+        transcriptions = {
+            t["entry"].get("local_transcription") for t in candidates
+            if t["entry"].get("local_transcription")
+        }
+        if len(digests) > 1 or len(transcriptions) > 1:
+            conflicts.append({
+                "reference": ref,
+                "sources": [summaries[t["source"]]["path"] for t in candidates],
+                "chosen": summaries[winner["source"]]["path"]
+            })
+
+        if policy == POLICY_KEEP_ALL and entry.get("audio_filename"):
+            seen = {primary_audio["digest"]}
+            for take in candidates[1:]:
+                if take["audio"] is None or take["audio"]["digest"] in seen:
+                    continue
+                seen.add(take["audio"]["digest"])
+                name = _take_filename(entry["audio_filename"], len(seen))
+                audio[name] = take["audio"]
+                extra_takes.setdefault(entry["audio_filename"], []).append(name)
+
+    placed = len(audio)
+    renamed_audio = _place_unreferenced_audio(summaries, audio)
+
+    return {
+        "entries": entries,
+        "audio": audio,
+        "pictures": pictures,
+        "conflicts": conflicts,
+        "extra_takes": extra_takes,
+        "unreferenced_audio": len(audio) - placed,
+        "renamed_audio": renamed_audio
+    }
+
+
+def _copy_member(
+    src: zipfile.ZipFile,
+    member: str,
+    out: zipfile.ZipFile,
+    arcname: str,
+    compress_type: Optional[int] = None
+) -> str:
+    """Copy a member between archives in chunks, returning its SHA-256 digest."""
+    info = zipfile.ZipInfo(arcname, date_time=time.localtime(time.time())[:6])
+    info.compress_type = out.compression if compress_type is None else compress_type
+    info.external_attr = 0o600 << 16
+    digest = hashlib.sha256()
+    with src.open(member) as reader, out.open(info, 'w', force_zip64=True) as writer:
+        while True:
+            chunk = reader.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            writer.write(chunk)
+    return digest.hexdigest()
+
+
+def _merge_consent(
+    summaries: List[Dict[str, Any]],
+    renamed_audio: Optional[Dict[int, Dict[str, str]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Combine consent records from all archives, dropping exact duplicates.
+
+    Verbal consent filenames follow recordings renamed in the merge
+    (see reconcile_entries).
+    """
+    renamed_audio = renamed_audio or {}
+    seen = set()
+    records = []
+    for source, summary in enumerate(summaries):
+        renamed = renamed_audio.get(source, {})
+        for record in summary["consent"]:
+            key = (record["timestamp"], record["device_id"], record["type"], record["response"])
+            if key not in seen:
+                seen.add(key)
+                filename = record.get("verbal_consent_filename")
+                if filename in renamed:
+                    record = dict(record, verbal_consent_filename=renamed[filename])
+                records.append(record)
+    records.sort(key=lambda r: r.get("timestamp") or "")
+    return records
+
+
+def merge_exports(
+    zip_paths: List[str],
+    dest_path: str,
+    policy: str = POLICY_LATEST,
+    max_workers: Optional[int] = None,
+    use_processes: bool = True
+) -> Dict[str, Any]:
+    """
+    Merge several export archives into one consolidated archive.
+
+    Archives are summarized concurrently (one worker process each by
+    default), reconciled by normalized reference, and written in a single
+    streaming pass that copies recordings chunk by chunk. Identical audio is
+    stored once, with duplicates listed as aliases in checksums.json.
+    Pictures the merged entries use are copied uncompressed, like in exports.
+    Recordings no entry refers to, such as verbal consent statements, are
+    carried over too.
+
+    Args:
+        zip_paths: Export ZIPs to merge
+        dest_path: Path of the merged archive
+        policy: Conflict policy, one of POLICIES
+        max_workers: Worker count for reading archives
+        use_processes: Use processes (True) or threads for reading
+
+    Returns:
+        MergeSummary dict with counts, conflicts and status
+    """
+    if not dest_path.endswith(".zip"):
+        dest_path += ".zip"
+    partial_path = dest_path + ".partial"
+
+    try:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown merge policy: {policy}")
+        if not zip_paths:
+            raise ValueError("No archives to merge")
+
+        workers = max(1, min(max_workers or default_workers(), len(zip_paths)))
+        executor_cls = ProcessPoolExecutor if use_processes and workers > 1 else ThreadPoolExecutor
+        with executor_cls(max_workers=workers) as pool:
+            summaries = list(pool.map(load_archive_summary, zip_paths))
+
+        merged = reconcile_entries(summaries, policy)
+        consent = _merge_consent(summaries, merged["renamed_audio"])
+        manifest = ChecksumManifest()
+        written: Dict[str, str] = {}
+
+        with zipfile.ZipFile(partial_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as out:
+            xml_data = generate_xml_utf16le(merged["entries"])
+            out.writestr("wordlist.xml", xml_data)
+            manifest.add_bytes("wordlist.xml", xml_data)
+
+            # Group reads by source volume so each archive is opened once
+            by_volume: Dict[str, List[str]] = {}
+            for arcname in sorted(merged["pictures"]):
+                by_volume.setdefault(merged["pictures"][arcname]["volume"], []).append(arcname)
+
+            for volume, arcnames in by_volume.items():
+                with zipfile.ZipFile(volume, 'r') as src:
+                    for arcname in arcnames:
+                        location = merged["pictures"][arcname]
+                        # Pictures are already compressed
+                        digest = _copy_member(src, location["member"], out, arcname, zipfile.ZIP_STORED)
+                        if digest != location["digest"]:
+                            raise ValueError(f"Checksum mismatch for {location['member']} in {volume}")
+                        manifest.add(arcname, digest, location["size"])
+
+            by_volume = {}
+            for filename in sorted(merged["audio"]):
+                by_volume.setdefault(merged["audio"][filename]["volume"], []).append(filename)
+
+            for volume, filenames in by_volume.items():
+                with zipfile.ZipFile(volume, 'r') as src:
+                    for filename in filenames:
+                        location = merged["audio"][filename]
+                        arcname = f"{AUDIO_PREFIX}{filename}"
+                        canonical = written.get(location["digest"])
+                        if canonical:
+                            manifest.add_alias(arcname, canonical)
+                            continue
+                        digest = _copy_member(src, location["member"], out, arcname)
+                        if digest != location["digest"]:
+                            raise ValueError(f"Checksum mismatch for {filename} in {volume}")
+                        manifest.add(arcname, digest, location["size"])
+                        written[digest] = arcname
+
+            if consent:
+                consent_json = generate_consent_json(consent)
+                out.writestr("consent_log.json", consent_json)
+                manifest.add_bytes("consent_log.json", consent_json)
+
+            metadata_json = generate_metadata_json(merged["entries"])
+            out.writestr("metadata.json", metadata_json)
+            manifest.add_bytes("metadata.json", metadata_json)
+
+            report_json = json.dumps({
+                "mergedAt": datetime.utcnow().isoformat() + "Z",
+                "policy": policy,
+                "sources": [os.path.abspath(p) for p in zip_paths],
+                "conflicts": merged["conflicts"],
+                "extraTakes": merged["extra_takes"]
+            }, indent=2)
+            out.writestr(MERGE_REPORT_FILENAME, report_json)
+            manifest.add_bytes(MERGE_REPORT_FILENAME, report_json)
+
+            out.writestr(CHECKSUMS_FILENAME, manifest.to_json())
+
+        os.replace(partial_path, dest_path)
+
+        return {
+            "success": True,
+            "path": os.path.abspath(dest_path),
+            "sources": len(zip_paths),
+            "total_entries": len(merged["entries"]),
+            "audio_files_included": len(written),
+            "audio_duplicates_skipped": len(manifest.aliases),
+            "unreferenced_audio_included": merged["unreferenced_audio"],
+            "pictures_included": len(merged["pictures"]),
+            "conflicts": len(merged["conflicts"]),
+            "consent_records_included": len(consent),
+            "error": None
+        }
+
+    except Exception as e:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        return {"success": False, "error": str(e), "path": None}
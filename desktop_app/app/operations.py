@@ -0,0 +1,216 @@
+"""
+Wordlist import, export and statistics on top of StorageManager.
+
+Shared by the window API (main.py) and the command line (app.cli); nothing
+here imports pywebview or the audio backends.
+"""
+import itertools
+import os
+import ssl
+import urllib.request
+from typing import Optional, Dict, Any, List
+
+from .storage import StorageManager
+from .xml_io import parse_wordlist_from_bytes
+from .import_zip import import_from_zip
+from .export_zip import create_export_zip, create_split_export, DEFAULT_COMPRESSION
+from .audio_processing import convert_wav_rate, resampled_wav_size, NUMPY_AVAILABLE as PROCESSING_AVAILABLE
+from .jobs import check_cancelled, report_progress
+from .pictures import resolve_picture, collect_pictures, picture_roots
+from .utils import parse_reference_numeric
+
+
+def load_sorted_entries(storage: StorageManager) -> List[Dict[str, Any]]:
+    """Load all entries sorted by numeric reference."""
+    entries = storage.get_all_entries()
+    entries.sort(key=lambda e: parse_reference_numeric(e.get("reference", "0")))
+    return entries
+
+
+def get_progress(storage: StorageManager) -> Dict[str, int]:
+    """Get progress statistics."""
+    return {
+        "total": storage.get_total_count(),
+        "completed": storage.get_completed_count(),
+        "withAudio": storage.get_with_audio_count(),
+        "transcribed": storage.get_with_transcription_count()
+    }
+
+
+def replace_wordlist(
+    storage: StorageManager,
+    data: bytes,
+    empty_error: str,
+    base: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Replace all entries and audio with the wordlist in an XML document.
+
+    Storage is left untouched when the document has no entries.
+
+    Args:
+        storage: StorageManager to import into
+        data: XML file data as bytes
+        empty_error: Error message when no entries are found
+        base: Directory or URL of the document; relative picture paths
+            are resolved against it
+
+    Returns:
+        ImportSummary with count and status
+    """
+    entries = parse_wordlist_from_bytes(data)
+    if not entries:
+        return {"success": False, "error": empty_error, "count": 0}
+    if base:
+        for entry in entries:
+            entry["picture_filename"] = resolve_picture(entry.get("picture_filename"), base)
+
+    storage.replace_all(entries)
+    return {"success": True, "count": len(entries), "error": None}
+
+
+def import_wordlist_file(storage: StorageManager, path: str) -> Dict[str, Any]:
+    """
+    Import a wordlist from a local XML file or an export ZIP.
+
+    Args:
+        storage: StorageManager to import into
+        path: Path to an XML file or export ZIP
+
+    Returns:
+        ImportSummary with count and status
+    """
+    if path.lower().endswith(".zip"):
+        return import_from_zip(path, storage)
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        return replace_wordlist(storage, data, "No entries found in file",
+                                base=os.path.dirname(os.path.abspath(path)))
+    except Exception as e:
+        return {"success": False, "error": str(e), "count": 0}
+
+
+def fetch_url(url: str, timeout: float = 30) -> bytes:
+    """Download a URL, verifying certificates except for plain-HTTP localhost."""
+    if url.startswith('http://localhost') or url.startswith('http://127.0.0.1'):
+        # Allow HTTP for localhost (development)
+        ctx = None
+    else:
+        # Use secure defaults for all other URLs
+        ctx = ssl.create_default_context()
+
+    with urllib.request.urlopen(url, timeout=timeout, context=ctx) as response:
+        return response.read()
+
+
+def import_wordlist_url(storage: StorageManager, url: str) -> Dict[str, Any]:
+    """
+    Import a wordlist from a URL to an XML file.
+
+    Args:
+        storage: StorageManager to import into
+        url: URL to XML file
+
+    Returns:
+        ImportSummary with count and status
+    """
+    try:
+        return replace_wordlist(storage, fetch_url(url), "No entries found at URL", base=url)
+    except Exception as e:
+        return {"success": False, "error": str(e), "count": 0}
+
+
+def export_sample_rate(storage: StorageManager) -> Optional[int]:
+    """Rate recordings are converted to on export, or None to keep their own."""
+    rate = storage.get_setting("export_sample_rate", "")
+    return int(rate) if rate else None
+
+
+def _export_audio(wav_data: Optional[bytes], sample_rate: Optional[int]) -> Optional[bytes]:
+    """Convert a recording to the export sample rate, if one is set."""
+    if not wav_data or not sample_rate:
+        return wav_data
+    try:
+        return convert_wav_rate(wav_data, sample_rate)
+    except ValueError:
+        return wav_data
+
+
+def export_archive(
+    storage: StorageManager,
+    dest_path: Optional[str] = None,
+    dedupe_audio: bool = False,
+    max_volume_bytes: Optional[int] = None,
+    compression: str = DEFAULT_COMPRESSION,
+    sample_rate: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Export all entries, recordings, pictures and consent records as a ZIP archive.
+
+    Inside a job (see app.jobs), the export reports progress per recording
+    and stops between recordings when the job is cancelled.
+
+    Args:
+        storage: StorageManager to export from
+        dest_path: Optional destination path
+        dedupe_audio: Store identical recordings only once; not supported
+            with max_volume_bytes
+        max_volume_bytes: If set, split the export into volumes no
+            larger than this many bytes
+        compression: 'stored', 'fast', 'default' or 'max'
+        sample_rate: Convert recordings to this rate (needs numpy)
+
+    Relative picture paths resolve as in app.pictures.picture_roots, the
+    same as in the window. Pictures that are not found or are URLs are
+    left out and keep their reference.
+
+    Returns:
+        ExportSummary with path and counts
+    """
+    if dedupe_audio and max_volume_bytes:
+        # Aliases in one volume could point at a recording in another
+        return {
+            "success": False,
+            "error": "Duplicate recordings cannot be skipped in a split export",
+            "path": None
+        }
+    entries, pictures = collect_pictures(load_sorted_entries(storage), picture_roots(storage.db_path))
+    consent_records = storage.get_all_consent_records()
+    rate = sample_rate if PROCESSING_AVAILABLE else None
+
+    # Recordings are read one at a time while the archive is written; each
+    # one is a point where the job reports progress and can be cancelled
+    loaded = itertools.count()
+
+    def load_audio(filename: str, total: int) -> Optional[bytes]:
+        check_cancelled()
+        report_progress(next(loaded), total)
+        return _export_audio(storage.get_audio(filename), rate)
+
+    if max_volume_bytes:
+        audio_sizes = storage.get_audio_sizes()
+        if rate:
+            audio_sizes = [
+                dict(a, size=resampled_wav_size(a["size"], a["sample_rate"], a["channels"], rate))
+                for a in audio_sizes
+            ]
+        return create_split_export(
+            entries,
+            audio_sizes,
+            lambda filename: load_audio(filename, len(audio_sizes)),
+            consent_records,
+            int(max_volume_bytes),
+            dest_path,
+            compression=compression,
+            pictures=pictures
+        )
+
+    filenames = storage.get_audio_filenames()
+    return create_export_zip(
+        entries, [{"filename": f} for f in filenames], consent_records, dest_path,
+        dedupe_audio=dedupe_audio,
+        compression=compression,
+        pictures=pictures,
+        load_audio=lambda filename: load_audio(filename, len(filenames))
+    )
@@ -0,0 +1,160 @@
+"""Per-method latency, payload size and error statistics for the JS bridge API."""
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+
+# Environment variables: enable recording at startup, and dump to a file on exit
+PERF_ENV = "WORDLIST_PERF"
+PERF_DUMP_ENV = "WORDLIST_PERF_DUMP"
+
+
+class MethodStats:
+    """
+    Counters for one API method.
+
+    Latency percentiles are computed over the most recent window calls;
+    counts, errors and payload totals cover the whole session.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.calls = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.payload_bytes = 0
+        self.max_payload_bytes = 0
+        self._durations = deque(maxlen=window)
+
+    def record(self, ms: float, payload: int, error: Optional[str]) -> None:
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self._durations.append(ms)
+        if error is not None:
+            self.errors += 1
+            self.last_error = error
+        else:
+            self.payload_bytes += payload
+            self.max_payload_bytes = max(self.max_payload_bytes, payload)
+
+    def snapshot(self) -> Dict[str, Any]:
+        durations = sorted(self._durations)
+        result = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "total_ms": round(self.total_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "payload_bytes_avg": round(self.payload_bytes / max(1, self.calls - self.errors)),
+            "payload_bytes_max": self.max_payload_bytes
+        }
+        for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            value = durations[min(len(durations) - 1, int(q * len(durations)))] if durations else None
+            result[f"{name}_ms"] = round(value, 3) if value is not None else None
+        return result
+
+
+def payload_size(value) -> int:
+    """Approximate size of a value once serialized to JSON for the bridge."""
+    if value is None:
+        return 0
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class PerfRecorder:
+    """
+    Collects MethodStats for instrumented methods.
+
+    Instrumented methods check the enabled flag before doing anything
+    else, so a disabled recorder costs one attribute lookup per call.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._methods: Dict[str, MethodStats] = {}
+
+    def record(self, name: str, seconds: float, payload: int, error: Optional[str] = None) -> None:
+        with self._lock:
+            stats = self._methods.get(name)
+            if stats is None:
+                stats = self._methods[name] = MethodStats()
+            stats.record(seconds * 1000, payload, error)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Statistics of every method called since the last reset.
+
+        Returns:
+            Dict with 'enabled', 'since' (Unix time) and 'methods', mapping
+            method names to calls, errors, latency percentiles and payload sizes
+        """
+        with self._lock:
+            methods = {name: stats.snapshot() for name, stats in self._methods.items()}
+        return {"enabled": self.enabled, "since": self.started_at, "methods": methods}
+
+    def dump(self, path: str) -> None:
+        """Write the snapshot to a JSON file."""
+        data = self.snapshot()
+        data["generatedAt"] = datetime.utcnow().isoformat() + "Z"
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def instrument(obj, recorder: PerfRecorder, exclude=()) -> int:
+    """
+    Wrap every public method of obj so calls are recorded.
+
+    The wrappers are set on the instance and keep the original signature,
+    so pywebview exposes them to JavaScript exactly like the methods.
+
+    Args:
+        obj: Object whose public methods to wrap
+        recorder: Receives the measurements
+        exclude: Method names to leave unwrapped
+
+    Returns:
+        Number of methods wrapped
+    """
+    wrapped = 0
+    for name, func in inspect.getmembers(type(obj), inspect.isfunction):
+        if name.startswith("_") or name in exclude:
+            continue
+        setattr(obj, name, _wrap(name, getattr(obj, name), recorder))
+        wrapped += 1
+    return wrapped
+
+
+def _wrap(name: str, method, recorder: PerfRecorder):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if not recorder.enabled:
+            return method(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception as e:
+            recorder.record(name, time.perf_counter() - start, 0, f"{type(e).__name__}: {e}")
+            raise
+        elapsed = time.perf_counter() - start
+        recorder.record(name, elapsed, payload_size(result))
+        return result
+
+    wrapper.__signature__ = inspect.signature(method)
+    return wrapper
@@ -0,0 +1,360 @@
+"""
+Entry pictures: path resolution, export packing and a downscaled variant cache.
+
+Wordlists name a picture per entry (<Picture>/<Image>), often a camera-size
+photo. The webview gets a thumbnail or display-size variant instead of the
+original; variants are rendered on a thread pool into an on-disk cache that
+is bounded in size and evicts the least recently used files.
+"""
+import hashlib
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterable
+from urllib.parse import urljoin
+
+from .lazy import LazyModule, module_available
+
+# Optional imports, deferred until a picture is resized
+Image = LazyModule("PIL.Image")
+ImageOps = LazyModule("PIL.ImageOps")
+PIL_AVAILABLE = module_available("PIL")
+
+
+# Longest edge in pixels of each variant
+VARIANTS = {"thumb": 160, "display": 1024}
+
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+PICTURES_PREFIX = "pictures/"
+
+# Relative paths of wordlists imported before paths were resolved on
+# import point into the web directory, as <img> src values did
+WEB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web")
+
+_REMOTE_RE = re.compile(r"^[a-z]+://", re.IGNORECASE)
+
+
+def is_remote(picture: str) -> bool:
+    """True for URLs (http://, file://, ...) rather than file paths."""
+    return bool(_REMOTE_RE.match(picture))
+
+
+def resolve_picture(picture: Optional[str], base: str) -> Optional[str]:
+    """
+    Resolve a picture reference from a wordlist against the wordlist's location.
+
+    Args:
+        picture: <Picture> value as imported
+        base: Directory of an imported file, or the URL of an imported URL
+
+    Returns:
+        An absolute path or URL when base resolves it, otherwise picture
+        unchanged (relative paths then resolve as in picture_roots)
+    """
+    if not picture or is_remote(picture) or os.path.isabs(picture):
+        return picture
+    if is_remote(base):
+        return urljoin(base, picture)
+    path = os.path.normpath(os.path.join(base, picture))
+    return path if os.path.isfile(path) else picture
+
+
+def picture_dir(db_path: str) -> str:
+    """Directory that holds the pictures restored from export archives for a database."""
+    return os.path.splitext(db_path)[0] + "_pictures"
+
+
+def picture_roots(db_path: str, web_dir: str = WEB_DIR) -> List[str]:
+    """Directories relative picture paths of a database resolve against, in order."""
+    return [picture_dir(db_path), web_dir]
+
+
+def local_picture_path(picture: Optional[str], roots: List[str]) -> Optional[str]:
+    """
+    Local file of a picture reference.
+
+    Args:
+        picture: picture_filename of an entry
+        roots: Directories to resolve relative paths against, in order
+
+    Returns:
+        Path of the first existing file, or None for URLs and missing files
+    """
+    if not picture or is_remote(picture):
+        return None
+    for root in roots:
+        path = os.path.join(root, picture)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def collect_pictures(
+    entries: List[Dict[str, Any]],
+    roots: List[str]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Pick the picture files to pack into an export.
+
+    Each local picture is stored once under pictures/, even when several
+    entries share it; names are made unique when different files share one.
+
+    Args:
+        entries: Entries to export
+        roots: Directories relative picture paths resolve against (see
+            picture_roots)
+
+    Returns:
+        (entries with picture_filename pointing into pictures/ where a file
+        was found, list of dicts with 'path', 'arcname' and 'size')
+    """
+    by_path: Dict[str, str] = {}
+    taken = set()
+    pictures = []
+    exported = []
+    for entry in entries:
+        path = local_picture_path(entry.get("picture_filename"), roots)
+        if path is None:
+            exported.append(entry)
+            continue
+        path = os.path.abspath(path)
+        arcname = by_path.get(path)
+        if arcname is None:
+            name = os.path.basename(path)
+            arcname, n = PICTURES_PREFIX + name, 2
+            while arcname in taken:
+                stem, ext = os.path.splitext(name)
+                arcname, n = f"{PICTURES_PREFIX}{stem}_{n}{ext}", n + 1
+            taken.add(arcname)
+            by_path[path] = arcname
+            pictures.append({"path": path, "arcname": arcname, "size": os.path.getsize(path)})
+        exported.append(dict(entry, picture_filename=arcname))
+    return exported, pictures
+
+
+def render_with_pillow(src_path: str, max_edge: int) -> Optional[Tuple[bytes, str]]:
+    """
+    Downscale a picture so its longest edge is max_edge pixels.
+
+    Returns:
+        (encoded bytes, file extension): JPEG, or PNG for pictures with
+        transparency; None if the picture is already small enough
+    """
+    with Image.open(src_path) as img:
+        if max(img.size) <= max_edge:
+            return None
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_edge, max_edge))
+        buffer = io.BytesIO()
+        if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+            img.save(buffer, "PNG", optimize=True)
+            return buffer.getvalue(), ".png"
+        img.convert("RGB").save(buffer, "JPEG", quality=85)
+        return buffer.getvalue(), ".jpg"
+
+
+class PictureCache:
+    """
+    On-disk cache of downscaled picture variants.
+
+    Files are keyed by a hash of the source path, modification time, size
+    and variant, so an edited picture gets new variants without reading the
+    source to look it up. The cache directory is kept under max_bytes by
+    deleting the least recently used variants. Rendering runs on a thread
+    pool; concurrent requests for one variant share a single render.
+
+    Without a renderer (Pillow not installed) or for pictures already
+    smaller than the variant, get() returns None and the original is used.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        workers: int = 2,
+        render: Optional[Callable[[str, int], Optional[Tuple[bytes, str]]]] = None
+    ):
+        """
+        Args:
+            cache_dir: Directory for variant files
+            max_bytes: Size limit of the directory
+            workers: Rendering threads
+            render: Callable (source path, longest edge) -> (bytes, extension)
+                or None; defaults to render_with_pillow when Pillow is installed
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.render = render if render is not None else (render_with_pillow if PIL_AVAILABLE else None)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="pictures")
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+        # Keys whose original is used as is (small enough, or not renderable)
+        self._originals = set()
+        self._files: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.evictions = 0
+        self.errors = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Register variants left by earlier sessions, oldest access first."""
+        found = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".tmp") or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            found.append((stat.st_atime, os.path.splitext(name)[0], path, stat.st_size))
+        for _, key, path, size in sorted(found):
+            self._files[key] = (path, size)
+            self._bytes += size
+        self._evict()
+
+    @staticmethod
+    def key(src_path: str, variant: str) -> str:
+        stat = os.stat(src_path)
+        ident = f"{os.path.abspath(src_path)}|{stat.st_mtime_ns}|{stat.st_size}|{VARIANTS[variant]}"
+        return hashlib.blake2b(ident.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, src_path: str, variant: str, wait: bool = True) -> Optional[str]:
+        """
+        Path of a cached variant, rendering it if needed.
+
+        Args:
+            src_path: Original picture file
+            variant: One of VARIANTS
+            wait: Wait for a render; otherwise only return an existing file
+
+        Returns:
+            Variant file path, or None to use the original
+        """
+        if self.render is None or variant not in VARIANTS:
+            return None
+        try:
+            key = self.key(src_path, variant)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._files.get(key)
+            if cached is not None:
+                self._files.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            if key in self._originals:
+                self.hits += 1
+                return None
+            self.misses += 1
+            future = self._submit(key, src_path, variant)
+        return future.result() if wait else None
+
+    def prefetch(self, src_paths: Iterable[str], variants: Iterable[str] = ("display",)) -> int:
+        """
+        Queue rendering of variants that are not cached yet.
+
+        Returns:
+            Number of renders queued
+        """
+        if self.render is None:
+            return 0
+        queued = 0
+        for src_path in src_paths:
+            for variant in variants:
+                try:
+                    key = self.key(src_path, variant)
+                except (OSError, KeyError):
+                    continue
+                with self._lock:
+                    if key in self._files or key in self._originals or key in self._pending:
+                        continue
+                    self._submit(key, src_path, variant)
+                    queued += 1
+        return queued
+
+    def _submit(self, key: str, src_path: str, variant: str) -> Future:
+        # Called with the lock held
+        future = self._pending.get(key)
+        if future is None:
+            future = self._pool.submit(self._render, key, src_path, VARIANTS[variant])
+            self._pending[key] = future
+        return future
+
+    def _render(self, key: str, src_path: str, max_edge: int) -> Optional[str]:
+        # Any failure, including writing the variant (e.g. disk full), falls
+        # back to the original; the key is never left pending
+        path = None
+        try:
+            result = self.render(src_path, max_edge)
+            if result is not None:
+                data, ext = result
+                path = os.path.join(self.cache_dir, key + ext)
+                tmp_path = path + ".tmp"
+                try:
+                    with open(tmp_path, 'wb') as f:
+                        f.write(data)
+                    os.replace(tmp_path, path)
+                except OSError:
+                    path = None
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+        except Exception as e:
+            print(f"Could not resize {src_path}: {e}")
+            with self._lock:
+                self.errors += 1
+
+        with self._lock:
+            self._pending.pop(key, None)
+            if path is None:
+                self._originals.add(key)
+                return None
+            self.renders += 1
+            self._files[key] = (path, len(data))
+            self._bytes += len(data)
+            self._evict()
+        return path
+
+    def _evict(self) -> None:
+        # Called with the lock held (or during construction)
+        while self._bytes > self.max_bytes and len(self._files) > 1:
+            _, (path, size) = self._files.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache statistics.
+
+        Returns:
+            Dict with available, files, bytes, max_bytes, pending, hits,
+            misses, renders, evictions and errors
+        """
+        with self._lock:
+            return {
+                "available": self.render is not None,
+                "files": len(self._files),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "pending": len(self._pending),
+                "hits": self.hits,
+                "misses": self.misses,
+                "renders": self.renders,
+                "evictions": self.evictions,
+                "errors": self.errors
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,303 @@
+"""Low-latency playback: decoded PCM cache and a persistent output stream."""
+import io
+import threading
+import time
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, Tuple, List
+
+from .lazy import LazyModule, module_available
+
+np = LazyModule("numpy")
+NUMPY_AVAILABLE = module_available("numpy")
+
+from .audio_backends import AudioBackend, StreamStats, default_backend
+
+
+class DecodedAudio:
+    """16-bit PCM samples ready to hand to an output stream."""
+
+    __slots__ = ("samples", "sample_rate", "channels")
+
+    def __init__(self, samples, sample_rate: int, channels: int):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    @property
+    def nbytes(self) -> int:
+        return self.samples.nbytes
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+
+def decode_wav(wav_data: bytes) -> DecodedAudio:
+    """
+    Decode a 16-bit PCM WAV into a (frames, channels) int16 array.
+
+    Raises:
+        ValueError: If the data is not 16-bit PCM WAV
+    """
+    try:
+        with wave.open(io.BytesIO(wav_data), 'rb') as wf:
+            if wf.getsampwidth() != 2:
+                raise ValueError("Only 16-bit PCM WAV is supported")
+            sample_rate = wf.getframerate()
+            channels = wf.getnchannels()
+            frames = wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"Invalid WAV data: {e}")
+
+    samples = np.frombuffer(frames, dtype='<i2').reshape(-1, channels)
+    return DecodedAudio(samples, sample_rate, channels)
+
+
+class PcmCache:
+    """
+    LRU cache of decoded recordings, bounded by total sample bytes.
+
+    Keyed by audio filename. Entries larger than the whole budget are not
+    cached. The generation changes on every invalidate() and clear(); a
+    decode started before then passes the generation it saw to put(), which
+    then drops the stale result.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._items: "OrderedDict[str, DecodedAudio]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str) -> Optional[DecodedAudio]:
+        """Get a decoded recording and mark it most recently used."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item
+
+    def put(self, key: str, item: DecodedAudio, generation: Optional[int] = None) -> bool:
+        """
+        Add a decoded recording, evicting least recently used ones.
+
+        Args:
+            key: Audio filename
+            item: Decoded recording
+            generation: The cache generation when decoding started; the
+                item is dropped if the cache was invalidated since
+
+        Returns:
+            True if the item was cached
+        """
+        if item.nbytes > self.max_bytes:
+            return False
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+            self._items[key] = item
+            self.current_bytes += item.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+            return True
+
+    def invalidate(self, key: str) -> None:
+        """Drop a recording (e.g. after it was re-recorded)."""
+        with self._lock:
+            self.generation += 1
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._items.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._items),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+class PlaybackEngine:
+    """
+    Plays decoded buffers through a persistent output stream.
+
+    The stream stays open between plays and outputs silence while idle, so
+    starting playback only swaps the buffer the callback reads from. The
+    stream is reopened when the sample rate or channel count changes, or
+    when it is no longer active. Before a device rescan, the device manager
+    asks the engine to close the stream if nothing is playing
+    (release_idle).
+    """
+
+    def __init__(self, open_stream: Optional[Callable] = None, backend: Optional[AudioBackend] = None):
+        """
+        Args:
+            open_stream: Factory (sample_rate, channels, callback) -> started
+                stream with a close() method. Defaults to the backend's
+                output stream.
+            backend: Audio backend; defaults to default_backend()
+        """
+        self.backend = backend if backend is not None else default_backend()
+        self.stats = StreamStats()
+        self._open_stream = open_stream or self._default_open_stream
+        self._stream = None
+        self._format: Optional[Tuple[int, int]] = None
+        # Guards opening and closing the stream; _lock guards the buffer
+        self._stream_lock = threading.RLock()
+        self._lock = threading.Lock()
+        self._buffer = None
+        self._pos = 0
+        self._on_complete: Optional[Callable] = None
+        self._requested_at: Optional[float] = None
+        self.last_latency_ms: Optional[float] = None
+        if open_stream is None and self.backend is not None:
+            self.backend.register_idle_release(self.release_idle)
+
+    def available(self) -> bool:
+        """True if numpy and an audio backend are available."""
+        return NUMPY_AVAILABLE and self.backend is not None
+
+    def _default_open_stream(self, sample_rate: int, channels: int, fill: Callable):
+        return self.backend.open_output(sample_rate, channels, fill, self.stats)
+
+    def _fill(self, outdata) -> None:
+        """Stream callback: copy the next block of the current buffer."""
+        done = None
+        with self._lock:
+            buffer = self._buffer
+            if buffer is None:
+                outdata.fill(0)
+                return
+            if self._requested_at is not None:
+                self.last_latency_ms = (time.perf_counter() - self._requested_at) * 1000
+                self._requested_at = None
+            frames = len(outdata)
+            n = min(frames, len(buffer) - self._pos)
+            outdata[:n] = buffer[self._pos:self._pos + n]
+            outdata[n:] = 0
+            self._pos += n
+            if self._pos >= len(buffer):
+                self._buffer = None
+                done = self._on_complete
+                self._on_complete = None
+        if done:
+            threading.Thread(target=done, daemon=True).start()
+
+    def play(self, audio: DecodedAudio, on_complete: Optional[Callable] = None) -> bool:
+        """Start playing a decoded recording, replacing any current playback."""
+        fmt = (audio.sample_rate, audio.channels)
+        with self._stream_lock:
+            stale = self._stream is not None and not getattr(self._stream, "active", True)
+            if self._stream is None or self._format != fmt or stale:
+                self.close()
+                self._stream = self._open_stream(audio.sample_rate, audio.channels, self._fill)
+                self._format = fmt
+
+            with self._lock:
+                self._buffer = audio.samples
+                self._pos = 0
+                self._on_complete = on_complete
+                self._requested_at = time.perf_counter()
+        return True
+
+    def stop(self) -> None:
+        """Stop the current playback; the stream stays open."""
+        with self._lock:
+            self._buffer = None
+            self._on_complete = None
+
+    @property
+    def is_playing(self) -> bool:
+        return self._buffer is not None
+
+    def release_idle(self) -> bool:
+        """
+        Close the output stream unless something is playing.
+
+        Returns:
+            True if a stream was closed
+        """
+        # A play() in progress on another thread may be waiting for the
+        # device manager, so never wait for the stream lock here
+        if not self._stream_lock.acquire(blocking=False):
+            return False
+        try:
+            if self._stream is None or self.is_playing:
+                return False
+            self._close_stream()
+            return True
+        finally:
+            self._stream_lock.release()
+
+    def close(self) -> None:
+        """Close the output stream."""
+        self.stop()
+        with self._stream_lock:
+            self._close_stream()
+
+    def _close_stream(self) -> None:
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except Exception as e:
+                print(f"Playback error: {e}")
+            self._stream = None
+            self._format = None
+
+
+class Prefetcher:
+    """Decodes upcoming recordings into a PcmCache on a background thread."""
+
+    def __init__(self, cache: PcmCache, load: Callable[[str], Optional[bytes]]):
+        self.cache = cache
+        self._load = load
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+
+    def _decode(self, filename: str) -> None:
+        if filename in self.cache:
+            return
+        # Re-recording or switching projects meanwhile makes the result stale
+        generation = self.cache.generation
+        data = self._load(filename)
+        if data:
+            try:
+                self.cache.put(filename, decode_wav(data), generation)
+            except ValueError:
+                pass
+
+    def prefetch(self, filenames: List[str]):
+        """Queue filenames for decoding; returns the future of the batch."""
+        def run():
+            for name in filenames:
+                self._decode(name)
+        return self._pool.submit(run)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,269 @@
+"""Project registry: one SQLite database per wordlist project."""
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+from .storage import StorageManager, default_app_dir, DEFAULT_DB_NAME
+from .operations import get_progress
+from .pictures import picture_dir
+from .utils import slugify_gloss
+
+
+REGISTRY_NAME = "projects.json"
+PROJECTS_DIRNAME = "projects"
+
+# The database used before projects existed becomes this project
+DEFAULT_PROJECT_ID = "default"
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class ProjectManager:
+    """
+    Registry of project databases with an LRU of StorageManagers.
+
+    The registry (projects.json in the app directory) records each
+    project's name, database file and summary statistics as of the last
+    time it was used, so the project picker is built without opening any
+    database.
+
+    The LRU caches StorageManager objects, not SQLite connections:
+    StorageManager opens a connection per call, as everywhere else in the
+    app. Keeping recently used managers saves the schema check and
+    settings reads of a new StorageManager when switching back.
+    """
+
+    def __init__(self, app_dir: Optional[str] = None, max_cached: int = 4, tracer=None):
+        """
+        Args:
+            app_dir: Directory holding the registry and databases
+                (default: ~/.wordlist_elicitation)
+            max_cached: Number of StorageManagers kept in the LRU
+            tracer: QueryTracer passed to every StorageManager
+        """
+        self.app_dir = app_dir or default_app_dir()
+        os.makedirs(os.path.join(self.app_dir, PROJECTS_DIRNAME), exist_ok=True)
+        self.registry_path = os.path.join(self.app_dir, REGISTRY_NAME)
+        self.max_cached = max(1, max_cached)
+        self.tracer = tracer
+        self._lock = threading.RLock()
+        self._cached: "OrderedDict[str, StorageManager]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._registry = self._load_registry()
+
+    # Registry file
+    def _load_registry(self) -> Dict[str, Any]:
+        try:
+            with open(self.registry_path, 'r', encoding='utf-8') as f:
+                registry = json.load(f)
+        except (OSError, ValueError):
+            registry = {}
+        projects = registry.setdefault("projects", {})
+        if not projects:
+            projects[DEFAULT_PROJECT_ID] = {
+                "name": "Default",
+                "file": DEFAULT_DB_NAME,
+                "created_at": _now(),
+                "last_opened": None,
+                "stats": None
+            }
+        if registry.get("active") not in projects:
+            registry["active"] = next(iter(projects))
+        return registry
+
+    def _save_registry(self) -> None:
+        # Written to a temporary file first, so a crash never leaves half a registry
+        tmp_path = self.registry_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._registry, f, indent=2)
+        os.replace(tmp_path, self.registry_path)
+
+    def _project(self, project_id: str) -> Dict[str, Any]:
+        project = self._registry["projects"].get(project_id)
+        if project is None:
+            raise ValueError(f"Unknown project: {project_id}")
+        return project
+
+    def db_path(self, project_id: str) -> str:
+        """Database file of a project."""
+        with self._lock:
+            return os.path.join(self.app_dir, self._project(project_id)["file"])
+
+    # Projects
+    @property
+    def active_id(self) -> str:
+        with self._lock:
+            return self._registry["active"]
+
+    def list_projects(self) -> List[Dict[str, Any]]:
+        """
+        All projects, most recently opened first, from the registry alone.
+
+        Returns:
+            List of dicts with id, name, active, cached, created_at,
+            last_opened and stats (None until the project was first closed
+            or refreshed)
+        """
+        with self._lock:
+            projects = [
+                dict(project, id=project_id,
+                     active=project_id == self._registry["active"],
+                     cached=project_id in self._cached)
+                for project_id, project in self._registry["projects"].items()
+            ]
+        projects.sort(key=lambda p: p["last_opened"] or "", reverse=True)
+        return projects
+
+    def create_project(self, name: str) -> Dict[str, Any]:
+        """
+        Register a new, empty project.
+
+        Args:
+            name: Display name; the project ID and file name derive from it
+
+        Returns:
+            The new project's registry record, with its id
+        """
+        name = (name or "").strip()
+        if not name:
+            raise ValueError("Project name is required")
+        with self._lock:
+            base = slugify_gloss(name).strip(".") or "project"
+            project_id, n = base, 2
+            while project_id in self._registry["projects"] or \
+                    os.path.exists(os.path.join(self.app_dir, PROJECTS_DIRNAME, project_id + ".db")):
+                project_id, n = f"{base}-{n}", n + 1
+            project = {
+                "name": name,
+                "file": os.path.join(PROJECTS_DIRNAME, project_id + ".db"),
+                "created_at": _now(),
+                "last_opened": None,
+                "stats": None
+            }
+            self._registry["projects"][project_id] = project
+            self._save_registry()
+            return dict(project, id=project_id)
+
+    def rename_project(self, project_id: str, name: str) -> None:
+        name = (name or "").strip()
+        if not name:
+            raise ValueError("Project name is required")
+        with self._lock:
+            self._project(project_id)["name"] = name
+            self._save_registry()
+
+    def delete_project(self, project_id: str) -> None:
+        """
+        Remove a project, its database file and the pictures restored into it.
+
+        Raises:
+            ValueError: For unknown projects and the active project
+        """
+        with self._lock:
+            path = self.db_path(project_id)
+            if project_id == self._registry["active"]:
+                raise ValueError("The active project cannot be deleted")
+            self._cached.pop(project_id, None)
+            del self._registry["projects"][project_id]
+            self._save_registry()
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        shutil.rmtree(picture_dir(path), ignore_errors=True)
+
+    # Open databases
+    def get_storage(self, project_id: str) -> StorageManager:
+        """
+        StorageManager of a project, from the LRU when it is cached.
+
+        A new StorageManager evicts the least recently used ones beyond
+        max_cached, caching their statistics; the active project is never
+        evicted.
+        """
+        with self._lock:
+            storage = self._cached.get(project_id)
+            if storage is not None:
+                self.hits += 1
+                self._cached.move_to_end(project_id)
+                return storage
+
+            self.misses += 1
+            storage = StorageManager(self.db_path(project_id), tracer=self.tracer)
+            self._cached[project_id] = storage
+            excess = len(self._cached) - self.max_cached
+            if excess > 0:
+                keep = (self._registry["active"], project_id)
+                for evict in [pid for pid in self._cached if pid not in keep][:excess]:
+                    self._update_stats(evict, self._cached.pop(evict))
+                self._save_registry()
+            return storage
+
+    def active_storage(self) -> StorageManager:
+        return self.get_storage(self.active_id)
+
+    def set_active(self, project_id: str) -> StorageManager:
+        """
+        Make a project the active one, caching the statistics of the previous one.
+
+        Returns:
+            The project's StorageManager
+        """
+        with self._lock:
+            previous = self._registry["active"]
+            storage = self.get_storage(project_id)
+            if previous != project_id and previous in self._cached:
+                self._update_stats(previous, self._cached[previous])
+            self._registry["active"] = project_id
+            self._project(project_id)["last_opened"] = _now()
+            self._save_registry()
+            return storage
+
+    # Cached statistics
+    def _update_stats(self, project_id: str, storage: StorageManager) -> None:
+        try:
+            stats = get_progress(storage)
+            stats["size_bytes"] = os.path.getsize(storage.db_path)
+        except Exception as e:
+            print(f"Could not read statistics of project {project_id}: {e}")
+            return
+        stats["updated_at"] = _now()
+        project = self._registry["projects"].get(project_id)
+        if project is not None:
+            project["stats"] = stats
+
+    def refresh_stats(self, project_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Recompute the cached statistics of a project (default: the active one).
+
+        Returns:
+            The statistics: progress counts, size_bytes and updated_at
+        """
+        with self._lock:
+            project_id = project_id or self._registry["active"]
+            self._update_stats(project_id, self.get_storage(project_id))
+            self._save_registry()
+            return self._project(project_id)["stats"]
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Projects in the StorageManager LRU, most recent last, with hit and miss counts."""
+        with self._lock:
+            return {
+                "cached": list(self._cached),
+                "max_cached": self.max_cached,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def close(self) -> None:
+        """Cache the statistics of all projects in the LRU."""
+        with self._lock:
+            for project_id, storage in list(self._cached.items()):
+                self._update_stats(project_id, storage)
+            self._save_registry()
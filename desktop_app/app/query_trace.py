@@ -0,0 +1,326 @@
+"""SQLite statement timing, query plans and slow-query log for StorageManager."""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+
+# Environment variables: enable tracing, slow-query threshold and log file
+TRACE_ENV = "WORDLIST_SQL_TRACE"
+SLOW_MS_ENV = "WORDLIST_SLOW_QUERY_MS"
+SLOW_LOG_ENV = "WORDLIST_SLOW_QUERY_LOG"
+
+DEFAULT_SLOW_MS = 20.0
+
+# Statements EXPLAIN QUERY PLAN can describe
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace so one statement always maps to the same key."""
+    return _WHITESPACE_RE.sub(" ", sql).strip()
+
+
+def tracer_from_env(environ=os.environ) -> "QueryTracer":
+    """
+    Build a QueryTracer from the environment.
+
+    Tracing starts enabled when WORDLIST_SQL_TRACE or WORDLIST_SLOW_QUERY_LOG
+    is set; WORDLIST_SLOW_QUERY_MS overrides the slow-query threshold.
+    """
+    try:
+        slow_ms = float(environ.get(SLOW_MS_ENV, DEFAULT_SLOW_MS))
+    except ValueError:
+        slow_ms = DEFAULT_SLOW_MS
+    log_path = environ.get(SLOW_LOG_ENV) or None
+    return QueryTracer(
+        enabled=bool(environ.get(TRACE_ENV) or log_path), slow_ms=slow_ms, log_path=log_path
+    )
+
+
+class StatementStats:
+    """
+    Counters for one SQL statement.
+
+    Durations include fetching the rows, so a SELECT that returns the
+    whole table is charged for reading it.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._durations = deque(maxlen=window)
+
+    def record(self, ms: float, rows: int, error: bool) -> None:
+        self.calls += 1
+        self.rows += rows
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self._durations.append(ms)
+        if error:
+            self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        durations = sorted(self._durations)
+        result = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / max(1, self.calls), 3),
+            "max_ms": round(self.max_ms, 3)
+        }
+        for name, q in (("p50", 0.50), ("p95", 0.95)):
+            value = durations[min(len(durations) - 1, int(q * len(durations)))] if durations else None
+            result[f"{name}_ms"] = round(value, 3) if value is not None else None
+        return result
+
+
+class QueryTracer:
+    """
+    Aggregates timings of every statement run through its connections.
+
+    StorageManager opens its connections through connect(); while the
+    tracer is disabled that is a plain sqlite3.connect. Each statement
+    seen for the first time also has its EXPLAIN QUERY PLAN recorded, and
+    statements slower than slow_ms are kept and appended to log_path as
+    JSON lines.
+    """
+
+    def __init__(self, enabled: bool = False, slow_ms: float = DEFAULT_SLOW_MS,
+                 log_path: Optional[str] = None, keep_slow: int = 100):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.log_path = log_path
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._statements: Dict[str, StatementStats] = {}
+        self._plans: Dict[str, List[str]] = {}
+        self._slow = deque(maxlen=keep_slow)
+        self._slow_count = 0
+        self._connects = 0
+        self._connect_ms = 0.0
+
+    def connect(self, db_path: str) -> sqlite3.Connection:
+        """Open a connection, timed and traced when enabled."""
+        if not self.enabled:
+            return sqlite3.connect(db_path)
+        start = time.perf_counter()
+        conn = sqlite3.connect(db_path, factory=_TracedConnection)
+        conn._tracer = self
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._connects += 1
+            self._connect_ms += elapsed
+        return conn
+
+    def record(self, sql: str, ms: float, rows: int = 0, error: Optional[str] = None) -> None:
+        """Record one execution of a statement."""
+        with self._lock:
+            stats = self._statements.get(sql)
+            if stats is None:
+                stats = self._statements[sql] = StatementStats()
+            stats.record(ms, rows, error is not None)
+            if ms < self.slow_ms:
+                return
+            self._slow_count += 1
+            entry = {
+                "time": datetime.utcnow().isoformat() + "Z",
+                "ms": round(ms, 3),
+                "rows": rows,
+                "sql": sql,
+                "plan": self._plans.get(sql)
+            }
+            if error is not None:
+                entry["error"] = error
+            self._slow.append(entry)
+        self._log(entry)
+
+    def _log(self, entry: Dict[str, Any]) -> None:
+        if not self.log_path:
+            return
+        try:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"Could not write slow-query log: {e}")
+
+    def needs_plan(self, sql: str) -> bool:
+        return sql not in self._plans and sql.split(" ", 1)[0].upper() in _EXPLAINABLE
+
+    def set_plan(self, sql: str, plan: List[str]) -> None:
+        with self._lock:
+            self._plans[sql] = plan
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._slow.clear()
+            self._slow_count = 0
+            self._connects = 0
+            self._connect_ms = 0.0
+            self.started_at = time.time()
+
+    def report(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Statistics of the statements run since the last reset.
+
+        Args:
+            top: Only list this many statements
+
+        Returns:
+            Dict with 'enabled', 'since', 'connections' (count, total_ms,
+            avg_ms), 'statements' sorted by total time, each with its share
+            of all statement time and its query plan, and 'slow' (threshold_ms,
+            count and the most recent slow statements)
+        """
+        with self._lock:
+            statements = [
+                dict(sql=sql, plan=self._plans.get(sql), **stats.snapshot())
+                for sql, stats in self._statements.items()
+            ]
+            connections = {
+                "count": self._connects,
+                "total_ms": round(self._connect_ms, 3),
+                "avg_ms": round(self._connect_ms / max(1, self._connects), 3)
+            }
+            slow = {
+                "threshold_ms": self.slow_ms,
+                "count": self._slow_count,
+                "recent": list(self._slow)
+            }
+
+        statements.sort(key=lambda s: s["total_ms"], reverse=True)
+        total_ms = sum(s["total_ms"] for s in statements)
+        for s in statements:
+            s["share"] = round(s["total_ms"] / total_ms, 3) if total_ms else 0.0
+        return {
+            "enabled": self.enabled,
+            "since": self.started_at,
+            "connections": connections,
+            "statements": statements[:top] if top else statements,
+            "slow": slow
+        }
+
+
+class _TracedCursor(sqlite3.Cursor):
+    """
+    Cursor that charges execute and fetch time to the executed statement.
+
+    An execution is recorded once the cursor moves on to another statement
+    or is closed, so rows fetched after execute() are included.
+    """
+
+    _pending = None
+
+    def _finish(self) -> None:
+        if self._pending is not None:
+            sql, ms, rows = self._pending
+            self._pending = None
+            self.connection._tracer.record(sql, ms, rows)
+
+    def _run(self, method, sql, parameters):
+        self._finish()
+        tracer = self.connection._tracer
+        key = normalize_sql(sql)
+        if tracer.needs_plan(key):
+            tracer.set_plan(key, _explain(self.connection, sql))
+        start = time.perf_counter()
+        try:
+            method(sql, parameters)
+        except sqlite3.Error as e:
+            tracer.record(key, (time.perf_counter() - start) * 1000, 0, f"{type(e).__name__}: {e}")
+            raise
+        self._pending = [key, (time.perf_counter() - start) * 1000, max(0, self.rowcount)]
+        return self
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._run(super().executemany, sql, seq_of_parameters)
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        if self._pending is not None:
+            self._pending[1] += (time.perf_counter() - start) * 1000
+            self._pending[2] += len(result) if isinstance(result, list) else int(result is not None)
+        return result
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(super().fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+    def close(self):
+        self._finish()
+        super().close()
+
+
+class _TracedConnection(sqlite3.Connection):
+    """Connection whose cursors, commits and rollbacks are timed."""
+
+    _tracer = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = []
+
+    def cursor(self, factory=_TracedCursor):
+        cursor = super().cursor(factory)
+        if isinstance(cursor, _TracedCursor):
+            self._cursors.append(cursor)
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def _timed(self, name, method):
+        self._finish_cursors()
+        start = time.perf_counter()
+        method()
+        self._tracer.record(name, (time.perf_counter() - start) * 1000)
+
+    def _finish_cursors(self) -> None:
+        for cursor in self._cursors:
+            cursor._finish()
+
+    def commit(self):
+        self._timed("COMMIT", super().commit)
+
+    def rollback(self):
+        self._timed("ROLLBACK", super().rollback)
+
+    def close(self):
+        self._finish_cursors()
+        self._cursors = []
+        super().close()
+
+
+def _explain(conn: sqlite3.Connection, sql: str) -> List[str]:
+    """EXPLAIN QUERY PLAN of a statement, with NULL for every parameter."""
+    try:
+        # A plain cursor, so the EXPLAIN itself is not recorded
+        cursor = sqlite3.Cursor(conn)
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, (None,) * sql.count("?"))
+        return [row[3] for row in cursor.fetchall()]
+    except sqlite3.Error:
+        return []
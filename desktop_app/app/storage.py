@@ -1,33 +1,65 @@
 """SQLite storage for entries, audio, and consent data."""
 import sqlite3
 import os
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable, Tuple
 from contextlib import contextmanager
 from datetime import datetime, timezone
 
+from .query_trace import QueryTracer
+from .audio_codec import (
+    encode_audio, decode_audio, decoded_wav_size, stored_audio_format,
+    CODEC_WAV, CODECS, available_codecs
+)
+
+
+# Bump when _init_db changes, so existing databases are brought up to date
+SCHEMA_VERSION = 1
+
+DEFAULT_DB_NAME = "wordlist.db"
+
+
+def default_app_dir() -> str:
+    """Directory holding the app's databases (~/.wordlist_elicitation)."""
+    return os.path.expanduser("~/.wordlist_elicitation")
+
 
 class StorageManager:
     """Manages SQLite database for wordlist entries, audio, and consent."""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, tracer: Optional[QueryTracer] = None):
         """
         Initialize storage manager.
         
         Args:
             db_path: Path to SQLite database file. Defaults to app data directory.
+            tracer: Times the statements run on this database (see app.query_trace)
         """
         if db_path is None:
-            app_dir = os.path.expanduser("~/.wordlist_elicitation")
+            app_dir = default_app_dir()
             os.makedirs(app_dir, exist_ok=True)
-            db_path = os.path.join(app_dir, "wordlist.db")
+            db_path = os.path.join(app_dir, DEFAULT_DB_NAME)
         
         self.db_path = db_path
+        self.tracer = tracer
         self._init_db()
+        self.audio_codec = self.get_setting("audio_codec", CODEC_WAV)
+        # Checking other codecs imports their libraries, so skip it for WAV
+        if self.audio_codec != CODEC_WAV and self.audio_codec not in available_codecs():
+            self.audio_codec = CODEC_WAV
     
     def _init_db(self):
-        """Initialize database schema."""
+        """
+        Initialize database schema.
+        
+        Skipped when the database already records the current
+        SCHEMA_VERSION (SQLite's user_version), which saves a dozen
+        statements on every start.
+        """
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("PRAGMA user_version")
+            if cursor.fetchone()[0] == SCHEMA_VERSION:
+                return
             
             # Entries table
             cursor.execute("""
@@ -52,6 +84,28 @@ class StorageManager:
                 )
             """)
             
+            # Durations and processing applied to each recording
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS audio_info (
+                    filename TEXT PRIMARY KEY,
+                    original_duration REAL,
+                    duration REAL,
+                    trimmed_start REAL,
+                    trimmed_end REAL,
+                    gain_db REAL
+                )
+            """)
+            
+            # Min/max peak summaries for drawing waveforms (see app.waveform)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS waveforms (
+                    filename TEXT PRIMARY KEY,
+                    levels TEXT NOT NULL,
+                    peaks BLOB NOT NULL,
+                    duration REAL
+                )
+            """)
+            
             # Consent table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS consent (
@@ -72,27 +126,64 @@ class StorageManager:
                 )
             """)
             
+            # Data version of the last change to each entry (see get_changes_since)
+            cursor.execute("PRAGMA table_info(entries)")
+            if "version" not in [row["name"] for row in cursor.fetchall()]:
+                cursor.execute("ALTER TABLE entries ADD COLUMN version INTEGER DEFAULT 0")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_entries_version ON entries (version)")
+            
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             conn.commit()
     
     @contextmanager
     def _get_connection(self):
         """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
+        if self.tracer is not None:
+            conn = self.tracer.connect(self.db_path)
+        else:
+            conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         try:
             yield conn
         finally:
             conn.close()
     
+    # Data version operations
+    def _next_version(self, cursor: sqlite3.Cursor) -> int:
+        """Increment the data version inside the caller's transaction and return it."""
+        cursor.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('data_version', '0')")
+        cursor.execute("""
+            UPDATE settings SET value = CAST(value AS INTEGER) + 1 WHERE key = 'data_version'
+        """)
+        cursor.execute("SELECT value FROM settings WHERE key = 'data_version'")
+        return int(cursor.fetchone()[0])
+    
+    def get_data_version(self) -> int:
+        """Get the version of the most recent change to the entries."""
+        return int(self.get_setting("data_version", "0"))
+    
+    def get_reset_version(self) -> int:
+        """Get the data version at which all entries were last deleted."""
+        return int(self.get_setting("entries_reset_version", "0"))
+    
+    def get_entries_changed_since(self, version: int) -> List[Dict[str, Any]]:
+        """Get entries added or updated after the given data version."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM entries WHERE version > ? ORDER BY id", (version,))
+            rows = cursor.fetchall()
+            return [self._row_to_dict(row) for row in rows]
+    
     # Entry operations
     def add_entry(self, entry: Dict[str, Any]) -> int:
         """Add a new entry and return its ID."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            version = self._next_version(cursor)
             cursor.execute("""
                 INSERT INTO entries (reference, gloss, local_transcription, audio_filename, 
-                                   picture_filename, recorded_at, is_completed)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                                   picture_filename, recorded_at, is_completed, version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 entry.get("reference", "0000"),
                 entry.get("gloss", ""),
@@ -100,11 +191,79 @@ class StorageManager:
                 entry.get("audio_filename"),
                 entry.get("picture_filename"),
                 entry.get("recorded_at"),
-                1 if entry.get("is_completed") else 0
+                1 if entry.get("is_completed") else 0,
+                version
             ))
             conn.commit()
             return cursor.lastrowid
     
+    def add_entries(self, entries: List[Dict[str, Any]]) -> int:
+        """Add many entries in a single transaction and return the count."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            self._insert_entries(cursor, entries, self._next_version(cursor))
+            conn.commit()
+            return len(entries)
+    
+    def _insert_entries(self, cursor: sqlite3.Cursor, entries: List[Dict[str, Any]], version: int) -> None:
+        cursor.executemany("""
+            INSERT INTO entries (reference, gloss, local_transcription, audio_filename, 
+                               picture_filename, recorded_at, is_completed, version)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                entry.get("reference", "0000"),
+                entry.get("gloss", ""),
+                entry.get("local_transcription", ""),
+                entry.get("audio_filename"),
+                entry.get("picture_filename"),
+                entry.get("recorded_at"),
+                1 if entry.get("is_completed") else 0,
+                version
+            )
+            for entry in entries
+        ])
+    
+    def replace_all(
+        self,
+        entries: List[Dict[str, Any]],
+        audio_records: Iterable[Tuple[str, bytes]] = ()
+    ) -> int:
+        """
+        Replace all entries and audio in a single transaction.
+        
+        If anything fails, including reading audio_records, the database
+        is left as it was. Records are consumed lazily, as in
+        save_audio_many.
+        
+        Args:
+            entries: New entries
+            audio_records: Iterable of (filename, data) tuples
+            
+        Returns:
+            Number of audio records saved
+        """
+        count = 0
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            version = self._next_version(cursor)
+            cursor.execute("DELETE FROM entries")
+            cursor.execute("""
+                INSERT OR REPLACE INTO settings (key, value) VALUES ('entries_reset_version', ?)
+            """, (str(version),))
+            cursor.execute("DELETE FROM audio")
+            cursor.execute("DELETE FROM audio_info")
+            cursor.execute("DELETE FROM waveforms")
+            self._insert_entries(cursor, entries, version)
+            for filename, data in audio_records:
+                cursor.execute("""
+                    INSERT OR REPLACE INTO audio (filename, data, created_at)
+                    VALUES (?, ?, ?)
+                """, (filename, encode_audio(data, self.audio_codec), datetime.now(timezone.utc).isoformat()))
+                count += 1
+            conn.commit()
+        return count
+    
     def get_all_entries(self) -> List[Dict[str, Any]]:
         """Get all entries sorted by numeric reference."""
         with self._get_connection() as conn:
@@ -125,10 +284,12 @@ class StorageManager:
         """Update an existing entry."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            version = self._next_version(cursor)
             cursor.execute("""
                 UPDATE entries SET 
                     reference = ?, gloss = ?, local_transcription = ?,
-                    audio_filename = ?, picture_filename = ?, recorded_at = ?, is_completed = ?
+                    audio_filename = ?, picture_filename = ?, recorded_at = ?, is_completed = ?,
+                    version = ?
                 WHERE id = ?
             """, (
                 entry.get("reference", "0000"),
@@ -138,16 +299,62 @@ class StorageManager:
                 entry.get("picture_filename"),
                 entry.get("recorded_at"),
                 1 if entry.get("is_completed") else 0,
+                version,
                 entry.get("id")
             ))
+            if cursor.rowcount == 0:
+                # Nothing changed; don't advance the version
+                conn.rollback()
+                return False
+            conn.commit()
+            return True
+    
+    def apply_writes(self, transcriptions: Dict[int, str], settings: Dict[str, str]) -> int:
+        """
+        Save transcriptions and settings in a single transaction.
+        
+        An entry is marked completed when it has a transcription or a
+        recording.
+        
+        Args:
+            transcriptions: Transcription text by entry ID
+            settings: Setting values by key
+        
+        Returns:
+            Number of entries updated
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            updated = 0
+            if transcriptions:
+                version = self._next_version(cursor)
+                cursor.executemany("""
+                    UPDATE entries SET
+                        local_transcription = ?,
+                        is_completed = CASE WHEN ? OR audio_filename IS NOT NULL THEN 1 ELSE 0 END,
+                        version = ?
+                    WHERE id = ?
+                """, [
+                    (text, 1 if text.strip() else 0, version, entry_id)
+                    for entry_id, text in transcriptions.items()
+                ])
+                updated = cursor.rowcount
+            if settings:
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)
+                """, list(settings.items()))
             conn.commit()
-            return cursor.rowcount > 0
+            return updated
     
     def delete_all_entries(self) -> None:
-        """Delete all entries."""
+        """Delete all entries and record the reset in the data version."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            version = self._next_version(cursor)
             cursor.execute("DELETE FROM entries")
+            cursor.execute("""
+                INSERT OR REPLACE INTO settings (key, value) VALUES ('entries_reset_version', ?)
+            """, (str(version),))
             conn.commit()
     
     def get_total_count(self) -> int:
@@ -180,7 +387,8 @@ class StorageManager:
     
     # Audio operations
     def save_audio(self, filename: str, data: bytes) -> None:
-        """Save audio data."""
+        """Save audio data, encoded with the configured storage codec."""
+        data = encode_audio(data, self.audio_codec)
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
@@ -189,28 +397,288 @@ class StorageManager:
             """, (filename, data, datetime.now(timezone.utc).isoformat()))
             conn.commit()
     
+    def save_audio_file(self, filename: str, path: str, chunk_size: int = 1024 * 1024) -> None:
+        """
+        Save audio from a file on disk without loading it into memory.
+        
+        Reserves a zeroblob of the file's size and fills it through
+        incremental blob I/O (Python 3.11+). With a compressing storage
+        codec, or on older Pythons, the file is read and stored like
+        save_audio, so both store the same bytes.
+        """
+        if self.audio_codec != CODEC_WAV:
+            with open(path, 'rb') as f:
+                self.save_audio(filename, f.read())
+            return
+        
+        size = os.path.getsize(path)
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            if not hasattr(conn, "blobopen"):
+                with open(path, 'rb') as f:
+                    data = f.read()
+                cursor.execute("""
+                    INSERT OR REPLACE INTO audio (filename, data, created_at)
+                    VALUES (?, ?, ?)
+                """, (filename, data, datetime.now(timezone.utc).isoformat()))
+                conn.commit()
+                return
+            
+            cursor.execute("""
+                INSERT OR REPLACE INTO audio (filename, data, created_at)
+                VALUES (?, zeroblob(?), ?)
+            """, (filename, size, datetime.now(timezone.utc).isoformat()))
+            rowid = cursor.lastrowid
+            with conn.blobopen("audio", "data", rowid) as blob, open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    blob.write(chunk)
+            conn.commit()
+    
     def get_audio(self, filename: str) -> Optional[bytes]:
-        """Get audio data by filename."""
+        """Get audio data by filename, decoded to WAV."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT data FROM audio WHERE filename = ?", (filename,))
             row = cursor.fetchone()
-            return row[0] if row else None
+            return decode_audio(row[0]) if row else None
+    
+    def save_audio_many(self, records: Iterable[Tuple[str, bytes]]) -> int:
+        """
+        Save many audio records in a single transaction.
+        
+        Records are consumed lazily, so a generator that reads one file at a
+        time keeps only one recording in memory.
+        
+        Args:
+            records: Iterable of (filename, data) tuples
+            
+        Returns:
+            Number of records saved
+        """
+        count = 0
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for filename, data in records:
+                data = encode_audio(data, self.audio_codec)
+                cursor.execute("""
+                    INSERT OR REPLACE INTO audio (filename, data, created_at)
+                    VALUES (?, ?, ?)
+                """, (filename, data, datetime.now(timezone.utc).isoformat()))
+                count += 1
+            conn.commit()
+        return count
+    
+    def get_audio_stat(self, filename: str) -> Optional[Dict[str, Any]]:
+        """
+        Identity and size of a recording without reading its data.
+        
+        Returns:
+            Dict with 'version' (changes whenever the recording is saved or
+            re-encoded), 'size' (decoded WAV bytes) and 'encoded' (stored
+            with a compressing codec), or None if there is no such recording
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT rowid, created_at, length(data), substr(data, 1, 42)
+                FROM audio WHERE filename = ?
+            """, (filename,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            rowid, created_at, stored_size, prefix = row
+            return {
+                "version": f"{rowid}|{created_at}|{stored_size}",
+                "size": decoded_wav_size(prefix, stored_size),
+                "encoded": stored_size > 0 and prefix[:4] != b"RIFF"
+            }
+    
+    def read_audio_range(self, filename: str, start: int, length: int) -> bytes:
+        """
+        Read part of a recording as stored, without loading the rest.
+        
+        Only meaningful for recordings stored as WAV (see get_audio_stat);
+        uses incremental blob I/O where available (Python 3.11+).
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            if not hasattr(conn, "blobopen"):
+                cursor.execute(
+                    "SELECT substr(data, ?, ?) FROM audio WHERE filename = ?",
+                    (start + 1, length, filename)
+                )
+                row = cursor.fetchone()
+                return row[0] if row else b""
+            cursor.execute("SELECT rowid FROM audio WHERE filename = ?", (filename,))
+            row = cursor.fetchone()
+            if row is None:
+                return b""
+            with conn.blobopen("audio", "data", row[0], readonly=True) as blob:
+                blob.seek(start)
+                return blob.read(length)
+    
+    def get_audio_filenames(self) -> List[str]:
+        """Get the filenames of all audio records, sorted, without reading any audio."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT filename FROM audio ORDER BY filename")
+            return [row[0] for row in cursor.fetchall()]
     
     def get_all_audio(self) -> List[Dict[str, Any]]:
-        """Get all audio records."""
+        """Get all audio records, decoded to WAV."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT filename, data FROM audio")
-            return [{"filename": row[0], "data": row[1]} for row in cursor.fetchall()]
+            return [{"filename": row[0], "data": decode_audio(row[1])} for row in cursor.fetchall()]
+    
+    def get_audio_sizes(self) -> List[Dict[str, Any]]:
+        """
+        Get filename, decoded WAV byte size and format of every audio record.
+        
+        Only the first bytes of each blob are read; encoded recordings are
+        sized from their codec header.
+        
+        Returns:
+            List of dicts with 'filename', 'size', 'sample_rate' and 'channels'
+            (format values are None for unrecognized headers)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT filename, length(data), substr(data, 1, 42) FROM audio ORDER BY filename")
+            result = []
+            for filename, stored_size, prefix in cursor.fetchall():
+                sample_rate, channels = stored_audio_format(prefix)
+                result.append({
+                    "filename": filename,
+                    "size": decoded_wav_size(prefix, stored_size),
+                    "sample_rate": sample_rate,
+                    "channels": channels
+                })
+            return result
+    
+    def get_stored_audio_bytes(self) -> int:
+        """Total bytes of audio as stored (after codec compression)."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(SUM(length(data)), 0) FROM audio")
+            return cursor.fetchone()[0]
+    
+    def set_audio_codec(self, codec: str) -> None:
+        """
+        Set the codec used for newly saved audio.
+        
+        Raises:
+            ValueError: If the codec is unknown or not available
+        """
+        if codec not in CODECS or codec not in available_codecs():
+            raise ValueError(f"Audio codec not available: {codec}")
+        self.set_setting("audio_codec", codec)
+        self.audio_codec = codec
+    
+    def recode_all_audio(self) -> int:
+        """
+        Re-encode every stored recording with the current codec.
+        
+        Recordings are converted one at a time in a single transaction.
+        Recordings that are not 16-bit PCM WAV are left unchanged.
+        
+        Returns:
+            Number of recordings rewritten
+        """
+        count = 0
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT filename FROM audio ORDER BY filename")
+            filenames = [row[0] for row in cursor.fetchall()]
+            for filename in filenames:
+                cursor.execute("SELECT data FROM audio WHERE filename = ?", (filename,))
+                stored = cursor.fetchone()[0]
+                try:
+                    encoded = encode_audio(decode_audio(stored), self.audio_codec)
+                except ValueError:
+                    # Not 16-bit PCM; keep as stored
+                    continue
+                if encoded != stored:
+                    cursor.execute("UPDATE audio SET data = ? WHERE filename = ?", (encoded, filename))
+                    count += 1
+            conn.commit()
+        return count
     
     def delete_all_audio(self) -> None:
         """Delete all audio data."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM audio")
+            cursor.execute("DELETE FROM audio_info")
+            cursor.execute("DELETE FROM waveforms")
+            conn.commit()
+    
+    def save_audio_info(self, filename: str, info: Dict[str, Any]) -> None:
+        """Save original/trimmed durations and gain of a recording."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO audio_info
+                    (filename, original_duration, duration, trimmed_start, trimmed_end, gain_db)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                filename,
+                info.get("original_duration"),
+                info.get("duration"),
+                info.get("trimmed_start"),
+                info.get("trimmed_end"),
+                info.get("gain_db")
+            ))
             conn.commit()
     
+    def get_audio_info(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Get durations and gain recorded for a recording."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM audio_info WHERE filename = ?", (filename,))
+            row = cursor.fetchone()
+            return self._row_to_dict(row) if row else None
+    
+    # Waveform operations
+    def save_waveform(self, filename: str, levels: str, peaks: bytes, duration: float) -> None:
+        """Save the peak summary of a recording."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO waveforms (filename, levels, peaks, duration)
+                VALUES (?, ?, ?, ?)
+            """, (filename, levels, peaks, duration))
+            conn.commit()
+    
+    def get_waveform(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Get the peak summary of a recording."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM waveforms WHERE filename = ?", (filename,))
+            row = cursor.fetchone()
+            return self._row_to_dict(row) if row else None
+    
+    def delete_waveform(self, filename: str) -> None:
+        """Delete a stale peak summary."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM waveforms WHERE filename = ?", (filename,))
+            conn.commit()
+    
+    def get_audio_without_waveform(self) -> List[str]:
+        """Get filenames of recordings that have no peak summary yet."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT filename FROM audio
+                WHERE filename NOT IN (SELECT filename FROM waveforms)
+                ORDER BY filename
+            """)
+            return [row[0] for row in cursor.fetchall()]
+    
     # Consent operations
     def add_consent_record(self, record: Dict[str, Any]) -> int:
         """Add a consent record and return its ID."""
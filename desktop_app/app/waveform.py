@@ -0,0 +1,206 @@
+"""Compact min/max peak summaries of recordings for drawing waveforms."""
+import io
+import json
+import threading
+import wave
+from typing import Dict, Any, List, Optional, Tuple
+
+from .lazy import LazyModule, module_available
+
+np = LazyModule("numpy")
+NUMPY_AVAILABLE = module_available("numpy")
+
+
+# Column counts of the stored zoom levels, coarsest first
+WAVEFORM_LEVELS = (128, 512, 2048)
+
+# Peaks are stored as int8, i.e. int16 samples divided by this
+PEAK_SCALE = 256
+
+
+def _reduce_columns(mins, maxs, columns: int):
+    """Reduce min/max arrays to the given number of columns."""
+    count = len(mins)
+    if count <= columns:
+        return mins, maxs
+    edges = (np.arange(columns) * count) // columns
+    return np.minimum.reduceat(mins, edges), np.maximum.reduceat(maxs, edges)
+
+
+def compute_peaks(samples, levels: Tuple[int, ...] = WAVEFORM_LEVELS) -> Dict[int, Tuple[Any, Any]]:
+    """
+    Compute min/max peaks of int16 samples at several zoom levels.
+
+    Channels are mixed down first. Recordings shorter than a level have
+    one column per sample at that level.
+
+    Args:
+        samples: int16 array of shape (frames,) or (frames, channels)
+        levels: Column counts to compute
+
+    Returns:
+        Dict mapping column count to (mins, maxs) int8 arrays
+    """
+    x = samples
+    if x.ndim > 1:
+        x = x.mean(axis=1).astype(np.int16) if x.shape[1] > 1 else x[:, 0]
+    if len(x) == 0:
+        empty = np.zeros(0, dtype=np.int8)
+        return {n: (empty, empty) for n in levels}
+
+    # Finest level from the samples, coarser ones from the finest
+    finest = max(levels)
+    mins, maxs = _reduce_columns(x, x, finest)
+    mins = np.floor_divide(mins, PEAK_SCALE).astype(np.int8)
+    maxs = np.floor_divide(maxs, PEAK_SCALE).astype(np.int8)
+    return {n: _reduce_columns(mins, maxs, n) for n in levels}
+
+
+def compute_wav_peaks(wav_data: bytes) -> Optional[Tuple[Dict[int, Tuple[Any, Any]], float]]:
+    """
+    Compute peaks of a 16-bit PCM WAV.
+
+    Returns:
+        (peaks, duration in seconds), or None if the data is not 16-bit PCM WAV
+    """
+    try:
+        with wave.open(io.BytesIO(wav_data), 'rb') as wf:
+            if wf.getsampwidth() != 2:
+                return None
+            sample_rate = wf.getframerate()
+            channels = wf.getnchannels()
+            frames = wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    samples = np.frombuffer(frames, dtype='<i2').reshape(-1, channels)
+    return compute_peaks(samples), len(samples) / sample_rate
+
+
+def pack_peaks(peaks: Dict[int, Tuple[Any, Any]]) -> Tuple[str, bytes]:
+    """
+    Serialize peaks for storage.
+
+    Returns:
+        (JSON list of stored column counts, concatenated min/max int8 bytes)
+    """
+    levels = sorted(peaks)
+    counts = [len(peaks[n][0]) for n in levels]
+    data = b"".join(peaks[n][0].tobytes() + peaks[n][1].tobytes() for n in levels)
+    return json.dumps(counts), data
+
+
+def unpack_peaks(levels_json: str, data: bytes) -> List[Tuple[Any, Any]]:
+    """Inverse of pack_peaks: list of (mins, maxs), coarsest first."""
+    result = []
+    offset = 0
+    for count in json.loads(levels_json):
+        mins = np.frombuffer(data, dtype=np.int8, count=count, offset=offset)
+        maxs = np.frombuffer(data, dtype=np.int8, count=count, offset=offset + count)
+        result.append((mins, maxs))
+        offset += 2 * count
+    return result
+
+
+def select_level(levels: List[Tuple[Any, Any]], width: int) -> Tuple[Any, Any]:
+    """
+    Peaks for drawing at a pixel width.
+
+    Uses the coarsest level with at least width columns (or the finest one)
+    and reduces it to exactly width columns.
+    """
+    for mins, maxs in levels:
+        if len(mins) >= width:
+            return _reduce_columns(mins, maxs, width)
+    return levels[-1]
+
+
+def store_waveform(storage, filename: str, wav_data: bytes) -> bool:
+    """Compute and save the peak summary of one recording."""
+    if not NUMPY_AVAILABLE:
+        return False
+    result = compute_wav_peaks(wav_data)
+    if result is None:
+        return False
+    peaks, duration = result
+    levels_json, data = pack_peaks(peaks)
+    storage.save_waveform(filename, levels_json, data, duration)
+    return True
+
+
+class WaveformBackfill:
+    """
+    Computes missing peak summaries for existing audio on a background thread.
+
+    Each pass works on the storage it was started with; set_storage stops
+    the pass over the previous database before starting on the new one.
+    A recording that cannot be read or summarized is counted in errors
+    and skipped; it is retried on the next pass.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.processed = 0
+        self.errors = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._again = False
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start a pass, or schedule another one if a pass is running."""
+        if not NUMPY_AVAILABLE:
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive() and not self._stop.is_set():
+                self._again = True
+                return
+            # Each thread has its own stop event, so a stopped thread that
+            # is still finishing a file never picks up the new storage
+            self._stop = threading.Event()
+            self._again = False
+            self._thread = threading.Thread(target=self._run, args=(self.storage, self._stop), daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the running pass after the current file and wait for it."""
+        with self._lock:
+            self._stop.set()
+            thread = self._thread
+        if thread:
+            thread.join(timeout)
+
+    def set_storage(self, storage) -> None:
+        """Stop the pass over the current database and start one over another."""
+        self.stop()
+        self.storage = storage
+        self.start()
+
+    def _run(self, storage, stop: threading.Event) -> None:
+        while True:
+            try:
+                filenames = storage.get_audio_without_waveform()
+            except Exception as e:
+                print(f"Waveform backfill failed: {e}")
+                with self._lock:
+                    self.errors += 1
+                return
+            for filename in filenames:
+                if stop.is_set():
+                    return
+                try:
+                    data = storage.get_audio(filename)
+                    if data and store_waveform(storage, filename, data):
+                        self.processed += 1
+                except Exception as e:
+                    print(f"Waveform backfill failed for {filename}: {e}")
+                    with self._lock:
+                        self.errors += 1
+            with self._lock:
+                if not self._again or stop.is_set():
+                    return
+                self._again = False
+
+    def join(self, timeout: float = None) -> None:
+        if self._thread:
+            self._thread.join(timeout)
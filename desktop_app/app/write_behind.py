@@ -0,0 +1,166 @@
+"""Coalescing write-behind queue for frequent small saves."""
+import threading
+import time
+from typing import Optional, Dict, Any
+
+
+# Longest wait between retries of a failing flush, in seconds
+MAX_RETRY_DELAY = 30.0
+
+
+class WriteBehindQueue:
+    """
+    Buffers transcription and setting writes and saves them in batches.
+
+    Writes are kept per key, so repeated saves of the same entry or
+    setting collapse into the latest value. Pending writes are saved in one
+    transaction delay seconds after the first one is queued, or earlier
+    when flush() is called (before reads that depend on them and on
+    shutdown). Queuing never touches the disk. A failed flush keeps the
+    batch and retries it, doubling the wait after each consecutive failure
+    up to MAX_RETRY_DELAY.
+    """
+
+    def __init__(self, storage, delay: float = 0.5, storage_lock=None):
+        """
+        Args:
+            storage: StorageManager to write to
+            delay: Seconds to wait for more writes before saving
+            storage_lock: Reentrant lock held while saving, shared with
+                other storage writers (see JobScheduler.storage_lock)
+        """
+        self.storage = storage
+        self.delay = delay
+        self.storage_lock = storage_lock or threading.RLock()
+        self._lock = threading.Lock()
+        # Serializes flushes so batches reach the database in queue order;
+        # always taken after storage_lock
+        self._flush_lock = threading.RLock()
+        self._transcriptions: Dict[int, str] = {}
+        self._settings: Dict[str, str] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        self._failures = 0
+
+        self.queued = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.written = 0
+        self.errors = 0
+        self.last_flush_ms: Optional[float] = None
+        self.max_flush_ms = 0.0
+
+    def set_transcription(self, entry_id: int, text: str) -> None:
+        """Queue a transcription save."""
+        with self._lock:
+            self._queue(self._transcriptions, entry_id, text)
+
+    def set_setting(self, key: str, value: str) -> None:
+        """Queue a setting save."""
+        with self._lock:
+            self._queue(self._settings, key, value)
+
+    def _queue(self, pending: Dict, key, value) -> None:
+        self.queued += 1
+        if key in pending:
+            self.coalesced += 1
+        pending[key] = value
+        self._schedule(self.delay)
+
+    def _schedule(self, delay: float) -> None:
+        # Called with the lock held
+        if self._closed or self._timer is not None:
+            return
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._transcriptions) + len(self._settings)
+
+    def flush(self) -> int:
+        """
+        Save all pending writes now.
+
+        Returns:
+            Number of writes saved
+        """
+        with self.storage_lock, self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                transcriptions, self._transcriptions = self._transcriptions, {}
+                settings, self._settings = self._settings, {}
+            if not transcriptions and not settings:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                self.storage.apply_writes(transcriptions, settings)
+            except Exception as e:
+                print(f"Write-behind flush failed: {e}")
+                with self._lock:
+                    self.errors += 1
+                    # Put the batch back unless newer values were queued meanwhile
+                    for entry_id, text in transcriptions.items():
+                        self._transcriptions.setdefault(entry_id, text)
+                    for key, value in settings.items():
+                        self._settings.setdefault(key, value)
+                    self._failures += 1
+                    self._schedule(min(MAX_RETRY_DELAY, self.delay * 2 ** self._failures))
+                return 0
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            count = len(transcriptions) + len(settings)
+            with self._lock:
+                self._failures = 0
+                self.flushes += 1
+                self.written += count
+                self.last_flush_ms = round(elapsed_ms, 3)
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            return count
+
+    def set_storage(self, storage) -> bool:
+        """
+        Flush pending writes, then send later writes to another StorageManager.
+
+        Returns:
+            False, keeping the current storage, if writes are still pending
+            (the flush failed or new writes arrived meanwhile)
+        """
+        with self.storage_lock, self._flush_lock:
+            self.flush()
+            with self._lock:
+                if self._transcriptions or self._settings:
+                    return False
+                self.storage = storage
+                return True
+
+    def close(self) -> None:
+        """Flush pending writes and stop scheduling timed flushes."""
+        with self._lock:
+            self._closed = True
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Flush statistics.
+
+        Returns:
+            Dict with queued, coalesced, flushes, written, errors, pending,
+            last_flush_ms and max_flush_ms
+        """
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "written": self.written,
+                "errors": self.errors,
+                "pending": len(self._transcriptions) + len(self._settings),
+                "last_flush_ms": self.last_flush_ms,
+                "max_flush_ms": round(self.max_flush_ms, 3)
+            }
@@ -65,13 +65,78 @@ def parse_wordlist(xml_string: str) -> List[Dict[str, Any]]:
     return entries
 
 
+# Element names tried, in order, when locating word entries
+WORD_ELEMENT_NAMES = ["Word", "Entry", "Item", "word", "entry", "item", "data_form"]
+
+
+def parse_wordlist_from_stream(stream) -> List[Dict[str, Any]]:
+    """
+    Parse a wordlist XML from a binary stream without building the full tree.
+    
+    Produces the same entries as parse_wordlist. Each record element and
+    each top-level element is discarded once parsed, at any nesting depth,
+    so memory is bounded by the largest record rather than the whole
+    document. The encoding is detected by the parser from the
+    BOM and XML declaration.
+    
+    Args:
+        stream: Binary file-like object (e.g. a ZIP member)
+        
+    Returns:
+        List of entry dictionaries, sorted by numeric reference
+    """
+    # Candidate entries per element name, plus root children as fallback
+    buckets: Dict[str, List[Dict[str, Any]]] = {name: [] for name in WORD_ELEMENT_NAMES}
+    fallback: List[Dict[str, Any]] = []
+    counts: Dict[str, int] = {}
+    # Open elements, root first
+    stack: List[ET.Element] = []
+    
+    try:
+        for event, el in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                stack.append(el)
+                continue
+            
+            stack.pop()
+            depth = len(stack)
+            if el.tag in buckets:
+                index = counts.get(el.tag, 0)
+                counts[el.tag] = index + 1
+                entry = parse_word_element(el, index)
+                if entry:
+                    buckets[el.tag].append(entry)
+            
+            if depth == 1:
+                entry = parse_word_element(el, len(fallback))
+                if entry:
+                    fallback.append(entry)
+            
+            if depth >= 1 and (depth == 1 or el.tag in buckets):
+                # Drop the finished record so neither it nor an emptied
+                # placeholder stays attached to the tree
+                el.clear()
+                stack[-1].remove(el)
+    except ET.ParseError as e:
+        raise ValueError(f"XML parse error: {e}")
+    
+    entries = fallback
+    for name in WORD_ELEMENT_NAMES:
+        if counts.get(name):
+            entries = buckets[name]
+            break
+    
+    entries.sort(key=lambda e: parse_reference_numeric(e["reference"]))
+    return entries
+
+
 def find_word_elements(root: ET.Element) -> List[ET.Element]:
     """
     Find word/entry elements in XML tree.
     
     Tries multiple element names for compatibility.
     """
-    element_names = ["Word", "Entry", "Item", "word", "entry", "item", "data_form"]
+    element_names = WORD_ELEMENT_NAMES
     
     for name in element_names:
         elements = root.findall(f".//{name}")
@@ -0,0 +1 @@
+"""Benchmark scripts for desktop application performance work."""
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Real-time audio benchmark.
+
+Measures record start latency (cold and warm), capture throughput,
+capture callback durations and playback start latency. Uses the fake
+audio device by default, so it runs in CI without a sound card; pass
+--backend default to measure the real device instead.
+
+Run from the desktop_app directory:
+    python -m benchmarks.bench_audio --seconds 2 --speed 0
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.audio import AudioRecorder
+from app.audio_backends import FakeBackend, default_backend
+from app.playback import PlaybackEngine, DecodedAudio
+
+
+def make_backend(name: str, speed: float):
+    if name == "fake":
+        return FakeBackend(speed=speed)
+    backend = default_backend()
+    if backend is None:
+        raise RuntimeError("No audio backend available")
+    return backend
+
+
+def bench_start_latency(backend, runs: int) -> Dict[str, Any]:
+    """Median record start latency without and with a warm stream."""
+    results = {}
+    for warm in (False, True):
+        latencies = []
+        rec = AudioRecorder(backend=backend)
+        try:
+            if warm:
+                rec.start_monitoring(preroll_ms=100)
+                time.sleep(0.05)
+            for _ in range(runs):
+                rec.start_recording()
+                time.sleep(0.05)
+                rec.stop_recording()
+                latency = rec.get_start_latency()["latency_ms"]
+                if latency is not None:
+                    latencies.append(latency)
+        finally:
+            rec.cleanup()
+        key = "warm_start_ms" if warm else "cold_start_ms"
+        results[key] = round(float(np.median(latencies)), 3) if latencies else None
+    return results
+
+
+def bench_capture(backend, seconds: float) -> Dict[str, Any]:
+    """Record for a wall-clock duration and report throughput and callback stats."""
+    rec = AudioRecorder(backend=backend)
+    try:
+        rec.start_recording()
+        time.sleep(seconds)
+        wav_data = rec.stop_recording()
+        stats = rec.get_capture_stats()
+    finally:
+        rec.cleanup()
+
+    audio_seconds = (len(wav_data) - 44) / (2 * rec.CHANNELS * rec.sample_rate)
+    return {
+        "wall_seconds": seconds,
+        "audio_seconds": round(audio_seconds, 3),
+        "realtime_factor": round(audio_seconds / seconds, 2),
+        "stats": stats
+    }
+
+
+def bench_playback(backend, runs: int) -> Dict[str, Any]:
+    """Median time from play() to the first block reaching the output stream."""
+    engine = PlaybackEngine(backend=backend)
+    samples = np.full((4410, 1), 1000, dtype='<i2')
+    latencies = []
+    try:
+        for _ in range(runs):
+            done = threading.Event()
+            engine.play(DecodedAudio(samples, 44100, 1), on_complete=done.set)
+            done.wait(2.0)
+            if engine.last_latency_ms is not None:
+                latencies.append(engine.last_latency_ms)
+        stats = engine.stats.snapshot()
+    finally:
+        engine.close()
+    return {
+        "start_ms": round(float(np.median(latencies)), 3) if latencies else None,
+        "stats": stats
+    }
+
+
+def run_benchmarks(backend_name: str, seconds: float, speed: float, runs: int) -> Dict[str, Any]:
+    return {
+        "generatedAt": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": backend_name,
+        "speed": speed,
+        "start": bench_start_latency(make_backend(backend_name, 1.0), runs),
+        "capture": bench_capture(make_backend(backend_name, speed), seconds),
+        # Playback latency is only meaningful at real-time pace
+        "playback": bench_playback(make_backend(backend_name, 1.0), runs)
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark audio capture and playback")
+    parser.add_argument("--backend", choices=["fake", "default"], default="fake",
+                        help="Audio backend (default: fake)")
+    parser.add_argument("--seconds", type=float, default=2.0,
+                        help="Wall-clock capture duration (default: 2)")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Fake device speed for the capture run; 0 is unthrottled (default: 0)")
+    parser.add_argument("--runs", type=int, default=5, help="Start latency runs (default: 5)")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.backend, args.seconds, args.speed, args.runs)
+    capture = results["capture"]
+    print(f"Record start: cold {results['start']['cold_start_ms']} ms, "
+          f"warm {results['start']['warm_start_ms']} ms")
+    print(f"Capture: {capture['audio_seconds']} s of audio in {capture['wall_seconds']} s "
+          f"({capture['realtime_factor']}x real time), "
+          f"callback p50/p95/p99 {capture['stats']['callback_ms_p50']}/"
+          f"{capture['stats']['callback_ms_p95']}/{capture['stats']['callback_ms_p99']} ms, "
+          f"{capture['stats']['overflows']} overflows")
+    print(f"Playback start: {results['playback']['start_ms']} ms, "
+          f"{results['playback']['stats']['underflows']} underflows")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
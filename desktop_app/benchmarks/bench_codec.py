@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Storage codec benchmark.
+
+Encodes and decodes synthetic speech-like recordings with every available
+storage codec and reports compression ratio and throughput (MB of WAV
+per second).
+
+Run from the desktop_app directory:
+    python -m benchmarks.bench_codec --clips 20 --seconds 3
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Any, List
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.audio import encode_audio, decode_audio, available_codecs, CODEC_WAV
+from benchmarks.bench_export import synthetic_audio, SAMPLE_RATE
+
+
+def run_codec(codec: str, clips: List[bytes]) -> Dict[str, Any]:
+    """Time encoding and decoding of all clips with one codec."""
+    wav_bytes = sum(len(c) for c in clips)
+
+    start = time.perf_counter()
+    encoded = [encode_audio(c, codec) for c in clips]
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = [decode_audio(e) for e in encoded]
+    decode_seconds = time.perf_counter() - start
+
+    if decoded != clips:
+        raise RuntimeError(f"{codec} did not round-trip losslessly")
+
+    stored_bytes = sum(len(e) for e in encoded)
+    mb = wav_bytes / (1024 * 1024)
+    return {
+        "codec": codec,
+        "wav_bytes": wav_bytes,
+        "stored_bytes": stored_bytes,
+        "ratio": round(wav_bytes / stored_bytes, 3),
+        "encode_mb_per_s": round(mb / encode_seconds, 1) if encode_seconds else None,
+        "decode_mb_per_s": round(mb / decode_seconds, 1) if decode_seconds else None
+    }
+
+
+def run_benchmarks(clip_count: int, seconds: float) -> Dict[str, Any]:
+    bytes_each = 44 + int(seconds * SAMPLE_RATE) * 2
+    clips = [data for _, data in synthetic_audio(clip_count, bytes_each)]
+    results = [
+        run_codec(codec, clips) for codec in available_codecs() if codec != CODEC_WAV
+    ]
+    return {
+        "generatedAt": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "clips": clip_count,
+        "seconds_per_clip": seconds,
+        "results": results
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark audio storage codecs")
+    parser.add_argument("--clips", type=int, default=20, help="Number of clips (default: 20)")
+    parser.add_argument("--seconds", type=float, default=3.0,
+                        help="Length of each clip in seconds (default: 3)")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.clips, args.seconds)
+    for r in results["results"]:
+        print(f"{r['codec']:12s} ratio {r['ratio']:.2f}x  "
+              f"encode {r['encode_mb_per_s']} MB/s  decode {r['decode_mb_per_s']} MB/s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
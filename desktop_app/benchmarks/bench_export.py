@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Export-path benchmark and memory profiler.
+
+Builds synthetic stores (entries plus numpy-generated 16-bit PCM audio),
+then times the export path for each compression policy. Each case runs in
+a fresh process so peak RSS is measured per case.
+
+Run from the desktop_app directory:
+    python -m benchmarks.bench_export --entries 1000,10000 --audio-mb 0,500
+    python -m benchmarks.bench_export --output new.json --baseline old.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, Any, List, Iterator, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.storage import StorageManager
+from app.audio_codec import wav_header
+from app.export_zip import (
+    create_export_zip, generate_metadata_json, COMPRESSION_POLICIES
+)
+from app.xml_io import generate_xml_utf16le
+from app.utils import generate_audio_filename, parse_reference_numeric
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+
+SAMPLE_RATE = 44100
+
+# Metrics compared against a baseline; larger is worse for all of them
+COMPARED_METRICS = ["wall_seconds", "peak_rss_bytes", "tracemalloc_peak_bytes", "output_bytes"]
+
+
+def synthetic_audio(count: int, bytes_each: int, seed: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield synthetic speech-like WAV recordings one at a time.
+
+    Each clip is a decaying tone with noise, so deflate behaves roughly as
+    it does on real recordings.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    frames = max(1, (bytes_each - 44) // 2)
+    t = np.arange(frames, dtype=np.float32) / SAMPLE_RATE
+    envelope = np.exp(-3.0 * t / max(t[-1], 1e-3)).astype(np.float32)
+
+    for i in range(count):
+        freq = 100.0 + 200.0 * rng.random()
+        signal = np.sin(2 * np.pi * freq * t) * envelope * 8000
+        signal += rng.normal(0, 300, frames).astype(np.float32)
+        pcm = np.clip(signal, -32768, 32767).astype("<i2").tobytes()
+        yield i, wav_header(len(pcm), SAMPLE_RATE) + pcm
+
+
+def build_store(db_path: str, entry_count: int, audio_bytes: int) -> None:
+    """
+    Create a synthetic wordlist database.
+
+    Audio is spread evenly across all entries; 0 audio_bytes gives a
+    text-only wordlist.
+    """
+    storage = StorageManager(db_path)
+    entries = []
+    for i in range(entry_count):
+        reference = str(i + 1).zfill(4)
+        gloss = f"word {i + 1}"
+        entries.append({
+            "reference": reference,
+            "gloss": gloss,
+            "local_transcription": f"transcription {i + 1}",
+            "audio_filename": generate_audio_filename(reference, gloss) if audio_bytes else None,
+            "recorded_at": "2024-01-01T00:00:00Z" if audio_bytes else None,
+            "is_completed": True
+        })
+    storage.add_entries(entries)
+
+    if audio_bytes and entry_count:
+        clips = synthetic_audio(entry_count, audio_bytes // entry_count)
+        storage.save_audio_many(
+            (entries[i]["audio_filename"], data) for i, data in clips
+        )
+
+
+def _peak_rss_bytes():
+    """Peak resident set size of this process, or None if unavailable."""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _export(db_path: str, policy: str, out_dir: str) -> Dict[str, Any]:
+    """Export the store once; returns the summary and timings."""
+    start = time.perf_counter()
+
+    storage = StorageManager(db_path)
+    entries = storage.get_all_entries()
+    entries.sort(key=lambda e: parse_reference_numeric(e.get("reference", "0")))
+
+    t0 = time.perf_counter()
+    generate_xml_utf16le(entries)
+    xml_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    generate_metadata_json(entries)
+    metadata_seconds = time.perf_counter() - t0
+
+    # Recordings are loaded one at a time, as in app.operations.export_archive
+    audio_data = [{"filename": f} for f in storage.get_audio_filenames()]
+    consent_records = storage.get_all_consent_records()
+    dest = os.path.join(out_dir, f"export_{policy}.zip")
+    result = create_export_zip(
+        entries, audio_data, consent_records, dest,
+        compression=policy, load_audio=storage.get_audio
+    )
+    wall = time.perf_counter() - start
+
+    if not result["success"]:
+        raise RuntimeError(result["error"])
+    output_bytes = os.path.getsize(dest)
+    os.remove(dest)
+    return {
+        "wall_seconds": wall,
+        "xml_seconds": xml_seconds,
+        "metadata_seconds": metadata_seconds,
+        "output_bytes": output_bytes
+    }
+
+
+def _run_case(db_path: str, policy: str, out_dir: str, queue) -> None:
+    """Run one export in a child process and report metrics through queue."""
+    try:
+        # Timings come from a pass without tracemalloc, which slows
+        # allocation-heavy code; a second pass measures traced memory
+        timed = _export(db_path, policy, out_dir)
+
+        tracemalloc.start()
+        _export(db_path, policy, out_dir)
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        queue.put({
+            "wall_seconds": round(timed["wall_seconds"], 4),
+            "xml_seconds": round(timed["xml_seconds"], 4),
+            "metadata_seconds": round(timed["metadata_seconds"], 4),
+            "peak_rss_bytes": _peak_rss_bytes(),
+            "tracemalloc_peak_bytes": traced_peak,
+            "output_bytes": timed["output_bytes"],
+            "error": None
+        })
+    except Exception as e:
+        queue.put({"error": str(e)})
+
+
+def run_case(db_path: str, policy: str, out_dir: str) -> Dict[str, Any]:
+    """Run one benchmark case in a fresh interpreter."""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_case, args=(db_path, policy, out_dir, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def run_benchmarks(
+    entry_counts: List[int],
+    audio_mbs: List[float],
+    policies: List[str],
+    work_dir: str = None
+) -> Dict[str, Any]:
+    """
+    Run the full benchmark matrix.
+
+    Returns:
+        Results dict ready to be written as JSON
+    """
+    work_dir = tempfile.mkdtemp(prefix="bench_export_", dir=work_dir)
+    results = []
+
+    try:
+        for entry_count in entry_counts:
+            for audio_mb in audio_mbs:
+                audio_bytes = int(audio_mb * 1024 * 1024)
+                db_path = os.path.join(work_dir, f"store_{entry_count}_{audio_bytes}.db")
+                print(f"Building store: {entry_count} entries, {audio_mb} MB audio")
+                build_store(db_path, entry_count, audio_bytes)
+
+                for policy in policies:
+                    metrics = run_case(db_path, policy, work_dir)
+                    case = {"entries": entry_count, "audio_bytes": audio_bytes, "policy": policy}
+                    case.update(metrics)
+                    results.append(case)
+                    print(f"  {policy:8s} {json.dumps(metrics)}")
+
+                os.remove(db_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "generatedAt": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+
+def compare_to_baseline(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.2
+) -> List[Dict[str, Any]]:
+    """
+    Find metrics that got worse than the baseline by more than tolerance.
+
+    Cases are matched on entries, audio_bytes and policy.
+
+    Returns:
+        List of regression dicts (empty if none)
+    """
+    def key(case):
+        return (case["entries"], case["audio_bytes"], case["policy"])
+
+    base_cases = {key(c): c for c in baseline.get("results", [])}
+    regressions = []
+
+    for case in current.get("results", []):
+        base = base_cases.get(key(case))
+        if not base:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = base.get(metric), case.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append({
+                    "entries": case["entries"],
+                    "audio_bytes": case["audio_bytes"],
+                    "policy": case["policy"],
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new
+                })
+
+    return regressions
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(x) for x in text.split(",") if x]
+
+
+def _float_list(text: str) -> List[float]:
+    return [float(x) for x in text.split(",") if x]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the export path")
+    parser.add_argument("--entries", type=_int_list, default=[1000, 10000],
+                        help="Comma-separated entry counts (default: 1000,10000)")
+    parser.add_argument("--audio-mb", type=_float_list, default=[0, 100],
+                        help="Comma-separated total audio sizes in MB (default: 0,100)")
+    parser.add_argument("--policies", default=",".join(COMPRESSION_POLICIES),
+                        help="Comma-separated compression policies")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed fractional regression (default: 0.2)")
+    parser.add_argument("--work-dir", help="Directory for temporary stores")
+    args = parser.parse_args(argv)
+
+    policies = [p for p in args.policies.split(",") if p]
+    unknown = [p for p in policies if p not in COMPRESSION_POLICIES]
+    if unknown:
+        parser.error(f"Unknown compression policy: {unknown[0]}")
+
+    results = run_benchmarks(args.entries, args.audio_mb, policies, args.work_dir)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['policy']} entries={r['entries']} audio={r['audio_bytes']}: "
+                  f"{r['metric']} {r['baseline']} -> {r['current']}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
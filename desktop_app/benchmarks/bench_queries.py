@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+SQLite query benchmark.
+
+Builds synthetic wordlists of each size and replays a typical elicitation
+session against them with statement tracing enabled: loading all entries,
+then per entry a lookup, a batched transcription and position save, the
+four progress counts and a change-feed sync. Reports connection overhead
+and the statements that take the most total time, with their query plans.
+
+Run from the desktop_app directory:
+    python -m benchmarks.bench_queries --entries 1000,10000 --steps 200
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, Any, List
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.storage import StorageManager
+from app.query_trace import QueryTracer
+
+from benchmarks.bench_export import build_store
+
+
+def replay_session(storage: StorageManager, steps: int) -> None:
+    """Run the storage calls the UI makes while stepping through entries."""
+    entries = storage.get_all_entries()
+    version = storage.get_data_version()
+    for i in range(min(steps, len(entries))):
+        entry = storage.get_entry(entries[i]["id"])
+        storage.apply_writes({entry["id"]: f"edited {i}"}, {"last_position": str(i)})
+        storage.get_total_count()
+        storage.get_completed_count()
+        storage.get_with_audio_count()
+        storage.get_with_transcription_count()
+        storage.get_entries_changed_since(version)
+        version = storage.get_data_version()
+
+
+def run_case(entry_count: int, steps: int, top: int, slow_ms: float) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "bench.db")
+        build_store(db_path, entry_count, 0)
+
+        tracer = QueryTracer(enabled=True, slow_ms=slow_ms)
+        storage = StorageManager(db_path, tracer=tracer)
+        tracer.reset()
+        replay_session(storage, steps)
+        report = tracer.report(top)
+
+    report.pop("since")
+    report["entries"] = entry_count
+    report["steps"] = steps
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SQLite statements of a session")
+    parser.add_argument("--entries", default="1000,10000",
+                        help="Comma-separated wordlist sizes (default: 1000,10000)")
+    parser.add_argument("--steps", type=int, default=200,
+                        help="Entries stepped through per session (default: 200)")
+    parser.add_argument("--top", type=int, default=8, help="Statements to list (default: 8)")
+    parser.add_argument("--slow-ms", type=float, default=20.0,
+                        help="Slow-query threshold in ms (default: 20)")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args(argv)
+
+    cases: List[Dict[str, Any]] = []
+    for count in (int(n) for n in args.entries.split(",") if n.strip()):
+        report = run_case(count, args.steps, args.top, args.slow_ms)
+        cases.append(report)
+
+        conns = report["connections"]
+        print(f"\n{count} entries, {args.steps} steps: {conns['count']} connections, "
+              f"{conns['total_ms']:.1f} ms connecting ({conns['avg_ms']:.3f} ms each), "
+              f"{report['slow']['count']} slow statements")
+        for s in report["statements"]:
+            print(f"  {s['total_ms']:9.1f} ms {s['share'] * 100:5.1f}%  {s['calls']:6d} calls  "
+                  f"p95 {s['p95_ms']:7.3f} ms  {s['sql'][:60]}")
+            for line in s["plan"] or []:
+                print(f"{'':30}{line}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                "generatedAt": datetime.utcnow().isoformat() + "Z",
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cases": cases
+            }, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
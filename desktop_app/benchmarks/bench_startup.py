@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Startup time benchmark.
+
+Each measurement runs in a fresh interpreter:
+
+- an import-time breakdown of `import main` (python -X importtime),
+  listing the slowest modules by cumulative time;
+- time to a ready WordlistAPI, for a new database and for a database
+  whose schema is already current, plus which heavy optional modules
+  were imported along the way;
+- time to the first loaded window, when pywebview is installed.
+
+Run from the desktop_app directory:
+    python -m benchmarks.bench_startup --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from app.lazy import module_available
+
+# Modules that should only be imported once audio is used
+HEAVY_MODULES = ("numpy", "sounddevice", "pyaudio", "soundfile", "webview")
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+_API_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+api = main.WordlistAPI()
+ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "api_ms": (ready - imported) * 1000,
+    "total_ms": (ready - start) * 1000,
+    "heavy_modules": [m for m in %r if m in sys.modules]
+}))
+api.shutdown()
+""" % (HEAVY_MODULES,)
+
+
+def _env(home: str) -> Dict[str, str]:
+    # A private home directory keeps the benchmark away from the real database
+    env = dict(os.environ, HOME=home, USERPROFILE=home)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+
+def import_breakdown(home: str, top: int) -> Dict[str, Any]:
+    """Parse `python -X importtime -c 'import main'` into the slowest modules."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=APP_DIR, env=_env(home), capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, name = match.groups()
+            modules.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000
+            })
+    total = sum(m["self_ms"] for m in modules)
+    slowest = sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:top]
+    return {"total_ms": round(total, 1), "modules": len(modules), "slowest": slowest}
+
+
+def time_api(home: str) -> Dict[str, Any]:
+    proc = subprocess.run(
+        [sys.executable, "-c", _API_SCRIPT],
+        cwd=APP_DIR, env=_env(home), capture_output=True, text=True, check=True
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def time_window(home: str, timeout: float = 60.0) -> Optional[Dict[str, Any]]:
+    """Launch the app and wait for its startup report; None without pywebview."""
+    if not module_available("webview"):
+        return None
+    env = _env(home)
+    env["WORDLIST_STARTUP_REPORT"] = "1"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=APP_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    try:
+        for line in proc.stdout:
+            if line.startswith("STARTUP "):
+                report = json.loads(line[len("STARTUP "):])
+                report["wall_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                return report
+            if time.perf_counter() - start > timeout:
+                break
+    finally:
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return None
+
+
+def _median(runs: List[Dict[str, Any]], key: str) -> float:
+    return round(statistics.median(r[key] for r in runs), 1)
+
+
+def run_benchmarks(runs: int, top: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as home:
+        breakdown = import_breakdown(home, top)
+
+        # The first run creates the database; later runs find a current schema
+        first = time_api(home)
+        warm = [time_api(home) for _ in range(runs)]
+        window = [w for w in (time_window(home) for _ in range(runs)) if w]
+
+    return {
+        "generatedAt": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+        "imports": breakdown,
+        "api": {
+            "new_database_ms": round(first["total_ms"], 1),
+            "import_ms": _median(warm, "import_ms"),
+            "construct_ms": _median(warm, "api_ms"),
+            "total_ms": _median(warm, "total_ms"),
+            "heavy_modules_loaded": first["heavy_modules"]
+        },
+        "window": {
+            "api_ms": _median(window, "api_ms"),
+            "first_window_ms": _median(window, "window_ms"),
+            "wall_ms": _median(window, "wall_ms")
+        } if window else None
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark application startup")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement (default: 5)")
+    parser.add_argument("--top", type=int, default=15,
+                        help="Slowest imports to list (default: 15)")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.runs, args.top)
+    imports = results["imports"]
+    print(f"import main: {imports['total_ms']} ms across {imports['modules']} modules")
+    for m in imports["slowest"]:
+        print(f"  {m['cumulative_ms']:8.1f} ms  {m['module']}")
+    api = results["api"]
+    print(f"WordlistAPI ready: {api['total_ms']} ms "
+          f"(import {api['import_ms']} ms, construct {api['construct_ms']} ms; "
+          f"new database {api['new_database_ms']} ms)")
+    print(f"Heavy modules loaded at startup: {', '.join(api['heavy_modules_loaded']) or 'none'}")
+    if results["window"]:
+        print(f"First window: {results['window']['first_window_ms']} ms")
+    else:
+        print("First window: skipped (pywebview not installed)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
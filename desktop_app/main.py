@@ -5,22 +5,53 @@ Wordlist Elicitation Tool - Desktop Application
 A pywebview-based desktop application for linguistic fieldwork.
 Run with: python desktop_app/main.py
 """
+import json
 import os
+import sqlite3
 import sys
+import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
-import webview
+_module_start = time.perf_counter()
 
 # Add app directory to path
 app_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, app_dir)
 
-from app.storage import StorageManager
-from app.xml_io import parse_wordlist_from_bytes, parse_wordlist, generate_xml_utf16le
-from app.audio import AudioRecorder
-from app.export_zip import create_export_zip, get_export_stats
-from app.utils import generate_audio_filename, normalize_reference, parse_reference_numeric
+from app.lazy import LazyModule
+
+# GUI toolkit, imported when the window is created
+webview = LazyModule("webview")
+
+from app.projects import ProjectManager
+from app.xml_io import parse_wordlist, generate_xml_utf16le
+from app.audio import AudioRecorder, find_partial_recordings, recover_partial_wav, available_codecs
+from app.audio_devices import get_device_manager
+from app.audio_backends import default_backend
+from app.audio_processing import (
+    process_recording, convert_wav_rate,
+    NUMPY_AVAILABLE as PROCESSING_AVAILABLE
+)
+from app.waveform import WaveformBackfill, store_waveform, unpack_peaks, select_level, PEAK_SCALE
+from app.playback import PcmCache, PlaybackEngine, Prefetcher, decode_wav
+from app.write_behind import WriteBehindQueue
+from app.jobs import (
+    JobScheduler, JobCancelled, check_cancelled, report_progress, JOB_QUEUED, JOB_RUNNING
+)
+from app.media_server import MediaServer
+from app.pictures import PictureCache
+from app.perf import PerfRecorder, instrument, PERF_ENV, PERF_DUMP_ENV
+from app.query_trace import tracer_from_env
+from app.operations import (
+    load_sorted_entries, get_progress, import_wordlist_file, import_wordlist_url,
+    export_archive, export_sample_rate
+)
+from app.export_zip import get_export_stats
+from app.integrity import verify_export_zip
+from app.import_zip import import_from_zip
+from app.merge import merge_exports
+from app.utils import generate_audio_filename, normalize_reference
 
 
 class WordlistAPI:
@@ -31,49 +62,232 @@ class WordlistAPI:
     """
     
     def __init__(self):
-        self.storage = StorageManager()
-        self.audio_recorder = AudioRecorder()
+        # Each wordlist project has its own database; self.storage is the active one
+        self.projects = ProjectManager(tracer=tracer_from_env())
+        self.storage = self.projects.active_storage()
+        
+        # Long operations submitted with submit_job; updates are pushed to the UI.
+        # Storage writes made outside jobs hold jobs.storage_lock, so they wait
+        # for a running import or export instead of hitting a locked database
+        self._window = None
+        self.jobs = JobScheduler(notify=self._notify_job)
+        
+        # Transcription and position saves are batched off the navigation path
+        self.writes = WriteBehindQueue(self.storage, storage_lock=self.jobs.storage_lock)
+        # One backend shared by recording and playback
+        backend = default_backend()
+        self.audio_recorder = AudioRecorder(
+            spill_dir=os.path.join(self.projects.app_dir, "recordings"),
+            sample_rate=self._capture_sample_rate(),
+            backend=backend
+        )
         self._current_recording_entry_id: Optional[int] = None
+        
+        # Decoded recordings for instant replay, filled on play and by prefetch
+        self.pcm_cache = PcmCache()
+        self.playback = PlaybackEngine(backend=backend)
+        self.prefetcher = Prefetcher(self.pcm_cache, lambda filename: self.storage.get_audio(filename))
+        
+        # Compute peak summaries for recordings saved before waveforms existed
+        self.waveform_backfill = WaveformBackfill(self.storage)
+        self.waveform_backfill.start()
+        
+        # Downscaled pictures, shared by all projects (keys include the source path)
+        self.pictures = PictureCache(os.path.join(self.projects.app_dir, "picture_cache"))
+        
+        # Recordings and pictures over localhost HTTP; relative picture
+        # paths resolve as in app.pictures.picture_roots
+        self.media_server = MediaServer(self.storage, pictures=self.pictures)
+        try:
+            self.media_server.start()
+        except OSError as e:
+            print(f"Media server unavailable: {e}")
+        
+        # Per-method latency statistics; wrappers do nothing until enabled
+        self.perf = PerfRecorder(enabled=bool(os.environ.get(PERF_ENV) or os.environ.get(PERF_DUMP_ENV)))
+        instrument(self, self.perf, exclude=("get_perf_stats", "get_query_stats"))
+    
+    # Methods that may be run as background jobs with submit_job
+    JOB_METHODS = (
+        "import_from_file", "import_from_zip", "import_from_url",
+        "export_zip", "merge_exports", "verify_export",
+        "set_capture_settings", "set_audio_codec"
+    )
+    
+    def set_window(self, window) -> None:
+        """Set the window that receives job notifications."""
+        self._window = window
+    
+    # Project operations
+    def list_projects(self) -> List[Dict[str, Any]]:
+        """
+        List all projects for the project picker.
+        
+        Only the active project's database is read; the others show the
+        statistics cached when they were last open.
+        
+        Returns:
+            List of projects (id, name, active, open, last_opened, stats),
+            most recently opened first
+        """
+        self.writes.flush()
+        self.projects.refresh_stats()
+        return self.projects.list_projects()
+    
+    def create_project(self, name: str, switch: bool = True) -> Dict[str, Any]:
+        """
+        Create a new, empty project.
+        
+        Args:
+            name: Project name, e.g. the language
+            switch: Make it the active project
+            
+        Returns:
+            Dict with success, project and error
+        """
+        try:
+            project = self.projects.create_project(name)
+        except (ValueError, OSError) as e:
+            return {"success": False, "project": None, "error": str(e)}
+        if switch:
+            result = self.switch_project(project["id"])
+            if not result["success"]:
+                return dict(result, project=project)
+        return {"success": True, "project": project, "error": None}
+    
+    def switch_project(self, project_id: str) -> Dict[str, Any]:
+        """
+        Make another project the active one; all later calls use its database.
+        
+        Refused while a recording or a job is running.
+        
+        Args:
+            project_id: ID from list_projects
+            
+        Returns:
+            Dict with success, project_id, media_base_url (changes with
+            every switch) and error
+        """
+        if project_id == self.projects.active_id:
+            return {"success": True, "project_id": project_id,
+                    "media_base_url": self.media_server.base_url, "error": None}
+        if self.audio_recorder.is_recording:
+            return {"success": False, "error": "Stop recording before switching projects"}
+        if any(job.status in (JOB_QUEUED, JOB_RUNNING) for job in self.jobs.jobs()):
+            return {"success": False, "error": "Wait for running jobs before switching projects"}
+        
+        try:
+            storage = self.projects.get_storage(project_id)
+        except (ValueError, OSError, sqlite3.Error) as e:
+            return {"success": False, "error": str(e)}
+        if not self.writes.set_storage(storage):
+            return {"success": False, "error": "Could not save pending changes"}
+        
+        self.projects.set_active(project_id)
+        self.storage = storage
+        self.media_server.set_storage(storage)
+        self.pcm_cache.clear()
+        self.audio_recorder.set_sample_rate(self._capture_sample_rate())
+        # Stops the pass over the previous database before starting on this one
+        self.waveform_backfill.set_storage(storage)
+        return {"success": True, "project_id": project_id,
+                "media_base_url": self.media_server.base_url, "error": None}
+    
+    def rename_project(self, project_id: str, name: str) -> Dict[str, Any]:
+        """Rename a project."""
+        try:
+            self.projects.rename_project(project_id, name)
+            return {"success": True, "error": None}
+        except (ValueError, OSError) as e:
+            return {"success": False, "error": str(e)}
+    
+    def delete_project(self, project_id: str) -> Dict[str, Any]:
+        """Delete a project and its recordings; the active project cannot be deleted."""
+        try:
+            self.projects.delete_project(project_id)
+            return {"success": True, "error": None}
+        except (ValueError, OSError) as e:
+            return {"success": False, "error": str(e)}
+    
+    def get_project_cache_stats(self) -> Dict[str, Any]:
+        """Get the cached projects and hit/miss counts of the StorageManager LRU."""
+        return self.projects.cache_stats()
     
     # Entry operations
     def load_entries(self) -> List[Dict[str, Any]]:
         """Load all entries sorted by numeric reference."""
-        entries = self.storage.get_all_entries()
-        # Sort by numeric reference
-        entries.sort(key=lambda e: parse_reference_numeric(e.get("reference", "0")))
-        return entries
+        self.writes.flush()
+        return load_sorted_entries(self.storage)
+    
+    def get_data_version(self) -> int:
+        """Get the current data version, to pass to get_changes_since later."""
+        return self.storage.get_data_version()
+    
+    def get_changes_since(self, version: int) -> Dict[str, Any]:
+        """
+        Get the entries changed since a data version.
+        
+        Lets the UI patch its local entry list instead of reloading it.
+        Entries are only ever deleted all at once (on import), which is
+        reported as a reset; the UI then reloads with load_entries().
+        
+        Args:
+            version: Data version the caller's copy of the entries reflects
+            
+        Returns:
+            Dict with the new 'version', 'reset' flag, 'changed' entries
+            and 'progress' counters
+        """
+        self.writes.flush()
+        current = self.storage.get_data_version()
+        reset = self.storage.get_reset_version() > version
+        changed = []
+        if not reset and current > version:
+            changed = self.storage.get_entries_changed_since(version)
+        return {
+            "version": current,
+            "reset": reset,
+            "changed": changed,
+            "progress": self.get_progress()
+        }
     
     def import_from_file(self, path: str) -> Dict[str, Any]:
         """
         Import wordlist from a local XML file.
         
+        ZIP files are restored with import_from_zip.
+        
         Args:
             path: Path to XML file
             
         Returns:
             ImportSummary with count and status
         """
-        try:
-            with open(path, 'rb') as f:
-                data = f.read()
-            
-            entries = parse_wordlist_from_bytes(data)
-            
-            if not entries:
-                return {"success": False, "error": "No entries found in file", "count": 0}
-            
-            # Clear existing entries and audio
-            self.storage.delete_all_entries()
-            self.storage.delete_all_audio()
-            
-            # Add new entries
-            for entry in entries:
-                self.storage.add_entry(entry)
-            
-            return {"success": True, "count": len(entries), "error": None}
+        if path.lower().endswith(".zip"):
+            return self.import_from_zip(path)
         
-        except Exception as e:
-            return {"success": False, "error": str(e), "count": 0}
+        self.writes.flush()
+        result = import_wordlist_file(self.storage, path)
+        if result["success"]:
+            self.pcm_cache.clear()
+        return result
+    
+    def import_from_zip(self, path: str) -> Dict[str, Any]:
+        """
+        Restore an export ZIP, including audio and consent log.
+        
+        Args:
+            path: Path to export ZIP
+            
+        Returns:
+            ImportSummary with count, audio counts and status
+        """
+        self.writes.flush()
+        self.pcm_cache.clear()
+        result = import_from_zip(path, self.storage)
+        if result["success"]:
+            self.waveform_backfill.start()
+        return result
     
     def import_from_url(self, url: str) -> Dict[str, Any]:
         """
@@ -85,59 +299,224 @@ class WordlistAPI:
         Returns:
             ImportSummary with count and status
         """
-        try:
-            import urllib.request
-            import ssl
-            
-            # Use default SSL context with certificate verification
-            # Only disable verification for localhost (development)
-            if url.startswith('http://localhost') or url.startswith('http://127.0.0.1'):
-                # Allow HTTP for localhost
-                ctx = None
-            else:
-                # Use secure defaults for all other URLs
-                ctx = ssl.create_default_context()
-            
-            with urllib.request.urlopen(url, timeout=30, context=ctx) as response:
-                data = response.read()
-            
-            entries = parse_wordlist_from_bytes(data)
-            
-            if not entries:
-                return {"success": False, "error": "No entries found at URL", "count": 0}
-            
-            # Clear existing entries and audio
-            self.storage.delete_all_entries()
-            self.storage.delete_all_audio()
-            
-            # Add new entries
-            for entry in entries:
-                self.storage.add_entry(entry)
+        self.writes.flush()
+        result = import_wordlist_url(self.storage, url)
+        if result["success"]:
+            self.pcm_cache.clear()
+        return result
+    
+    def save_transcription(self, entry_id: int, text: str) -> bool:
+        """
+        Save transcription for an entry.
+        
+        The save is queued and written shortly afterwards together with
+        other pending saves, so this never waits for the disk.
+        
+        Returns:
+            True once the save is queued
+        """
+        self.writes.set_transcription(entry_id, text)
+        return True
+    
+    # Job operations
+    def submit_job(self, method: str, kwargs: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Run a long API method in the background.
+        
+        Progress and completion are pushed to window.onJobUpdate(job) in
+        the UI and can also be polled with get_job.
+        
+        Args:
+            method: Name of one of JOB_METHODS
+            kwargs: Keyword arguments for the method
             
-            return {"success": True, "count": len(entries), "error": None}
+        Returns:
+            Dict with 'success', 'job_id' and 'error'
+        """
+        if method not in self.JOB_METHODS:
+            return {"success": False, "job_id": None, "error": f"Not a job method: {method}"}
+        func = getattr(self, method)
+        kwargs = kwargs or {}
+        try:
+            job = self.jobs.submit(method, lambda: func(**kwargs))
+        except RuntimeError as e:
+            return {"success": False, "job_id": None, "error": str(e)}
+        return {"success": True, "job_id": job.id, "error": None}
+    
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the state of a job.
         
-        except Exception as e:
-            return {"success": False, "error": str(e), "count": 0}
+        Returns:
+            Dict with id, name, status ('queued', 'running', 'done',
+            'failed' or 'cancelled'), progress (0-1 or None), result and
+            error, or None for an unknown job
+        """
+        job = self.jobs.get(job_id)
+        return job.to_dict() if job else None
     
-    def save_transcription(self, entry_id: int, text: str) -> bool:
-        """Save transcription for an entry."""
-        entry = self.storage.get_entry(entry_id)
-        if not entry:
-            return False
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """Get the state of all queued, running and recently finished jobs."""
+        return [job.to_dict() for job in self.jobs.jobs()]
+    
+    def cancel_job(self, job_id: str) -> bool:
+        """
+        Cancel a job.
+        
+        Queued jobs never start. Running exports and resampling stop
+        between recordings; imports run to completion once started.
+        
+        Returns:
+            False if the job is unknown or already finished
+        """
+        return self.jobs.cancel(job_id)
+    
+    def _notify_job(self, job: Dict[str, Any]) -> None:
+        if self._window is None:
+            return
+        payload = json.dumps(job, default=str)
+        self._window.evaluate_js(f"window.onJobUpdate && window.onJobUpdate({payload})")
+    
+    def get_media_base_url(self) -> Optional[str]:
+        """
+        Get the base URL of the local media server.
+        
+        Recordings are at <base>/audio/<filename> and entry pictures at
+        <base>/picture/<entry_id>, with ?size=thumb or ?size=display for a
+        downscaled copy. None if the server could not start.
+        """
+        return self.media_server.base_url
+    
+    # Instrumentation
+    def get_perf_stats(self) -> Dict[str, Any]:
+        """
+        Get per-method call statistics of this API.
+        
+        Returns:
+            Dict with 'enabled', 'since' and 'methods', mapping each called
+            method to calls, errors, p50/p95/p99 latency and payload sizes
+        """
+        return self.perf.snapshot()
+    
+    def set_perf_enabled(self, enabled: bool, reset: bool = False) -> bool:
+        """
+        Turn API call recording on or off.
         
-        entry["local_transcription"] = text
-        entry["is_completed"] = bool(text.strip()) or bool(entry.get("audio_filename"))
-        return self.storage.update_entry(entry)
+        Args:
+            enabled: Record calls from now on
+            reset: Discard the statistics recorded so far
+        """
+        if reset:
+            self.perf.reset()
+        self.perf.enabled = bool(enabled)
+        return self.perf.enabled
+    
+    def get_query_stats(self, top: int = None) -> Dict[str, Any]:
+        """
+        Get per-statement SQLite timings of the database.
+        
+        Args:
+            top: Only list this many statements, slowest in total first
+            
+        Returns:
+            Dict with 'enabled', 'connections', 'statements' (calls, rows,
+            latency, share of statement time and query plan) and 'slow'
+        """
+        return self.storage.tracer.report(top)
+    
+    def set_query_tracing(self, enabled: bool, reset: bool = False) -> bool:
+        """
+        Turn SQLite statement timing on or off.
+        
+        Args:
+            enabled: Trace connections opened from now on
+            reset: Discard the statistics recorded so far
+        """
+        if reset:
+            self.storage.tracer.reset()
+        self.storage.tracer.enabled = bool(enabled)
+        return self.storage.tracer.enabled
+    
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Get statistics of the write-behind queue."""
+        return self.writes.stats()
+    
+    def shutdown(self) -> None:
+        """Finish running jobs, save pending writes and release audio resources."""
+        self.jobs.shutdown()
+        self.writes.close()
+        self.projects.close()
+        self.media_server.stop()
+        dump_path = os.environ.get(PERF_DUMP_ENV)
+        if dump_path:
+            try:
+                self.perf.dump(dump_path)
+            except OSError as e:
+                print(f"Could not write API statistics: {e}")
+        self.waveform_backfill.stop()
+        self.prefetcher.shutdown()
+        self.pictures.shutdown()
+        self.playback.close()
+        self.audio_recorder.cleanup()
     
     # Audio operations
     def check_audio_support(self) -> Dict[str, Any]:
         """Check if audio recording is supported."""
-        return AudioRecorder.check_audio_support()
+        return self.audio_recorder.check_audio_support()
     
-    def start_recording(self, entry_id: int) -> bool:
-        """Start recording audio for an entry."""
+    def list_audio_devices(self) -> List[Dict[str, Any]]:
+        """Get cached audio device capabilities."""
+        return get_device_manager().devices()
+    
+    def refresh_audio_devices(self) -> Dict[str, Any]:
+        """Rescan audio devices (e.g. after plugging in a microphone)."""
+        # Like the automatic rescan of a stale device list, this closes the
+        # output stream if idle and is skipped while audio is playing
+        get_device_manager().refresh()
+        return self.audio_recorder.check_audio_support()
+    
+    def _preroll_ms(self) -> int:
+        return int(self.storage.get_setting("preroll_ms", "500"))
+    
+    def start_monitoring(self, preroll_ms: int = None) -> bool:
+        """
+        Open the warm input stream used while the elicitation screen is shown.
+        
+        The stream is optional: with a pre-roll of 0 it is not opened (and
+        a running one is closed), and recordings open their own stream.
+        
+        Args:
+            preroll_ms: Pre-roll length; defaults to the 'preroll_ms' setting (500)
+            
+        Returns:
+            True if the warm stream is running
+        """
+        if preroll_ms is None:
+            preroll_ms = self._preroll_ms()
+        if preroll_ms <= 0:
+            self.audio_recorder.stop_monitoring()
+            return False
+        return self.audio_recorder.start_monitoring(preroll_ms)
+    
+    def stop_monitoring(self) -> None:
+        """Close the warm input stream."""
+        self.audio_recorder.stop_monitoring()
+    
+    def get_record_start_latency(self) -> Dict[str, Any]:
+        """Get start latency and pre-roll of the last recording."""
+        return self.audio_recorder.get_start_latency()
+    
+    def start_recording(self, entry_id: int, long_recording: bool = False) -> bool:
+        """
+        Start recording audio for an entry.
+        
+        Args:
+            entry_id: Entry being recorded
+            long_recording: Stream to disk instead of RAM (consent
+                statements, texts, narratives)
+        """
         self._current_recording_entry_id = entry_id
-        return self.audio_recorder.start_recording()
+        return self.audio_recorder.start_recording(spill_to_disk=long_recording)
     
     def stop_recording(self, entry_id: int) -> Dict[str, Any]:
         """
@@ -146,68 +525,458 @@ class WordlistAPI:
         Returns:
             Dict with filename or error
         """
-        wav_data = self.audio_recorder.stop_recording()
+        wav_path = None
+        if self.audio_recorder.recording_to_disk:
+            wav_path = self.audio_recorder.stop_recording_to_file()
+            wav_data = None
+        else:
+            wav_data = self.audio_recorder.stop_recording()
         
-        if not wav_data:
+        if not wav_data and not wav_path:
             return {"success": False, "error": "No audio data recorded", "filename": None}
         
-        entry = self.storage.get_entry(entry_id)
-        if not entry:
-            return {"success": False, "error": "Entry not found", "filename": None}
+        with self.jobs.storage_lock:
+            self.writes.flush()
+            entry = self.storage.get_entry(entry_id)
+            if not entry:
+                # Leave disk recordings in place so they can be recovered
+                return {"success": False, "error": "Entry not found", "filename": None}
+            
+            # Generate filename
+            filename = generate_audio_filename(entry["reference"], entry["gloss"])
+            processing = self._store_recording(filename, wav_data, wav_path)
+            
+            # Update entry
+            entry["audio_filename"] = filename
+            entry["recorded_at"] = datetime.utcnow().isoformat() + "Z"
+            entry["is_completed"] = True
+            self.storage.update_entry(entry)
         
-        # Generate filename
-        filename = generate_audio_filename(entry["reference"], entry["gloss"])
+        self._current_recording_entry_id = None
         
-        # Save audio
-        self.storage.save_audio(filename, wav_data)
+        return {"success": True, "filename": filename, "processing": processing, "error": None}
+    
+    def _store_recording(self, filename: str, wav_data: Optional[bytes], wav_path: Optional[str]):
+        """
+        Process, encode and store a recording from memory or from a disk capture.
         
-        # Update entry
-        entry["audio_filename"] = filename
-        entry["recorded_at"] = datetime.utcnow().isoformat() + "Z"
-        entry["is_completed"] = True
-        self.storage.update_entry(entry)
+        Disk recordings are streamed into the database only when there is
+        nothing to process; otherwise they are read and stored like
+        in-memory ones. The storage codec applies either way (see
+        StorageManager.save_audio_file).
         
-        self._current_recording_entry_id = None
+        Returns:
+            Processing info (durations) or None
+        """
+        if wav_path and self._processing_enabled(self.get_audio_processing()):
+            with open(wav_path, 'rb') as f:
+                wav_data = f.read()
+        
+        processing = None
+        if wav_data:
+            wav_data, processing = self._process_recording(wav_data)
+            self.storage.save_audio(filename, wav_data)
+            store_waveform(self.storage, filename, wav_data)
+        else:
+            self.storage.save_audio_file(filename, wav_path)
+            self.storage.delete_waveform(filename)
+            self.waveform_backfill.start()
+        if wav_path:
+            os.remove(wav_path)
+        self.pcm_cache.invalidate(filename)
+        if processing:
+            self.storage.save_audio_info(filename, processing)
+        return processing
+    
+    @staticmethod
+    def _processing_enabled(settings: Dict[str, Any]) -> bool:
+        return PROCESSING_AVAILABLE and (settings["trim_silence"] or settings["normalize"])
+    
+    def _process_recording(self, wav_data: bytes):
+        """Apply the configured silence trimming and normalization."""
+        settings = self.get_audio_processing()
+        if not self._processing_enabled(settings):
+            return wav_data, None
+        try:
+            return process_recording(
+                wav_data,
+                trim=settings["trim_silence"],
+                normalize=settings["normalize"],
+                threshold_db=settings["threshold_db"],
+                padding_ms=settings["padding_ms"]
+            )
+        except ValueError as e:
+            print(f"Audio processing error: {e}")
+            return wav_data, None
+    
+    def get_audio_processing(self) -> Dict[str, Any]:
+        """Get the post-recording processing settings."""
+        return {
+            "trim_silence": self.storage.get_setting("trim_silence", "0") == "1",
+            "normalize": self.storage.get_setting("normalize_audio", "0") == "1",
+            "padding_ms": int(self.storage.get_setting("trim_padding_ms", "150")),
+            "threshold_db": float(self.storage.get_setting("silence_threshold_db", "-45"))
+        }
+    
+    def set_audio_processing(
+        self,
+        trim_silence: bool = None,
+        normalize: bool = None,
+        padding_ms: int = None,
+        threshold_db: float = None
+    ) -> Dict[str, Any]:
+        """
+        Configure processing applied to new recordings before they are saved.
+        
+        Args:
+            trim_silence: Trim leading and trailing silence
+            normalize: Peak-normalize to -1 dBFS
+            padding_ms: Silence kept around the trimmed sound
+            threshold_db: Silence threshold in dBFS
+            
+        Returns:
+            The updated settings
+        """
+        with self.jobs.storage_lock:
+            if trim_silence is not None:
+                self.storage.set_setting("trim_silence", "1" if trim_silence else "0")
+            if normalize is not None:
+                self.storage.set_setting("normalize_audio", "1" if normalize else "0")
+            if padding_ms is not None:
+                self.storage.set_setting("trim_padding_ms", str(int(padding_ms)))
+            if threshold_db is not None:
+                self.storage.set_setting("silence_threshold_db", str(float(threshold_db)))
+        return self.get_audio_processing()
+    
+    def _capture_sample_rate(self) -> int:
+        rate = int(self.storage.get_setting("capture_sample_rate", str(AudioRecorder.SAMPLE_RATE)))
+        return rate if rate in AudioRecorder.SUPPORTED_SAMPLE_RATES else AudioRecorder.SAMPLE_RATE
+    
+    def get_capture_settings(self) -> Dict[str, Any]:
+        """Get the capture sample rate, pre-roll and the sample rate used for exports."""
+        return {
+            "sample_rate": self.audio_recorder.sample_rate,
+            "preroll_ms": self._preroll_ms(),
+            "export_sample_rate": export_sample_rate(self.storage),
+            "supported_sample_rates": list(AudioRecorder.SUPPORTED_SAMPLE_RATES)
+        }
+    
+    def set_capture_settings(
+        self,
+        sample_rate: int = None,
+        export_sample_rate: int = None,
+        convert_existing: bool = False,
+        preroll_ms: int = None
+    ) -> Dict[str, Any]:
+        """
+        Configure the project's capture and export sample rates and pre-roll.
+        
+        Args:
+            sample_rate: Capture rate for new recordings
+            export_sample_rate: Rate recordings are converted to on export;
+                0 exports them at the rate they were recorded
+            convert_existing: Resample stored recordings to sample_rate
+            preroll_ms: Audio kept from before record start by the warm
+                input stream; 0 turns the stream off and closes it
+            
+        Returns:
+            Dict with success, converted count and error
+        """
+        try:
+            with self.jobs.storage_lock:
+                if sample_rate is not None:
+                    sample_rate = int(sample_rate)
+                    if not self.audio_recorder.set_sample_rate(sample_rate):
+                        raise ValueError(f"Cannot switch to {sample_rate} Hz now")
+                    self.storage.set_setting("capture_sample_rate", str(sample_rate))
+                if export_sample_rate is not None:
+                    export_sample_rate = int(export_sample_rate)
+                    if export_sample_rate and export_sample_rate not in AudioRecorder.SUPPORTED_SAMPLE_RATES:
+                        raise ValueError(f"Unsupported sample rate: {export_sample_rate}")
+                    self.storage.set_setting("export_sample_rate", str(export_sample_rate or ""))
+                if preroll_ms is not None:
+                    preroll_ms = max(0, int(preroll_ms))
+                    self.storage.set_setting("preroll_ms", str(preroll_ms))
+                    if self.audio_recorder.is_monitoring:
+                        # Reopen with the new length, or close it when turned off
+                        self.audio_recorder.stop_monitoring()
+                        self.start_monitoring(preroll_ms)
+                
+                converted = 0
+                if convert_existing:
+                    converted = self._resample_stored_audio(self.audio_recorder.sample_rate)
+            return {"success": True, "converted": converted, "error": None}
+        except JobCancelled:
+            raise
+        except Exception as e:
+            return {"success": False, "converted": 0, "error": str(e)}
+    
+    def _resample_stored_audio(self, sample_rate: int) -> int:
+        """Resample stored recordings that are not at sample_rate, one at a time."""
+        if not PROCESSING_AVAILABLE:
+            return 0
+        converted = 0
+        audio_sizes = self.storage.get_audio_sizes()
+        for i, audio in enumerate(audio_sizes):
+            # Each recording is saved on its own, so stopping here is safe
+            check_cancelled()
+            report_progress(i, len(audio_sizes))
+            if audio["sample_rate"] in (None, sample_rate):
+                continue
+            filename = audio["filename"]
+            try:
+                wav_data = convert_wav_rate(self.storage.get_audio(filename), sample_rate)
+            except ValueError:
+                continue
+            self.storage.save_audio(filename, wav_data)
+            store_waveform(self.storage, filename, wav_data)
+            self.pcm_cache.invalidate(filename)
+            converted += 1
+        return converted
+    
+    def get_audio_storage(self) -> Dict[str, Any]:
+        """Get the storage codec, available codecs and stored audio size."""
+        return {
+            "codec": self.storage.audio_codec,
+            "available": available_codecs(),
+            "stored_bytes": self.storage.get_stored_audio_bytes(),
+            "wav_bytes": sum(a["size"] for a in self.storage.get_audio_sizes())
+        }
+    
+    def set_audio_codec(self, codec: str, recode_existing: bool = False) -> Dict[str, Any]:
+        """
+        Choose how recordings are stored in the database.
+        
+        Exports always contain 16-bit PCM WAV regardless of the codec.
+        
+        Args:
+            codec: 'wav', 'flac' (needs soundfile) or 'delta-zlib'
+            recode_existing: Also re-encode recordings already stored
+            
+        Returns:
+            Dict with success, recoded count and error
+        """
+        try:
+            with self.jobs.storage_lock:
+                self.storage.set_audio_codec(codec)
+                recoded = self.storage.recode_all_audio() if recode_existing else 0
+            return {"success": True, "recoded": recoded, "error": None}
+        except Exception as e:
+            return {"success": False, "recoded": 0, "error": str(e)}
+    
+    def recover_recordings(self) -> List[str]:
+        """
+        Repair disk recordings interrupted by a crash.
         
-        return {"success": True, "filename": filename, "error": None}
+        Returns:
+            Paths of recovered WAV files in the recordings folder
+        """
+        recovered = []
+        for path in find_partial_recordings(self.audio_recorder.spill_dir):
+            fixed = recover_partial_wav(path)
+            if fixed:
+                recovered.append(fixed)
+        return recovered
     
     def play_audio(self, entry_id: int) -> bool:
-        """Play audio for an entry."""
+        """
+        Play audio for an entry.
+        
+        Decoded recordings are cached, and played through a persistent
+        output stream when numpy and an audio backend are available.
+        """
         entry = self.storage.get_entry(entry_id)
         if not entry or not entry.get("audio_filename"):
             return False
         
-        audio_data = self.storage.get_audio(entry["audio_filename"])
-        if not audio_data:
+        filename = entry["audio_filename"]
+        if not self.playback.available():
+            audio_data = self.storage.get_audio(filename)
+            if not audio_data:
+                return False
+            return self.audio_recorder.play_audio(audio_data)
+        
+        decoded = self.pcm_cache.get(filename)
+        if decoded is None:
+            generation = self.pcm_cache.generation
+            audio_data = self.storage.get_audio(filename)
+            if not audio_data:
+                return False
+            try:
+                decoded = decode_wav(audio_data)
+            except ValueError as e:
+                print(f"Playback error: {e}")
+                return False
+            self.pcm_cache.put(filename, decoded, generation)
+        
+        try:
+            return self.playback.play(decoded)
+        except Exception as e:
+            print(f"Playback error: {e}")
+            self.playback.close()
             return False
+    
+    def stop_audio(self) -> None:
+        """Stop playback."""
+        self.playback.stop()
+    
+    def prefetch_audio(self, entry_ids: List[int]) -> None:
+        """
+        Decode recordings of upcoming entries in the background.
+        
+        Args:
+            entry_ids: Entries likely to be played next (e.g. the current,
+                next and previous entries)
+        """
+        if not self.playback.available():
+            return
+        filenames = []
+        for entry_id in entry_ids:
+            entry = self.storage.get_entry(entry_id)
+            if entry and entry.get("audio_filename"):
+                filenames.append(entry["audio_filename"])
+        if filenames:
+            self.prefetcher.prefetch(filenames)
+    
+    def prefetch_pictures(self, entry_ids: List[int], size: str = "display") -> int:
+        """
+        Downscale pictures of upcoming entries in the background.
+        
+        Args:
+            entry_ids: Entries likely to be shown next
+            size: 'thumb' or 'display'
+            
+        Returns:
+            Number of pictures queued for resizing
+        """
+        paths = [self.media_server.picture_path(str(entry_id)) for entry_id in entry_ids]
+        return self.pictures.prefetch([p for p in paths if p], (size,))
+    
+    def get_picture_cache_stats(self) -> Dict[str, Any]:
+        """Get size, hit/miss and render counts of the picture cache."""
+        return self.pictures.stats()
+    
+    def get_waveform(self, entry_id: int, width: int = 512) -> Dict[str, Any]:
+        """
+        Get min/max peaks for drawing an entry's waveform.
+        
+        Args:
+            entry_id: Entry whose recording to draw
+            width: Number of columns (usually the canvas width in pixels)
+            
+        Returns:
+            Dict with 'min' and 'max' lists of values in -128..127,
+            'scale' (int16 sample value per unit) and 'duration' in seconds
+        """
+        entry = self.storage.get_entry(entry_id)
+        if not entry or not entry.get("audio_filename"):
+            return {"success": False, "error": "No recording", "min": [], "max": []}
+        
+        row = self.storage.get_waveform(entry["audio_filename"])
+        if not row:
+            return {"success": False, "error": "Waveform not computed yet", "min": [], "max": []}
         
-        return self.audio_recorder.play_audio(audio_data)
+        mins, maxs = select_level(unpack_peaks(row["levels"], row["peaks"]), max(1, int(width)))
+        return {
+            "success": True,
+            "min": mins.tolist(),
+            "max": maxs.tolist(),
+            "scale": PEAK_SCALE,
+            "duration": row["duration"],
+            "error": None
+        }
+    
+    def get_audio_stats(self) -> Dict[str, Any]:
+        """
+        Get real-time audio instrumentation.
+        
+        Returns:
+            Dict with 'capture' and 'playback' counters (blocks, overflows,
+            underflows, queue depths, callback duration percentiles)
+        """
+        playback = self.playback.stats.snapshot()
+        playback["backend"] = self.playback.backend.name if self.playback.backend else None
+        return {
+            "capture": self.audio_recorder.get_capture_stats(),
+            "playback": playback
+        }
+    
+    def get_playback_stats(self) -> Dict[str, Any]:
+        """Get decoded-audio cache statistics and the last playback start latency."""
+        stats = self.pcm_cache.stats()
+        stats["last_start_latency_ms"] = self.playback.last_latency_ms
+        return stats
     
     # Export operations
-    def export_zip(self, dest_path: str = None) -> Dict[str, Any]:
+    def export_zip(
+        self,
+        dest_path: str = None,
+        dedupe_audio: bool = False,
+        max_volume_bytes: int = None,
+        compression: str = "default"
+    ) -> Dict[str, Any]:
         """
         Export data as ZIP file.
         
+        Recordings are resampled to the export sample rate when one is set
+        (see set_capture_settings).
+        
         Args:
             dest_path: Optional destination path
+            dedupe_audio: Store identical recordings only once; not
+                supported with max_volume_bytes
+            max_volume_bytes: If set, split the export into volumes no
+                larger than this many bytes
+            compression: 'stored', 'fast', 'default' or 'max'
             
         Returns:
             ExportSummary with path and counts
         """
-        entries = self.load_entries()
-        audio_data = self.storage.get_all_audio()
-        consent_records = self.storage.get_all_consent_records()
+        self.writes.flush()
+        return export_archive(
+            self.storage, dest_path,
+            dedupe_audio=dedupe_audio,
+            max_volume_bytes=max_volume_bytes,
+            compression=compression,
+            sample_rate=export_sample_rate(self.storage)
+        )
+    
+    def merge_exports(
+        self,
+        paths: List[str],
+        dest_path: str,
+        policy: str = "latest"
+    ) -> Dict[str, Any]:
+        """
+        Merge export ZIPs from several devices into one archive.
         
-        return create_export_zip(entries, audio_data, consent_records, dest_path)
+        Args:
+            paths: Export ZIPs to merge
+            dest_path: Destination path for the merged ZIP
+            policy: 'latest', 'prefer_audio' or 'keep_all'
+            
+        Returns:
+            MergeSummary with counts and conflicts
+        """
+        return merge_exports(paths, dest_path, policy=policy)
+    
+    def verify_export(self, path: str, quick: bool = False) -> Dict[str, Any]:
+        """
+        Verify an export ZIP against its checksums.json manifest.
+        
+        Args:
+            path: Path to the export ZIP
+            quick: Only compare names and sizes without decompressing
+            
+        Returns:
+            VerifySummary with success flag and problems
+        """
+        return verify_export_zip(path, quick=quick)
     
     def get_progress(self) -> Dict[str, int]:
         """Get progress statistics."""
-        return {
-            "total": self.storage.get_total_count(),
-            "completed": self.storage.get_completed_count(),
-            "withAudio": self.storage.get_with_audio_count(),
-            "transcribed": self.storage.get_with_transcription_count()
-        }
+        self.writes.flush()
+        return get_progress(self.storage)
     
     # Navigation operations
     def list_all_entries(self, filter_text: str = None) -> List[Dict[str, Any]]:
@@ -218,7 +987,8 @@ class WordlistAPI:
             filter_text: Optional text to filter by reference or gloss
             
         Returns:
-            List of entry summaries (id, reference, gloss, is_completed)
+            List of entry summaries (id, reference, gloss, is_completed,
+            picture_filename)
         """
         entries = self.load_entries()
         
@@ -235,7 +1005,8 @@ class WordlistAPI:
                 "id": e["id"],
                 "reference": e["reference"],
                 "gloss": e["gloss"],
-                "is_completed": e.get("is_completed", False)
+                "is_completed": e.get("is_completed", False),
+                "picture_filename": e.get("picture_filename")
             }
             for e in entries
         ]
@@ -266,23 +1037,25 @@ class WordlistAPI:
     
     def get_last_position(self) -> int:
         """Get last saved entry position."""
+        self.writes.flush()
         pos = self.storage.get_setting("last_entry_index", "0")
         return int(pos)
     
     def set_last_position(self, index: int) -> None:
         """Save last entry position."""
-        self.storage.set_setting("last_entry_index", str(index))
+        self.writes.set_setting("last_entry_index", str(index))
     
     def get_entry_by_id(self, entry_id: int) -> Optional[Dict[str, Any]]:
         """Get a single entry by ID."""
+        self.writes.flush()
         return self.storage.get_entry(entry_id)
     
     # File dialog helpers
     def select_import_file(self) -> Optional[str]:
-        """Open file dialog for XML import."""
+        """Open file dialog for XML or export ZIP import."""
         result = webview.windows[0].create_file_dialog(
             webview.OPEN_DIALOG,
-            file_types=('XML Files (*.xml)',)
+            file_types=('XML Files (*.xml)', 'Export Archives (*.zip)')
         )
         if result and len(result) > 0:
             return result[0]
@@ -300,6 +1073,11 @@ class WordlistAPI:
         return None
 
 
+# When set, print startup timings once the page has loaded and exit
+# (used by benchmarks/bench_startup.py)
+STARTUP_REPORT_ENV = "WORDLIST_STARTUP_REPORT"
+
+
 def main():
     """Launch the desktop application."""
     # Get the web directory path
@@ -312,6 +1090,7 @@ def main():
     
     # Create API instance
     api = WordlistAPI()
+    api_ready = time.perf_counter()
     
     # Create window
     window = webview.create_window(
@@ -322,9 +1101,22 @@ def main():
         height=768,
         min_size=(800, 600)
     )
+    api.set_window(window)
+    
+    if os.environ.get(STARTUP_REPORT_ENV):
+        def report_startup():
+            print("STARTUP " + json.dumps({
+                "api_ms": round((api_ready - _module_start) * 1000, 1),
+                "window_ms": round((time.perf_counter() - _module_start) * 1000, 1)
+            }), flush=True)
+            window.destroy()
+        window.events.loaded += report_startup
     
     # Start webview
-    webview.start(debug=False)
+    try:
+        webview.start(debug=False)
+    finally:
+        api.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+"""
+Window API fixture shared by the test modules.
+
+Imported as tests.api_fixtures, like tests.audio_fixtures.
+"""
+import os
+from contextlib import contextmanager
+
+from app.audio_backends import BACKEND_ENV
+from main import WordlistAPI
+
+
+@contextmanager
+def open_api(home: str):
+    """
+    Create a WordlistAPI with its data under home and the fake audio backend.
+
+    Args:
+        home: Directory used as the home directory while the API starts
+
+    Yields:
+        The API; it is shut down on exit
+    """
+    saved_env = {key: os.environ.get(key) for key in ("HOME", BACKEND_ENV)}
+    os.environ["HOME"] = home
+    os.environ[BACKEND_ENV] = "fake"
+    try:
+        api = WordlistAPI()
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    try:
+        yield api
+    finally:
+        api.shutdown()
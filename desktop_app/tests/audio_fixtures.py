@@ -0,0 +1,37 @@
+"""
+Audio fixtures shared by the test modules.
+
+Imported as tests.audio_fixtures: each test module puts the desktop_app
+directory on sys.path, so this works both under pytest and when a test
+file is run directly.
+"""
+import io
+import wave
+from typing import Optional
+
+import numpy as np
+
+
+def make_wav(samples, sample_rate: int = 44100, channels: Optional[int] = None) -> bytes:
+    """
+    Build a 16-bit PCM WAV in memory.
+
+    Args:
+        samples: Sample values; a (frames, channels) array, or a flat
+            sequence (interleaved when channels is more than 1)
+        sample_rate: Frames per second
+        channels: Channel count (default: columns of a 2-D array, else 1)
+
+    Returns:
+        WAV file bytes
+    """
+    samples = np.asarray(samples)
+    if channels is None:
+        channels = samples.shape[1] if samples.ndim == 2 else 1
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.astype('<i2').tobytes())
+    return buffer.getvalue()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Tests for the audio backends and real-time instrumentation.
+
+Tests verify:
+1. StreamStats reports counters and callback percentiles
+2. The fake device records a continuous signal with no dropped blocks
+3. Accelerated fake devices run faster than real time
+4. A slow consumer is reported as input overflows
+5. Playback through the fake output stream plays the exact samples
+6. A stale device list never reinitializes PortAudio under an open output stream
+7. A PyAudio capture that fails still closes its stream
+"""
+import sys
+import os
+import io
+import threading
+import time
+import wave
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import audio_backends
+from app.audio import AudioRecorder
+from app.audio_backends import (
+    StreamStats, FakeBackend, PyAudioBackend, sine_signal, default_backend, BACKEND_ENV
+)
+from app.audio_devices import AudioDeviceManager
+from app.playback import PlaybackEngine, DecodedAudio
+
+
+def test_stream_stats():
+    """Test counters and percentiles."""
+    stats = StreamStats()
+    assert stats.snapshot()["callback_ms_p50"] is None
+
+    for i in range(1, 101):
+        stats.record_block(512, i / 1000)
+    stats.record_overflow()
+    stats.record_queue_depth(3)
+    stats.record_queue_depth(1)
+
+    snap = stats.snapshot()
+    assert snap["blocks"] == 100 and snap["frames"] == 51200
+    assert snap["overflows"] == 1 and snap["underflows"] == 0
+    assert snap["queue_depth"] == 1 and snap["max_queue_depth"] == 3
+    assert snap["callback_ms_p50"] == 51 and snap["callback_ms_p99"] == 100
+    assert snap["callback_ms_max"] == 100
+
+    stats.reset()
+    assert stats.snapshot()["blocks"] == 0
+    print("✓ StreamStats works")
+
+
+def test_fake_recording_continuous():
+    """Test a fake recording matches the signal sample for sample."""
+    rec = AudioRecorder(backend=FakeBackend(speed=0))
+    try:
+        assert rec.check_audio_support()["supported"]
+        assert rec.start_recording()
+        time.sleep(0.05)
+        wav_data = rec.stop_recording()
+    finally:
+        rec.cleanup()
+
+    with wave.open(io.BytesIO(wav_data), 'rb') as wf:
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype='<i2').reshape(-1, 1)
+
+    assert len(samples) > 0
+    expected = sine_signal()(0, len(samples), rec.sample_rate, 1)
+    assert np.array_equal(samples, expected), "blocks dropped or repeated"
+
+    stats = rec.get_capture_stats()
+    assert stats["backend"] == "fake"
+    assert stats["overflows"] == 0
+    assert stats["frames"] >= len(samples)
+    print("✓ Fake recording is continuous")
+
+
+def test_accelerated_speed():
+    """Test speed scales the pace of the fake device."""
+    backend = FakeBackend(speed=20.0, block_size=441)
+    stats = StreamStats()
+    stop = threading.Event()
+    timer = threading.Timer(0.1, stop.set)
+    timer.start()
+    backend.run_input(44100, 1, lambda block: None, stop, stats)
+
+    # 0.1 s at 20x real time is about 2 s of audio (200 blocks)
+    blocks = stats.snapshot()["blocks"]
+    assert 100 < blocks < 300, blocks
+    print("✓ Accelerated fake device works")
+
+
+def test_slow_consumer_overflows():
+    """Test blocks delivered late are counted as overflows."""
+    backend = FakeBackend(block_size=441)
+    stats = StreamStats()
+    stop = threading.Event()
+    timer = threading.Timer(0.2, stop.set)
+    timer.start()
+    # Each 10 ms block takes 25 ms to consume
+    backend.run_input(44100, 1, lambda block: time.sleep(0.025), stop, stats)
+
+    snap = stats.snapshot()
+    assert snap["overflows"] > 0
+    assert snap["callback_ms_p50"] >= 20
+    print("✓ Slow consumer reported as overflows")
+
+
+def test_fake_playback():
+    """Test the engine plays exact samples through the fake output."""
+    backend = FakeBackend(speed=4.0, block_size=256)
+    engine = PlaybackEngine(backend=backend)
+    assert engine.available()
+
+    samples = (np.arange(4410, dtype='<i2') % 1000 + 1).reshape(-1, 1)
+    done = threading.Event()
+    try:
+        engine.play(DecodedAudio(samples, 44100, 1), on_complete=done.set)
+        assert done.wait(2.0)
+    finally:
+        engine.close()
+
+    played = backend.outputs[0].played()
+    start = int(np.flatnonzero(played[:, 0])[0])
+    assert np.array_equal(played[start:start + len(samples)], samples)
+    assert engine.last_latency_ms is not None
+    assert engine.stats.snapshot()["blocks"] >= len(samples) // 256
+    print("✓ Fake playback works")
+
+
+class FakePaStream:
+    def __init__(self):
+        self.closed = False
+
+    def start_stream(self):
+        pass
+
+    def stop_stream(self):
+        pass
+
+    def is_active(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+    def get_read_available(self):
+        return 0
+
+    def read(self, frames, exception_on_overflow=True):
+        # As when the microphone is unplugged mid-recording
+        raise IOError("Stream closed")
+
+
+class FakePyAudio:
+    """Stand-in for pyaudio.PyAudio whose terminate closes every stream, as PortAudio does."""
+
+    paInt16, paOutputUnderflow, paContinue = 8, 4, 0
+
+    def __init__(self):
+        self.streams = []
+        self.terminated = False
+
+    @classmethod
+    def PyAudio(cls):
+        return cls()
+
+    def get_device_count(self):
+        return 1
+
+    def get_device_info_by_index(self, index):
+        return {"name": "speaker", "maxInputChannels": 0, "maxOutputChannels": 2,
+                "defaultSampleRate": 44100.0}
+
+    def get_default_input_device_info(self):
+        raise IOError("no input")
+
+    def get_default_output_device_info(self):
+        return {"index": 0}
+
+    def open(self, **kwargs):
+        self.streams.append(FakePaStream())
+        return self.streams[-1]
+
+    def terminate(self):
+        self.terminated = True
+        for stream in self.streams:
+            stream.close()
+
+
+def test_output_survives_stale_rescan():
+    """Test the output stream holds off device rescans while playing."""
+    saved = audio_backends.pyaudio, audio_backends.get_device_manager
+    from app import audio_devices
+    saved_devices_pyaudio = audio_devices.pyaudio
+    manager = AudioDeviceManager(stale_after=0)
+    manager.backend = "pyaudio"
+    audio_devices.pyaudio = audio_backends.pyaudio = FakePyAudio
+    audio_backends.get_device_manager = lambda: manager
+    try:
+        engine = PlaybackEngine(backend=PyAudioBackend())
+        pa = manager.get_pyaudio()
+        engine.play(DecodedAudio(np.ones((44100, 1), dtype='<i2'), 44100, 1))
+        stream = engine._stream
+
+        # The device list is stale on every access; nothing may be torn down while playing
+        assert manager.devices()
+        assert not pa.terminated and stream.active
+
+        # Once idle, the engine closes the stream itself before the rescan
+        engine.stop()
+        manager.devices()
+        assert pa.terminated and engine._stream is None
+        assert manager._active_streams == 0
+
+        # A stream closed underneath the engine is reopened on the next play
+        engine.play(DecodedAudio(np.ones((10, 1), dtype='<i2'), 44100, 1))
+        engine._stream.stream.close()
+        engine.play(DecodedAudio(np.ones((10, 1), dtype='<i2'), 44100, 1))
+        assert engine._stream.active
+        engine.close()
+        assert manager._active_streams == 0
+    finally:
+        audio_backends.pyaudio, audio_backends.get_device_manager = saved
+        audio_devices.pyaudio = saved_devices_pyaudio
+    print("✓ Output stream survives stale device rescans")
+
+
+def test_input_closed_on_error():
+    """Test a failing PyAudio capture closes its stream and ends its session."""
+    saved = audio_backends.pyaudio, audio_backends.get_device_manager
+    from app import audio_devices
+    saved_devices_pyaudio = audio_devices.pyaudio
+    manager = AudioDeviceManager()
+    manager.backend = "pyaudio"
+    audio_devices.pyaudio = audio_backends.pyaudio = FakePyAudio
+    audio_backends.get_device_manager = lambda: manager
+    try:
+        PyAudioBackend().run_input(44100, 1, lambda block: None, threading.Event(), StreamStats())
+        stream = manager.get_pyaudio().streams[-1]
+        assert stream.closed
+        assert manager._active_streams == 0
+    finally:
+        audio_backends.pyaudio, audio_backends.get_device_manager = saved
+        audio_devices.pyaudio = saved_devices_pyaudio
+    print("✓ Input stream closed after a capture error")
+
+
+def test_backend_env_selection():
+    """Test the environment variable selects the fake backend."""
+    saved = os.environ.get(BACKEND_ENV)
+    os.environ[BACKEND_ENV] = "fake"
+    try:
+        assert default_backend().name == "fake"
+    finally:
+        if saved is None:
+            del os.environ[BACKEND_ENV]
+        else:
+            os.environ[BACKEND_ENV] = saved
+    print("✓ Backend selected from environment")
+
+
+if __name__ == "__main__":
+    print("\n=== Audio Backend Tests ===\n")
+
+    test_stream_stats()
+    test_fake_recording_continuous()
+    test_accelerated_speed()
+    test_slow_consumer_overflows()
+    test_fake_playback()
+    test_output_survives_stale_rescan()
+    test_input_closed_on_error()
+    test_backend_env_selection()
+
+    print("\n✓ All audio backend tests passed!\n")
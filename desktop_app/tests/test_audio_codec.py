@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for the lossless audio storage codecs.
+
+Tests verify:
+1. Delta + zlib and FLAC round-trip samples exactly
+2. Stored audio is decoded transparently by StorageManager
+3. Export sizing and ZIP exports see plain 16-bit PCM WAV
+4. Existing recordings can be re-encoded
+"""
+import sys
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.audio import (
+    encode_audio, decode_audio, decoded_wav_size, validate_wav_16bit,
+    CODEC_DELTA, CODEC_FLAC, CODEC_WAV, SOUNDFILE_AVAILABLE
+)
+from app.storage import StorageManager
+from app.export_zip import create_export_zip
+from tests.audio_fixtures import make_wav
+
+
+def noisy_wav(frames=22050, channels=1, sample_rate=44100, seed=0) -> bytes:
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames) / sample_rate
+    signal = np.sin(2 * np.pi * 180 * t) * 12000 + rng.normal(0, 200, frames)
+    samples = np.repeat(signal[:, None], channels, axis=1)
+    # Include full-scale extremes to exercise wrapping deltas
+    samples[:2] = [[32767] * channels, [-32768] * channels]
+    return make_wav(np.clip(samples, -32768, 32767), sample_rate)
+
+
+def test_delta_round_trip():
+    """Test delta + zlib is lossless and smaller than WAV."""
+    for channels in (1, 2):
+        wav = noisy_wav(channels=channels)
+        encoded = encode_audio(wav, CODEC_DELTA)
+        assert len(encoded) < len(wav)
+        assert decode_audio(encoded) == wav
+        assert decoded_wav_size(encoded[:42], len(encoded)) == len(wav)
+    print("✓ Delta + zlib round-trips")
+
+
+def test_flac_round_trip():
+    """Test FLAC is lossless (when soundfile is installed)."""
+    if not SOUNDFILE_AVAILABLE:
+        print("- soundfile not installed, FLAC skipped")
+        return
+    wav = noisy_wav(channels=2)
+    encoded = encode_audio(wav, CODEC_FLAC)
+    assert encoded[:4] == b"fLaC"
+    assert decode_audio(encoded) == wav
+    assert decoded_wav_size(encoded[:42], len(encoded)) == len(wav)
+    print("✓ FLAC round-trips")
+
+
+def test_wav_passthrough():
+    """Test WAV data is stored and returned unchanged."""
+    wav = noisy_wav()
+    assert encode_audio(wav, CODEC_WAV) is wav
+    assert decode_audio(wav) is wav
+    print("✓ WAV passes through")
+
+
+def test_storage_transparent_decoding():
+    """Test storage encodes on save and exports plain WAV."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageManager(os.path.join(tmpdir, "test.db"))
+        storage.set_audio_codec(CODEC_DELTA)
+        wav = noisy_wav()
+        storage.save_audio("0001_a.wav", wav)
+        storage.save_audio_many([("0002_b.wav", noisy_wav(seed=1))])
+
+        assert storage.get_stored_audio_bytes() < 2 * len(wav)
+        assert storage.get_audio("0001_a.wav") == wav
+        assert [a["size"] for a in storage.get_audio_sizes()] == [len(wav), len(wav)]
+
+        # Codec setting persists
+        assert StorageManager(storage.db_path).audio_codec == CODEC_DELTA
+
+        entries = [{"reference": "0001", "gloss": "a", "audio_filename": "0001_a.wav"}]
+        dest = os.path.join(tmpdir, "export.zip")
+        result = create_export_zip(entries, storage.get_all_audio(), [], dest)
+        assert result["success"], result["error"]
+        with zipfile.ZipFile(dest) as zf:
+            exported = zf.read("audio/0001_a.wav")
+        assert exported == wav and validate_wav_16bit(exported)
+    print("✓ Storage decodes transparently")
+
+
+def test_recode_existing():
+    """Test existing WAV recordings are re-encoded and stay readable."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageManager(os.path.join(tmpdir, "test.db"))
+        wav = noisy_wav()
+        storage.save_audio("0001_a.wav", wav)
+        before = storage.get_stored_audio_bytes()
+
+        storage.set_audio_codec(CODEC_DELTA)
+        assert storage.recode_all_audio() == 1
+        assert storage.get_stored_audio_bytes() < before
+        assert storage.get_audio("0001_a.wav") == wav
+        assert storage.recode_all_audio() == 0
+    print("✓ Existing recordings re-encoded")
+
+
+def test_unavailable_codec_rejected():
+    """Test unknown codecs are rejected."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageManager(os.path.join(tmpdir, "test.db"))
+        try:
+            storage.set_audio_codec("mp3")
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+        assert storage.audio_codec == CODEC_WAV
+    print("✓ Unknown codec rejected")
+
+
+if __name__ == "__main__":
+    print("\n=== Audio Codec Tests ===\n")
+
+    test_delta_round_trip()
+    test_flac_round_trip()
+    test_wav_passthrough()
+    test_storage_transparent_decoding()
+    test_recode_existing()
+    test_unavailable_codec_rejected()
+
+    print("\n✓ All audio codec tests passed!\n")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached audio device manager.
+
+Tests verify:
+1. The backend is initialized once and reused
+2. Device capabilities are cached between calls
+3. Refresh reinitializes the backend, but not while a stream is open
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import audio_devices
+from app.audio_devices import AudioDeviceManager
+
+
+class FakePyAudio:
+    """Stand-in for pyaudio.PyAudio that counts enumeration calls."""
+    
+    instances = 0
+    
+    def __init__(self):
+        FakePyAudio.instances += 1
+        self.info_calls = 0
+        self.terminated = False
+    
+    def get_device_count(self):
+        return 2
+    
+    def get_device_info_by_index(self, index):
+        self.info_calls += 1
+        return {
+            "name": f"device {index}",
+            "maxInputChannels": 1 if index == 0 else 0,
+            "maxOutputChannels": 0 if index == 0 else 2,
+            "defaultSampleRate": 44100.0
+        }
+    
+    def get_default_input_device_info(self):
+        return {"index": 0}
+    
+    def get_default_output_device_info(self):
+        return {"index": 1}
+    
+    def terminate(self):
+        self.terminated = True
+
+
+class FakePyAudioModule:
+    PyAudio = FakePyAudio
+
+
+def _manager(**kwargs):
+    audio_devices.pyaudio = FakePyAudioModule
+    FakePyAudio.instances = 0
+    manager = AudioDeviceManager(**kwargs)
+    manager.backend = "pyaudio"
+    return manager
+
+
+def test_backend_initialized_once():
+    """Test the PyAudio handle is shared."""
+    manager = _manager()
+    first = manager.get_pyaudio()
+    
+    assert manager.get_pyaudio() is first
+    assert FakePyAudio.instances == 1
+    print("✓ Backend initialized once")
+
+
+def test_devices_cached():
+    """Test device info and defaults are cached."""
+    manager = _manager()
+    devices = manager.devices()
+    calls = manager.get_pyaudio().info_calls
+    manager.devices()
+    manager.check_support()
+    
+    assert [d["name"] for d in devices] == ["device 0", "device 1"]
+    assert manager.default_input() == 0
+    assert manager.default_output() == 1
+    assert manager.get_pyaudio().info_calls == calls
+    assert manager.check_support()["supported"]
+    print("✓ Device info cached")
+
+
+def test_refresh():
+    """Test refresh reinitializes, except while a stream is open."""
+    manager = _manager()
+    manager.devices()
+    old = manager.get_pyaudio()
+    
+    with manager.stream_session():
+        assert manager.refresh() is False
+    assert manager.get_pyaudio() is old
+    
+    assert manager.refresh() is True
+    assert old.terminated
+    assert manager.get_pyaudio() is not old
+    print("✓ Refresh respects open streams")
+
+
+def test_stale_rescan():
+    """Test a stale device list is rescanned on access."""
+    manager = _manager(stale_after=0)
+    manager.devices()
+    old = manager.get_pyaudio()
+    manager.devices()
+    
+    assert old.terminated
+    print("✓ Stale device list rescanned")
+
+
+def test_no_backend():
+    """Test support check without any audio library."""
+    manager = AudioDeviceManager()
+    manager.backend = None
+    
+    assert manager.check_support()["supported"] is False
+    print("✓ Missing backend reported")
+
+
+def run_all_tests():
+    """Run all device manager tests."""
+    print("=" * 50)
+    print("Running Audio Device Manager Tests")
+    print("=" * 50)
+    
+    tests = [
+        test_backend_initialized_once,
+        test_devices_cached,
+        test_refresh,
+        test_stale_rescan,
+        test_no_backend,
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: Unexpected error: {e}")
+            failed += 1
+    
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 50)
+    
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for silence trimming and peak normalization.
+
+Tests verify:
+1. Leading and trailing silence is trimmed with padding
+2. Silent recordings are kept whole
+3. Peak normalization reaches the target level and caps gain
+4. Original and trimmed durations are reported
+5. A 10 second clip is processed well under 50 ms
+"""
+import sys
+import os
+import io
+import time
+import wave
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.audio_processing import find_speech_bounds, peak_normalize, process_recording
+from app.audio import validate_wav_16bit
+from tests.audio_fixtures import make_wav
+
+RATE = 16000
+
+
+def make_signal(silence_before=1.0, tone=0.5, silence_after=1.0, amplitude=8000, noise=20, seed=0):
+    """Tone surrounded by low-level noise, as int16 samples."""
+    rng = np.random.default_rng(seed)
+    total = int((silence_before + tone + silence_after) * RATE)
+    signal = rng.normal(0, noise, total)
+    start = int(silence_before * RATE)
+    t = np.arange(int(tone * RATE)) / RATE
+    signal[start:start + len(t)] += amplitude * np.sin(2 * np.pi * 220 * t)
+    return np.clip(signal, -32768, 32767).astype('<i2')
+
+
+def read_samples(wav_data: bytes):
+    with wave.open(io.BytesIO(wav_data), 'rb') as wf:
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype='<i2')
+
+
+def test_trim_bounds_with_padding():
+    """Test the kept range covers the tone plus padding."""
+    samples = make_signal(1.0, 0.5, 1.0)
+    start, end = find_speech_bounds(samples, RATE, padding_ms=100)
+
+    # Tone spans 1.0-1.5 s; allow one 10 ms frame of slack
+    assert abs(start / RATE - 0.9) <= 0.011
+    assert abs(end / RATE - 1.6) <= 0.011
+    print("✓ Silence bounds found with padding")
+
+
+def test_silent_recording_kept():
+    """Test a recording with no sound is not trimmed away."""
+    samples = make_signal(1.0, 0.0, 1.0)
+    assert find_speech_bounds(samples, RATE) == (0, len(samples))
+    print("✓ Silent recording kept whole")
+
+
+def test_peak_normalize():
+    """Test normalization reaches -1 dBFS and caps gain for quiet takes."""
+    samples = make_signal(0.1, 0.5, 0.1, amplitude=3000, noise=0)
+    scaled, gain_db = peak_normalize(samples)
+    peak = np.abs(scaled.astype(np.int32)).max()
+    assert abs(20 * np.log10(peak / 32768) - (-1.0)) < 0.05
+    assert gain_db > 0
+
+    quiet = make_signal(0.1, 0.5, 0.1, amplitude=10, noise=0)
+    _, capped = peak_normalize(quiet)
+    assert capped == 20.0
+    print("✓ Peak normalization works")
+
+
+def test_process_recording_reports_durations():
+    """Test the processed WAV is shorter, valid and durations are reported."""
+    wav = make_wav(make_signal(1.0, 0.5, 1.0), RATE)
+    processed, info = process_recording(wav, trim=True, normalize=True, padding_ms=150)
+
+    assert validate_wav_16bit(processed)
+    assert info["original_duration"] == 2.5
+    assert 0.75 <= info["duration"] <= 0.83
+    assert abs(info["trimmed_start"] - 0.85) <= 0.011
+    assert abs(info["original_duration"] - info["duration"]
+               - info["trimmed_start"] - info["trimmed_end"]) < 0.002
+    assert len(read_samples(processed)) == round(info["duration"] * RATE)
+    print("✓ Processing reports durations")
+
+
+def test_process_recording_unchanged():
+    """Test the original bytes are returned when nothing changes."""
+    wav = make_wav(make_signal(0.0, 0.5, 0.0), RATE)
+    processed, info = process_recording(wav, trim=True, padding_ms=0)
+    assert processed is wav
+    assert info["duration"] == info["original_duration"]
+    print("✓ Unchanged recordings are passed through")
+
+
+def test_ten_second_clip_is_fast():
+    """Test a 10 s 44.1 kHz clip is processed well under 50 ms."""
+    rng = np.random.default_rng(1)
+    samples = np.zeros(10 * 44100, dtype='<i2')
+    samples[3 * 44100:6 * 44100] = rng.normal(0, 4000, 3 * 44100).astype('<i2')
+    wav = make_wav(samples, sample_rate=44100)
+
+    process_recording(wav, trim=True, normalize=True)
+    best = min(
+        _timed(lambda: process_recording(wav, trim=True, normalize=True))
+        for _ in range(5)
+    )
+    assert best < 0.05, f"took {best * 1000:.1f} ms"
+    print(f"✓ 10 s clip processed in {best * 1000:.1f} ms")
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print("\n=== Audio Processing Tests ===\n")
+
+    test_trim_bounds_with_padding()
+    test_silent_recording_kept()
+    test_peak_normalize()
+    test_process_recording_reports_durations()
+    test_process_recording_unchanged()
+    test_ten_second_clip_is_fast()
+
+    print("\n✓ All audio processing tests passed!\n")
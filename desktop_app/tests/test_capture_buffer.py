@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the preallocated capture buffer used by AudioRecorder.
+
+Tests verify:
+1. Blocks from sounddevice (arrays) and PyAudio (bytes) are appended in order
+2. The buffer grows past its initial capacity without losing samples
+3. to_wav produces a valid 16-bit PCM WAV with a correct header
+"""
+import sys
+import os
+import io
+import wave
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.audio import CaptureBuffer, wav_header, validate_wav_16bit, WAV_HEADER_SIZE
+
+
+def test_wav_header_matches_wave_module():
+    """Test wav_header produces the same header as the wave module."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(44100)
+        wf.writeframes(b"\x00\x00" * 10)
+    
+    assert wav_header(20, 44100) == buffer.getvalue()[:WAV_HEADER_SIZE]
+    print("✓ WAV header matches wave module")
+
+
+def test_write_arrays_and_bytes():
+    """Test array and bytes blocks are appended in order."""
+    buf = CaptureBuffer(44100)
+    buf.write(np.array([[1], [2], [3]], dtype=np.int16))
+    buf.write(np.array([4, 5], dtype=np.int16).tobytes())
+    
+    assert len(buf) == 5
+    assert buf.samples().tolist() == [1, 2, 3, 4, 5]
+    print("✓ Array and bytes blocks appended")
+
+
+def test_growth():
+    """Test the buffer grows beyond its initial capacity."""
+    buf = CaptureBuffer(1000, initial_seconds=1.0)
+    initial = buf.capacity
+    blocks = [np.arange(i * 700, (i + 1) * 700, dtype=np.int16) for i in range(5)]
+    for block in blocks:
+        buf.write(block)
+    
+    assert buf.capacity > initial
+    assert np.array_equal(buf.samples(), np.concatenate(blocks))
+    print("✓ Buffer growth keeps all samples")
+
+
+def test_to_wav():
+    """Test to_wav output is a readable 16-bit WAV with the same samples."""
+    buf = CaptureBuffer(44100)
+    samples = (np.sin(np.linspace(0, 100, 5000)) * 10000).astype(np.int16)
+    buf.write(samples[:1024])
+    buf.write(samples[1024:])
+    
+    wav_data = buf.to_wav()
+    assert validate_wav_16bit(wav_data)
+    with wave.open(io.BytesIO(wav_data), 'rb') as wf:
+        assert wf.getframerate() == 44100
+        assert wf.getnchannels() == 1
+        frames = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    assert np.array_equal(frames, samples)
+    print("✓ to_wav produces valid WAV")
+
+
+def test_empty_buffer_is_falsy():
+    """Test an empty buffer is falsy so stop_recording returns None."""
+    assert not CaptureBuffer(44100)
+    print("✓ Empty buffer is falsy")
+
+
+def run_all_tests():
+    """Run all capture buffer tests."""
+    print("=" * 50)
+    print("Running Capture Buffer Tests")
+    print("=" * 50)
+    
+    tests = [
+        test_wav_header_matches_wave_module,
+        test_write_arrays_and_bytes,
+        test_growth,
+        test_to_wav,
+        test_empty_buffer_is_falsy,
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: Unexpected error: {e}")
+            failed += 1
+    
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 50)
+    
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the entry data version used by the UI change feed.
+
+Tests verify:
+1. Every entry write advances the data version
+2. Only entries changed after a version are returned
+3. Deleting all entries is recorded as a reset
+4. Databases created before versioning are migrated
+"""
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.storage import StorageManager
+
+
+def make_entries(count):
+    return [{"reference": f"{i:04d}", "gloss": f"word{i}"} for i in range(1, count + 1)]
+
+
+def test_writes_advance_version():
+    """Test add, bulk add and update each bump the version once."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageManager(os.path.join(tmpdir, "test.db"))
+        assert storage.get_data_version() == 0
+
+        storage.add_entries(make_entries(100))
+        assert storage.get_data_version() == 1
+        entry_id = storage.add_entry({"reference": "0101", "gloss": "extra"})
+        assert storage.get_data_version() == 2
+
+        entry = storage.get_entry(entry_id)
+        entry["local_transcription"] = "ekstra"
+        assert storage.update_entry(entry)
+        assert storage.get_data_version() == 3
+
+        # Updating a missing entry changes nothing
+        assert not storage.update_entry({"id": 9999, "reference": "9999"})
+        assert storage.get_data_version() == 3
+    print("✓ Writes advance the data version")
+
+
+def test_changes_since():
+    """Test only entries changed after a version are returned."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageManager(os.path.join(tmpdir, "test.db"))
+        storage.add_entries(make_entries(1000))
+        version = storage.get_data_version()
+        assert storage.get_entries_changed_since(version) == []
+
+        entries = storage.get_all_entries()
+        for entry in (entries[10], entries[500]):
+            entry["local_transcription"] = "x"
+            entry["is_completed"] = True
+            storage.update_entry(entry)
+
+        changed = storage.get_entries_changed_since(version)
+        assert [e["id"] for e in changed] == [entries[10]["id"], entries[500]["id"]]
+        assert changed[0]["local_transcription"] == "x" and changed[0]["is_completed"] is True
+        assert storage.get_entries_changed_since(storage.get_data_version()) == []
+    print("✓ Changes since a version returned")
+
+
+def test_delete_all_is_reset():
+    """Test deleting all entries records the reset version."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageManager(os.path.join(tmpdir, "test.db"))
+        storage.add_entries(make_entries(10))
+        version = storage.get_data_version()
+        assert storage.get_reset_version() < version
+
+        storage.delete_all_entries()
+        storage.add_entries(make_entries(5))
+        assert storage.get_reset_version() > version
+        assert storage.get_data_version() > storage.get_reset_version()
+    print("✓ Delete all recorded as reset")
+
+
+def test_migrates_old_database():
+    """Test an entries table without a version column is migrated."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "old.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                reference TEXT NOT NULL,
+                gloss TEXT NOT NULL,
+                local_transcription TEXT DEFAULT '',
+                audio_filename TEXT,
+                picture_filename TEXT,
+                recorded_at TEXT,
+                is_completed INTEGER DEFAULT 0
+            )
+        """)
+        conn.execute("INSERT INTO entries (reference, gloss) VALUES ('0001', 'water')")
+        conn.commit()
+        conn.close()
+
+        storage = StorageManager(db_path)
+        assert storage.get_all_entries()[0]["version"] == 0
+        assert storage.get_entries_changed_since(0) == []
+
+        entry = storage.get_all_entries()[0]
+        entry["local_transcription"] = "wata"
+        storage.update_entry(entry)
+        assert [e["gloss"] for e in storage.get_entries_changed_since(0)] == ["water"]
+    print("✓ Old databases migrated")
+
+
+if __name__ == "__main__":
+    print("\n=== Change Feed Tests ===\n")
+
+    test_writes_advance_version()
+    test_changes_since()
+    test_delete_all_is_reset()
+    test_migrates_old_database()
+
+    print("\n✓ All change feed tests passed!\n")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the headless command line (python -m app).
+
+Tests verify:
+1. import, stats, export and verify work on a database with JSON output
+2. Failures exit with 1 and usage errors with 2
+3. The benchmark reports read and export timings
+4. The command line imports neither pywebview nor the audio backends
+"""
+import sys
+import os
+import io
+import json
+import subprocess
+import tempfile
+from contextlib import redirect_stdout, redirect_stderr
+
+# Add parent directory to path
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from app.cli import main
+from app.xml_io import generate_xml_utf16le
+
+
+ENTRIES = [
+    {"reference": "0001", "gloss": "water"},
+    {"reference": "0002", "gloss": "fire"},
+    {"reference": "0003", "gloss": "stone"},
+]
+
+
+def run(*argv):
+    """Run the command line in-process and return (exit code, parsed JSON)."""
+    out = io.StringIO()
+    with redirect_stdout(out):
+        code = main(list(argv))
+    return code, json.loads(out.getvalue())
+
+
+def _write_wordlist(tmpdir):
+    path = os.path.join(tmpdir, "wordlist.xml")
+    with open(path, 'wb') as f:
+        f.write(generate_xml_utf16le(ENTRIES))
+    return path
+
+
+def test_import_export_verify():
+    """Test a wordlist round trip through the command line."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = os.path.join(tmpdir, "project.db")
+        code, result = run("--db", db, "import", _write_wordlist(tmpdir))
+        assert code == 0
+        assert result["count"] == 3
+
+        code, stats = run("--db", db, "stats")
+        assert code == 0
+        assert stats["progress"]["total"] == 3
+        assert stats["audio"]["recordings"] == 0
+
+        archive = os.path.join(tmpdir, "out.zip")
+        code, result = run("--db", db, "export", archive, "--compression", "fast")
+        assert code == 0
+        assert result["total_entries"] == 3
+        assert os.path.exists(archive)
+
+        code, result = run("verify", archive)
+        assert code == 0
+        assert result["success"]
+
+        # Restoring the export into another database
+        other = os.path.join(tmpdir, "other.db")
+        code, result = run("--db", other, "import", archive)
+        assert code == 0
+        assert run("--db", other, "stats")[1]["progress"]["total"] == 3
+    print("✓ Import, export and verify round trip")
+
+
+def test_exit_codes():
+    """Test failures exit with 1 and usage errors with 2."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = os.path.join(tmpdir, "project.db")
+        code, result = run("--db", db, "import", os.path.join(tmpdir, "missing.xml"))
+        assert code == 1
+        assert "not found" in result["error"]
+
+        not_zip = _write_wordlist(tmpdir)
+        code, result = run("verify", not_zip)
+        assert code == 1
+        assert not result["success"]
+
+        err = io.StringIO()
+        try:
+            with redirect_stderr(err):
+                main(["no-such-command"])
+            assert False, "Expected SystemExit"
+        except SystemExit as e:
+            assert e.code == 2
+    print("✓ Exit codes")
+
+
+def test_benchmark():
+    """Test the benchmark times reads, exports and statements."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = os.path.join(tmpdir, "project.db")
+        run("--db", db, "import", _write_wordlist(tmpdir))
+        code, result = run("--db", db, "benchmark", "--runs", "2", "--compression", "stored", "fast")
+        assert code == 0
+        assert result["entries"] == 3
+        assert result["load_entries_ms"] >= 0
+        assert [e["compression"] for e in result["exports"]] == ["stored", "fast"]
+        assert all(e["output_bytes"] for e in result["exports"])
+        assert result["queries"]["statements"]
+        assert run("--db", db, "stats")[1]["progress"]["total"] == 3
+    print("✓ Benchmark")
+
+
+def test_no_gui_or_audio_imports():
+    """Test the command line runs without pywebview or audio backends."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        script = (
+            "import sys\n"
+            "from app.cli import main\n"
+            f"main(['--db', {os.path.join(tmpdir, 'p.db')!r}, 'stats'])\n"
+            "loaded = ('webview', 'sounddevice', 'pyaudio', 'app.audio', 'app.audio_backends')\n"
+            "print(','.join(m for m in loaded if m in sys.modules), file=sys.stderr)\n"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", script], cwd=APP_DIR, capture_output=True, text=True, check=True
+        )
+    assert proc.stderr.strip() == "", proc.stderr
+    print("✓ No GUI or audio imports")
+
+
+if __name__ == "__main__":
+    print("\n=== Command Line Tests ===\n")
+
+    test_import_export_verify()
+    test_exit_codes()
+    test_benchmark()
+    test_no_gui_or_audio_imports()
+
+    print("\n✓ All command line tests passed!\n")
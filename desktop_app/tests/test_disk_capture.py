@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Tests for disk-spilling recording mode.
+
+Tests verify:
+1. Blocks queued by the callback end up in a valid WAV on disk
+2. Partial files left by a crash can be recovered
+3. Disk recordings are saved to storage without reloading them
+4. Disk recordings are encoded with the storage codec
+"""
+import sys
+import os
+import io
+import shutil
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.audio import (
+    DiskCaptureWriter, recover_partial_wav, find_partial_recordings,
+    validate_wav_16bit, PARTIAL_SUFFIX
+)
+from app.storage import StorageManager
+
+
+def _read_samples(path):
+    with wave.open(path, 'rb') as wf:
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+
+def test_writer_produces_wav():
+    """Test queued blocks are written in order to a finished WAV."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        writer = DiskCaptureWriter(tmp_dir, 44100)
+        blocks = [np.full((1024, 1), i, dtype=np.int16) for i in range(20)]
+        for block in blocks:
+            writer.write(block)
+        writer.write(np.arange(10, dtype=np.int16).tobytes())
+        path = writer.close()
+        
+        assert path.endswith(".wav") and not path.endswith(PARTIAL_SUFFIX)
+        samples = _read_samples(path)
+        expected = np.concatenate([b.reshape(-1) for b in blocks] + [np.arange(10, dtype=np.int16)])
+        assert np.array_equal(samples, expected)
+        assert find_partial_recordings(tmp_dir) == []
+        print("✓ Disk writer produces WAV")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_empty_recording():
+    """Test closing without data removes the file."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        writer = DiskCaptureWriter(tmp_dir, 44100)
+        assert writer.close() is None
+        assert os.listdir(tmp_dir) == []
+        print("✓ Empty disk recording removed")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_periodic_header_patch_and_recovery():
+    """Test a crashed recording has usable sizes and can be recovered."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        writer = DiskCaptureWriter(tmp_dir, 44100, flush_interval=0.05)
+        writer.write(np.ones(4000, dtype=np.int16))
+        time.sleep(0.3)
+        
+        # Simulate a crash: the partial file is readable as-is
+        partial = find_partial_recordings(tmp_dir)
+        assert partial == [writer.path]
+        with open(writer.path, 'rb') as f:
+            assert validate_wav_16bit(f.read())
+        
+        # Append a torn half sample, as an interrupted write might
+        with open(writer.path, 'ab') as f:
+            f.write(b"\x01")
+        recovered = recover_partial_wav(writer.path)
+        
+        assert recovered.endswith(".wav") and not recovered.endswith(PARTIAL_SUFFIX)
+        assert len(_read_samples(recovered)) == 4000
+        writer._queue.put(writer._STOP)
+        writer._thread.join()
+        print("✓ Partial recording recovered")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_save_audio_file():
+    """Test storage saves a WAV file via blob I/O."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        writer = DiskCaptureWriter(tmp_dir, 44100)
+        writer.write(np.arange(50000, dtype=np.int16))
+        path = writer.close()
+        
+        storage = StorageManager(os.path.join(tmp_dir, "test.db"))
+        storage.save_audio_file("0001_body.wav", path, chunk_size=4096)
+        
+        with open(path, 'rb') as f:
+            assert storage.get_audio("0001_body.wav") == f.read()
+        assert storage.get_audio_sizes() == [{
+            "filename": "0001_body.wav",
+            "size": os.path.getsize(path),
+            "sample_rate": 44100,
+            "channels": 1
+        }]
+        print("✓ Audio saved from file")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_save_audio_file_uses_codec():
+    """Test disk recordings are encoded with the storage codec like in-memory ones."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        writer = DiskCaptureWriter(tmp_dir, 44100)
+        writer.write(np.zeros(50000, dtype=np.int16))
+        path = writer.close()
+        with open(path, 'rb') as f:
+            wav_data = f.read()
+        
+        storage = StorageManager(os.path.join(tmp_dir, "test.db"))
+        storage.set_audio_codec("delta-zlib")
+        storage.save_audio_file("0001_body.wav", path)
+        storage.save_audio("0002_head.wav", wav_data)
+        
+        assert storage.get_audio("0001_body.wav") == wav_data
+        # Both recordings were compressed
+        assert storage.get_stored_audio_bytes() < len(wav_data)
+        print("✓ Audio saved from file with the storage codec")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def run_all_tests():
+    """Run all disk capture tests."""
+    print("=" * 50)
+    print("Running Disk Capture Tests")
+    print("=" * 50)
+    
+    tests = [
+        test_writer_produces_wav,
+        test_empty_recording,
+        test_periodic_header_patch_and_recovery,
+        test_save_audio_file,
+        test_save_audio_file_uses_codec,
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: Unexpected error: {e}")
+            failed += 1
+    
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 50)
+    
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Tests for restoring export ZIPs into storage.
+
+Tests verify:
+1. Entries, audio and consent survive an export/import round trip
+2. Streaming XML parsing matches the in-memory parser
+3. Invalid or tampered audio members are rejected
+4. Deduplicated and split exports are restored completely
+5. A failed import leaves entries, audio and pictures as they were
+"""
+import sys
+import os
+import io
+import shutil
+import tempfile
+import zipfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.storage import StorageManager
+from app.export_zip import create_export_zip, create_split_export
+from app.import_zip import import_from_zip
+from app.pictures import picture_dir
+from app.xml_io import generate_xml_utf16le, parse_wordlist_from_bytes, parse_wordlist_from_stream
+from tests.audio_fixtures import make_wav
+
+
+ENTRIES = [
+    {"reference": "0001", "gloss": "body", "local_transcription": "soma",
+     "audio_filename": "0001_body.wav", "recorded_at": "2024-01-01T00:00:00Z", "is_completed": True},
+    {"reference": "0002", "gloss": "head", "audio_filename": "0002_head.wav", "is_completed": True},
+    {"reference": "0003", "gloss": "eye", "is_completed": False},
+]
+
+AUDIO = [
+    {"filename": "0001_body.wav", "data": make_wav([1000] * 4410)},
+    {"filename": "0002_head.wav", "data": make_wav([1000] * 4410)},
+]
+
+CONSENT = [
+    {"id": 1, "timestamp": "2024-01-01T00:00:00", "device_id": "dev1",
+     "type": "verbal", "response": "yes", "verbal_consent_filename": None}
+]
+
+
+def test_stream_parser_matches():
+    """Test streaming parser gives the same entries as the DOM parser."""
+    data = generate_xml_utf16le(ENTRIES)
+    
+    assert parse_wordlist_from_stream(io.BytesIO(data)) == parse_wordlist_from_bytes(data)
+    
+    # Records nested below a wrapper element are dropped as they are parsed too
+    nested = ("<root><words>" + "".join(
+        f"<Word><Reference>{i:04d}</Reference><Gloss>w{i}</Gloss></Word>" for i in range(1, 50)
+    ) + "</words></root>").encode("utf-8")
+    assert parse_wordlist_from_stream(io.BytesIO(nested)) == parse_wordlist_from_bytes(nested)
+    print("✓ Streaming parser matches DOM parser")
+
+
+def test_round_trip():
+    """Test export followed by import restores everything."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        dest = os.path.join(tmp_dir, "export.zip")
+        assert create_export_zip(ENTRIES, AUDIO, CONSENT, dest)["success"]
+        
+        storage = StorageManager(os.path.join(tmp_dir, "restore.db"))
+        storage.add_entry({"reference": "0099", "gloss": "old"})
+        result = import_from_zip(dest, storage)
+        
+        assert result["success"], result.get("error")
+        assert result["count"] == 3
+        assert result["audio_imported"] == 2
+        assert result["consent_imported"] == 1
+        
+        entries = storage.get_all_entries()
+        assert [e["gloss"] for e in entries] == ["body", "head", "eye"]
+        assert entries[0]["local_transcription"] == "soma"
+        assert entries[0]["recorded_at"] == "2024-01-01T00:00:00Z"
+        assert storage.get_audio("0001_body.wav") == AUDIO[0]["data"]
+        
+        # Re-importing does not duplicate consent records
+        import_from_zip(dest, storage)
+        assert len(storage.get_all_consent_records()) == 1
+        print("✓ Export/import round trip works")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_rejects_invalid_audio():
+    """Test non-WAV and tampered audio members are skipped."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        dest = os.path.join(tmp_dir, "export.zip")
+        audio = AUDIO + [{"filename": "0003_eye.wav", "data": b"not a wav"}]
+        assert create_export_zip(ENTRIES, audio, [], dest)["success"]
+        
+        tampered = os.path.join(tmp_dir, "tampered.zip")
+        with zipfile.ZipFile(dest) as src, zipfile.ZipFile(tampered, 'w') as dst:
+            for name in src.namelist():
+                data = src.read(name)
+                if name == "audio/0002_head.wav":
+                    data = data[:-2] + b"\x00\x00"
+                dst.writestr(name, data)
+        
+        storage = StorageManager(os.path.join(tmp_dir, "restore.db"))
+        result = import_from_zip(tampered, storage)
+        
+        assert result["success"]
+        assert result["audio_imported"] == 1
+        errors = {r["file"]: r["error"] for r in result["audio_rejected"]}
+        assert errors == {"0002_head.wav": "checksum mismatch", "0003_eye.wav": "not 16-bit PCM WAV"}
+        print("✓ Invalid audio rejected")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_deduplicated_export():
+    """Test aliases in a deduplicated export are restored."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        dest = os.path.join(tmp_dir, "export.zip")
+        assert create_export_zip(ENTRIES, AUDIO, [], dest, dedupe_audio=True)["success"]
+        
+        storage = StorageManager(os.path.join(tmp_dir, "restore.db"))
+        result = import_from_zip(dest, storage)
+        
+        assert result["audio_imported"] == 2
+        assert storage.get_audio("0002_head.wav") == AUDIO[1]["data"]
+        print("✓ Deduplicated export restored")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_split_export():
+    """Test all volumes of a split export are restored from the first."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        # Two half-second recordings do not fit in one 64 KB volume
+        audio = {a["filename"]: make_wav([1000] * 22050) for a in AUDIO}
+        sizes = [{"filename": n, "size": len(d)} for n, d in sorted(audio.items())]
+        dest = os.path.join(tmp_dir, "export.zip")
+        result = create_split_export(ENTRIES, sizes, audio.get, [], 64 * 1024, dest)
+        assert result["success"] and len(result["volumes"]) == 2
+        
+        storage = StorageManager(os.path.join(tmp_dir, "restore.db"))
+        result = import_from_zip(result["volumes"][0], storage)
+        
+        assert result["success"], result.get("error")
+        assert result["audio_imported"] == 2
+        print("✓ Split export restored")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_missing_wordlist():
+    """Test archives without wordlist.xml are reported."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, "bad.zip")
+        with zipfile.ZipFile(path, 'w') as zf:
+            zf.writestr("metadata.json", "{}")
+        
+        storage = StorageManager(os.path.join(tmp_dir, "restore.db"))
+        result = import_from_zip(path, storage)
+        
+        assert not result["success"]
+        assert "wordlist.xml" in result["error"]
+        print("✓ Missing wordlist reported")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_failed_import_keeps_data():
+    """Test a failing import rolls back and keeps the existing pictures."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        picture = os.path.join(tmp_dir, "new.jpg")
+        with open(picture, 'wb') as f:
+            f.write(b"new picture")
+        dest = os.path.join(tmp_dir, "export.zip")
+        pictures = [{"path": picture, "arcname": "pictures/new.jpg"}]
+        entries = [dict(ENTRIES[0], picture_filename="pictures/new.jpg")] + ENTRIES[1:]
+        assert create_export_zip(entries, AUDIO, [], dest, pictures=pictures)["success"]
+        
+        storage = StorageManager(os.path.join(tmp_dir, "restore.db"))
+        old_dir = picture_dir(storage.db_path)
+        os.makedirs(old_dir)
+        with open(os.path.join(old_dir, "old.jpg"), 'wb') as f:
+            f.write(b"old picture")
+        storage.add_entry({"reference": "0099", "gloss": "old",
+                           "picture_filename": os.path.join(old_dir, "old.jpg")})
+        storage.save_audio("old.wav", make_wav([1000] * 4410))
+        
+        # Audio that cannot be read fails the import halfway through the transaction
+        def failing_records():
+            yield "0001_body.wav", make_wav([1000] * 4410)
+            raise OSError("read error")
+        
+        import app.import_zip as import_zip
+        reader = import_zip._AudioReader
+        import_zip._AudioReader = lambda paths: failing_records()
+        try:
+            result = import_from_zip(dest, storage)
+        finally:
+            import_zip._AudioReader = reader
+        
+        assert not result["success"]
+        assert [e["gloss"] for e in storage.get_all_entries()] == ["old"]
+        assert [a["filename"] for a in storage.get_audio_sizes()] == ["old.wav"]
+        assert os.listdir(old_dir) == ["old.jpg"]
+        assert sorted(os.listdir(tmp_dir)) == ["export.zip", "new.jpg", "restore.db", "restore_pictures"]
+        
+        # A successful import replaces the picture directory
+        result = import_from_zip(dest, storage)
+        assert result["success"] and result["pictures_imported"] == 1
+        assert os.listdir(old_dir) == ["new.jpg"]
+        print("✓ Failed import keeps existing data")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def run_all_tests():
+    """Run all ZIP import tests."""
+    print("=" * 50)
+    print("Running ZIP Import Tests")
+    print("=" * 50)
+    
+    tests = [
+        test_stream_parser_matches,
+        test_round_trip,
+        test_rejects_invalid_audio,
+        test_deduplicated_export,
+        test_split_export,
+        test_missing_wordlist,
+        test_failed_import_keeps_data,
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: Unexpected error: {e}")
+            failed += 1
+    
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 50)
+    
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
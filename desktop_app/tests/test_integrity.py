@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Tests for export checksums and audio deduplication.
+
+Tests verify:
+1. Exports include checksums.json covering every member
+2. Identical audio payloads are stored once when dedupe is enabled, also
+   when recordings are loaded one at a time and hashed ahead of the writer
+3. Quick and full verification detect tampered archives
+"""
+import sys
+import os
+import json
+import shutil
+import tempfile
+import zipfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.export_zip import create_export_zip
+from app.integrity import (
+    sha256_bytes, hash_audio_records, hash_ahead, find_duplicates, verify_export_zip,
+    CHECKSUMS_FILENAME
+)
+
+
+ENTRIES = [
+    {"reference": "0001", "gloss": "body", "audio_filename": "0001_body.wav", "is_completed": True},
+    {"reference": "0002", "gloss": "head", "audio_filename": "0002_head.wav", "is_completed": True},
+]
+
+AUDIO = [
+    {"filename": "0001_body.wav", "data": b"RIFF-body" * 1000},
+    {"filename": "0002_head.wav", "data": b"RIFF-body" * 1000},
+    {"filename": "0003_eye.wav", "data": b"RIFF-eye" * 1000},
+]
+
+
+def _export(tmp_dir, **kwargs):
+    dest = os.path.join(tmp_dir, "export.zip")
+    result = create_export_zip(ENTRIES, AUDIO, [], dest, **kwargs)
+    assert result["success"], result.get("error")
+    return dest, result
+
+
+def test_hash_audio_records():
+    """Test parallel hashing matches hashlib."""
+    digests = hash_audio_records(AUDIO, max_workers=3)
+    
+    assert set(digests) == {a["filename"] for a in AUDIO}
+    assert digests["0001_body.wav"] == sha256_bytes(AUDIO[0]["data"])
+    assert digests["0001_body.wav"] == digests["0002_head.wav"]
+    print("✓ Parallel hashing works")
+
+
+def test_find_duplicates():
+    """Test duplicate detection keeps first filename as canonical."""
+    duplicates = find_duplicates({"b.wav": "x", "a.wav": "x", "c.wav": "y"})
+    
+    assert duplicates == {"b.wav": "a.wav"}
+    print("✓ Duplicate detection works")
+
+
+def test_manifest_covers_members():
+    """Test checksums.json lists every other archive member."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        dest, _ = _export(tmp_dir)
+        with zipfile.ZipFile(dest) as zf:
+            manifest = json.loads(zf.read(CHECKSUMS_FILENAME))
+            names = set(zf.namelist()) - {CHECKSUMS_FILENAME}
+        
+        assert set(manifest["files"]) == names
+        assert manifest["files"]["audio/0003_eye.wav"]["sha256"] == sha256_bytes(AUDIO[2]["data"])
+        print("✓ Manifest covers all members")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_dedupe_audio():
+    """Test identical payloads are stored once with an alias."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        dest, result = _export(tmp_dir, dedupe_audio=True)
+        with zipfile.ZipFile(dest) as zf:
+            manifest = json.loads(zf.read(CHECKSUMS_FILENAME))
+            names = zf.namelist()
+        
+        assert result["audio_duplicates_skipped"] == 1
+        assert "audio/0002_head.wav" not in names
+        assert manifest["aliases"] == {"audio/0002_head.wav": "audio/0001_body.wav"}
+        print("✓ Audio deduplication works")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_dedupe_loaded_audio():
+    """Test recordings fetched one at a time give the same archive contents."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        payloads = {a["filename"]: a["data"] for a in AUDIO}
+        loaded = []
+        
+        def load_audio(filename):
+            loaded.append(filename)
+            return payloads.get(filename)
+        
+        dest = os.path.join(tmp_dir, "export.zip")
+        filenames = sorted(payloads) + ["0004_gone.wav"]
+        result = create_export_zip(
+            ENTRIES, [{"filename": f} for f in filenames], [], dest,
+            dedupe_audio=True, load_audio=load_audio
+        )
+        assert result["success"], result.get("error")
+        with zipfile.ZipFile(dest) as zf:
+            manifest = json.loads(zf.read(CHECKSUMS_FILENAME))
+        
+        assert loaded == filenames
+        # Only members actually written count as included
+        assert result["audio_files_included"] == 2
+        assert result["audio_duplicates_skipped"] == 1
+        assert manifest["aliases"] == {"audio/0002_head.wav": "audio/0001_body.wav"}
+        assert manifest["files"]["audio/0003_eye.wav"]["sha256"] == sha256_bytes(AUDIO[2]["data"])
+        assert verify_export_zip(dest)["success"]
+        print("✓ Loaded audio exported and deduplicated")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_hash_ahead():
+    """Test payloads come back in order, hashed, with a bounded number loaded ahead."""
+    payloads = {f"{i}.wav": bytes([i]) * 5000 for i in range(10)}
+    payloads["3.wav"] = None
+    loaded = []
+    
+    results = []
+    for filename, data, digest in hash_ahead(sorted(payloads), lambda f: loaded.append(f) or payloads[f], 2):
+        # Never more than ahead + 1 payloads loaded but not yet consumed
+        assert len(loaded) - len(results) <= 3
+        results.append((filename, digest))
+    
+    assert [f for f, _ in results] == sorted(payloads)
+    assert dict(results)["3.wav"] is None
+    assert dict(results)["5.wav"] == sha256_bytes(payloads["5.wav"])
+    print("✓ Payloads hashed ahead in order")
+
+
+def test_verify_valid_archive():
+    """Test verification passes for an untouched export."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        dest, _ = _export(tmp_dir, dedupe_audio=True)
+        
+        assert verify_export_zip(dest)["success"]
+        assert verify_export_zip(dest, quick=True)["success"]
+        print("✓ Verification passes for valid archive")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_verify_detects_tampering():
+    """Test verification detects a modified member."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        dest, _ = _export(tmp_dir)
+        tampered = os.path.join(tmp_dir, "tampered.zip")
+        with zipfile.ZipFile(dest) as src, zipfile.ZipFile(tampered, 'w') as dst:
+            for name in src.namelist():
+                data = src.read(name)
+                if name == "audio/0003_eye.wav":
+                    data = data[:-1] + b"X"
+                dst.writestr(name, data)
+        
+        result = verify_export_zip(tampered)
+        assert not result["success"]
+        assert result["problems"] == [{"file": "audio/0003_eye.wav", "error": "checksum mismatch"}]
+        # Same size, so the quick check cannot see it
+        assert verify_export_zip(tampered, quick=True)["success"]
+        print("✓ Verification detects tampering")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_compression_policies():
+    """Test each compression policy produces a verifiable archive."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        for policy in ["stored", "fast", "default", "max"]:
+            dest, _ = _export(tmp_dir, compression=policy)
+            with zipfile.ZipFile(dest) as zf:
+                method = zf.getinfo("audio/0003_eye.wav").compress_type
+            assert method == (zipfile.ZIP_STORED if policy == "stored" else zipfile.ZIP_DEFLATED)
+            assert verify_export_zip(dest)["success"]
+        
+        result = create_export_zip(ENTRIES, AUDIO, [], os.path.join(tmp_dir, "x.zip"), compression="bzip")
+        assert not result["success"]
+        print("✓ Compression policies work")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_verify_without_manifest():
+    """Test verification fails for archives without checksums.json."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, "old.zip")
+        with zipfile.ZipFile(path, 'w') as zf:
+            zf.writestr("wordlist.xml", b"")
+        
+        result = verify_export_zip(path)
+        assert not result["success"]
+        assert "checksums.json" in result["error"]
+        print("✓ Missing manifest reported")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def run_all_tests():
+    """Run all integrity tests."""
+    print("=" * 50)
+    print("Running Export Integrity Tests")
+    print("=" * 50)
+    
+    tests = [
+        test_hash_audio_records,
+        test_find_duplicates,
+        test_manifest_covers_members,
+        test_dedupe_audio,
+        test_dedupe_loaded_audio,
+        test_hash_ahead,
+        test_verify_valid_archive,
+        test_verify_detects_tampering,
+        test_compression_policies,
+        test_verify_without_manifest,
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: Unexpected error: {e}")
+            failed += 1
+    
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 50)
+    
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Tests for the background job scheduler.
+
+Tests verify:
+1. Jobs run and report results, errors and notifications
+2. Queued and running jobs can be cancelled
+3. The queue is bounded
+4. Storage jobs never run concurrently
+5. Cancelling a running export through the window API stops it and
+   leaves no archive behind
+"""
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.jobs import (
+    JobScheduler, check_cancelled, report_progress, current_job,
+    JOB_DONE, JOB_FAILED, JOB_CANCELLED, JOB_RUNNING
+)
+from tests.api_fixtures import open_api
+from tests.audio_fixtures import make_wav
+
+
+def wait_for(job, timeout=2.0):
+    deadline = time.time() + timeout
+    while job.status not in (JOB_DONE, JOB_FAILED, JOB_CANCELLED) and time.time() < deadline:
+        time.sleep(0.005)
+    return job.status
+
+
+def test_result_and_notifications():
+    """Test a job's result, progress and state notifications."""
+    updates = []
+    scheduler = JobScheduler(notify=updates.append)
+
+    def work():
+        for i in range(4):
+            report_progress(i + 1, 4)
+        return {"success": True}
+
+    job = scheduler.submit("work", work)
+    assert wait_for(job) == JOB_DONE
+    assert job.result == {"success": True} and job.progress == 1.0
+
+    statuses = [u["status"] for u in updates]
+    assert statuses[0] == "queued" and statuses[-1] == "done" and "running" in statuses
+    assert [u["progress"] for u in updates if u["progress"] is not None][:2] == [0.25, 0.5]
+    assert scheduler.get(job.id).to_dict()["status"] == JOB_DONE
+    scheduler.shutdown()
+    print("✓ Job results and notifications work")
+
+
+def test_failure():
+    """Test exceptions mark the job failed."""
+    scheduler = JobScheduler()
+    job = scheduler.submit("broken", lambda: 1 / 0)
+    assert wait_for(job) == JOB_FAILED
+    assert "division" in job.error
+    scheduler.shutdown()
+    print("✓ Failed jobs report their error")
+
+
+def test_cancel():
+    """Test cancelling a queued job and a running job."""
+    scheduler = JobScheduler(workers=1)
+    started = threading.Event()
+
+    def long_running():
+        started.set()
+        while True:
+            check_cancelled()
+            time.sleep(0.005)
+
+    running = scheduler.submit("long", long_running)
+    queued = scheduler.submit("never", lambda: "ran")
+    assert started.wait(2.0)
+    assert running.status == JOB_RUNNING
+
+    assert scheduler.cancel(queued.id)
+    assert scheduler.cancel(running.id)
+    assert wait_for(running) == JOB_CANCELLED
+    assert wait_for(queued) == JOB_CANCELLED and queued.result is None
+    assert not scheduler.cancel(running.id)
+    assert not scheduler.cancel("job-unknown")
+    scheduler.shutdown()
+    print("✓ Jobs can be cancelled")
+
+
+def test_bounded_queue():
+    """Test submit refuses jobs when the queue is full."""
+    scheduler = JobScheduler(workers=1, max_queued=2)
+    release = threading.Event()
+    started = threading.Event()
+    scheduler.submit("block", lambda: (started.set(), release.wait(2.0)))
+    assert started.wait(2.0)
+
+    scheduler.submit("a", lambda: None)
+    scheduler.submit("b", lambda: None)
+    try:
+        scheduler.submit("c", lambda: None)
+        assert False, "Expected RuntimeError"
+    except RuntimeError:
+        pass
+    assert len(scheduler.jobs()) == 3
+    release.set()
+    scheduler.shutdown()
+    print("✓ Job queue is bounded")
+
+
+def test_storage_jobs_serialized():
+    """Test storage jobs never overlap, other jobs run alongside."""
+    scheduler = JobScheduler(workers=3)
+    active = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def storage_work():
+        with lock:
+            active.append(1)
+            if len(active) > 1:
+                overlaps.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.pop()
+
+    free_started = threading.Event()
+    jobs = [scheduler.submit(f"s{i}", storage_work) for i in range(3)]
+    free = scheduler.submit("free", free_started.set, uses_storage=False)
+
+    assert free_started.wait(2.0)
+    for job in jobs + [free]:
+        assert wait_for(job) == JOB_DONE
+    assert overlaps == []
+    scheduler.shutdown()
+    print("✓ Storage jobs are serialized")
+
+
+def test_cancel_export_through_api():
+    """Test a cancelled export job ends cancelled, single and split."""
+    with tempfile.TemporaryDirectory() as tmpdir, open_api(tmpdir) as api:
+        storage = api.storage
+        storage.replace_all(
+            [{"reference": f"{i:04d}", "gloss": f"word {i}", "audio_filename": f"{i}.wav"}
+             for i in range(1, 5)],
+            [(f"{i}.wav", make_wav([i] * 2000)) for i in range(1, 5)]
+        )
+        read_audio = storage.get_audio
+        reads = []
+        job_ids = []
+
+        def get_audio(filename):
+            # Cancel the export while it reads its first recording
+            if current_job() is not None:
+                reads.append(filename)
+                api.cancel_job(job_ids[-1])
+            return read_audio(filename)
+
+        storage.get_audio = get_audio
+        for max_volume_bytes in (None, 64 * 1024):
+            dest = os.path.join(tmpdir, f"export_{max_volume_bytes}.zip")
+            del reads[:]
+            # Hold the lock so the job ID is known before the export starts
+            with api.jobs.storage_lock:
+                submitted = api.submit_job(
+                    "export_zip", {"dest_path": dest, "max_volume_bytes": max_volume_bytes}
+                )
+                assert submitted["success"], submitted
+                job_ids.append(submitted["job_id"])
+
+            job = api.jobs.get(job_ids[-1])
+            assert wait_for(job) == JOB_CANCELLED
+            assert api.get_job(job.id)["status"] == "cancelled"
+            assert api.get_job(job.id)["result"] is None
+            # Stopped at the next recording, with no archive left behind
+            assert len(reads) == 1
+            assert not [f for f in os.listdir(tmpdir) if f.startswith("export_")]
+    print("✓ Cancelled export jobs end cancelled")
+
+if __name__ == "__main__":
+    print("\n=== Job Scheduler Tests ===\n")
+
+    test_result_and_notifications()
+    test_failure()
+    test_cancel()
+    test_bounded_queue()
+    test_storage_jobs_serialized()
+    test_cancel_export_through_api()
+
+    print("\n✓ All job scheduler tests passed!\n")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Tests for the local media server.
+
+Tests verify:
+1. Range headers are parsed, including suffix and open ranges
+2. Recordings are served whole and by range with ETags, reading only
+   the requested bytes of uncompressed recordings
+3. Revalidation returns 304 and unsatisfiable ranges 416
+4. Pictures are served by entry ID
+5. Requests without the token are rejected
+"""
+import sys
+import os
+import tempfile
+import urllib.error
+import urllib.request
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.media_server import MediaServer, parse_range
+from app.storage import StorageManager
+from app.audio import wav_header
+
+
+def fetch(url, headers=None):
+    """Return (status, headers, body), including error statuses."""
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def make_server(tmpdir):
+    storage = StorageManager(os.path.join(tmpdir, "test.db"))
+    pcm = bytes(range(256)) * 40
+    wav = wav_header(len(pcm), 44100, 1) + pcm
+    storage.save_audio("0001 water.wav", wav)
+
+    os.makedirs(os.path.join(tmpdir, "pictures"))
+    with open(os.path.join(tmpdir, "pictures", "water.png"), 'wb') as f:
+        f.write(b"\x89PNG" + b"\x00" * 1000)
+    entry_id = storage.add_entry({
+        "reference": "0001", "gloss": "water", "picture_filename": "pictures/water.png"
+    })
+    remote_id = storage.add_entry({
+        "reference": "0002", "gloss": "fire", "picture_filename": "https://example.org/fire.png"
+    })
+
+    server = MediaServer(storage, picture_root=tmpdir)
+    server.start()
+    return server, wav, entry_id, remote_id
+
+
+def test_parse_range():
+    """Test single-range parsing."""
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=-500", 100) == (0, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    # Multiple ranges are answered with the whole resource
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    for bad in ("bytes=100-", "bytes=5-4", "bytes=-0"):
+        try:
+            parse_range(bad, 100)
+            assert False, f"Expected ValueError for {bad}"
+        except ValueError:
+            pass
+    print("✓ Range parsing works")
+
+
+def test_audio_full_and_ranges():
+    """Test recordings are served whole and by range."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server, wav, _, _ = make_server(tmpdir)
+        try:
+            url = server.audio_url("0001 water.wav")
+            assert "127.0.0.1" in url and server.token in url
+
+            status, headers, body = fetch(url)
+            assert status == 200 and body == wav
+            assert headers["Content-Type"] == "audio/wav"
+            assert headers["Accept-Ranges"] == "bytes"
+            assert headers["Cache-Control"] == "private, no-cache"
+            etag = headers["ETag"]
+
+            status, headers, body = fetch(url, {"Range": "bytes=44-99"})
+            assert status == 206 and body == wav[44:100]
+            assert headers["Content-Range"] == f"bytes 44-99/{len(wav)}"
+
+            status, _, body = fetch(url, {"Range": "bytes=-16"})
+            assert status == 206 and body == wav[-16:]
+
+            # Stale If-Range: the whole recording is sent
+            status, _, body = fetch(url, {"Range": "bytes=0-9", "If-Range": '"stale"'})
+            assert status == 200 and body == wav
+
+            status, _, body = fetch(url, {"If-None-Match": etag})
+            assert status == 304 and body == b""
+
+            status, headers, _ = fetch(url, {"Range": f"bytes={len(wav)}-"})
+            assert status == 416 and headers["Content-Range"] == f"bytes */{len(wav)}"
+
+            assert fetch(server.audio_url("missing.wav"))[0] == 404
+        finally:
+            server.stop()
+    print("✓ Recordings served with ranges and ETags")
+
+
+def test_audio_reads_only_ranges():
+    """Test ranges are read without loading recordings; compressed ones are decoded once."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server, wav, _, _ = make_server(tmpdir)
+        storage = server.storage
+        loads = []
+        get_audio = storage.get_audio
+        storage.get_audio = lambda filename: loads.append(filename) or get_audio(filename)
+        try:
+            url = server.audio_url("0001 water.wav")
+            status, headers, body = fetch(url, {"Range": "bytes=100-199"})
+            assert status == 206 and body == wav[100:200]
+            etag = headers["ETag"]
+            assert fetch(url, {"If-None-Match": etag})[0] == 304
+            assert loads == []
+
+            # Saving again changes the ETag, even with the same content
+            storage.save_audio("0001 water.wav", wav)
+            status, headers, _ = fetch(url, {"If-None-Match": etag})
+            assert status == 200 and headers["ETag"] != etag
+
+            storage.set_audio_codec("delta-zlib")
+            storage.save_audio("0002 fire.wav", wav)
+            url = server.audio_url("0002 fire.wav")
+            status, headers, body = fetch(url, {"Range": "bytes=0-99"})
+            assert status == 206 and body == wav[:100]
+            assert headers["Content-Range"] == f"bytes 0-99/{len(wav)}"
+            status, _, body = fetch(url, {"Range": "bytes=100-"})
+            assert status == 206 and body == wav[100:]
+            assert loads == ["0002 fire.wav"]
+        finally:
+            server.stop()
+    print("✓ Recordings served by range without reading them whole")
+
+
+def test_pictures():
+    """Test entry pictures are served from disk."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server, _, entry_id, remote_id = make_server(tmpdir)
+        try:
+            status, headers, body = fetch(server.picture_url(entry_id))
+            assert status == 200 and body.startswith(b"\x89PNG") and len(body) == 1004
+            assert headers["Content-Type"] == "image/png"
+            assert headers["Last-Modified"]
+
+            status, _, _ = fetch(server.picture_url(entry_id), {"If-None-Match": headers["ETag"]})
+            assert status == 304
+            status, _, _ = fetch(server.picture_url(entry_id),
+                                 {"If-Modified-Since": headers["Last-Modified"]})
+            assert status == 304
+
+            # Remote pictures and unknown entries are not served
+            assert fetch(server.picture_url(remote_id))[0] == 404
+            assert fetch(server.picture_url(9999))[0] == 404
+        finally:
+            server.stop()
+    print("✓ Pictures served by entry ID")
+
+
+def test_token_required():
+    """Test requests without the token are rejected."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server, _, _, _ = make_server(tmpdir)
+        try:
+            base = server.base_url.rsplit("/", 1)[0]
+            assert fetch(f"{base}/wrong-token/audio/0001%20water.wav")[0] == 404
+            assert fetch(f"{base}/audio/0001%20water.wav")[0] == 404
+        finally:
+            server.stop()
+        assert server.base_url is None
+    print("✓ Token required")
+
+
+if __name__ == "__main__":
+    print("\n=== Media Server Tests ===\n")
+
+    test_parse_range()
+    test_audio_full_and_ranges()
+    test_audio_reads_only_ranges()
+    test_pictures()
+    test_token_required()
+
+    print("\n✓ All media server tests passed!\n")
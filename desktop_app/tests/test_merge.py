@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Tests for merging exports from several fieldworkers.
+
+Tests verify:
+1. Entries are reconciled by normalized reference
+2. Each conflict policy picks the expected take
+3. Identical audio is stored once in the merged archive
+4. The merged archive verifies and can be re-imported
+5. Pictures are carried over, renamed when different files share a name
+6. Recordings no entry refers to, such as verbal consent, are carried over
+"""
+import sys
+import os
+import json
+import shutil
+import tempfile
+import zipfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.export_zip import create_export_zip
+from app.merge import merge_exports, MERGE_REPORT_FILENAME
+from app.integrity import verify_export_zip, CHECKSUMS_FILENAME
+from tests.audio_fixtures import make_wav
+
+
+WAV_A = make_wav([100] * 2000)
+WAV_B = make_wav([200] * 2000)
+
+
+def _write_sources(tmp_dir):
+    """Two devices: device 1 recorded 'body' early, device 2 re-recorded it later."""
+    device1 = [
+        {"reference": "1", "gloss": "body", "local_transcription": "soma",
+         "audio_filename": "0001_body.wav", "recorded_at": "2024-01-01T10:00:00Z"},
+        {"reference": "0002", "gloss": "head", "audio_filename": "0002_head.wav",
+         "recorded_at": "2024-01-01T10:05:00Z"},
+    ]
+    device2 = [
+        {"reference": "0001", "gloss": "body", "recorded_at": "2024-01-02T10:00:00Z",
+         "local_transcription": ""},
+        {"reference": "0002", "gloss": "head", "audio_filename": "0002_head.wav",
+         "recorded_at": "2024-01-02T10:05:00Z"},
+        {"reference": "0003", "gloss": "eye", "local_transcription": "jicho"},
+    ]
+    paths = []
+    for i, (entries, audio) in enumerate([
+        (device1, [{"filename": "0001_body.wav", "data": WAV_A},
+                   {"filename": "0002_head.wav", "data": WAV_A}]),
+        (device2, [{"filename": "0002_head.wav", "data": WAV_B}]),
+    ]):
+        path = os.path.join(tmp_dir, f"device{i + 1}.zip")
+        assert create_export_zip(entries, audio, [], path)["success"]
+        paths.append(path)
+    return paths
+
+
+def _read(path):
+    with zipfile.ZipFile(path) as zf:
+        xml = zf.read("wordlist.xml").decode("utf-16")
+        report = json.loads(zf.read(MERGE_REPORT_FILENAME))
+        manifest = json.loads(zf.read(CHECKSUMS_FILENAME))
+        names = zf.namelist()
+    return xml, report, manifest, names
+
+
+def test_merge_latest():
+    """Test latest policy picks newest takes and fills transcriptions."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        sources = _write_sources(tmp_dir)
+        dest = os.path.join(tmp_dir, "merged.zip")
+        result = merge_exports(sources, dest, policy="latest", max_workers=2)
+        
+        assert result["success"], result.get("error")
+        assert result["total_entries"] == 3
+        xml, report, _, names = _read(dest)
+        # Newer body take has no audio or transcription; transcription is filled in
+        assert "<LocalTranscription>soma</LocalTranscription>" in xml
+        assert "audio/0001_body.wav" not in names
+        assert "audio/0002_head.wav" in names
+        assert [c["reference"] for c in report["conflicts"]] == ["0002"]
+        assert verify_export_zip(dest)["success"]
+        print("✓ Latest policy works")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_merge_prefer_audio():
+    """Test prefer_audio policy keeps the older take that has audio."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        sources = _write_sources(tmp_dir)
+        dest = os.path.join(tmp_dir, "merged.zip")
+        result = merge_exports(sources, dest, policy="prefer_audio", use_processes=False)
+        
+        assert result["success"], result.get("error")
+        xml, _, manifest, names = _read(dest)
+        assert "<SoundFile>0001_body.wav</SoundFile>" in xml
+        # body (device 1) and head (device 2) are different recordings
+        assert "audio/0001_body.wav" in names and "audio/0002_head.wav" in names
+        assert manifest["aliases"] == {}
+        print("✓ Prefer-audio policy works")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_merge_keep_all_dedupes():
+    """Test keep_all keeps distinct takes and stores identical audio once."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        sources = _write_sources(tmp_dir)
+        dest = os.path.join(tmp_dir, "merged.zip")
+        result = merge_exports(sources, dest, policy="keep_all", use_processes=False)
+        
+        assert result["success"], result.get("error")
+        _, report, manifest, names = _read(dest)
+        assert report["extraTakes"] == {"0002_head.wav": ["0002_head.take2.wav"]}
+        # The older head take is identical to device 1's body audio
+        assert "audio/0002_head.take2.wav" not in names
+        assert manifest["aliases"]["audio/0002_head.take2.wav"] in names
+        assert result["audio_duplicates_skipped"] == 1
+        assert verify_export_zip(dest)["success"]
+        print("✓ Keep-all policy keeps takes and dedupes")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_merge_pictures():
+    """Test pictures survive the merge, deduplicated by content."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        sources = []
+        for i, (tree, house) in enumerate([(b"tree-1", b"house"), (b"tree-2", b"house")]):
+            pictures = []
+            for name, data in (("tree.jpg", tree), ("house.jpg", house)):
+                path = os.path.join(tmp_dir, f"device{i + 1}", name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                pictures.append({"path": path, "arcname": f"pictures/{name}"})
+            entries = [
+                {"reference": "0001", "gloss": "tree", "picture_filename": "pictures/tree.jpg",
+                 "recorded_at": f"2024-01-0{i + 1}T10:00:00Z"},
+                {"reference": f"000{i + 2}", "gloss": "house", "picture_filename": "pictures/house.jpg"},
+                {"reference": f"001{i}", "gloss": "leaf", "picture_filename": "pictures/tree.jpg"},
+            ]
+            path = os.path.join(tmp_dir, f"device{i + 1}.zip")
+            assert create_export_zip(entries, [], [], path, pictures=pictures)["success"]
+            sources.append(path)
+
+        dest = os.path.join(tmp_dir, "merged.zip")
+        result = merge_exports(sources, dest, use_processes=False)
+
+        assert result["success"], result.get("error")
+        assert result["pictures_included"] == 3
+        xml, _, _, _ = _read(dest)
+        with zipfile.ZipFile(dest) as zf:
+            # The newer tree wins; the identical house picture is stored once
+            assert zf.read("pictures/tree.jpg") == b"tree-2"
+            assert zf.read("pictures/house.jpg") == b"house"
+            # Device 1's different tree.jpg is kept under a new name
+            assert zf.read("pictures/tree_2.jpg") == b"tree-1"
+            assert zf.getinfo("pictures/tree.jpg").compress_type == zipfile.ZIP_STORED
+        assert xml.count("<Picture>pictures/house.jpg</Picture>") == 2
+        assert xml.count("<Picture>pictures/tree.jpg</Picture>") == 2
+        assert xml.count("<Picture>pictures/tree_2.jpg</Picture>") == 1
+        assert verify_export_zip(dest)["success"]
+        print("✓ Pictures carried through the merge")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_merge_consent_audio():
+    """Test verbal consent recordings survive the merge and stay linked to their records."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        sources = []
+        statements = [make_wav([300] * 2000), WAV_B]
+        for i, statement in enumerate(statements):
+            entries = [{"reference": "0001", "gloss": "body", "audio_filename": "0001_body.wav"}]
+            audio = [
+                {"filename": "0001_body.wav", "data": WAV_A},
+                # Same name on both devices, different statements
+                {"filename": "consent.wav", "data": statement},
+                # Identical on both devices
+                {"filename": "consent_shared.wav", "data": WAV_A},
+            ]
+            consent = [
+                {"timestamp": f"2024-01-0{i + 1}T09:00:00Z", "device_id": f"device{i + 1}",
+                 "type": "verbal", "response": "yes", "verbal_consent_filename": "consent.wav"},
+            ]
+            path = os.path.join(tmp_dir, f"device{i + 1}.zip")
+            assert create_export_zip(entries, audio, consent, path)["success"]
+            sources.append(path)
+
+        dest = os.path.join(tmp_dir, "merged.zip")
+        result = merge_exports(sources, dest, use_processes=False)
+
+        assert result["success"], result.get("error")
+        assert result["unreferenced_audio_included"] == 3
+        with zipfile.ZipFile(dest) as zf:
+            assert zf.read("audio/consent.wav") == statements[0]
+            assert zf.read("audio/consent_2.wav") == statements[1]
+            consent = json.loads(zf.read("consent_log.json"))["records"]
+        assert [r["verbalConsentFilename"] for r in consent] == ["consent.wav", "consent_2.wav"]
+        _, _, manifest, names = _read(dest)
+        # Identical audio is still stored once
+        assert "audio/consent_shared.wav" in manifest["aliases"]
+        assert "audio/consent_shared.wav" not in names
+        assert verify_export_zip(dest)["success"]
+        print("✓ Consent recordings carried through the merge")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_merge_unknown_policy():
+    """Test unknown policies are rejected."""
+    result = merge_exports(["a.zip"], "out.zip", policy="newest")
+    
+    assert not result["success"]
+    assert "policy" in result["error"]
+    assert not os.path.exists("out.zip")
+    print("✓ Unknown policy rejected")
+
+
+def run_all_tests():
+    """Run all merge tests."""
+    print("=" * 50)
+    print("Running Merge Tests")
+    print("=" * 50)
+    
+    tests = [
+        test_merge_latest,
+        test_merge_prefer_audio,
+        test_merge_keep_all_dedupes,
+        test_merge_pictures,
+        test_merge_consent_audio,
+        test_merge_unknown_policy,
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: Unexpected error: {e}")
+            failed += 1
+    
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 50)
+    
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
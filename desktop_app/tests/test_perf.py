@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for bridge API instrumentation.
+
+Tests verify:
+1. Latency percentiles are computed over the recorded calls
+2. Disabled wrappers record nothing
+3. Enabled wrappers record calls, payload sizes and errors
+4. Wrapped methods keep their signature and excluded methods stay unwrapped
+5. Statistics can be dumped to JSON
+"""
+import sys
+import os
+import json
+import inspect
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.perf import MethodStats, PerfRecorder, instrument, payload_size
+
+
+class SampleAPI:
+    def get_items(self, count: int, prefix: str = "item"):
+        return [f"{prefix}{i}" for i in range(count)]
+
+    def fail(self):
+        raise ValueError("bad input")
+
+    def get_stats(self):
+        return {}
+
+    def _private(self):
+        return 1
+
+
+def test_percentiles():
+    """Test percentiles and payload averages of MethodStats."""
+    stats = MethodStats()
+    for ms in range(1, 101):
+        stats.record(float(ms), 10, None)
+    stats.record(500.0, 0, "ValueError: x")
+
+    snap = stats.snapshot()
+    assert snap["calls"] == 101
+    assert snap["errors"] == 1
+    assert snap["last_error"] == "ValueError: x"
+    assert snap["p50_ms"] == 51.0
+    assert snap["p95_ms"] == 96.0
+    assert snap["p99_ms"] == 100.0
+    assert snap["max_ms"] == 500.0
+    assert snap["payload_bytes_avg"] == 10
+
+    empty = MethodStats().snapshot()
+    assert empty["p50_ms"] is None
+    assert empty["payload_bytes_avg"] == 0
+    print("✓ Percentiles computed")
+
+
+def test_disabled_records_nothing():
+    """Test a disabled recorder leaves calls unrecorded."""
+    api = SampleAPI()
+    recorder = PerfRecorder(enabled=False)
+    instrument(api, recorder)
+
+    assert api.get_items(3) == ["item0", "item1", "item2"]
+    assert recorder.snapshot()["methods"] == {}
+    print("✓ Disabled recorder records nothing")
+
+
+def test_enabled_records_calls():
+    """Test calls, payload sizes and errors are recorded."""
+    api = SampleAPI()
+    recorder = PerfRecorder(enabled=True)
+    instrument(api, recorder)
+
+    result = api.get_items(2, prefix="w")
+    api.get_items(2, prefix="w")
+    try:
+        api.fail()
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+    methods = recorder.snapshot()["methods"]
+    assert methods["get_items"]["calls"] == 2
+    assert methods["get_items"]["payload_bytes_max"] == payload_size(result)
+    assert methods["get_items"]["p50_ms"] is not None
+    assert methods["fail"]["errors"] == 1
+    assert methods["fail"]["last_error"] == "ValueError: bad input"
+
+    recorder.reset()
+    assert recorder.snapshot()["methods"] == {}
+    print("✓ Calls, payloads and errors recorded")
+
+
+def test_signature_and_exclusions():
+    """Test wrappers keep signatures and skip excluded and private methods."""
+    api = SampleAPI()
+    wrapped = instrument(api, PerfRecorder(enabled=True), exclude=("get_stats",))
+
+    assert wrapped == 2
+    spec = inspect.getfullargspec(api.get_items)
+    assert spec.args[-2:] == ["count", "prefix"]
+    assert "get_stats" not in api.__dict__
+    assert "_private" not in api.__dict__
+    print("✓ Signatures kept, exclusions honoured")
+
+
+def test_dump():
+    """Test statistics are written as JSON."""
+    recorder = PerfRecorder(enabled=True)
+    recorder.record("load_entries", 0.004, 1200)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "perf.json")
+        recorder.dump(path)
+        with open(path) as f:
+            data = json.load(f)
+
+    assert data["enabled"] is True
+    assert data["methods"]["load_entries"]["calls"] == 1
+    assert data["methods"]["load_entries"]["p50_ms"] == 4.0
+    assert "generatedAt" in data
+    print("✓ Statistics dumped")
+
+
+if __name__ == "__main__":
+    print("\n=== API Instrumentation Tests ===\n")
+
+    test_percentiles()
+    test_disabled_records_nothing()
+    test_enabled_records_calls()
+    test_signature_and_exclusions()
+    test_dump()
+
+    print("\n✓ All API instrumentation tests passed!\n")
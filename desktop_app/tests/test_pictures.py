@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Tests for entry pictures.
+
+Tests verify:
+1. Picture references resolve against the imported file or URL
+2. Variants are cached by source path and modification time
+3. The cache stays under its size limit, dropping least recently used files
+4. Prefetching renders in the background; originals are used without a renderer
+5. The media server serves variants for ?size=
+6. Exports pack pictures and ZIP imports restore them
+7. A variant that cannot be written falls back to the original
+8. Exports find relative pictures without depending on the working directory
+"""
+import sys
+import os
+import tempfile
+import time
+import urllib.request
+import zipfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pictures import (
+    PictureCache, resolve_picture, collect_pictures, picture_dir, VARIANTS
+)
+from app.storage import StorageManager
+from app.media_server import MediaServer
+from app.operations import import_wordlist_file, export_archive
+from app.integrity import verify_export_zip
+
+
+class FakeRenderer:
+    """Writes the edge length instead of an image; pictures under 100 bytes count as small."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, src_path, max_edge):
+        self.calls.append((os.path.basename(src_path), max_edge))
+        if os.path.getsize(src_path) < 100:
+            return None
+        return f"{max_edge}:".encode() + b"x" * 1000, ".jpg"
+
+
+def _write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+    return path
+
+
+def test_resolve_picture():
+    """Test relative references resolve against the wordlist location."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = _write(os.path.join(tmpdir, "img", "water.jpg"), 10)
+        assert resolve_picture("img/water.jpg", tmpdir) == path
+        # Missing files keep the old meaning (relative to the web directory)
+        assert resolve_picture("img/fire.jpg", tmpdir) == "img/fire.jpg"
+        assert resolve_picture("https://example.org/a.jpg", tmpdir) == "https://example.org/a.jpg"
+        assert resolve_picture(None, tmpdir) is None
+    assert resolve_picture("img/a.jpg", "https://example.org/lists/words.xml") == \
+        "https://example.org/lists/img/a.jpg"
+    print("✓ Picture references resolved")
+
+
+def test_cache_key_and_reuse():
+    """Test variants are reused until the source changes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = _write(os.path.join(tmpdir, "src", "water.jpg"), 500)
+        render = FakeRenderer()
+        cache = PictureCache(os.path.join(tmpdir, "cache"), render=render)
+
+        thumb = cache.get(src, "thumb")
+        assert open(thumb, 'rb').read().startswith(b"160:")
+        assert cache.get(src, "thumb") == thumb
+        assert cache.get(src, "display") != thumb
+        assert len(render.calls) == 2
+
+        # A modified picture gets a new variant
+        _write(src, 600)
+        os.utime(src, ns=(time.time_ns() + 10 ** 9,) * 2)
+        assert cache.get(src, "thumb") != thumb
+        assert len(render.calls) == 3
+
+        # Variants persist across sessions
+        cache.shutdown()
+        reopened = PictureCache(os.path.join(tmpdir, "cache"), render=render)
+        assert reopened.stats()["files"] == 3
+        reopened.get(src, "thumb")
+        assert len(render.calls) == 3
+        reopened.shutdown()
+    print("✓ Variants cached by source and modification time")
+
+
+def test_size_bound():
+    """Test the least recently used variants are evicted."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sources = [_write(os.path.join(tmpdir, "src", f"{i}.jpg"), 500) for i in range(4)]
+        cache = PictureCache(os.path.join(tmpdir, "cache"), max_bytes=3500, render=FakeRenderer())
+
+        first = cache.get(sources[0], "thumb")
+        cache.get(sources[1], "thumb")
+        cache.get(sources[2], "thumb")
+        # Using the first keeps it; the second is now the oldest
+        cache.get(sources[0], "thumb")
+        cache.get(sources[3], "thumb")
+
+        stats = cache.stats()
+        assert stats["bytes"] <= 3500
+        assert stats["evictions"] == 1
+        assert os.path.exists(first)
+        assert len(os.listdir(cache.cache_dir)) == stats["files"] == 3
+        cache.shutdown()
+    print("✓ Cache size bounded")
+
+
+def test_prefetch_and_originals():
+    """Test background rendering and falling back to originals."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        big = _write(os.path.join(tmpdir, "src", "big.jpg"), 500)
+        small = _write(os.path.join(tmpdir, "src", "small.jpg"), 50)
+        render = FakeRenderer()
+        cache = PictureCache(os.path.join(tmpdir, "cache"), render=render)
+
+        assert cache.prefetch([big, small, os.path.join(tmpdir, "missing.jpg")]) == 2
+        cache._pool.shutdown(wait=True)
+        assert cache.stats()["renders"] == 1
+        assert cache.get(big, "display", wait=False) is not None
+        # Pictures smaller than the variant are served as they are
+        assert cache.get(small, "display") is None
+        assert len(render.calls) == 2
+
+        without = PictureCache(os.path.join(tmpdir, "cache2"), render=None)
+        without.render = None
+        assert without.get(big, "thumb") is None
+        assert without.prefetch([big]) == 0
+        assert not without.stats()["available"]
+        without.shutdown()
+    print("✓ Prefetch and original fallback")
+
+
+def test_media_server_variants():
+    """Test ?size= serves the cached variant."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageManager(os.path.join(tmpdir, "test.db"))
+        src = _write(os.path.join(tmpdir, "water.jpg"), 500)
+        entry_id = storage.add_entry({"reference": "0001", "gloss": "water", "picture_filename": src})
+        cache = PictureCache(os.path.join(tmpdir, "cache"), render=FakeRenderer())
+        server = MediaServer(storage, picture_root=tmpdir, pictures=cache)
+        server.start()
+        try:
+            with urllib.request.urlopen(server.picture_url(entry_id, "thumb"), timeout=5) as response:
+                assert response.read().startswith(b"160:")
+                assert response.headers["Content-Type"] == "image/jpeg"
+            with urllib.request.urlopen(server.picture_url(entry_id), timeout=5) as response:
+                assert response.read() == open(src, 'rb').read()
+            # Unknown sizes get the original
+            with urllib.request.urlopen(server.picture_url(entry_id) + "?size=huge", timeout=5) as response:
+                assert len(response.read()) == 500
+        finally:
+            server.stop()
+            cache.shutdown()
+    print("✓ Media server serves variants")
+
+
+def test_collect_pictures():
+    """Test each picture is packed once under a unique name."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        a = _write(os.path.join(tmpdir, "a", "pic.jpg"), 10)
+        b = _write(os.path.join(tmpdir, "b", "pic.jpg"), 20)
+        entries = [
+            {"id": 1, "picture_filename": a},
+            {"id": 2, "picture_filename": "b/pic.jpg"},
+            {"id": 3, "picture_filename": a},
+            {"id": 4, "picture_filename": "https://example.org/x.jpg"},
+            {"id": 5, "picture_filename": "missing.jpg"},
+        ]
+        exported, pictures = collect_pictures(entries, [tmpdir])
+        assert [e["picture_filename"] for e in exported] == [
+            "pictures/pic.jpg", "pictures/pic_2.jpg", "pictures/pic.jpg",
+            "https://example.org/x.jpg", "missing.jpg"
+        ]
+        assert [(p["path"], p["size"]) for p in pictures] == [(a, 10), (b, 20)]
+        # Entries passed in are not modified
+        assert entries[0]["picture_filename"] == a
+    print("✓ Pictures collected for export")
+
+
+def test_export_import_roundtrip():
+    """Test pictures travel through single and split exports."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src_dir = os.path.join(tmpdir, "wordlist")
+        data = _write(os.path.join(src_dir, "img", "water.jpg"), 2000)
+        xml_path = os.path.join(src_dir, "words.xml")
+        with open(xml_path, 'w', encoding='utf-8') as f:
+            f.write("<Wordlist><Entry><Reference>0001</Reference><Gloss>water</Gloss>"
+                    "<Picture>img/water.jpg</Picture></Entry></Wordlist>")
+
+        source = StorageManager(os.path.join(tmpdir, "source.db"))
+        assert import_wordlist_file(source, xml_path)["success"]
+        assert source.get_entry(1)["picture_filename"] == data
+
+        for max_volume_bytes in (None, 64 * 1024):
+            dest = os.path.join(tmpdir, f"export_{max_volume_bytes}.zip")
+            summary = export_archive(source, dest, max_volume_bytes=max_volume_bytes)
+            assert summary["success"], summary
+            assert summary["pictures_included"] == 1
+            archive = summary.get("volumes", [summary["path"]])[0]
+            with zipfile.ZipFile(archive) as zf:
+                assert zf.read("pictures/water.jpg") == open(data, 'rb').read()
+            assert verify_export_zip(archive)["success"]
+
+            target = StorageManager(os.path.join(tmpdir, f"target_{max_volume_bytes}.db"))
+            result = import_wordlist_file(target, archive)
+            assert result["success"] and result["pictures_imported"] == 1
+            restored = target.get_entry(1)["picture_filename"]
+            assert os.path.dirname(restored) == picture_dir(target.db_path)
+            assert open(restored, 'rb').read() == open(data, 'rb').read()
+    print("✓ Pictures exported and restored")
+
+
+def test_write_failure():
+    """Test a failed variant write is not left pending."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = _write(os.path.join(tmpdir, "src", "water.jpg"), 500)
+        render = FakeRenderer()
+        cache = PictureCache(os.path.join(tmpdir, "cache"), render=render)
+        # As if the disk were full
+        cache.cache_dir = os.path.join(tmpdir, "missing")
+
+        assert cache.get(src, "thumb") is None
+        assert cache.get(src, "thumb") is None
+        stats = cache.stats()
+        assert stats["errors"] == 1 and stats["pending"] == 0
+        assert len(render.calls) == 1
+        cache.shutdown()
+    print("✓ Failed variant writes fall back to the original")
+
+
+def test_export_resolves_without_cwd():
+    """Test relative pictures resolve against the project, not the working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageManager(os.path.join(tmpdir, "project.db"))
+        data = _write(os.path.join(picture_dir(storage.db_path), "water.jpg"), 300)
+        entry_id = storage.add_entry({"reference": "0001", "gloss": "water", "picture_filename": "water.jpg"})
+
+        cwd = os.getcwd()
+        os.chdir(os.path.dirname(tmpdir))
+        try:
+            summary = export_archive(storage, os.path.join(tmpdir, "out.zip"))
+        finally:
+            os.chdir(cwd)
+        assert summary["pictures_included"] == 1
+        with zipfile.ZipFile(summary["path"]) as zf:
+            assert zf.read("pictures/water.jpg") == open(data, 'rb').read()
+
+        server = MediaServer(storage)
+        assert server.picture_path(str(entry_id)) == data
+    print("✓ Relative pictures resolved from the project")
+
+
+if __name__ == "__main__":
+    print("\n=== Picture Tests ===\n")
+
+    test_resolve_picture()
+    test_cache_key_and_reuse()
+    test_size_bound()
+    test_prefetch_and_originals()
+    test_media_server_variants()
+    test_collect_pictures()
+    test_export_import_roundtrip()
+    test_write_failure()
+    test_export_resolves_without_cwd()
+
+    print("\n✓ All picture tests passed!\n")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Tests for low-latency playback.
+
+Tests verify:
+1. WAV data decodes to (frames, channels) int16 samples
+2. The PCM cache evicts least recently used recordings by byte budget
+3. The persistent stream callback plays buffers block by block
+4. The stream is reused between plays and reopened on format change
+5. Prefetch fills the cache in the background
+6. A decode that was in flight when the cache was invalidated is dropped
+"""
+import sys
+import os
+import threading
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.playback import DecodedAudio, PcmCache, PlaybackEngine, Prefetcher, decode_wav
+from tests.audio_fixtures import make_wav
+
+
+def decoded(frames: int) -> DecodedAudio:
+    return DecodedAudio(np.zeros((frames, 1), dtype=np.int16), 44100, 1)
+
+
+class FakeStream:
+    def __init__(self, sample_rate, channels, fill):
+        self.format = (sample_rate, channels)
+        self.fill = fill
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_decode_wav():
+    """Test decoding mono and stereo WAV data."""
+    audio = decode_wav(make_wav([1, -2, 3], sample_rate=16000))
+    assert audio.samples.shape == (3, 1)
+    assert audio.samples[:, 0].tolist() == [1, -2, 3]
+    assert audio.sample_rate == 16000
+
+    stereo = decode_wav(make_wav([1, 2, 3, 4], channels=2))
+    assert stereo.samples.tolist() == [[1, 2], [3, 4]]
+    print("✓ WAV decoding works")
+
+
+def test_decode_rejects_invalid():
+    """Test non-WAV data raises ValueError."""
+    try:
+        decode_wav(b"not a wav")
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    print("✓ Invalid WAV data rejected")
+
+
+def test_cache_lru_eviction():
+    """Test the least recently used recording is evicted first."""
+    cache = PcmCache(max_bytes=2500)
+    cache.put("a.wav", decoded(500))
+    cache.put("b.wav", decoded(500))
+    assert cache.get("a.wav") is not None  # a is now most recent
+    cache.put("c.wav", decoded(500))
+
+    assert "b.wav" not in cache
+    assert "a.wav" in cache and "c.wav" in cache
+    assert cache.current_bytes == 2000
+    print("✓ LRU eviction works")
+
+
+def test_cache_skips_oversized_and_invalidates():
+    """Test oversized recordings are not cached and invalidate frees bytes."""
+    cache = PcmCache(max_bytes=1000)
+    cache.put("big.wav", decoded(1000))
+    assert "big.wav" not in cache
+
+    cache.put("a.wav", decoded(100))
+    cache.put("a.wav", decoded(200))
+    assert cache.current_bytes == 400
+    cache.invalidate("a.wav")
+    assert cache.current_bytes == 0 and len(cache) == 0
+    print("✓ Oversized entries skipped, invalidation works")
+
+
+def test_engine_fills_blocks():
+    """Test the callback copies the buffer, pads with silence and completes."""
+    engine = PlaybackEngine(open_stream=FakeStream)
+    done = threading.Event()
+    samples = np.arange(1, 6, dtype=np.int16).reshape(-1, 1)
+    engine.play(DecodedAudio(samples, 44100, 1), on_complete=done.set)
+
+    out = np.full((3, 1), 99, dtype=np.int16)
+    engine._fill(out)
+    assert out[:, 0].tolist() == [1, 2, 3]
+    assert engine.last_latency_ms is not None
+
+    engine._fill(out)
+    assert out[:, 0].tolist() == [4, 5, 0]
+    assert done.wait(1)
+    assert not engine.is_playing
+
+    engine._fill(out)
+    assert out[:, 0].tolist() == [0, 0, 0]
+    print("✓ Playback callback works")
+
+
+def test_engine_reuses_stream():
+    """Test the stream stays open between plays of the same format."""
+    opened = []
+
+    def open_stream(sample_rate, channels, fill):
+        opened.append(FakeStream(sample_rate, channels, fill))
+        return opened[-1]
+
+    engine = PlaybackEngine(open_stream=open_stream)
+    engine.play(decoded(10))
+    engine.play(decoded(20))
+    assert len(opened) == 1
+
+    engine.play(DecodedAudio(np.zeros((10, 1), dtype=np.int16), 16000, 1))
+    assert len(opened) == 2
+    assert opened[0].closed and not opened[1].closed
+
+    engine.close()
+    assert opened[1].closed
+    print("✓ Output stream reused until format changes")
+
+
+def test_prefetch_fills_cache():
+    """Test prefetch decodes recordings into the cache."""
+    store = {"a.wav": make_wav([1, 2, 3]), "bad.wav": b"junk"}
+    cache = PcmCache()
+    prefetcher = Prefetcher(cache, store.get)
+
+    prefetcher.prefetch(["a.wav", "bad.wav", "missing.wav"]).result(timeout=5)
+    prefetcher.shutdown()
+
+    assert "a.wav" in cache
+    assert "bad.wav" not in cache and "missing.wav" not in cache
+    print("✓ Prefetch fills the cache")
+
+
+def test_prefetch_drops_stale_decode():
+    """Test a decode in flight during invalidate() or clear() is not cached."""
+    for drop in ("invalidate", "clear"):
+        loading = threading.Event()
+        release = threading.Event()
+        cache = PcmCache()
+
+        def load(filename):
+            loading.set()
+            release.wait(5)
+            return make_wav([1, 2, 3])
+
+        prefetcher = Prefetcher(cache, load)
+        future = prefetcher.prefetch(["a.wav"])
+        assert loading.wait(5)
+        # The recording is replaced while its old version is being decoded
+        if drop == "invalidate":
+            cache.invalidate("a.wav")
+        else:
+            cache.clear()
+        release.set()
+        future.result(timeout=5)
+        prefetcher.shutdown()
+
+        assert "a.wav" not in cache
+        # Later decodes are cached again
+        assert cache.put("a.wav", decoded(10), cache.generation)
+        assert "a.wav" in cache
+    print("✓ Stale prefetch results are dropped")
+
+
+if __name__ == "__main__":
+    print("\n=== Playback Tests ===\n")
+
+    test_decode_wav()
+    test_decode_rejects_invalid()
+    test_cache_lru_eviction()
+    test_cache_skips_oversized_and_invalidates()
+    test_engine_fills_blocks()
+    test_engine_reuses_stream()
+    test_prefetch_fills_cache()
+    test_prefetch_drops_stale_decode()
+
+    print("\n✓ All playback tests passed!\n")
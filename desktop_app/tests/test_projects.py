@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Tests for multi-project storage.
+
+Tests verify:
+1. The database of earlier versions is registered as the default project
+2. Projects get unique IDs and their own databases, and persist in the registry
+3. StorageManagers are kept in an LRU that never evicts the active project
+4. Statistics are cached when a project is evicted or deactivated
+5. Projects can be renamed and deleted, except the active one
+6. The write-behind queue and media server move to another database
+"""
+import sys
+import os
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.projects import ProjectManager, DEFAULT_PROJECT_ID
+from app.storage import StorageManager
+from app.write_behind import WriteBehindQueue
+from app.media_server import MediaServer
+
+
+def _add_entries(storage, count):
+    storage.add_entries([{"reference": f"{i:04d}", "gloss": f"word {i}"} for i in range(count)])
+
+
+def test_default_project():
+    """Test the existing wordlist.db becomes the default project."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _add_entries(StorageManager(os.path.join(tmpdir, "wordlist.db")), 3)
+
+        projects = ProjectManager(tmpdir)
+        assert projects.active_id == DEFAULT_PROJECT_ID
+        assert projects.active_storage().get_total_count() == 3
+        listed = projects.list_projects()
+        assert [p["id"] for p in listed] == [DEFAULT_PROJECT_ID]
+        assert listed[0]["active"]
+    print("✓ Default project")
+
+
+def test_create_and_persist():
+    """Test projects get unique IDs, separate databases and are saved."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        projects = ProjectManager(tmpdir)
+        first = projects.create_project("Swahili")
+        second = projects.create_project("swahili")
+        assert first["id"] == "swahili"
+        assert second["id"] == "swahili-2"
+        assert projects.db_path("swahili") != projects.db_path("swahili-2")
+
+        _add_entries(projects.get_storage("swahili"), 2)
+        assert projects.get_storage("swahili-2").get_total_count() == 0
+
+        projects.set_active("swahili")
+        try:
+            projects.create_project("  ")
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+
+        reopened = ProjectManager(tmpdir)
+        assert reopened.active_id == "swahili"
+        assert {p["id"] for p in reopened.list_projects()} == {"default", "swahili", "swahili-2"}
+        assert reopened.list_projects()[0]["id"] == "swahili"
+        assert reopened.active_storage().get_total_count() == 2
+    print("✓ Projects created and persisted")
+
+
+def test_lru():
+    """Test the LRU of StorageManagers."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        projects = ProjectManager(tmpdir, max_cached=2)
+        for name in ("a", "b", "c"):
+            projects.create_project(name)
+
+        active = projects.active_storage()
+        a = projects.get_storage("a")
+        assert projects.get_storage("a") is a
+        assert projects.hits == 1
+
+        projects.get_storage("b")
+        stats = projects.cache_stats()
+        # 'a' is evicted; the active default project stays open
+        assert stats["cached"] == ["default", "b"]
+        assert projects.active_storage() is active
+        assert projects.get_storage("a") is not a
+        assert projects.cache_stats()["misses"] == 4
+    print("✓ LRU of open projects")
+
+
+def test_cached_stats():
+    """Test statistics are cached without opening databases."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        projects = ProjectManager(tmpdir, max_cached=1)
+        projects.create_project("Hausa")
+        projects.set_active("hausa")
+        _add_entries(projects.active_storage(), 4)
+
+        # Deactivating caches the statistics
+        projects.set_active(DEFAULT_PROJECT_ID)
+        listed = {p["id"]: p for p in ProjectManager(tmpdir).list_projects()}
+        assert listed["hausa"]["stats"]["total"] == 4
+        assert listed["hausa"]["stats"]["size_bytes"] > 0
+        assert not listed["hausa"]["cached"]
+
+        assert projects.refresh_stats()["total"] == 0
+    print("✓ Statistics cached")
+
+
+def test_rename_and_delete():
+    """Test renaming and deleting projects."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        projects = ProjectManager(tmpdir)
+        projects.create_project("Yoruba")
+        path = projects.db_path("yoruba")
+        projects.get_storage("yoruba")
+        assert os.path.exists(path)
+
+        projects.rename_project("yoruba", "Yorùbá")
+        assert {p["id"]: p["name"] for p in projects.list_projects()}["yoruba"] == "Yorùbá"
+
+        for project_id in (DEFAULT_PROJECT_ID, "missing"):
+            try:
+                projects.delete_project(project_id)
+                assert False, "Expected ValueError"
+            except ValueError:
+                pass
+
+        projects.delete_project("yoruba")
+        assert not os.path.exists(path)
+        assert [p["id"] for p in projects.list_projects()] == [DEFAULT_PROJECT_ID]
+    print("✓ Projects renamed and deleted")
+
+
+def test_switch_dependents():
+    """Test pending writes go to the old database and later ones to the new."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        old = StorageManager(os.path.join(tmpdir, "old.db"))
+        new = StorageManager(os.path.join(tmpdir, "new.db"))
+        _add_entries(old, 1)
+        _add_entries(new, 1)
+
+        writes = WriteBehindQueue(old, delay=60)
+        writes.set_transcription(1, "old text")
+        assert writes.set_storage(new)
+        writes.set_transcription(1, "new text")
+        writes.close()
+        assert old.get_entry(1)["local_transcription"] == "old text"
+        assert new.get_entry(1)["local_transcription"] == "new text"
+
+        media = MediaServer(old)
+        token = media.token
+        media.set_storage(new)
+        assert media.storage is new
+        assert media.token != token
+    print("✓ Writes and media follow the active project")
+
+
+if __name__ == "__main__":
+    print("\n=== Project Tests ===\n")
+
+    test_default_project()
+    test_create_and_persist()
+    test_lru()
+    test_cached_stats()
+    test_rename_and_delete()
+    test_switch_dependents()
+
+    print("\n✓ All project tests passed!\n")
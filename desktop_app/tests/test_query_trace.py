@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for SQLite statement tracing.
+
+Tests verify:
+1. A disabled tracer opens plain connections and records nothing
+2. Statements are aggregated with calls, rows and query plans
+3. Slow statements are kept and written to the slow-query log
+4. Failing statements are recorded as errors
+5. Settings are read from the environment
+"""
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.storage import StorageManager
+from app.query_trace import QueryTracer, normalize_sql, tracer_from_env
+
+
+def _statement(report, sql):
+    matches = [s for s in report["statements"] if s["sql"] == sql]
+    assert matches, f"{sql} not in report"
+    return matches[0]
+
+
+def test_disabled_tracer():
+    """Test a disabled tracer leaves storage untraced."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tracer = QueryTracer(enabled=False)
+        storage = StorageManager(os.path.join(tmpdir, "test.db"), tracer=tracer)
+        storage.get_total_count()
+
+        conn = tracer.connect(storage.db_path)
+        assert type(conn) is sqlite3.Connection
+        conn.close()
+
+        report = tracer.report()
+        assert report["statements"] == []
+        assert report["connections"]["count"] == 0
+    print("✓ Disabled tracer records nothing")
+
+
+def test_statement_aggregates():
+    """Test statements are aggregated with rows and plans."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tracer = QueryTracer(enabled=True)
+        storage = StorageManager(os.path.join(tmpdir, "test.db"), tracer=tracer)
+        storage.add_entries([{"reference": f"{i:04d}", "gloss": f"word {i}"} for i in range(5)])
+        tracer.reset()
+
+        assert len(storage.get_all_entries()) == 5
+        storage.get_all_entries()
+        storage.get_entry(1)
+        storage.set_setting("last_position", "2")
+
+        report = tracer.report()
+        assert report["connections"]["count"] == 4
+
+        scan = _statement(report, "SELECT * FROM entries ORDER BY id")
+        assert scan["calls"] == 2
+        assert scan["rows"] == 10
+        assert any("entries" in line for line in scan["plan"])
+
+        lookup = _statement(report, "SELECT * FROM entries WHERE id = ?")
+        assert lookup["rows"] == 1
+        assert any("PRIMARY KEY" in line for line in lookup["plan"])
+
+        assert _statement(report, "COMMIT")["calls"] == 1
+        assert abs(sum(s["share"] for s in report["statements"]) - 1.0) < 0.01
+
+        totals = [s["total_ms"] for s in report["statements"]]
+        assert totals == sorted(totals, reverse=True)
+        assert len(tracer.report(top=2)["statements"]) == 2
+    print("✓ Statements aggregated with plans")
+
+
+def test_slow_query_log():
+    """Test statements over the threshold are logged."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        log_path = os.path.join(tmpdir, "slow.jsonl")
+        tracer = QueryTracer(enabled=True, slow_ms=0.0, log_path=log_path)
+        storage = StorageManager(os.path.join(tmpdir, "test.db"), tracer=tracer)
+        tracer.reset()
+        storage.get_total_count()
+
+        report = tracer.report()
+        assert report["slow"]["count"] >= 1
+        assert report["slow"]["recent"][-1]["sql"] == "SELECT COUNT(*) FROM entries"
+
+        with open(log_path) as f:
+            lines = [json.loads(line) for line in f]
+        assert lines[-1]["sql"] == "SELECT COUNT(*) FROM entries"
+        assert lines[-1]["plan"]
+
+        quiet = QueryTracer(enabled=True, slow_ms=10000.0)
+        StorageManager(os.path.join(tmpdir, "test.db"), tracer=quiet).get_total_count()
+        assert quiet.report()["slow"]["count"] == 0
+    print("✓ Slow queries logged")
+
+
+def test_errors_recorded():
+    """Test a failing statement is recorded and re-raised."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tracer = QueryTracer(enabled=True)
+        conn = tracer.connect(os.path.join(tmpdir, "test.db"))
+        try:
+            conn.execute("SELECT * FROM missing_table")
+            assert False, "Expected OperationalError"
+        except sqlite3.OperationalError:
+            pass
+        finally:
+            conn.close()
+
+        failed = _statement(tracer.report(), "SELECT * FROM missing_table")
+        assert failed["errors"] == 1
+        assert failed["plan"] == []
+    print("✓ Errors recorded")
+
+
+def test_from_env():
+    """Test tracer settings come from the environment."""
+    assert not tracer_from_env({}).enabled
+
+    tracer = tracer_from_env({"WORDLIST_SQL_TRACE": "1", "WORDLIST_SLOW_QUERY_MS": "5"})
+    assert tracer.enabled
+    assert tracer.slow_ms == 5.0
+
+    tracer = tracer_from_env({"WORDLIST_SLOW_QUERY_LOG": "slow.jsonl", "WORDLIST_SLOW_QUERY_MS": "x"})
+    assert tracer.enabled
+    assert tracer.log_path == "slow.jsonl"
+    assert tracer.slow_ms == 20.0
+
+    assert normalize_sql("SELECT *\n    FROM entries  ") == "SELECT * FROM entries"
+    print("✓ Settings read from environment")
+
+
+if __name__ == "__main__":
+    print("\n=== Query Tracing Tests ===\n")
+
+    test_disabled_tracer()
+    test_statement_aggregates()
+    test_slow_query_log()
+    test_errors_recorded()
+    test_from_env()
+
+    print("\n✓ All query tracing tests passed!\n")
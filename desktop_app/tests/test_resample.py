@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for configurable sample rates and resampling.
+
+Tests verify:
+1. The polyphase resampler preserves in-band tones and removes aliases
+2. Resampled WAVs have the predicted length and a valid header
+3. validate_wav_16bit checks sample rate and channels
+4. The recorder capture rate can be changed between recordings
+5. Stored audio reports its sample rate
+"""
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.audio import AudioRecorder, validate_wav_16bit, encode_audio, CODEC_DELTA
+from app.audio_processing import resample_pcm, convert_wav_rate, resampled_wav_size
+from app.storage import StorageManager
+from tests.audio_fixtures import make_wav
+
+
+def tone(freq, rate, seconds=1.0, amplitude=10000, channels=1):
+    t = np.arange(int(rate * seconds)) / rate
+    signal = (np.sin(2 * np.pi * freq * t) * amplitude).astype('<i2')
+    return np.repeat(signal[:, None], channels, axis=1)
+
+
+def test_resample_preserves_tone():
+    """Test an in-band tone survives conversion to common rates."""
+    source = tone(1000, 44100)
+    for rate in (22050, 16000, 48000):
+        out = resample_pcm(source, 44100, rate)
+        assert len(out) == rate
+        expected = tone(1000, rate)
+        # Ignore filter edge effects at both ends
+        error = np.abs(out[200:-200].astype(int) - expected[200:-200].astype(int)).max()
+        assert error < 20, f"{rate} Hz: error {error}"
+    print("✓ Resampler preserves in-band tones")
+
+
+def test_resample_removes_alias():
+    """Test a tone above the new Nyquist frequency is filtered out."""
+    out = resample_pcm(tone(15000, 44100), 44100, 22050)
+    rms = np.sqrt(np.mean(out[500:-500].astype(float) ** 2))
+    assert rms < 100, f"alias rms {rms}"
+    print("✓ Resampler suppresses aliasing")
+
+
+def test_convert_wav_rate_stereo():
+    """Test WAV conversion keeps channels and predicts its size."""
+    wav = make_wav(tone(440, 44100, seconds=0.5, channels=2), 44100)
+    converted = convert_wav_rate(wav, 22050)
+
+    assert validate_wav_16bit(converted, sample_rate=22050, channels=2)
+    assert len(converted) == resampled_wav_size(len(wav), 44100, 2, 22050)
+    assert abs(len(converted) - (len(wav) - 44) / 2 - 44) <= 4
+    assert convert_wav_rate(converted, 22050) is converted
+    print("✓ WAV conversion works")
+
+
+def test_validate_rate_and_channels():
+    """Test validation rejects the wrong rate or channel count."""
+    wav = make_wav(tone(440, 16000, seconds=0.1), 16000)
+    assert validate_wav_16bit(wav)
+    assert validate_wav_16bit(wav, sample_rate=16000, channels=1)
+    assert not validate_wav_16bit(wav, sample_rate=44100)
+    assert not validate_wav_16bit(wav, channels=2)
+    print("✓ Rate and channel validation works")
+
+
+def test_recorder_sample_rate():
+    """Test the capture rate is used for new recordings."""
+    recorder = AudioRecorder(sample_rate=22050)
+    assert recorder._new_capture(False).sample_rate == 22050
+
+    assert recorder.set_sample_rate(16000)
+    assert recorder._new_capture(False).sample_rate == 16000
+    assert not recorder.set_sample_rate(12345)
+
+    try:
+        AudioRecorder(sample_rate=8000)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    print("✓ Recorder sample rate configurable")
+
+
+def test_stored_audio_format():
+    """Test stored WAV and encoded audio report their format."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageManager(os.path.join(tmpdir, "test.db"))
+        storage.save_audio("a.wav", make_wav(tone(440, 22050, 0.1), 22050))
+        storage.save_audio("b.wav", encode_audio(make_wav(tone(440, 16000, 0.1, channels=2), 16000), CODEC_DELTA))
+
+        formats = {a["filename"]: (a["sample_rate"], a["channels"]) for a in storage.get_audio_sizes()}
+        assert formats == {"a.wav": (22050, 1), "b.wav": (16000, 2)}
+    print("✓ Stored audio format reported")
+
+
+if __name__ == "__main__":
+    print("\n=== Resampling Tests ===\n")
+
+    test_resample_preserves_tone()
+    test_resample_removes_alias()
+    test_convert_wav_rate_stereo()
+    test_validate_rate_and_channels()
+    test_recorder_sample_rate()
+    test_stored_audio_format()
+
+    print("\n✓ All resampling tests passed!\n")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Tests for size-capped multi-volume exports.
+
+Tests verify:
+1. Every volume stays below the byte limit
+2. Volume 1 holds wordlist.xml, metadata.json and the volume index
+3. The index matches where each recording was written
+4. Oversized recordings are rejected
+5. Skipping duplicate recordings is rejected for split exports
+"""
+import sys
+import os
+import json
+import random
+import shutil
+import tempfile
+import zipfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.export_zip import (
+    create_split_export, plan_volumes, volume_path, VOLUME_INDEX_FILENAME
+)
+from app.integrity import verify_export_zip
+from app.operations import export_archive
+from app.storage import StorageManager
+
+
+LIMIT = 200 * 1024
+
+
+def _make_audio(count, size):
+    rng = random.Random(42)
+    # Random bytes do not compress, which is the worst case for packing
+    return {
+        f"{i:04d}_word{i}.wav": bytes(rng.getrandbits(8) for _ in range(size))
+        for i in range(1, count + 1)
+    }
+
+
+def _split(tmp_dir, audio, limit=LIMIT):
+    entries = [
+        {"reference": name[:4], "gloss": name[5:-4], "audio_filename": name, "is_completed": True}
+        for name in sorted(audio)
+    ]
+    sizes = [{"filename": n, "size": len(d)} for n, d in sorted(audio.items())]
+    loaded = []
+    
+    def load(name):
+        loaded.append(name)
+        return audio[name]
+    
+    dest = os.path.join(tmp_dir, "export.zip")
+    result = create_split_export(entries, sizes, load, [], limit, dest)
+    return result, loaded
+
+
+def test_volume_path():
+    """Test volume naming."""
+    assert volume_path("out/export.zip", 1) == "out/export.part01.zip"
+    assert volume_path("export.zip", 12) == "export.part12.zip"
+    print("✓ Volume naming works")
+
+
+def test_plan_volumes():
+    """Test files are packed in order and spill into new volumes."""
+    sizes = [{"filename": f"{i}.wav", "size": 40000} for i in range(5)]
+    plan = plan_volumes(sizes, 100000)
+    
+    assert [plan[f"{i}.wav"] for i in range(5)] == [1, 1, 2, 2, 3]
+    print("✓ Volume planning works")
+
+
+def test_plan_rejects_oversized():
+    """Test a recording larger than the limit is rejected."""
+    try:
+        plan_volumes([{"filename": "big.wav", "size": 500000}], 100000)
+        assert False, "Should have raised ValueError"
+    except ValueError as e:
+        assert "big.wav" in str(e)
+        print("✓ Oversized recording rejected")
+
+
+def test_volumes_below_limit():
+    """Test every volume file respects the limit and verifies."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        result, loaded = _split(tmp_dir, _make_audio(12, 50000))
+        
+        assert result["success"], result.get("error")
+        assert len(result["volumes"]) > 1
+        for path in result["volumes"]:
+            assert os.path.getsize(path) <= LIMIT, f"{path} exceeds limit"
+            assert verify_export_zip(path)["success"]
+        # Each recording is loaded exactly once
+        assert len(loaded) == 12
+        print("✓ Volumes stay below limit")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_first_volume_contents():
+    """Test volume 1 holds the wordlist, metadata and a correct index."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        result, _ = _split(tmp_dir, _make_audio(12, 50000))
+        volumes = result["volumes"]
+        
+        with zipfile.ZipFile(volumes[0]) as zf:
+            names = zf.namelist()
+            index = json.loads(zf.read(VOLUME_INDEX_FILENAME))
+        
+        assert "wordlist.xml" in names
+        assert "metadata.json" in names
+        assert index["volumeCount"] == len(volumes)
+        
+        for filename, number in index["audio"].items():
+            with zipfile.ZipFile(volumes[number - 1]) as zf:
+                assert f"audio/{filename}" in zf.namelist()
+        print("✓ First volume holds wordlist and index")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_split_failure_cleans_up():
+    """Test failed split exports leave no volume files behind."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        result, _ = _split(tmp_dir, _make_audio(1, 300000))
+        
+        assert not result["success"]
+        assert os.listdir(tmp_dir) == []
+        print("✓ Failed split export cleans up")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_split_rejects_dedupe():
+    """Test a split export with dedupe fails before writing anything."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        storage = StorageManager(os.path.join(tmp_dir, "test.db"))
+        storage.replace_all(
+            [{"reference": "0001", "gloss": "water", "audio_filename": "a.wav"}],
+            [("a.wav", b"RIFF" * 100), ("b.wav", b"RIFF" * 100)]
+        )
+        dest = os.path.join(tmp_dir, "export.zip")
+        result = export_archive(storage, dest, dedupe_audio=True, max_volume_bytes=LIMIT)
+        
+        assert not result["success"]
+        assert "split" in result["error"]
+        assert os.listdir(tmp_dir) == ["test.db"]
+        print("✓ Split export rejects dedupe")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def run_all_tests():
+    """Run all split export tests."""
+    print("=" * 50)
+    print("Running Split Export Tests")
+    print("=" * 50)
+    
+    tests = [
+        test_volume_path,
+        test_plan_volumes,
+        test_plan_rejects_oversized,
+        test_volumes_below_limit,
+        test_first_volume_contents,
+        test_split_failure_cleans_up,
+        test_split_rejects_dedupe,
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: Unexpected error: {e}")
+            failed += 1
+    
+    print("=" * 50)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 50)
+    
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
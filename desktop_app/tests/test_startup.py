@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for startup cost reductions.
+
+Tests verify:
+1. LazyModule imports its module on first attribute access
+2. Importing the app modules does not import numpy or audio libraries
+3. The schema is only created when the stored schema version differs
+"""
+import sys
+import os
+import sqlite3
+import subprocess
+import tempfile
+
+# Add parent directory to path
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from app.lazy import LazyModule, module_available
+from app.storage import StorageManager, SCHEMA_VERSION
+
+
+def test_lazy_module():
+    """Test the module is imported on first use."""
+    colorsys = LazyModule("colorsys")
+    assert not colorsys.loaded
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0)[0] == 0.0
+    assert colorsys.loaded
+
+    missing = LazyModule("no_such_module_here")
+    try:
+        missing.anything
+        assert False, "Expected ImportError"
+    except ImportError:
+        pass
+
+    assert module_available("sqlite3")
+    assert not module_available("no_such_module_here")
+    print("✓ Lazy modules load on first use")
+
+
+def test_no_heavy_imports():
+    """Test app modules can be imported without numpy or audio libraries."""
+    script = (
+        "import sys\n"
+        "import app.storage, app.audio, app.audio_processing, app.playback, app.waveform\n"
+        "print(','.join(m for m in ('numpy', 'sounddevice', 'pyaudio', 'soundfile') if m in sys.modules))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", script], cwd=APP_DIR, capture_output=True, text=True, check=True
+    )
+    assert proc.stdout.strip() == "", proc.stdout
+    print("✓ No heavy imports at startup")
+
+
+def test_schema_version_skip():
+    """Test the schema is created once and then skipped."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "test.db")
+        StorageManager(db_path)
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        conn.close()
+
+        # A database claiming the current version is trusted as is
+        trusted = os.path.join(tmpdir, "trusted.db")
+        conn = sqlite3.connect(trusted)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT)")
+        conn.commit()
+        conn.close()
+        StorageManager(trusted)
+        conn = sqlite3.connect(trusted)
+        tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        conn.close()
+        assert tables == ["settings"]
+
+        # An older version is brought up to date
+        old = os.path.join(tmpdir, "old.db")
+        conn = sqlite3.connect(old)
+        conn.execute("CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT)")
+        conn.commit()
+        conn.close()
+        storage = StorageManager(old)
+        assert storage.get_total_count() == 0
+    print("✓ Schema check skipped when current")
+
+
+if __name__ == "__main__":
+    print("\n=== Startup Tests ===\n")
+
+    test_lazy_module()
+    test_no_heavy_imports()
+    test_schema_version_skip()
+
+    print("\n✓ All startup tests passed!\n")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for waveform peak summaries.
+
+Tests verify:
+1. Peaks keep the min/max of each column at every zoom level
+2. Peaks round-trip through storage serialization
+3. Drawing at a pixel width reduces to exactly that many columns
+4. The background backfill fills in missing summaries
+5. Switching storage stops the pass over the previous database
+6. A recording that cannot be read is skipped and counted
+"""
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.storage import StorageManager
+from app.waveform import (
+    compute_peaks, pack_peaks, unpack_peaks, select_level, store_waveform,
+    WaveformBackfill, WAVEFORM_LEVELS
+)
+from tests.audio_fixtures import make_wav
+
+RATE = 16000
+
+
+def test_peaks_keep_extremes():
+    """Test each level keeps the overall min and max."""
+    samples = np.zeros(100000, dtype=np.int16)
+    samples[12345] = 32767
+    samples[67890] = -32768
+    peaks = compute_peaks(samples)
+
+    for n in WAVEFORM_LEVELS:
+        mins, maxs = peaks[n]
+        assert len(mins) == len(maxs) == n
+        assert maxs.max() == 127 and mins.min() == -128
+    print("✓ Peaks keep extremes at every level")
+
+
+def test_short_recording():
+    """Test recordings shorter than a level keep one column per sample."""
+    peaks = compute_peaks(np.array([0, 256, -512], dtype=np.int16))
+    mins, maxs = peaks[2048]
+    assert mins.tolist() == [0, 1, -2]
+    assert maxs.tolist() == [0, 1, -2]
+    print("✓ Short recordings handled")
+
+
+def test_pack_round_trip_and_select():
+    """Test serialization and width selection."""
+    samples = (np.sin(np.linspace(0, 40, 50000)) * 20000).astype(np.int16)
+    levels_json, data = pack_peaks(compute_peaks(samples))
+    assert len(data) == 2 * sum(WAVEFORM_LEVELS)
+
+    levels = unpack_peaks(levels_json, data)
+    assert [len(m) for m, _ in levels] == list(WAVEFORM_LEVELS)
+
+    mins, maxs = select_level(levels, 300)
+    assert len(mins) == len(maxs) == 300
+    assert (mins <= maxs).all()
+
+    mins, maxs = select_level(levels, 5000)
+    assert len(mins) == 2048
+    print("✓ Peaks round-trip and select by width")
+
+
+def test_backfill():
+    """Test backfill computes summaries for existing audio only once."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageManager(os.path.join(tmpdir, "test.db"))
+        storage.save_audio("a.wav", make_wav(np.arange(5000) % 1000, RATE))
+        storage.save_audio("b.wav", make_wav(np.zeros(100), RATE))
+        store_waveform(storage, "b.wav", storage.get_audio("b.wav"))
+        assert storage.get_audio_without_waveform() == ["a.wav"]
+
+        backfill = WaveformBackfill(storage)
+        backfill.start()
+        backfill.join(timeout=10)
+
+        assert backfill.processed == 1
+        assert storage.get_audio_without_waveform() == []
+        row = storage.get_waveform("a.wav")
+        assert abs(row["duration"] - 5000 / RATE) < 1e-9
+
+        storage.delete_all_audio()
+        assert storage.get_waveform("a.wav") is None
+    print("✓ Backfill fills missing summaries")
+
+
+class SlowStorage:
+    """Wraps a StorageManager, slowing reads and counting them after a switch."""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.reads_after_stop = 0
+        self.stopped = False
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    def get_audio(self, filename):
+        if self.stopped:
+            self.reads_after_stop += 1
+        time.sleep(0.02)
+        return self.storage.get_audio(filename)
+
+
+class FailingStorage(SlowStorage):
+    """Raises for one recording, as a corrupt blob would."""
+
+    def get_audio(self, filename):
+        if filename == "bad.wav":
+            raise ValueError("Invalid WAV data")
+        return self.storage.get_audio(filename)
+
+
+def test_backfill_skips_failures():
+    """Test one unreadable recording does not stop the backfill."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageManager(os.path.join(tmpdir, "test.db"))
+        for name in ("a.wav", "bad.wav", "c.wav"):
+            storage.save_audio(name, make_wav(np.zeros(100), RATE))
+
+        backfill = WaveformBackfill(FailingStorage(storage))
+        backfill.start()
+        backfill.join(timeout=10)
+
+        assert backfill.processed == 2 and backfill.errors == 1
+        assert storage.get_audio_without_waveform() == ["bad.wav"]
+    print("✓ Backfill skips recordings it cannot read")
+
+
+def test_backfill_set_storage():
+    """Test switching storage stops the pass over the previous database."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        old = StorageManager(os.path.join(tmpdir, "old.db"))
+        new = StorageManager(os.path.join(tmpdir, "new.db"))
+        for i in range(20):
+            old.save_audio(f"{i}.wav", make_wav(np.zeros(100), RATE))
+        new.save_audio("new.wav", make_wav(np.zeros(100), RATE))
+
+        slow = SlowStorage(old)
+        backfill = WaveformBackfill(slow)
+        backfill.start()
+        time.sleep(0.05)
+        backfill.set_storage(new)
+        slow.stopped = True
+        backfill.join(timeout=10)
+
+        assert slow.reads_after_stop == 0
+        assert old.get_audio_without_waveform()
+        assert new.get_audio_without_waveform() == []
+    print("✓ Backfill follows the active storage")
+
+
+if __name__ == "__main__":
+    print("\n=== Waveform Tests ===\n")
+
+    test_peaks_keep_extremes()
+    test_short_recording()
+    test_pack_round_trip_and_select()
+    test_backfill()
+    test_backfill_set_storage()
+    test_backfill_skips_failures()
+
+    print("\n✓ All waveform tests passed!\n")
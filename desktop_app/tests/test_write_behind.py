@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Tests for the write-behind queue.
+
+Tests verify:
+1. Repeated writes to one key coalesce into one saved value
+2. A batch is saved in one transaction with completion status
+3. Pending writes are saved by the timer
+4. Closing flushes pending writes
+5. A failed flush is retried by a new timer
+6. Flushes wait for the shared storage lock held by a storage job
+"""
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.storage import StorageManager
+from app.write_behind import WriteBehindQueue
+from app.jobs import JobScheduler
+
+
+def make_storage(tmpdir, count=10):
+    storage = StorageManager(os.path.join(tmpdir, "test.db"))
+    storage.add_entries([{"reference": f"{i:04d}", "gloss": f"word{i}"} for i in range(1, count + 1)])
+    return storage
+
+
+def test_coalescing():
+    """Test repeated writes per key keep only the latest value."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = make_storage(tmpdir)
+        entry_id = storage.get_all_entries()[0]["id"]
+        queue = WriteBehindQueue(storage, delay=60)
+
+        for i in range(20):
+            queue.set_transcription(entry_id, f"text {i}")
+            queue.set_setting("last_entry_index", str(i))
+        assert queue.pending == 2
+        # Nothing touches the database until a flush
+        assert storage.get_entry(entry_id)["local_transcription"] == ""
+
+        assert queue.flush() == 2
+        assert storage.get_entry(entry_id)["local_transcription"] == "text 19"
+        assert storage.get_setting("last_entry_index") == "19"
+
+        stats = queue.stats()
+        assert stats["queued"] == 40 and stats["coalesced"] == 38
+        assert stats["flushes"] == 1 and stats["written"] == 2 and stats["pending"] == 0
+        assert queue.flush() == 0
+        queue.close()
+    print("✓ Writes coalesce per key")
+
+
+def test_batch_completion():
+    """Test a batch sets completion from text or existing audio."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = make_storage(tmpdir)
+        entries = storage.get_all_entries()
+        entries[2]["audio_filename"] = "0003_word3.wav"
+        storage.update_entry(entries[2])
+        version = storage.get_data_version()
+
+        queue = WriteBehindQueue(storage, delay=60)
+        queue.set_transcription(entries[0]["id"], "wata")
+        queue.set_transcription(entries[1]["id"], "   ")
+        queue.set_transcription(entries[2]["id"], "")
+        queue.flush()
+
+        by_id = {e["id"]: e for e in storage.get_all_entries()}
+        assert by_id[entries[0]["id"]]["is_completed"] is True
+        assert by_id[entries[1]["id"]]["is_completed"] is False
+        assert by_id[entries[2]["id"]]["is_completed"] is True
+
+        # One flush is one data version
+        assert storage.get_data_version() == version + 1
+        assert len(storage.get_entries_changed_since(version)) == 3
+        queue.close()
+    print("✓ Batch saved with completion status")
+
+
+def test_timer_flush():
+    """Test pending writes are saved after the delay."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = make_storage(tmpdir)
+        entry_id = storage.get_all_entries()[0]["id"]
+        queue = WriteBehindQueue(storage, delay=0.05)
+        queue.set_transcription(entry_id, "later")
+
+        # pending drops before the batch is written, so wait for the flush itself
+        deadline = time.time() + 2.0
+        while queue.stats()["last_flush_ms"] is None and time.time() < deadline:
+            time.sleep(0.01)
+        assert storage.get_entry(entry_id)["local_transcription"] == "later"
+        assert queue.stats()["last_flush_ms"] is not None
+        queue.close()
+    print("✓ Timer flushes pending writes")
+
+
+def test_close_flushes():
+    """Test close saves pending writes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = make_storage(tmpdir)
+        queue = WriteBehindQueue(storage, delay=60)
+        queue.set_setting("last_entry_index", "7")
+        queue.close()
+        assert storage.get_setting("last_entry_index") == "7"
+    print("✓ Close flushes pending writes")
+
+
+def test_failed_flush_retried():
+    """Test a failed batch is kept and saved by a retry timer."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = make_storage(tmpdir)
+        entry_id = storage.get_all_entries()[0]["id"]
+        apply_writes = storage.apply_writes
+        calls = []
+
+        def fail_once(transcriptions, settings):
+            calls.append(time.time())
+            if len(calls) == 1:
+                raise OSError("disk I/O error")
+            return apply_writes(transcriptions, settings)
+
+        storage.apply_writes = fail_once
+        queue = WriteBehindQueue(storage, delay=0.05)
+        queue.set_transcription(entry_id, "kept")
+
+        # No further writes are queued; only the retry timer can save it
+        deadline = time.time() + 2.0
+        while queue.stats()["flushes"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        stats = queue.stats()
+        assert stats["errors"] == 1 and stats["flushes"] == 1 and stats["pending"] == 0
+        assert storage.get_entry(entry_id)["local_transcription"] == "kept"
+        # The retry waits longer than the first flush did
+        assert calls[1] - calls[0] >= 0.09
+        queue.close()
+    print("✓ Failed flush retried")
+
+
+def test_flush_waits_for_storage_job():
+    """Test a flush waits for a running storage job instead of writing alongside it."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = make_storage(tmpdir)
+        entry_id = storage.get_all_entries()[0]["id"]
+        scheduler = JobScheduler()
+        queue = WriteBehindQueue(storage, delay=60, storage_lock=scheduler.storage_lock)
+        started = threading.Event()
+        release = threading.Event()
+        seen = []
+
+        def job():
+            started.set()
+            release.wait(2.0)
+            seen.append(storage.get_entry(entry_id)["local_transcription"])
+            # Flushing from inside the job does not deadlock
+            return queue.flush()
+
+        scheduler.submit("export", job)
+        assert started.wait(2.0)
+        queue.set_transcription(entry_id, "late")
+        flusher = threading.Thread(target=queue.flush)
+        flusher.start()
+        time.sleep(0.05)
+        assert flusher.is_alive()
+        release.set()
+        flusher.join(2.0)
+        assert not flusher.is_alive()
+        # The job saw the database as it was when it started
+        assert seen == [""]
+        assert storage.get_entry(entry_id)["local_transcription"] == "late"
+        queue.close()
+        scheduler.shutdown()
+    print("✓ Flushes wait for storage jobs")
+
+
+if __name__ == "__main__":
+    print("\n=== Write-behind Tests ===\n")
+
+    test_coalescing()
+    test_batch_completion()
+    test_timer_flush()
+    test_close_flushes()
+    test_failed_flush_retried()
+    test_flush_waits_for_storage_job()
+
+    print("\n✓ All write-behind tests passed!\n")
@@ -9,6 +9,8 @@
 let currentScreen = 'home-screen';
 let currentEntryIndex = 0;
 let entries = [];
+let dataVersion = 0;
+let mediaBase = null;
 let currentEntryId = null;
 let isRecording = false;
 
@@ -17,8 +19,10 @@ window.addEventListener('pywebviewready', init);
 
 async function init() {
     try {
+        mediaBase = await window.pywebview.api.get_media_base_url();
         await loadEntries();
         setupEventListeners();
+        await loadProjects();
         await updateHomeScreen();
         console.log('App initialized');
     } catch (err) {
@@ -29,6 +33,8 @@ async function init() {
 
 function setupEventListeners() {
     // Home screen
+    document.getElementById('project-select').addEventListener('change', (e) => switchProject(e.target.value));
+    document.getElementById('new-project-btn').addEventListener('click', createProject);
     document.getElementById('import-btn').addEventListener('click', () => showScreen('import-screen'));
     document.getElementById('elicitation-btn').addEventListener('click', () => showScreen('elicitation-screen'));
     document.getElementById('export-btn').addEventListener('click', () => showScreen('export-screen'));
@@ -62,6 +68,14 @@ function setupEventListeners() {
     // Export screen
     document.getElementById('export-back-btn').addEventListener('click', () => showScreen('home-screen'));
     document.getElementById('export-data-btn').addEventListener('click', exportData);
+    
+    // API timing overlay
+    document.addEventListener('keydown', (e) => {
+        if (e.ctrlKey && e.shiftKey && e.key.toLowerCase() === 'p') {
+            e.preventDefault();
+            togglePerfOverlay();
+        }
+    });
 }
 
 function showScreen(id) {
@@ -69,16 +83,49 @@ function showScreen(id) {
     document.getElementById(id).classList.add('active');
     currentScreen = id;
     
+    // Keep a warm input stream with pre-roll while eliciting, if the
+    // 'preroll_ms' setting is above 0; otherwise the API releases the
+    // stream and recordings open their own (fire and forget)
+    const monitor = id === 'elicitation-screen'
+        ? window.pywebview.api.start_monitoring()
+        : window.pywebview.api.stop_monitoring();
+    monitor.catch(err => console.warn('Input monitoring failed:', err));
+    
     if (id === 'elicitation-screen') loadElicitationScreen();
     else if (id === 'export-screen') loadExportScreen();
     else if (id === 'home-screen') updateHomeScreen();
 }
 
 async function loadEntries() {
+    // Read the version first: changes made meanwhile are just sent again
+    dataVersion = await window.pywebview.api.get_data_version();
     entries = await window.pywebview.api.load_entries();
     updateButtonStates();
 }
 
+// Patch the local entries with changes made since the last sync.
+// Returns the current progress counters.
+async function syncEntries() {
+    const changes = await window.pywebview.api.get_changes_since(dataVersion);
+    if (changes.reset) {
+        await loadEntries();
+        return changes.progress;
+    }
+    
+    for (const changed of changes.changed) {
+        const idx = entries.findIndex(e => e.id === changed.id);
+        if (idx === -1 || entries[idx].reference !== changed.reference) {
+            // New entry or new sort position: fall back to a full reload
+            await loadEntries();
+            return changes.progress;
+        }
+        entries[idx] = changed;
+    }
+    dataVersion = changes.version;
+    updateButtonStates();
+    return changes.progress;
+}
+
 function updateButtonStates() {
     const hasEntries = entries.length > 0;
     document.getElementById('elicitation-btn').disabled = !hasEntries;
@@ -86,13 +133,89 @@ function updateButtonStates() {
 }
 
 async function updateHomeScreen() {
-    const progress = await window.pywebview.api.get_progress();
+    const progress = await syncEntries();
     document.getElementById('total-count').textContent = progress.total;
     document.getElementById('completed-count').textContent = progress.completed;
     document.getElementById('remaining-count').textContent = progress.total - progress.completed;
     updateButtonStates();
 }
 
+// Projects: the picker shows the statistics cached in the registry
+async function loadProjects() {
+    const projects = await window.pywebview.api.list_projects();
+    document.getElementById('project-select').innerHTML = projects.map(p => {
+        const stats = p.stats ? ` (${p.stats.completed}/${p.stats.total})` : '';
+        return `<option value="${p.id}"${p.active ? ' selected' : ''}>${escapeHtml(p.name)}${stats}</option>`;
+    }).join('');
+}
+
+async function switchProject(projectId) {
+    const result = await window.pywebview.api.switch_project(projectId);
+    if (!result.success) {
+        alert('Cannot switch project: ' + result.error);
+    } else {
+        await onProjectChanged();
+    }
+    await loadProjects();
+}
+
+async function createProject() {
+    const name = prompt('Name of the new project, e.g. the language:');
+    if (!name || !name.trim()) return;
+    
+    const result = await window.pywebview.api.create_project(name.trim());
+    if (!result.success) {
+        alert('Could not create project: ' + result.error);
+        return;
+    }
+    await onProjectChanged();
+    await loadProjects();
+}
+
+async function onProjectChanged() {
+    // Media URLs change with the project, so cached pictures are not mixed up
+    mediaBase = await window.pywebview.api.get_media_base_url();
+    currentEntryIndex = 0;
+    await loadEntries();
+    await updateHomeScreen();
+}
+
+// Background jobs: settled by pushed updates, with polling as a fallback
+const jobWaiters = new Map();
+
+window.onJobUpdate = function(job) {
+    const waiter = jobWaiters.get(job.id);
+    if (!waiter) return;
+    if (waiter.onProgress && job.progress !== null) waiter.onProgress(job.progress);
+    if (['done', 'failed', 'cancelled'].includes(job.status)) {
+        jobWaiters.delete(job.id);
+        clearInterval(waiter.poll);
+        waiter.resolve(job);
+    }
+};
+
+// Run an API method as a job and resolve with its result dict
+async function runJob(method, kwargs, onProgress = null) {
+    const submitted = await window.pywebview.api.submit_job(method, kwargs);
+    if (!submitted.success) throw new Error(submitted.error);
+    
+    const job = await new Promise(resolve => {
+        const waiter = { resolve, onProgress };
+        const check = async () => {
+            const state = await window.pywebview.api.get_job(submitted.job_id);
+            if (state) window.onJobUpdate(state);
+        };
+        waiter.poll = setInterval(check, 2000);
+        jobWaiters.set(submitted.job_id, waiter);
+        // A short job may have finished, and its update been dropped,
+        // before the waiter existed
+        check();
+    });
+    
+    if (job.status === 'done') return job.result;
+    return { success: false, error: job.error || 'Cancelled' };
+}
+
 // Import functions
 async function handleFileSelect() {
     const status = document.getElementById('import-status');
@@ -104,7 +227,7 @@ async function handleFileSelect() {
         status.textContent = 'Processing...';
         status.className = 'status-message info';
         
-        const result = await window.pywebview.api.import_from_file(path);
+        const result = await runJob('import_from_file', { path });
         
         if (result.success) {
             await loadEntries();
@@ -143,7 +266,7 @@ async function handleUrlImport() {
         status.textContent = 'Fetching...';
         status.className = 'status-message info';
         
-        const result = await window.pywebview.api.import_from_url(url);
+        const result = await runJob('import_from_url', { url });
         
         if (result.success) {
             await loadEntries();
@@ -190,7 +313,7 @@ function displayCurrentEntry() {
     const pic = document.getElementById('picture-container');
     if (entry.picture_filename) {
         pic.style.display = 'block';
-        document.getElementById('word-picture').src = entry.picture_filename;
+        document.getElementById('word-picture').src = pictureUrl(entry, 'display');
     } else {
         pic.style.display = 'none';
     }
@@ -201,15 +324,49 @@ function displayCurrentEntry() {
     
     const playBtn = document.getElementById('play-btn');
     playBtn.style.display = entry.audio_filename ? 'flex' : 'none';
+    drawWaveform(entry);
     
     updateRecordingStatus('');
     
+    // Decode this entry's and its neighbours' recordings ahead of playback
+    const nearby = [entry, entries[currentEntryIndex + 1], entries[currentEntryIndex - 1]]
+        .filter(e => e && e.audio_filename)
+        .map(e => e.id);
+    if (nearby.length) {
+        window.pywebview.api.prefetch_audio(nearby).catch(err => {
+            console.warn('Failed to prefetch audio:', err);
+        });
+    }
+    prefetchPictures();
+    
     // Save position (fire and forget, no need to await)
     window.pywebview.api.set_last_position(currentEntryIndex).catch(err => {
         console.warn('Failed to save position:', err);
     });
 }
 
+// Local files go through the media server so the webview can cache them;
+// size 'thumb' or 'display' asks for a downscaled copy
+function pictureUrl(entry, size = null) {
+    if (!mediaBase || /^[a-z]+:\/\//i.test(entry.picture_filename)) return entry.picture_filename;
+    const url = `${mediaBase}/picture/${entry.id}`;
+    return size ? `${url}?size=${size}` : url;
+}
+
+// Resize the next entries' pictures in the background and warm the webview
+// cache, so moving forward shows the picture without waiting for it
+const PICTURE_PREFETCH_AHEAD = 3;
+function prefetchPictures() {
+    const upcoming = entries.slice(currentEntryIndex + 1, currentEntryIndex + 1 + PICTURE_PREFETCH_AHEAD)
+        .concat(entries[currentEntryIndex - 1] || [])
+        .filter(e => e.picture_filename);
+    if (!upcoming.length) return;
+    window.pywebview.api.prefetch_pictures(upcoming.map(e => e.id)).catch(err => {
+        console.warn('Failed to prefetch pictures:', err);
+    });
+    upcoming.forEach(e => { new Image().src = pictureUrl(e, 'display'); });
+}
+
 async function navigateEntry(direction) {
     await saveCurrentEntry();
     currentEntryIndex += direction;
@@ -233,7 +390,7 @@ async function saveCurrentEntry() {
 
 async function saveAndGoHome() {
     await saveCurrentEntry();
-    await loadEntries();
+    // The home screen syncs the changed entries
     showScreen('home-screen');
 }
 
@@ -245,6 +402,35 @@ async function updateTranscription(value) {
     }
 }
 
+async function drawWaveform(entry) {
+    const canvas = document.getElementById('waveform');
+    if (!entry || !entry.audio_filename) {
+        canvas.style.display = 'none';
+        return;
+    }
+    
+    const entryId = entry.id;
+    const result = await window.pywebview.api.get_waveform(entryId, canvas.width);
+    // Ignore stale responses after navigating away
+    if (entryId !== currentEntryId) return;
+    if (!result.success) {
+        canvas.style.display = 'none';
+        return;
+    }
+    
+    canvas.style.display = 'block';
+    const ctx = canvas.getContext('2d');
+    const mid = canvas.height / 2;
+    const step = canvas.width / Math.max(1, result.min.length);
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    ctx.fillStyle = getComputedStyle(document.documentElement).getPropertyValue('--primary-color');
+    for (let i = 0; i < result.min.length; i++) {
+        const top = mid - (result.max[i] / 128) * mid;
+        const bottom = mid - (result.min[i] / 128) * mid;
+        ctx.fillRect(i * step, top, Math.max(1, step), Math.max(1, bottom - top));
+    }
+}
+
 async function toggleRecording() {
     const btn = document.getElementById('record-btn');
     const txt = document.getElementById('record-text');
@@ -266,6 +452,7 @@ async function toggleRecording() {
                 }
                 
                 document.getElementById('play-btn').style.display = 'flex';
+                drawWaveform(entry);
                 updateRecordingStatus('Recording saved!', 'success');
             } else {
                 updateRecordingStatus('Recording failed: ' + result.error, 'error');
@@ -299,7 +486,13 @@ async function toggleRecording() {
 async function playRecording() {
     try {
         const success = await window.pywebview.api.play_audio(currentEntryId);
-        if (!success) {
+        if (success) return;
+        
+        // No audio output in Python: let the webview stream the recording
+        const entry = entries[currentEntryIndex];
+        if (mediaBase && entry && entry.audio_filename) {
+            await new Audio(`${mediaBase}/audio/${encodeURIComponent(entry.audio_filename)}`).play();
+        } else {
             updateRecordingStatus('No recording available', 'error');
         }
     } catch (err) {
@@ -341,6 +534,7 @@ async function populateEntryList(filterText = null) {
     
     list.innerHTML = summaries.map((e, idx) => `
         <div class="entry-item" data-index="${idx}" data-id="${e.id}">
+            ${e.picture_filename ? `<img class="entry-thumb" loading="lazy" alt="" src="${pictureUrl(e, 'thumb')}">` : ''}
             <span class="entry-ref">${e.reference}</span>
             <span class="entry-gloss">${e.gloss}</span>
             <span class="entry-badge">${e.is_completed ? '✓' : ''}</span>
@@ -397,7 +591,9 @@ async function exportData() {
         
         status.textContent = 'Preparing export...';
         
-        const result = await window.pywebview.api.export_zip(destPath);
+        const result = await runJob('export_zip', { dest_path: destPath }, progress => {
+            status.textContent = `Preparing export... ${Math.round(progress * 100)}%`;
+        });
         
         if (result.success) {
             status.textContent = `Export successful! Saved to: ${result.path}`;
@@ -414,3 +610,75 @@ async function exportData() {
         btn.disabled = false;
     }
 }
+
+// API timing overlay: per-method latency recorded by the Python side
+let perfTimer = null;
+
+async function togglePerfOverlay() {
+    const overlay = document.getElementById('perf-overlay');
+    if (perfTimer) {
+        clearInterval(perfTimer);
+        perfTimer = null;
+        overlay.hidden = true;
+        await window.pywebview.api.set_perf_enabled(false);
+        await window.pywebview.api.set_query_tracing(false);
+        return;
+    }
+    await window.pywebview.api.set_perf_enabled(true);
+    await window.pywebview.api.set_query_tracing(true);
+    overlay.hidden = false;
+    await renderPerfOverlay();
+    perfTimer = setInterval(renderPerfOverlay, 1000);
+}
+
+function formatMs(ms) {
+    return ms === null ? '-' : ms.toFixed(1);
+}
+
+async function renderPerfOverlay() {
+    const overlay = document.getElementById('perf-overlay');
+    const stats = await window.pywebview.api.get_perf_stats();
+    const queries = await window.pywebview.api.get_query_stats(5);
+    const methods = Object.entries(stats.methods)
+        .sort((a, b) => (b[1].p95_ms || 0) - (a[1].p95_ms || 0));
+    
+    if (methods.length === 0) {
+        overlay.textContent = 'No API calls recorded yet';
+        return;
+    }
+    
+    const connections = queries.connections;
+    
+    overlay.innerHTML = `
+        <table>
+            <tr><th>method</th><th>calls</th><th>p50</th><th>p95</th><th>p99</th><th>bytes</th><th>err</th></tr>
+            ${methods.map(([name, m]) => `
+                <tr${m.errors ? ' class="perf-alert"' : ''}>
+                    <td>${name}</td>
+                    <td>${m.calls}</td>
+                    <td>${formatMs(m.p50_ms)}</td>
+                    <td>${formatMs(m.p95_ms)}</td>
+                    <td>${formatMs(m.p99_ms)}</td>
+                    <td>${m.payload_bytes_avg}</td>
+                    <td>${m.errors}</td>
+                </tr>
+            `).join('')}
+        </table>
+        <table>
+            <tr><th>SQL (${connections.count} connects, ${formatMs(connections.avg_ms)} ms each)</th><th>calls</th><th>avg</th><th>total</th><th>share</th></tr>
+            ${queries.statements.map(q => `
+                <tr${q.max_ms >= queries.slow.threshold_ms ? ' class="perf-alert"' : ''}>
+                    <td>${escapeHtml(q.sql.slice(0, 48))}</td>
+                    <td>${q.calls}</td>
+                    <td>${formatMs(q.avg_ms)}</td>
+                    <td>${formatMs(q.total_ms)}</td>
+                    <td>${Math.round(q.share * 100)}%</td>
+                </tr>
+            `).join('')}
+        </table>
+    `;
+}
+
+function escapeHtml(text) {
+    return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+}